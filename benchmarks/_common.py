@@ -0,0 +1,62 @@
+"""_common.py: Helpers shared by the benchmarks of fleets of identical thermal units.
+
+The model library has no identical thermal units, so the fleet is synthetic: each
+thermal unit that is not must-take is split into identical units with a share of its
+capacity and ramp rate. The model folder is copied to a temporary folder, so the
+processed files of the model library are not changed.
+"""
+
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from pownet import SystemInput
+from pownet.core.data_processor import DataProcessor
+
+
+def split_thermal_units(input_folder, model_name, units_per_plant):
+    """Replace each thermal unit that is not must-take with identical units."""
+    thermal_unit_file = os.path.join(input_folder, model_name, "thermal_unit.csv")
+    thermal_units = pd.read_csv(thermal_unit_file)
+    is_split = thermal_units["must_take"] == 0
+    split_units = thermal_units.loc[
+        thermal_units.index[is_split].repeat(units_per_plant)
+    ].copy()
+    for column in ["max_capacity", "min_capacity", "ramp_rate"]:
+        split_units[column] = split_units[column] / units_per_plant
+    split_units["name"] = split_units["name"] + [
+        f"_{i}" for i in range(units_per_plant)
+    ] * int(is_split.sum())
+    pd.concat([split_units, thermal_units.loc[~is_split]]).to_csv(
+        thermal_unit_file, index=False
+    )
+
+
+def load_split_inputs(args) -> SystemInput:
+    """Load a copy of the model whose thermal units are split into
+    args.units_per_plant identical units. With one unit per plant, the thermal units
+    are unchanged.
+    """
+    with tempfile.TemporaryDirectory() as input_folder:
+        shutil.copytree(
+            os.path.join(args.input_folder, args.model_name),
+            os.path.join(input_folder, args.model_name),
+        )
+        if args.units_per_plant > 1:
+            split_thermal_units(input_folder, args.model_name, args.units_per_plant)
+        DataProcessor(
+            input_folder=input_folder,
+            model_name=args.model_name,
+            year=args.year,
+            frequency=args.frequency,
+        ).execute_data_pipeline()
+        inputs = SystemInput(
+            input_folder=input_folder,
+            model_name=args.model_name,
+            year=args.year,
+            sim_horizon=args.sim_horizon,
+        )
+        inputs.load_and_check_data()
+    return inputs
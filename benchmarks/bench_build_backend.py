@@ -0,0 +1,81 @@
+"""bench_build_backend.py: Compare the time of ModelBuilder.build with the expression
+backend against the matrix backend, which adds the thermal and system constraints
+as sparse matrices.
+
+The models are only built, not optimized, so the benchmark does not depend on the size
+limit of the Gurobi license. The processed input files of the model must exist, e.g.
+by running DataProcessor first.
+
+Usage:
+    python benchmarks/bench_build_backend.py --input_folder model_library \
+        --model_name dummy --sim_horizon 24 --repeats 5
+"""
+
+import argparse
+import time
+
+from pownet import ModelBuilder, SystemInput
+from pownet.data_utils import create_init_condition
+
+
+def time_builds(inputs: SystemInput, build_backend: str, repeats: int) -> dict:
+    """Return the time spent in add_constraints of the thermal and system builders
+    and in ModelBuilder.build, including model.update() in the total."""
+    timings = {"thermal": 0.0, "system": 0.0, "total": 0.0}
+    init_conditions = create_init_condition(inputs.thermal_units, inputs.storage_units)
+    for _ in range(repeats):
+        model_builder = ModelBuilder(inputs, build_backend=build_backend)
+        builders = {
+            "thermal": model_builder.thermal_builder,
+            "system": model_builder.system_builder,
+        }
+        # Time add_constraints of the builders through a wrapper
+        for name, builder in builders.items():
+            add_constraints = builder.add_constraints
+
+            def timed_add_constraints(*args, _name=name, _func=add_constraints, **kw):
+                start = time.perf_counter()
+                _func(*args, **kw)
+                timings[_name] += time.perf_counter() - start
+
+            builder.add_constraints = timed_add_constraints
+
+        start = time.perf_counter()
+        model_builder.build(step_k=1, init_conds=init_conditions)
+        model_builder.model.update()
+        timings["total"] += time.perf_counter() - start
+        model_builder.model.dispose()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="dummy")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--sim_horizon", type=int, default=24)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    inputs = SystemInput(
+        input_folder=args.input_folder,
+        model_name=args.model_name,
+        year=args.year,
+        sim_horizon=args.sim_horizon,
+    )
+    inputs.load_and_check_data()
+
+    expression = time_builds(inputs, build_backend="expression", repeats=args.repeats)
+    matrix = time_builds(inputs, build_backend="matrix", repeats=args.repeats)
+
+    print(f"{args.model_name}: {args.repeats} builds, sim_horizon={args.sim_horizon}")
+    print(f"{'builder':<12} {'expression (s)':>15} {'matrix (s)':>11} {'speedup':>8}")
+    for name in expression:
+        speedup = expression[name] / matrix[name] if matrix[name] > 0 else float("nan")
+        print(
+            f"{name:<12} {expression[name]:>15.4f} {matrix[name]:>11.4f} {speedup:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""bench_commitment_prefix.py: Compare a rolling horizon simulation with and without
+fixing the status of the thermal units before each solve.
+
+Before each step is solved, the status of the units that must run to meet the demand
+is fixed on, the status of the units that are never economic by the merit order and
+are off in the LP relaxation is fixed off, and the status that the reduced costs of
+the LP relaxation decide is fixed. The table reports the total objective value, the
+time to build or update the models including the pre-solve pass, the solver time,
+and the number of status variables fixed by each test. A step that is infeasible
+with the fixed status is solved again without it, which is counted as a release. The
+model folder is copied to a temporary folder, so the processed files of the model
+library are not changed.
+
+Usage:
+    python benchmarks/bench_commitment_prefix.py --input_folder model_library \
+        --model_name dummy --sim_horizon 24 --steps 7 --solver highs
+"""
+
+import argparse
+import collections
+import os
+import shutil
+import tempfile
+import time
+
+from pownet import ModelBuilder, SystemInput
+from pownet.core.data_processor import DataProcessor
+from pownet.core.record import SystemRecord
+from pownet.data_utils import create_init_condition
+
+
+def run_simulation(args, inputs, prefix_commitment):
+    model_builder = ModelBuilder(inputs, prefix_commitment=prefix_commitment)
+    system_record = SystemRecord(inputs)
+    init_conditions = create_init_condition(inputs.thermal_units, inputs.storage_units)
+    build_time = 0.0
+    fixed = collections.Counter()
+    releases = 0
+    for step_k in range(1, args.steps + 1):
+        start = time.perf_counter()
+        if step_k == 1:
+            power_system_model = model_builder.build(step_k, init_conditions)
+        else:
+            power_system_model = model_builder.update(step_k, init_conditions)
+        build_time += time.perf_counter() - start
+        power_system_model.optimize(
+            solver=args.solver,
+            log_to_console=False,
+            mipgap=args.mipgap,
+            num_threads=args.num_threads,
+        )
+        if prefix_commitment:
+            fixed.update(power_system_model.fixed_commitment)
+            releases += power_system_model.commitment_released
+        system_record.keep(
+            runtime=power_system_model.get_runtime(),
+            objval=power_system_model.get_objval(),
+            solution=power_system_model.get_structured_solution(),
+            step_k=step_k,
+        )
+        init_conditions = system_record.get_init_conds()
+
+    return {
+        "prefix": prefix_commitment,
+        "objval": sum(system_record.get_objvals()),
+        "build": build_time,
+        "solver": sum(system_record.get_runtimes()),
+        "fixed": fixed,
+        "releases": releases,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="dummy")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--frequency", type=int, default=50)
+    parser.add_argument("--sim_horizon", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=7)
+    parser.add_argument("--solver", default="highs")
+    parser.add_argument("--mipgap", type=float, default=1e-3)
+    parser.add_argument("--num_threads", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as input_folder:
+        shutil.copytree(
+            os.path.join(args.input_folder, args.model_name),
+            os.path.join(input_folder, args.model_name),
+        )
+        DataProcessor(
+            input_folder=input_folder,
+            model_name=args.model_name,
+            year=args.year,
+            frequency=args.frequency,
+        ).execute_data_pipeline()
+        inputs = SystemInput(
+            input_folder=input_folder,
+            model_name=args.model_name,
+            year=args.year,
+            sim_horizon=args.sim_horizon,
+        )
+        inputs.load_and_check_data()
+
+    results = [run_simulation(args, inputs, prefix) for prefix in [False, True]]
+
+    print(
+        f"{args.model_name}: sim_horizon={args.sim_horizon}, steps={args.steps}, "
+        f"solver={args.solver}, mipgap={args.mipgap}"
+    )
+    print(
+        f"{'prefix':>7} {'objval':>14} {'gap':>8} {'build (s)':>10} "
+        f"{'solver (s)':>11} {'must_run':>9} {'never_econ':>11} "
+        f"{'reduced_cost':>13} {'releases':>9}"
+    )
+    for result in results:
+        gap = result["objval"] / results[0]["objval"] - 1
+        fixed = result["fixed"]
+        print(
+            f"{str(result['prefix']):>7} {result['objval']:>14.1f} {gap:>8.3%} "
+            f"{result['build']:>10.3f} {result['solver']:>11.3f} "
+            f"{fixed['must_run']:>9} {fixed['never_economic']:>11} "
+            f"{fixed['reduced_cost']:>13} {result['releases']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""bench_constraint_update.py: Compare the time of ModelBuilder.update when the
+time-dependent constraints are updated in place against removing and re-adding them.
+
+The models are only built and updated, not optimized, so the benchmark does not depend
+on the size limit of the Gurobi license. The processed input files of the model must
+exist, e.g. by running DataProcessor first.
+
+Usage:
+    python benchmarks/bench_constraint_update.py --input_folder model_library \
+        --model_name dummy --sim_horizon 24 --steps 10
+"""
+
+import argparse
+import time
+
+from pownet import ModelBuilder, SystemInput
+from pownet.data_utils import create_init_condition
+
+
+def time_updates(inputs: SystemInput, update_in_place: bool, steps: int) -> dict:
+    """Return the time spent in update_constraints of each builder, including
+    model.update() in the total."""
+    model_builder = ModelBuilder(inputs, update_in_place=update_in_place)
+    init_conditions = create_init_condition(inputs.thermal_units, inputs.storage_units)
+    model_builder.build(step_k=1, init_conds=init_conditions)
+
+    builders = {
+        "thermal": model_builder.thermal_builder,
+        "hydro": model_builder.hydro_builder,
+        "nondispatch": model_builder.nondispatch_builder,
+        "storage": model_builder.storage_builder,
+        "system": model_builder.system_builder,
+    }
+    timings = {name: 0.0 for name in builders}
+    timings["total"] = 0.0
+    # The system builder needs the variables of the other builders to rebuild
+    system_kwargs = {
+        "spin_vars": model_builder.thermal_builder.spin,
+        "vpowerbar_vars": model_builder.thermal_builder.vpowerbar,
+        "thermal_status_vars": model_builder.thermal_builder.status,
+        "pthermal": model_builder.thermal_builder.pthermal,
+        "phydro": model_builder.hydro_builder.phydro,
+        "psolar": model_builder.nondispatch_builder.psolar,
+        "pwind": model_builder.nondispatch_builder.pwind,
+        "pimp": model_builder.nondispatch_builder.pimp,
+        "pcharge": model_builder.storage_builder.pcharge,
+        "pdischarge": model_builder.storage_builder.pdischarge,
+        "charge_state": model_builder.storage_builder.charge_state,
+    }
+    for step_k in range(2, steps + 2):
+        for builder in builders.values():
+            builder.update_variables(step_k=step_k)
+        total_start = time.perf_counter()
+        for name, builder in builders.items():
+            kwargs = system_kwargs if name == "system" else {}
+            start = time.perf_counter()
+            builder.update_constraints(
+                step_k=step_k, init_conds=init_conditions, **kwargs
+            )
+            timings[name] += time.perf_counter() - start
+        model_builder.model.update()
+        timings["total"] += time.perf_counter() - total_start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="dummy")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--sim_horizon", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+
+    inputs = SystemInput(
+        input_folder=args.input_folder,
+        model_name=args.model_name,
+        year=args.year,
+        sim_horizon=args.sim_horizon,
+    )
+    inputs.load_and_check_data()
+
+    rebuild = time_updates(inputs, update_in_place=False, steps=args.steps)
+    in_place = time_updates(inputs, update_in_place=True, steps=args.steps)
+
+    print(f"{args.model_name}: {args.steps} updates, sim_horizon={args.sim_horizon}")
+    print(f"{'builder':<12} {'rebuild (s)':>12} {'in place (s)':>13} {'speedup':>8}")
+    for name in rebuild:
+        speedup = rebuild[name] / in_place[name] if in_place[name] > 0 else float("nan")
+        print(
+            f"{name:<12} {rebuild[name]:>12.4f} {in_place[name]:>13.4f} {speedup:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""bench_lagrangian.py: Compare a rolling horizon simulation solved as a MIP with one
+solved by Lagrangian decomposition into thermal unit subproblems.
+
+The flow balance and reserve requirement constraints are relaxed, and the unit
+subproblems are solved in parallel. Each step reports the objective value of the
+economic dispatch of the best commitment, the lower bound of the Lagrangian dual, and
+the duality gap between them. The MIP is solved with HiGHS by default because the
+restricted Gurobi license is too small for larger models. Pass --units_per_plant to
+split each thermal unit into identical units and get more subproblems, as in
+bench_thermal_clusters.py. The model folder is copied to a temporary folder, so the
+processed files of the model library are not changed.
+
+Usage:
+    python benchmarks/bench_lagrangian.py --input_folder model_library \
+        --model_name dummy --units_per_plant 4 --sim_horizon 24 --steps 3
+"""
+
+import argparse
+import time
+
+from pownet import ModelBuilder
+from pownet.core.record import SystemRecord
+from pownet.data_utils import create_init_condition
+
+from _common import load_split_inputs
+
+
+def run_simulation(args, inputs, solver):
+    start = time.perf_counter()
+    model_builder = ModelBuilder(inputs)
+    system_record = SystemRecord(inputs)
+    init_conditions = create_init_condition(inputs.thermal_units, inputs.storage_units)
+    steps = []
+    for step_k in range(1, args.steps + 1):
+        if step_k == 1:
+            power_system_model = model_builder.build(step_k, init_conditions)
+        else:
+            power_system_model = model_builder.update(step_k, init_conditions)
+        power_system_model.optimize(
+            solver=solver,
+            log_to_console=False,
+            mipgap=args.mipgap,
+            num_threads=args.num_threads,
+        )
+        steps.append(
+            {
+                "solver": solver,
+                "step_k": step_k,
+                "objval": power_system_model.get_objval(),
+                "lower_bound": power_system_model.lagrangian_bound,
+                "gap": power_system_model.duality_gap,
+                "iterations": power_system_model.lagrangian_iterations,
+                "runtime": power_system_model.get_runtime(),
+            }
+        )
+        system_record.keep(
+            runtime=power_system_model.get_runtime(),
+            objval=power_system_model.get_objval(),
+            solution=power_system_model.get_structured_solution(),
+            step_k=step_k,
+        )
+        init_conditions = system_record.get_init_conds()
+    return steps, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="dummy")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--frequency", type=int, default=50)
+    parser.add_argument("--units_per_plant", type=int, default=1)
+    parser.add_argument("--sim_horizon", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=3)
+    parser.add_argument("--solver", default="highs")
+    parser.add_argument("--mipgap", type=float, default=1e-3)
+    parser.add_argument("--num_threads", type=int, default=0)
+    args = parser.parse_args()
+
+    inputs = load_split_inputs(args)
+
+    results = []
+    for solver in [args.solver, "lagrangian"]:
+        steps, wall_time = run_simulation(args, inputs, solver)
+        results.append((solver, steps, wall_time))
+
+    print(
+        f"{args.model_name}: {len(inputs.thermal_units)} thermal units, "
+        f"sim_horizon={args.sim_horizon}, steps={args.steps}, mipgap={args.mipgap}"
+    )
+    print(
+        f"{'solver':>10} {'step':>5} {'objval':>14} {'lower bound':>14} "
+        f"{'gap':>8} {'iters':>6} {'solver (s)':>11}"
+    )
+    for solver, steps, _ in results:
+        for step in steps:
+            lower_bound = step["lower_bound"]
+            gap = step["gap"]
+            print(
+                f"{solver:>10} {step['step_k']:>5} {step['objval']:>14.1f} "
+                f"{'-' if lower_bound is None else f'{lower_bound:.1f}':>14} "
+                f"{'-' if gap is None else f'{gap:.3%}':>8} "
+                f"{step['iterations'] or '-':>6} {step['runtime']:>11.3f}"
+            )
+    for solver, steps, wall_time in results:
+        print(
+            f"{solver}: objval {sum(step['objval'] for step in steps):.1f}, "
+            f"total {wall_time:.3f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
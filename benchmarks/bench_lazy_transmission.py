@@ -0,0 +1,107 @@
+"""bench_lazy_transmission.py: Compare a rolling horizon simulation with all transmission
+constraints in the model against adding them only after a solution violates them.
+
+With lazy transmission constraints, the flow limits of the lines and the Kirchhoff
+constraints of the cycles start outside the model. After each solve, the violated ones
+are added and the model is solved again. The lines and cycles that were added stay in
+the model, so later steps usually need no extra solves. The processed input files of
+the model must exist, e.g. by running DataProcessor first.
+
+Usage:
+    python benchmarks/bench_lazy_transmission.py --input_folder model_library \
+        --model_name dummy --sim_horizon 24 --steps 7 --solver gurobi
+"""
+
+import argparse
+import time
+
+from pownet import ModelBuilder, SystemInput
+from pownet.core.record import SystemRecord
+from pownet.data_utils import create_init_condition
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="dummy")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--sim_horizon", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=7)
+    parser.add_argument("--dc_opf", default="kirchhoff")
+    parser.add_argument("--solver", default="gurobi")
+    parser.add_argument("--mipgap", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    inputs = SystemInput(
+        input_folder=args.input_folder,
+        model_name=args.model_name,
+        year=args.year,
+        sim_horizon=args.sim_horizon,
+        dc_opf=args.dc_opf,
+    )
+    inputs.load_and_check_data()
+
+    results = []
+    for lazy_transmission in [False, True]:
+        start = time.perf_counter()
+        model_builder = ModelBuilder(inputs, lazy_transmission=lazy_transmission)
+        system_record = SystemRecord(inputs)
+        init_conditions = create_init_condition(
+            inputs.thermal_units, inputs.storage_units
+        )
+        iterations = 0
+        for step_k in range(1, args.steps + 1):
+            if step_k == 1:
+                power_system_model = model_builder.build(step_k, init_conditions)
+            else:
+                power_system_model = model_builder.update(step_k, init_conditions)
+            power_system_model.optimize(
+                solver=args.solver, log_to_console=False, mipgap=args.mipgap
+            )
+            iterations += power_system_model.constr_generation_iterations
+            system_record.keep(
+                runtime=power_system_model.get_runtime(),
+                objval=power_system_model.get_objval(),
+                solution=power_system_model.get_structured_solution(),
+                step_k=step_k,
+            )
+            init_conditions = system_record.get_init_conds()
+        wall_time = time.perf_counter() - start
+
+        system_builder = model_builder.system_builder
+        num_lines = len(inputs.edges)
+        num_cycles = len(inputs.cycle_map)
+        if lazy_transmission:
+            num_lines = len(system_builder.binding_lines)
+            num_cycles = len(system_builder.binding_cycles)
+        results.append(
+            {
+                "mode": "lazy" if lazy_transmission else "full",
+                "lines": num_lines,
+                "cycles": num_cycles,
+                "constrs": model_builder.model.NumConstrs,
+                "resolves": iterations,
+                "objval": sum(system_record.get_objvals()),
+                "solver": sum(system_record.get_runtimes()),
+                "total": wall_time,
+            }
+        )
+
+    print(
+        f"{args.model_name}: {len(inputs.edges)} lines, {len(inputs.cycle_map)} cycles, "
+        f"sim_horizon={args.sim_horizon}, steps={args.steps}, solver={args.solver}"
+    )
+    print(
+        f"{'mode':>5} {'lines':>6} {'cycles':>7} {'constrs':>8} {'resolves':>9} "
+        f"{'objval':>14} {'solver (s)':>11} {'total (s)':>10}"
+    )
+    for result in results:
+        print(
+            f"{result['mode']:>5} {result['lines']:>6} {result['cycles']:>7} "
+            f"{result['constrs']:>8} {result['resolves']:>9} {result['objval']:>14.1f} "
+            f"{result['solver']:>11.3f} {result['total']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
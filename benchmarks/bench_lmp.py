@@ -0,0 +1,98 @@
+"""bench_lmp.py: Compare the time of finding the locational marginal prices with
+model.fixed(), which copies and solves a new linear program at every step, against
+the persistent linear program of PowerSystemModel.solve_for_lmp.
+
+The MIP is solved at every step, so the model must fit the size limit of the Gurobi
+license. The processed input files of the model must exist, e.g. by running
+DataProcessor first.
+
+Usage:
+    python benchmarks/bench_lmp.py --input_folder model_library \
+        --model_name dummy --sim_horizon 24 --steps 10
+"""
+
+import argparse
+import time
+
+from pownet import ModelBuilder, SystemInput
+from pownet.core.record import SystemRecord
+from pownet.data_utils import create_init_condition
+
+
+def solve_fixed(model) -> tuple[dict, float]:
+    """Return the LMP from model.fixed() and the number of simplex iterations."""
+    model_fixed = model.fixed()
+    model_fixed.optimize()
+    constrs = model_fixed.getConstrs()
+    pi = model_fixed.getAttr("Pi", constrs)
+    lmp = {
+        constr.ConstrName: pi[i]
+        for i, constr in enumerate(constrs)
+        if "flowBal" in constr.ConstrName
+    }
+    return lmp, model_fixed.IterCount
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="dummy")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--sim_horizon", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+
+    inputs = SystemInput(
+        input_folder=args.input_folder,
+        model_name=args.model_name,
+        year=args.year,
+        sim_horizon=args.sim_horizon,
+    )
+    inputs.load_and_check_data()
+
+    model_builder = ModelBuilder(inputs)
+    system_record = SystemRecord(inputs)
+    init_conditions = create_init_condition(inputs.thermal_units, inputs.storage_units)
+
+    timings = {"mip": 0.0, "fixed": 0.0, "persistent": 0.0}
+    iterations = {"fixed": 0.0, "persistent": 0.0}
+    max_diff = 0.0
+    for step_k in range(1, args.steps + 1):
+        if step_k == 1:
+            power_system_model = model_builder.build(step_k, init_conditions)
+        else:
+            power_system_model = model_builder.update(step_k, init_conditions)
+        power_system_model.optimize(log_to_console=False)
+        timings["mip"] += power_system_model.get_runtime()
+
+        start = time.perf_counter()
+        fixed_lmp, fixed_iterations = solve_fixed(power_system_model.model)
+        timings["fixed"] += time.perf_counter() - start
+        iterations["fixed"] += fixed_iterations
+
+        start = time.perf_counter()
+        lmp = power_system_model.solve_for_lmp()
+        timings["persistent"] += time.perf_counter() - start
+        iterations[
+            "persistent"
+        ] += power_system_model.gurobi_model._pricing_model.lp.IterCount
+        max_diff = max(max_diff, max(abs(lmp[k] - fixed_lmp[k]) for k in lmp))
+
+        system_record.keep(
+            runtime=power_system_model.get_runtime(),
+            objval=power_system_model.get_objval(),
+            solution=power_system_model.get_structured_solution(),
+            step_k=step_k,
+        )
+        init_conditions = system_record.get_init_conds()
+
+    print(f"{args.model_name}: {args.steps} steps, sim_horizon={args.sim_horizon}")
+    print(f"MIP runtime: {timings['mip']:.4f} s")
+    print(f"{'':<12} {'time (s)':>9} {'iterations':>11}")
+    for name in ["fixed", "persistent"]:
+        print(f"{name:<12} {timings[name]:>9.4f} {iterations[name]:>11.0f}")
+    print(f"Largest difference in LMP: {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""bench_network_reduction.py: Compare a rolling horizon simulation on the full
+transmission network with one on the network without pass-through buses.
+
+DataProcessor(reduce_network=True) eliminates the buses without generation, demand,
+or storage with Kron reduction. The flows of the reduced network are mapped back to
+the original lines with pownet_line_map.csv. The flow error is the largest difference
+between these flows and the DC power flow of the full network with the same nodal
+injections. The flows of the two simulations are not compared directly because the
+location of a load shortfall is not unique. The model folder is copied to a temporary
+folder, so the processed files of the model library are not changed. Line losses are
+set to zero because they depend on the number of lines.
+
+Usage:
+    python benchmarks/bench_network_reduction.py --input_folder model_library \
+        --model_name test_flow --sim_horizon 24 --steps 7
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from pownet import ModelBuilder, SystemInput
+from pownet.core.data_processor import DataProcessor
+from pownet.core.network_reduction import map_flows_to_original_lines
+from pownet.core.record import SystemRecord
+from pownet.data_utils import create_init_condition
+
+
+def get_net_flows(flow_variables):
+    """Net flows (fwd - bwd) indexed by (node_a, node_b, hour)."""
+    sign = (flow_variables["type"] == "fwd") * 2 - 1
+    return (
+        flow_variables.assign(value=sign * flow_variables["value"])
+        .groupby(["node_a", "node_b", "hour"])["value"]
+        .sum()
+    )
+
+
+def get_flow_error(net_flows, transmission_data):
+    """Return the largest difference between the net flows on the lines and the DC
+    power flow of the network with the nodal injections of the net flows."""
+    net_flows = net_flows.unstack("hour").reindex(
+        pd.MultiIndex.from_frame(transmission_data[["source", "sink"]]), fill_value=0
+    )
+    nodes = list(pd.unique(transmission_data[["source", "sink"]].to_numpy().ravel()))
+    incidence = np.zeros((len(transmission_data), len(nodes)))
+    for row, (source, sink) in enumerate(net_flows.index):
+        incidence[row, nodes.index(source)] = 1
+        incidence[row, nodes.index(sink)] = -1
+    susceptance = transmission_data["susceptance"].to_numpy(dtype=float)
+    bus_susceptance = incidence.T @ (susceptance[:, np.newaxis] * incidence)
+    injections = incidence.T @ net_flows.to_numpy()
+    # The first node is the reference node
+    angles = np.zeros_like(injections)
+    angles[1:] = np.linalg.lstsq(bus_susceptance[1:, 1:], injections[1:], rcond=None)[0]
+    dc_flows = susceptance[:, np.newaxis] * (incidence @ angles)
+    return np.abs(net_flows.to_numpy() - dc_flows).max()
+
+
+def run_simulation(args, input_folder, reduce_network):
+    processor = DataProcessor(
+        input_folder=input_folder,
+        model_name=args.model_name,
+        year=args.year,
+        frequency=args.frequency,
+        reduce_network=reduce_network,
+    )
+    processor.execute_data_pipeline()
+
+    inputs = SystemInput(
+        input_folder=input_folder,
+        model_name=args.model_name,
+        year=args.year,
+        sim_horizon=args.sim_horizon,
+        line_loss_factor=0,
+    )
+    inputs.load_and_check_data()
+
+    start = time.perf_counter()
+    model_builder = ModelBuilder(inputs)
+    system_record = SystemRecord(inputs)
+    init_conditions = create_init_condition(inputs.thermal_units, inputs.storage_units)
+    for step_k in range(1, args.steps + 1):
+        if step_k == 1:
+            power_system_model = model_builder.build(step_k, init_conditions)
+        else:
+            power_system_model = model_builder.update(step_k, init_conditions)
+        power_system_model.optimize(
+            solver=args.solver, log_to_console=False, mipgap=args.mipgap
+        )
+        system_record.keep(
+            runtime=power_system_model.get_runtime(),
+            objval=power_system_model.get_objval(),
+            solution=power_system_model.get_structured_solution(),
+            step_k=step_k,
+        )
+        init_conditions = system_record.get_init_conds()
+    wall_time = time.perf_counter() - start
+
+    flow_variables = system_record.get_flow_variables()
+    if not inputs.line_map.empty:
+        flow_variables = map_flows_to_original_lines(flow_variables, inputs.line_map)
+    return {
+        "network": "reduced" if reduce_network else "full",
+        "nodes": len(inputs.nodes),
+        "lines": len(inputs.edges),
+        "vars": model_builder.model.NumVars,
+        "constrs": model_builder.model.NumConstrs,
+        "objval": sum(system_record.get_objvals()),
+        "solver": sum(system_record.get_runtimes()),
+        "total": wall_time,
+        "flows": get_net_flows(flow_variables),
+        "transmission_data": processor.transmission_data,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="test_flow")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--frequency", type=int, default=50)
+    parser.add_argument("--sim_horizon", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=7)
+    parser.add_argument("--solver", default="gurobi")
+    parser.add_argument("--mipgap", type=float, default=1e-6)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as input_folder:
+        shutil.copytree(
+            os.path.join(args.input_folder, args.model_name),
+            os.path.join(input_folder, args.model_name),
+        )
+        for reduce_network in [False, True]:
+            results.append(run_simulation(args, input_folder, reduce_network))
+
+    for result in results:
+        result["flow_error"] = get_flow_error(
+            result["flows"], results[0]["transmission_data"]
+        )
+
+    print(
+        f"{args.model_name}: sim_horizon={args.sim_horizon}, steps={args.steps}, "
+        f"solver={args.solver}"
+    )
+    print(
+        f"{'network':>8} {'nodes':>6} {'lines':>6} {'vars':>7} {'constrs':>8} "
+        f"{'objval':>14} {'flow error':>11} {'solver (s)':>11} {'total (s)':>10}"
+    )
+    for result in results:
+        print(
+            f"{result['network']:>8} {result['nodes']:>6} {result['lines']:>6} "
+            f"{result['vars']:>7} {result['constrs']:>8} {result['objval']:>14.1f} "
+            f"{result['flow_error']:>11.3g} {result['solver']:>11.3f} "
+            f"{result['total']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""bench_objective_update.py: Compare the time of updating the objective in
+ModelBuilder.update when the time-dependent coefficients are written to the Obj attribute
+against building and setting the whole objective again.
+
+The models are only built and updated, not optimized, so the benchmark does not depend
+on the size limit of the Gurobi license. The processed input files of the model must
+exist, e.g. by running DataProcessor first.
+
+Usage:
+    python benchmarks/bench_objective_update.py --input_folder model_library \
+        --model_name dummy --sim_horizon 24 --steps 10
+"""
+
+import argparse
+import time
+
+from pownet import ModelBuilder, SystemInput
+from pownet.data_utils import create_init_condition
+
+
+def time_updates(
+    inputs: SystemInput, update_objective_in_place: bool, steps: int
+) -> dict:
+    """Return the time spent in updating the objective and in ModelBuilder.update,
+    including model.update() in both."""
+    model_builder = ModelBuilder(
+        inputs, update_objective_in_place=update_objective_in_place
+    )
+    init_conditions = create_init_condition(inputs.thermal_units, inputs.storage_units)
+    model_builder.build(step_k=1, init_conds=init_conditions)
+
+    timings = {"objective": 0.0, "total": 0.0}
+    for step_k in range(2, steps + 2):
+        start = time.perf_counter()
+        if update_objective_in_place:
+            model_builder._update_objective_coeffs(step_k=step_k)
+        else:
+            model_builder._set_objective(step_k=step_k)
+        model_builder.model.update()
+        timings["objective"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        model_builder.update(step_k=step_k, init_conds=init_conditions)
+        timings["total"] += time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="dummy")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--sim_horizon", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+
+    inputs = SystemInput(
+        input_folder=args.input_folder,
+        model_name=args.model_name,
+        year=args.year,
+        sim_horizon=args.sim_horizon,
+    )
+    inputs.load_and_check_data()
+
+    rebuild = time_updates(inputs, update_objective_in_place=False, steps=args.steps)
+    in_place = time_updates(inputs, update_objective_in_place=True, steps=args.steps)
+
+    print(f"{args.model_name}: {args.steps} updates, sim_horizon={args.sim_horizon}")
+    print(f"{'':<12} {'rebuild (s)':>12} {'in place (s)':>13} {'speedup':>8}")
+    for name in rebuild:
+        speedup = rebuild[name] / in_place[name] if in_place[name] > 0 else float("nan")
+        print(
+            f"{name:<12} {rebuild[name]:>12.4f} {in_place[name]:>13.4f} {speedup:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""bench_portfolio.py: Compare a rolling horizon simulation solved by racing the MIP
+and the rounding heuristics with ones solved by each of them alone.
+
+The portfolio solves the MIP and the 'fast' and 'slow' rounding strategies of each
+step concurrently in threads on copies of the model. The first solution that meets
+the MIP gap wins and the other strategies are cancelled. A rounding solution meets
+the MIP gap when it is within the gap of the LP relaxation. The table reports the
+total objective value and runtime of each method, and how often each strategy won
+the race. Racing only pays off with more than one CPU because the strategies share
+the cores. The model folder is copied to a temporary folder, so the processed files
+of the model library are not changed.
+
+Usage:
+    python benchmarks/bench_portfolio.py --input_folder model_library \
+        --model_name dummy --sim_horizon 24 --steps 7 --solver highs
+"""
+
+import argparse
+import collections
+import os
+import shutil
+import tempfile
+import time
+
+from pownet import ModelBuilder, SystemInput
+from pownet.core.data_processor import DataProcessor
+from pownet.core.record import SystemRecord
+from pownet.data_utils import create_init_condition
+
+
+def run_simulation(args, inputs, method):
+    start = time.perf_counter()
+    model_builder = ModelBuilder(inputs)
+    system_record = SystemRecord(inputs)
+    init_conditions = create_init_condition(inputs.thermal_units, inputs.storage_units)
+    winners = collections.Counter()
+    for step_k in range(1, args.steps + 1):
+        if step_k == 1:
+            power_system_model = model_builder.build(step_k, init_conditions)
+        else:
+            power_system_model = model_builder.update(step_k, init_conditions)
+        if method == "mip":
+            power_system_model.optimize(
+                solver=args.solver,
+                log_to_console=False,
+                mipgap=args.mipgap,
+                num_threads=args.num_threads,
+            )
+        elif method == "portfolio":
+            power_system_model.optimize_portfolio(
+                solver=args.solver, mipgap=args.mipgap, num_threads=args.num_threads
+            )
+            winners[power_system_model.portfolio_winner] += 1
+        else:
+            power_system_model.optimize_with_rounding(
+                rounding_strategy=method,
+                solver=args.solver,
+                mipgap=args.mipgap,
+                num_threads=args.num_threads,
+            )
+        system_record.keep(
+            runtime=power_system_model.get_runtime(),
+            objval=power_system_model.get_objval(),
+            solution=power_system_model.get_structured_solution(),
+            step_k=step_k,
+        )
+        init_conditions = system_record.get_init_conds()
+    wall_time = time.perf_counter() - start
+
+    return {
+        "method": method,
+        "objval": sum(system_record.get_objvals()),
+        "solver": sum(system_record.get_runtimes()),
+        "total": wall_time,
+        "winners": winners,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="dummy")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--frequency", type=int, default=50)
+    parser.add_argument("--sim_horizon", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=7)
+    parser.add_argument("--solver", default="highs")
+    parser.add_argument("--mipgap", type=float, default=1e-3)
+    parser.add_argument("--num_threads", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as input_folder:
+        shutil.copytree(
+            os.path.join(args.input_folder, args.model_name),
+            os.path.join(input_folder, args.model_name),
+        )
+        DataProcessor(
+            input_folder=input_folder,
+            model_name=args.model_name,
+            year=args.year,
+            frequency=args.frequency,
+        ).execute_data_pipeline()
+        inputs = SystemInput(
+            input_folder=input_folder,
+            model_name=args.model_name,
+            year=args.year,
+            sim_horizon=args.sim_horizon,
+        )
+        inputs.load_and_check_data()
+
+    results = [
+        run_simulation(args, inputs, method)
+        for method in ["mip", "fast", "slow", "portfolio"]
+    ]
+
+    print(
+        f"{args.model_name}: sim_horizon={args.sim_horizon}, steps={args.steps}, "
+        f"solver={args.solver}, mipgap={args.mipgap}, cpus={os.cpu_count()}"
+    )
+    print(
+        f"{'method':>10} {'objval':>14} {'gap':>8} {'solver (s)':>11} {'total (s)':>10}"
+    )
+    for result in results:
+        gap = result["objval"] / results[0]["objval"] - 1
+        print(
+            f"{result['method']:>10} {result['objval']:>14.1f} {gap:>8.3%} "
+            f"{result['solver']:>11.3f} {result['total']:>10.3f}"
+        )
+    winners = results[-1]["winners"]
+    print(
+        "portfolio winners: "
+        + ", ".join(f"{strategy} {winners[strategy]}" for strategy in winners)
+    )
+
+
+if __name__ == "__main__":
+    main()
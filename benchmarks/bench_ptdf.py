@@ -0,0 +1,108 @@
+"""bench_ptdf.py: Compare the size and runtime of a rolling horizon simulation with
+the DC-OPF formulations of PowNet.
+
+The "kirchhoff" and "voltage_angle" formulations have flow variables on each line.
+The "ptdf" formulation expresses the line flows with the power transfer distribution
+factors (PTDF) of the nodes and their net injections, so it has no flow variables,
+voltage angles, or Kirchhoff constraints. With --lazy, the transmission constraints
+are only added after a solution violates them. Line losses are set to zero so that
+all formulations give the same objective values. The processed input files of the
+model, including pownet_ptdf.csv, must exist, e.g. by running DataProcessor first.
+
+Usage:
+    python benchmarks/bench_ptdf.py --input_folder model_library \
+        --model_name dummy --sim_horizon 24 --steps 7 --lazy
+"""
+
+import argparse
+import time
+
+from pownet import ModelBuilder, SystemInput
+from pownet.core.record import SystemRecord
+from pownet.data_utils import create_init_condition
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="dummy")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--sim_horizon", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=7)
+    parser.add_argument(
+        "--dc_opf", nargs="+", default=["kirchhoff", "voltage_angle", "ptdf"]
+    )
+    parser.add_argument("--lazy", action="store_true")
+    parser.add_argument("--solver", default="gurobi")
+    parser.add_argument("--mipgap", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    results = []
+    for dc_opf in args.dc_opf:
+        inputs = SystemInput(
+            input_folder=args.input_folder,
+            model_name=args.model_name,
+            year=args.year,
+            sim_horizon=args.sim_horizon,
+            dc_opf=dc_opf,
+            line_loss_factor=0,
+        )
+        inputs.load_and_check_data()
+
+        start = time.perf_counter()
+        model_builder = ModelBuilder(inputs, lazy_transmission=args.lazy)
+        system_record = SystemRecord(inputs)
+        init_conditions = create_init_condition(
+            inputs.thermal_units, inputs.storage_units
+        )
+        build_time = 0
+        for step_k in range(1, args.steps + 1):
+            build_start = time.perf_counter()
+            if step_k == 1:
+                power_system_model = model_builder.build(step_k, init_conditions)
+            else:
+                power_system_model = model_builder.update(step_k, init_conditions)
+            build_time += time.perf_counter() - build_start
+            power_system_model.optimize(
+                solver=args.solver, log_to_console=False, mipgap=args.mipgap
+            )
+            system_record.keep(
+                runtime=power_system_model.get_runtime(),
+                objval=power_system_model.get_objval(),
+                solution=power_system_model.get_structured_solution(),
+                step_k=step_k,
+            )
+            init_conditions = system_record.get_init_conds()
+        wall_time = time.perf_counter() - start
+
+        results.append(
+            {
+                "dc_opf": dc_opf,
+                "vars": model_builder.model.NumVars,
+                "constrs": model_builder.model.NumConstrs,
+                "nonzeros": model_builder.model.NumNZs,
+                "objval": sum(system_record.get_objvals()),
+                "build": build_time,
+                "solver": sum(system_record.get_runtimes()),
+                "total": wall_time,
+            }
+        )
+
+    print(
+        f"{args.model_name}: sim_horizon={args.sim_horizon}, steps={args.steps}, "
+        f"lazy={args.lazy}, solver={args.solver}"
+    )
+    print(
+        f"{'dc_opf':>13} {'vars':>7} {'constrs':>8} {'nonzeros':>9} {'objval':>14} "
+        f"{'build (s)':>10} {'solver (s)':>11} {'total (s)':>10}"
+    )
+    for result in results:
+        print(
+            f"{result['dc_opf']:>13} {result['vars']:>7} {result['constrs']:>8} "
+            f"{result['nonzeros']:>9} {result['objval']:>14.1f} {result['build']:>10.3f} "
+            f"{result['solver']:>11.3f} {result['total']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""bench_relaxed_lookahead.py: Compare the rolling horizon simulation with binary
+variables over the whole horizon against relaxing them after the first 24 hours
+(ModelBuilder with integer_hours=24).
+
+The cost is the objective of the recorded first 24 hours of each step, summed over
+the steps. The commitment difference is the share of recorded (unit, hour) pairs whose
+thermal status differs between the two runs. The MIP is solved at every step, so the
+model must fit the size limit of the Gurobi license. The processed input files of the
+model must exist, e.g. by running DataProcessor first.
+
+Usage:
+    python benchmarks/bench_relaxed_lookahead.py --input_folder model_library \
+        --model_name dummy --sim_horizon 48 --steps 10
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from pownet import ModelBuilder, SystemInput
+from pownet.core.record import SystemRecord
+from pownet.data_utils import create_init_condition
+
+
+def get_recorded_mask(model_builder: ModelBuilder, num_vars: int) -> np.ndarray:
+    """Return a mask of the variables in the first 24 hours of the horizon."""
+    mask = np.zeros(num_vars, dtype=bool)
+    for variables in model_builder.get_variables().values():
+        for key, var in variables.items():
+            t = key[-1] if isinstance(key, tuple) else key
+            mask[var.index] = t <= 24
+    return mask
+
+
+def run_steps(
+    inputs: SystemInput, integer_hours: int, steps: int, mipgap: float
+) -> tuple[dict, pd.DataFrame]:
+    """Run the simulation and return the runtime, the cost of the recorded hours,
+    and the recorded thermal status."""
+    model_builder = ModelBuilder(inputs, integer_hours=integer_hours)
+    system_record = SystemRecord(inputs)
+    init_conditions = create_init_condition(inputs.thermal_units, inputs.storage_units)
+
+    results = {"runtime": 0.0, "cost": 0.0}
+    for step_k in range(1, steps + 1):
+        if step_k == 1:
+            power_system_model = model_builder.build(step_k, init_conditions)
+            mask = get_recorded_mask(model_builder, model_builder.model.NumVars)
+        else:
+            power_system_model = model_builder.update(step_k, init_conditions)
+        power_system_model.optimize(log_to_console=False, mipgap=mipgap)
+
+        model = power_system_model.model
+        obj = np.array(model.getAttr("Obj", model.getVars()))
+        results["runtime"] += power_system_model.get_runtime()
+        results["cost"] += float(obj[mask] @ power_system_model.get_values()[mask])
+
+        system_record.keep(
+            runtime=power_system_model.get_runtime(),
+            objval=power_system_model.get_objval(),
+            solution=power_system_model.get_structured_solution(),
+            step_k=step_k,
+        )
+        init_conditions = system_record.get_init_conds()
+
+    node_vars = system_record.get_node_variables()
+    status = node_vars[node_vars["vartype"] == "status"]
+    return results, status.set_index(["node", "hour"])["value"].round()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="dummy")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--sim_horizon", type=int, default=48)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--mipgap", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    inputs = SystemInput(
+        input_folder=args.input_folder,
+        model_name=args.model_name,
+        year=args.year,
+        sim_horizon=args.sim_horizon,
+    )
+    inputs.load_and_check_data()
+
+    full, full_status = run_steps(inputs, None, args.steps, args.mipgap)
+    relaxed, relaxed_status = run_steps(inputs, 24, args.steps, args.mipgap)
+
+    print(f"{args.model_name}: {args.steps} steps, sim_horizon={args.sim_horizon}")
+    print(f"{'':<10} {'full MIP':>14} {'relaxed tail':>14} {'difference':>11}")
+    for name in ["runtime", "cost"]:
+        diff = (relaxed[name] - full[name]) / full[name] if full[name] else np.nan
+        print(f"{name:<10} {full[name]:>14.4f} {relaxed[name]:>14.4f} {diff:>10.2%}")
+    status_diff = (relaxed_status != full_status.reindex(relaxed_status.index)).mean()
+    print(f"Commitment difference: {status_diff:.2%} of (unit, hour) pairs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""bench_rounding.py: Compare a rolling horizon simulation solved as a MIP with ones
+solved by the iterative rounding heuristic.
+
+The rounding heuristic relaxes the model, rounds the fractional status variables of
+the thermal units, and solves the linear program again until they are integers. The
+values are read and the bounds are set in bulk, and each linear program starts from
+the basis of the previous one. The table reports the total objective value, the
+number of rounding iterations, and the runtime of each method. The initial
+conditions of a step depend on the solution of the previous step, so the total
+objective value of a heuristic can be below that of the MIP. The model folder is
+copied to a temporary folder, so the processed files of the model library are not
+changed.
+
+Usage:
+    python benchmarks/bench_rounding.py --input_folder model_library \
+        --model_name dummy --sim_horizon 24 --steps 7 --solver highs
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from pownet import ModelBuilder, SystemInput
+from pownet.core.data_processor import DataProcessor
+from pownet.core.record import SystemRecord
+from pownet.data_utils import create_init_condition
+
+
+def run_simulation(args, inputs, rounding_strategy):
+    start = time.perf_counter()
+    model_builder = ModelBuilder(inputs)
+    system_record = SystemRecord(inputs)
+    init_conditions = create_init_condition(inputs.thermal_units, inputs.storage_units)
+    iterations = 0
+    for step_k in range(1, args.steps + 1):
+        if step_k == 1:
+            power_system_model = model_builder.build(step_k, init_conditions)
+        else:
+            power_system_model = model_builder.update(step_k, init_conditions)
+        if rounding_strategy is None:
+            power_system_model.optimize(
+                solver=args.solver, log_to_console=False, mipgap=args.mipgap
+            )
+        else:
+            power_system_model.optimize_with_rounding(
+                rounding_strategy=rounding_strategy,
+                threshold=args.threshold,
+                solver=args.solver,
+                mipgap=args.mipgap,
+            )
+            iterations += power_system_model.rounding_iterations or 0
+        system_record.keep(
+            runtime=power_system_model.get_runtime(),
+            objval=power_system_model.get_objval(),
+            solution=power_system_model.get_structured_solution(),
+            step_k=step_k,
+        )
+        init_conditions = system_record.get_init_conds()
+    wall_time = time.perf_counter() - start
+
+    return {
+        "method": rounding_strategy or "mip",
+        "objval": sum(system_record.get_objvals()),
+        "iterations": iterations,
+        "total": wall_time,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="dummy")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--frequency", type=int, default=50)
+    parser.add_argument("--sim_horizon", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=7)
+    parser.add_argument("--solver", default="highs")
+    parser.add_argument("--mipgap", type=float, default=1e-4)
+    parser.add_argument("--threshold", type=float, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as input_folder:
+        shutil.copytree(
+            os.path.join(args.input_folder, args.model_name),
+            os.path.join(input_folder, args.model_name),
+        )
+        DataProcessor(
+            input_folder=input_folder,
+            model_name=args.model_name,
+            year=args.year,
+            frequency=args.frequency,
+        ).execute_data_pipeline()
+        inputs = SystemInput(
+            input_folder=input_folder,
+            model_name=args.model_name,
+            year=args.year,
+            sim_horizon=args.sim_horizon,
+        )
+        inputs.load_and_check_data()
+
+    results = [
+        run_simulation(args, inputs, rounding_strategy)
+        for rounding_strategy in [None, "fast", "slow"]
+    ]
+
+    print(
+        f"{args.model_name}: sim_horizon={args.sim_horizon}, steps={args.steps}, "
+        f"solver={args.solver}, threshold={args.threshold}"
+    )
+    print(
+        f"{'method':>7} {'objval':>14} {'gap':>8} {'iterations':>11} {'total (s)':>10}"
+    )
+    for result in results:
+        gap = result["objval"] / results[0]["objval"] - 1
+        print(
+            f"{result['method']:>7} {result['objval']:>14.1f} {gap:>8.3%} "
+            f"{result['iterations']:>11} {result['total']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
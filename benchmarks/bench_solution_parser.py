@@ -0,0 +1,110 @@
+"""bench_solution_parser.py: Compare the regex-based parsing of the solution in
+SystemRecord against the structured parsing with SolutionLayout.
+
+The synthetic model mirrors the variables of a PowNet model. It is not optimized;
+random values stand in for the solution so the benchmark does not depend on
+the size limit of the Gurobi license.
+
+Usage:
+    python benchmarks/bench_solution_parser.py --num_units 50 --sim_horizon 24
+"""
+
+import argparse
+import time
+
+import gurobipy as gp
+import numpy as np
+import pandas as pd
+
+from pownet.data_utils import (
+    parse_flow_variables,
+    parse_node_variables,
+    parse_syswide_variables,
+)
+from pownet.optim_model import SolutionLayout
+
+
+def create_synthetic_model(
+    num_units: int, sim_horizon: int
+) -> tuple[gp.Model, dict[str, gp.tupledict]]:
+    """Create a model with node, flow, and system-wide variables."""
+    model = gp.Model("synthetic")
+    units = [f"unit{i}" for i in range(num_units)]
+    nodes = [f"node{i}" for i in range(num_units)]
+    lines = [(nodes[i], nodes[i + 1]) for i in range(num_units - 1)]
+    timesteps = range(1, sim_horizon + 1)
+
+    variables = {}
+    for varname in ["pthermal", "vpower", "vpowerbar", "spin"]:
+        variables[varname] = model.addVars(units, timesteps, name=varname)
+    for varname in ["status", "startup", "shutdown"]:
+        variables[varname] = model.addVars(
+            units, timesteps, vtype=gp.GRB.BINARY, name=varname
+        )
+    for varname in ["pos_pmismatch", "neg_pmismatch", "theta"]:
+        variables[varname] = model.addVars(nodes, timesteps, name=varname)
+    for varname in ["flow_fwd", "flow_bwd"]:
+        variables[varname] = model.addVars(lines, timesteps, name=varname)
+    variables["spin_shortfall"] = model.addVars(timesteps, name="spin_shortfall")
+    model.update()
+    return model, variables
+
+
+def parse_with_regex(
+    varnames: list[str], values: np.ndarray, sim_horizon: int
+) -> dict[str, pd.DataFrame]:
+    """Parse the solution the way SystemRecord.keep does with a solution DataFrame."""
+    solution = pd.DataFrame({"varname": varnames, "value": values})
+    solution[["vartype"]] = solution["varname"].str.extract(r"(\w+)\[", expand=True)
+    return {
+        "node": parse_node_variables(solution, sim_horizon, step_k=1),
+        "flow": parse_flow_variables(solution, sim_horizon, step_k=1),
+        "syswide": parse_syswide_variables(solution, sim_horizon, step_k=1),
+    }
+
+
+def time_function(func, num_repeats: int) -> float:
+    """Return the best runtime over the repeats in seconds."""
+    runtimes = []
+    for _ in range(num_repeats):
+        start = time.perf_counter()
+        func()
+        runtimes.append(time.perf_counter() - start)
+    return min(runtimes)
+
+
+def main(num_units: int, sim_horizon: int, num_repeats: int) -> None:
+    model, variables = create_synthetic_model(num_units, sim_horizon)
+    values = np.random.default_rng(seed=0).uniform(0, 1, model.NumVars)
+    print(f"Number of variables: {model.NumVars}")
+
+    # The variable names are read at every step in the regex-based parsing
+    regex_time = time_function(
+        lambda: parse_with_regex(model.getAttr("VarName"), values, sim_horizon),
+        num_repeats,
+    )
+
+    # The layout is created once and reused at every step
+    start = time.perf_counter()
+    layout = SolutionLayout(variables)
+    layout_time = time.perf_counter() - start
+    structured_time = time_function(lambda: layout.get_tables(values), num_repeats)
+
+    regex_tables = parse_with_regex(model.getAttr("VarName"), values, sim_horizon)
+    structured_tables = layout.get_tables(values)
+    for table_name, df in structured_tables.items():
+        assert np.allclose(df["value"], regex_tables[table_name]["value"])
+
+    print(f"Regex parsing:      {regex_time * 1e3:8.2f} ms per step")
+    print(f"Structured parsing: {structured_time * 1e3:8.2f} ms per step")
+    print(f"Layout creation:    {layout_time * 1e3:8.2f} ms (once)")
+    print(f"Speedup: {regex_time / structured_time:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--num_units", type=int, default=50)
+    parser.add_argument("--sim_horizon", type=int, default=24)
+    parser.add_argument("--num_repeats", type=int, default=5)
+    args = parser.parse_args()
+    main(args.num_units, args.sim_horizon, args.num_repeats)
@@ -0,0 +1,80 @@
+"""bench_step_hours.py: Compare the runtime of a rolling horizon simulation for
+different numbers of hours between the starts of consecutive steps.
+
+Each step length simulates the first --days days of the year. A shorter step length
+re-optimizes the commitment more often with more recent information, but needs more
+steps to cover the simulated period. A step length equal to the simulation horizon
+solves each hour only once. The processed input files of the model must exist, e.g.
+by running DataProcessor first.
+
+Usage:
+    python benchmarks/bench_step_hours.py --input_folder model_library \
+        --model_name dummy --sim_horizon 48 --days 14 --step_hours 12 24 48
+"""
+
+import argparse
+import time
+
+from pownet import Simulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="dummy")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--sim_horizon", type=int, default=48)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--step_hours", type=int, nargs="+", default=[12, 24, 48])
+    parser.add_argument("--mipgap", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    results = []
+    for step_hours in args.step_hours:
+        simulator = Simulator(
+            input_folder=args.input_folder,
+            model_name=args.model_name,
+            model_year=args.year,
+        )
+        inputs = simulator.load_inputs(
+            sim_horizon=args.sim_horizon,
+            to_process_inputs=False,
+            step_hours=step_hours,
+        )
+        steps_to_run = (args.days * 24 - args.sim_horizon) // step_hours + 1
+
+        start = time.perf_counter()
+        system_record = simulator.simulate(
+            inputs=inputs,
+            steps_to_run=steps_to_run,
+            log_to_console=False,
+            mipgap=args.mipgap,
+        )
+        wall_time = time.perf_counter() - start
+
+        node_vars = system_record.get_node_variables()
+        results.append(
+            {
+                "step_hours": step_hours,
+                "steps": steps_to_run,
+                "hours": node_vars["hour"].max(),
+                "solver": sum(system_record.get_runtimes()),
+                "total": wall_time,
+            }
+        )
+
+    print(f"{args.model_name}: sim_horizon={args.sim_horizon}, days={args.days}")
+    print(
+        f"{'step_hours':>10} {'steps':>6} {'hours':>6} {'solver (s)':>11} "
+        f"{'total (s)':>10} {'s/day':>7}"
+    )
+    for result in results:
+        per_day = result["total"] / result["hours"] * 24
+        print(
+            f"{result['step_hours']:>10} {result['steps']:>6} {result['hours']:>6} "
+            f"{result['solver']:>11.3f} {result['total']:>10.3f} {per_day:>7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
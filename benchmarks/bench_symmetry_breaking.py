@@ -0,0 +1,102 @@
+"""bench_symmetry_breaking.py: Compare a rolling horizon simulation of a fleet of
+identical thermal units with and without ordering the status of the units.
+
+The model library has no identical thermal units, so the fleet is synthetic: each
+thermal unit that is not must-take is split into --units_per_plant identical units
+with a share of its capacity and ramp rate. Permuting identical units gives solutions
+with the same objective value, which the solver explores in separate branches. With
+symmetry breaking, the status of the identical units with the same initial conditions
+is ordered lexicographically over the first hours of each step. The table reports
+the number of ordering constraints of the last step, the total objective value, and
+the solver time. The model folder is copied to a temporary folder, so the processed
+files of the model library are not changed.
+
+The ordering is not always faster. On dummy with 5 steps, it reduced the HiGHS time
+with 2 units per plant (79 s -> 68 s), but increased the Gurobi time with 2 units per
+plant (1.2 s -> 1.5 s) and the HiGHS time with 4 units per plant (89 s -> 122 s).
+
+Usage:
+    python benchmarks/bench_symmetry_breaking.py --input_folder model_library \
+        --model_name dummy --units_per_plant 4 --sim_horizon 24 --steps 7
+"""
+
+import argparse
+import time
+
+from pownet import ModelBuilder
+from pownet.core.record import SystemRecord
+from pownet.data_utils import create_init_condition
+
+from _common import load_split_inputs
+
+
+def run_simulation(args, inputs, break_symmetry):
+    start = time.perf_counter()
+    model_builder = ModelBuilder(inputs, break_symmetry=break_symmetry)
+    system_record = SystemRecord(inputs)
+    init_conditions = create_init_condition(inputs.thermal_units, inputs.storage_units)
+    for step_k in range(1, args.steps + 1):
+        if step_k == 1:
+            power_system_model = model_builder.build(step_k, init_conditions)
+        else:
+            power_system_model = model_builder.update(step_k, init_conditions)
+        power_system_model.optimize(
+            solver=args.solver, log_to_console=False, mipgap=args.mipgap
+        )
+        system_record.keep(
+            runtime=power_system_model.get_runtime(),
+            objval=power_system_model.get_objval(),
+            solution=power_system_model.get_structured_solution(),
+            step_k=step_k,
+        )
+        init_conditions = system_record.get_init_conds()
+    wall_time = time.perf_counter() - start
+
+    return {
+        "symmetry": "ordered" if break_symmetry else "none",
+        "order_constrs": len(model_builder.thermal_builder.c_status_order),
+        "objval": sum(system_record.get_objvals()),
+        "solver": sum(system_record.get_runtimes()),
+        "total": wall_time,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="dummy")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--frequency", type=int, default=50)
+    parser.add_argument("--units_per_plant", type=int, default=4)
+    parser.add_argument("--sim_horizon", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=7)
+    parser.add_argument("--solver", default="highs")
+    parser.add_argument("--mipgap", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    inputs = load_split_inputs(args)
+
+    results = [
+        run_simulation(args, inputs, break_symmetry) for break_symmetry in [False, True]
+    ]
+
+    print(
+        f"{args.model_name}: {len(inputs.thermal_units)} thermal units, "
+        f"units_per_plant={args.units_per_plant}, sim_horizon={args.sim_horizon}, "
+        f"steps={args.steps}, solver={args.solver}, mipgap={args.mipgap}"
+    )
+    print(
+        f"{'symmetry':>9} {'order constrs':>14} {'objval':>14} {'gap':>8} "
+        f"{'solver (s)':>11} {'total (s)':>10}"
+    )
+    for result in results:
+        gap = result["objval"] / results[0]["objval"] - 1
+        print(
+            f"{result['symmetry']:>9} {result['order_constrs']:>14} "
+            f"{result['objval']:>14.1f} {gap:>8.3%} {result['solver']:>11.3f} "
+            f"{result['total']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
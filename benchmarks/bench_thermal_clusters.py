@@ -0,0 +1,102 @@
+"""bench_thermal_clusters.py: Compare a rolling horizon simulation of a fleet of
+identical thermal units with one where they are modeled as clusters.
+
+The model library has no identical thermal units, so the fleet is synthetic: each
+thermal unit that is not must-take is split into --units_per_plant identical units
+with a share of its capacity and ramp rate. The model folder is copied to a temporary
+folder, so the processed files of the model library are not changed. With clusters,
+the commitment of each plant is a single integer variable per timestep instead of one
+binary variable per unit, while the objective stays the same.
+
+Usage:
+    python benchmarks/bench_thermal_clusters.py --input_folder model_library \
+        --model_name dummy --units_per_plant 4 --sim_horizon 24 --steps 7
+"""
+
+import argparse
+import time
+
+from pownet import ModelBuilder
+from pownet.core.record import SystemRecord
+from pownet.data_utils import create_init_condition
+
+from _common import load_split_inputs
+
+
+def run_simulation(args, inputs, cluster_thermal_units):
+    start = time.perf_counter()
+    model_builder = ModelBuilder(inputs, cluster_thermal_units=cluster_thermal_units)
+    system_record = SystemRecord(inputs)
+    init_conditions = create_init_condition(inputs.thermal_units, inputs.storage_units)
+    for step_k in range(1, args.steps + 1):
+        if step_k == 1:
+            power_system_model = model_builder.build(step_k, init_conditions)
+        else:
+            power_system_model = model_builder.update(step_k, init_conditions)
+        power_system_model.optimize(
+            solver=args.solver, log_to_console=False, mipgap=args.mipgap
+        )
+        system_record.keep(
+            runtime=power_system_model.get_runtime(),
+            objval=power_system_model.get_objval(),
+            solution=power_system_model.get_structured_solution(),
+            step_k=step_k,
+        )
+        init_conditions = system_record.get_init_conds()
+    wall_time = time.perf_counter() - start
+
+    node_variables = system_record.get_node_variables()
+    return {
+        "units": "clusters" if cluster_thermal_units else "units",
+        "vars": model_builder.model.NumVars,
+        "int_vars": model_builder.model.NumIntVars,
+        "constrs": model_builder.model.NumConstrs,
+        "objval": sum(system_record.get_objvals()),
+        "startups": node_variables.loc[
+            node_variables["vartype"] == "startup", "value"
+        ].sum(),
+        "solver": sum(system_record.get_runtimes()),
+        "total": wall_time,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="dummy")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--frequency", type=int, default=50)
+    parser.add_argument("--units_per_plant", type=int, default=4)
+    parser.add_argument("--sim_horizon", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=7)
+    parser.add_argument("--solver", default="highs")
+    parser.add_argument("--mipgap", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    inputs = load_split_inputs(args)
+
+    results = [
+        run_simulation(args, inputs, cluster_thermal_units)
+        for cluster_thermal_units in [False, True]
+    ]
+
+    print(
+        f"{args.model_name}: {len(inputs.thermal_units)} thermal units, "
+        f"units_per_plant={args.units_per_plant}, sim_horizon={args.sim_horizon}, "
+        f"steps={args.steps}, solver={args.solver}"
+    )
+    print(
+        f"{'model':>9} {'vars':>7} {'int vars':>9} {'constrs':>8} {'objval':>14} "
+        f"{'startups':>9} {'solver (s)':>11} {'total (s)':>10}"
+    )
+    for result in results:
+        print(
+            f"{result['units']:>9} {result['vars']:>7} {result['int_vars']:>9} "
+            f"{result['constrs']:>8} {result['objval']:>14.1f} "
+            f"{result['startups']:>9.0f} {result['solver']:>11.3f} "
+            f"{result['total']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
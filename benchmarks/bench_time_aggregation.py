@@ -0,0 +1,100 @@
+"""bench_time_aggregation.py: Compare the model size and runtime of a rolling horizon
+simulation when the look-ahead hours are merged into blocks of several hours.
+
+The first --full_resolution_hours of each horizon keep one timestep per hour and the
+remaining hours are merged into blocks of --block_hours. A block length of one is the
+hourly model. The objective value of the first step shows how much the coarser
+look-ahead changes the solution. The processed input files of the model must exist, e.g.
+by running DataProcessor first.
+
+Usage:
+    python benchmarks/bench_time_aggregation.py --input_folder model_library \
+        --model_name dummy --sim_horizon 168 --steps 7 --block_hours 1 4 12 24
+"""
+
+import argparse
+import time
+
+from pownet import ModelBuilder, SystemInput
+from pownet.core.record import SystemRecord
+from pownet.data_utils import create_init_condition
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="dummy")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--sim_horizon", type=int, default=168)
+    parser.add_argument("--full_resolution_hours", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=7)
+    parser.add_argument("--block_hours", type=int, nargs="+", default=[1, 4, 12, 24])
+    parser.add_argument("--mipgap", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    results = []
+    for block_hours in args.block_hours:
+        inputs = SystemInput(
+            input_folder=args.input_folder,
+            model_name=args.model_name,
+            year=args.year,
+            sim_horizon=args.sim_horizon,
+            block_hours=block_hours,
+            full_resolution_hours=args.full_resolution_hours,
+        )
+        inputs.load_and_check_data()
+
+        start = time.perf_counter()
+        model_builder = ModelBuilder(inputs)
+        system_record = SystemRecord(inputs)
+        init_conditions = create_init_condition(
+            inputs.thermal_units, inputs.storage_units
+        )
+        for step_k in range(1, args.steps + 1):
+            if step_k == 1:
+                power_system_model = model_builder.build(step_k, init_conditions)
+            else:
+                power_system_model = model_builder.update(step_k, init_conditions)
+            power_system_model.optimize(log_to_console=False, mipgap=args.mipgap)
+            system_record.keep(
+                runtime=power_system_model.get_runtime(),
+                objval=power_system_model.get_objval(),
+                solution=power_system_model.get_structured_solution(),
+                step_k=step_k,
+            )
+            init_conditions = system_record.get_init_conds()
+        wall_time = time.perf_counter() - start
+
+        model = model_builder.model
+        results.append(
+            {
+                "block_hours": block_hours,
+                "timesteps": len(model_builder.thermal_builder.timesteps),
+                "vars": model.NumVars,
+                "binvars": model.NumBinVars,
+                "constrs": model.NumConstrs,
+                "objval": system_record.get_objvals()[0],
+                "solver": sum(system_record.get_runtimes()),
+                "total": wall_time,
+            }
+        )
+
+    print(
+        f"{args.model_name}: sim_horizon={args.sim_horizon}, "
+        f"full_resolution_hours={args.full_resolution_hours}, steps={args.steps}"
+    )
+    print(
+        f"{'block_hours':>11} {'timesteps':>9} {'vars':>7} {'binvars':>7} "
+        f"{'constrs':>7} {'objval (step 1)':>16} {'solver (s)':>11} {'total (s)':>10}"
+    )
+    for result in results:
+        print(
+            f"{result['block_hours']:>11} {result['timesteps']:>9} "
+            f"{result['vars']:>7} {result['binvars']:>7} {result['constrs']:>7} "
+            f"{result['objval']:>16.1f} {result['solver']:>11.3f} "
+            f"{result['total']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""bench_time_parallel.py: Compare the wall time of a sequential rolling horizon
+simulation with running its steps in parallel chunks.
+
+The steps are split into --num_chunks chunks that are solved over a process pool. Each
+chunk except the first starts --overlap_steps earlier with all units off, and the chunk
+boundaries are then repaired by solving steps again from the correct initial
+conditions. The cost error is the relative difference between the sum of the objective
+values of the parallel and the sequential run. The processed input files of the model
+must exist, e.g. by running DataProcessor first.
+
+Usage:
+    python benchmarks/bench_time_parallel.py --input_folder model_library \
+        --model_name dummy --steps 64 --num_chunks 2 4 8 --overlap_steps 2
+"""
+
+import argparse
+import time
+
+from pownet import Simulator
+from pownet.core.time_parallel import get_cost_error
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_folder", default="model_library")
+    parser.add_argument("--model_name", default="dummy")
+    parser.add_argument("--year", type=int, default=2016)
+    parser.add_argument("--sim_horizon", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=64)
+    parser.add_argument("--num_chunks", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--overlap_steps", type=int, default=2)
+    parser.add_argument("--num_threads", type=int, default=0)
+    parser.add_argument("--mipgap", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    simulator = Simulator(
+        input_folder=args.input_folder,
+        model_name=args.model_name,
+        model_year=args.year,
+    )
+    inputs = simulator.load_inputs(
+        sim_horizon=args.sim_horizon, to_process_inputs=False
+    )
+
+    start = time.perf_counter()
+    sequential_record = simulator.simulate(
+        inputs=inputs,
+        steps_to_run=args.steps,
+        log_to_console=False,
+        mipgap=args.mipgap,
+        num_threads=args.num_threads,
+    )
+    sequential_time = time.perf_counter() - start
+
+    print(
+        f"{args.model_name}: sim_horizon={args.sim_horizon}, steps={args.steps}, "
+        f"overlap_steps={args.overlap_steps}"
+    )
+    print(
+        f"{'num_chunks':>10} {'total (s)':>10} {'speedup':>8} {'repaired':>9} "
+        f"{'repair (s)':>11} {'cost error':>11}"
+    )
+    print(f"{1:>10} {sequential_time:>10.3f} {1:>8.2f} {0:>9} {0:>11.3f} {0:>11.2e}")
+    for num_chunks in args.num_chunks:
+        start = time.perf_counter()
+        parallel_record = simulator.simulate(
+            inputs=inputs,
+            steps_to_run=args.steps,
+            log_to_console=False,
+            mipgap=args.mipgap,
+            num_threads=args.num_threads,
+            num_chunks=num_chunks,
+            overlap_steps=args.overlap_steps,
+        )
+        parallel_time = time.perf_counter() - start
+        report = simulator.time_parallel_report
+        print(
+            f"{num_chunks:>10} {parallel_time:>10.3f} "
+            f"{sequential_time / parallel_time:>8.2f} "
+            f"{report['repaired_steps'].sum():>9} {report['repair_time'].sum():>11.3f} "
+            f"{get_cost_error(parallel_record, sequential_record):>11.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ from .core import (
     ModelBuilder,
     Visualizer,
     UserConstraint,
+    EnsembleRunner,
+    Scenario,
 )
 
 from .input import SystemInput
@@ -1,10 +1,14 @@
 """basebuilder.py: This module defines the abstract base class for component builders in the Pownet framework."""
 
 from abc import ABC, abstractmethod
+from types import ModuleType
 
 import gurobipy as gp
+import numpy as np
 
+from ..data_model import Timesteps
 from ..input import SystemInput
+from ..optim_model.constraints import matrix_constr
 
 
 class ComponentBuilder(ABC):
@@ -19,7 +23,83 @@ class ComponentBuilder(ABC):
         self.model = model
         self.inputs = inputs
         self.sim_horizon = inputs.sim_horizon
-        self.timesteps = range(1, self.inputs.sim_horizon + 1)
+        # Hourly timesteps up to full_resolution_hours and blocks of block_hours after
+        self.timesteps = Timesteps(
+            inputs.sim_horizon,
+            full_resolution_hours=inputs.full_resolution_hours,
+            block_hours=inputs.block_hours,
+        )
+        # Hours between the starts of consecutive steps of the rolling horizon
+        self.step_hours = inputs.step_hours
+
+        # Update time-dependent constraints by changing their RHS and coefficients.
+        # Otherwise, the constraints are removed and added again at each step.
+        self.update_in_place: bool = True
+
+        # Add the large constraint families as sparse matrices ("matrix")
+        # or as one linear expression per constraint ("expression")
+        self.build_backend: str = "expression"
+
+        # Binary variables after this hour of the horizon are relaxed to continuous
+        # variables between 0 and 1. None keeps all binary variables.
+        self.integer_hours: int = None
+
+    def get_duration_weighted_sum(self, variables: gp.tupledict) -> gp.LinExpr:
+        """Sum the variables weighted by the hours of their timesteps. The timestep
+        is the last element of the keys.
+
+        Args:
+            variables (gp.tupledict): Variables keyed by t or (..., t).
+
+        Returns:
+            gp.LinExpr: The weighted sum, which is the plain sum with hourly timesteps.
+        """
+        if self.timesteps.is_hourly:
+            return variables.sum()
+        return gp.quicksum(
+            self.timesteps.get_duration(key[-1] if isinstance(key, tuple) else key)
+            * var
+            for key, var in variables.items()
+        )
+
+    def get_constr_module(self, expression_module: ModuleType) -> ModuleType:
+        """Return the module whose add_c_* functions build the constraints.
+
+        Args:
+            expression_module (ModuleType): The module with the expression-based constraints.
+
+        Returns:
+            ModuleType: matrix_constr with the matrix backend, which has the same
+                add_c_* functions, or the expression module otherwise.
+
+        Raises:
+            ValueError: If the matrix backend is used with aggregated timesteps.
+        """
+        if self.build_backend == "matrix":
+            if not self.timesteps.is_hourly:
+                raise ValueError(
+                    "PowNet: The matrix backend does not support aggregated timesteps."
+                )
+            return matrix_constr
+        return expression_module
+
+    def relax_lookahead(self, variables: gp.tupledict) -> None:
+        """Relax the binary variables of the timesteps that start after integer_hours
+        to continuous variables. Their bounds of 0 and 1 are kept.
+
+        Args:
+            variables (gp.tupledict): Binary variables keyed by (unit, t).
+        """
+        if self.integer_hours is None:
+            return
+        relaxed_vars = [
+            var
+            for (_, t), var in variables.items()
+            if self.timesteps.starts[t - 1] >= self.integer_hours
+        ]
+        self.model.setAttr(
+            "VType", relaxed_vars, [gp.GRB.CONTINUOUS] * len(relaxed_vars)
+        )
 
     @abstractmethod
     def add_variables(self, step_k: int) -> None:
@@ -33,6 +113,21 @@ class ComponentBuilder(ABC):
     def get_variable_objective_terms(self, step_k: int, **kwargs) -> gp.LinExpr:
         pass
 
+    def get_variable_objective_coeffs(
+        self, step_k: int
+    ) -> list[tuple[list[gp.Var], np.ndarray]]:
+        """Get the variables of the time-dependent objective terms with their coefficients
+        at step_k. The coefficients are written to the Obj attribute when the objective
+        is updated in place. Builders without time-dependent terms return an empty list.
+
+        Args:
+            step_k (int): The current simulation step.
+
+        Returns:
+            list[tuple[list[gp.Var], np.ndarray]]: Pairs of variables and coefficients.
+        """
+        return []
+
     @abstractmethod
     def add_constraints(self, step_k: int, init_conds: dict, **kwargs) -> None:
         pass
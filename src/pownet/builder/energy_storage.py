@@ -3,13 +3,18 @@
 from .basebuilder import ComponentBuilder
 
 import gurobipy as gp
+import numpy as np
 
 from ..input import SystemInput
 from ..optim_model import (
     add_var_with_variable_ub,
     update_var_with_variable_ub,
 )
-from ..optim_model.objfunc import get_marginal_cost_coeff
+from ..optim_model.objfunc import (
+    get_marginal_cost_coeff,
+    get_marginal_cost_array,
+    get_objective_terms,
+)
 from ..optim_model.constraints import energy_storage_constr
 
 
@@ -104,7 +109,8 @@ class EnergyStorageUnitBuilder(ComponentBuilder):
             timesteps=self.timesteps,
             step_k=step_k,
             units=self.inputs.storage_units,
-            capacity_df=self.inputs.ess_derated_capacity,
+            capacity_df=self.inputs.get_timeseries_array("ess_derated_capacity"),
+            step_hours=self.step_hours,
         )
 
         # Binary variables
@@ -120,6 +126,7 @@ class EnergyStorageUnitBuilder(ComponentBuilder):
                     name=varname,
                 ),
             )
+            self.relax_lookahead(getattr(self, varname))
 
     def get_fixed_objective_terms(self) -> gp.LinExpr:
         """Energy storage units have no fixed objective terms."""
@@ -142,10 +149,39 @@ class EnergyStorageUnitBuilder(ComponentBuilder):
             units=self.inputs.storage_units,
             nondispatch_contracts=self.inputs.ess_contracts,
             contract_costs=self.inputs.contract_costs,
+            step_hours=self.step_hours,
         )
         self.total_energy_cost_expr.add(self.pdischarge.prod(energy_cost_coeffs))
         return self.total_energy_cost_expr
 
+    def get_variable_objective_coeffs(
+        self, step_k: int
+    ) -> list[tuple[list[gp.Var], np.ndarray]]:
+        """Get the energy cost coefficients of pdischarge at step_k.
+
+        Args:
+            step_k (int): The current simulation step.
+
+        Returns:
+            list[tuple[list[gp.Var], np.ndarray]]: Pairs of variables and coefficients.
+        """
+        energy_cost_coeffs = get_marginal_cost_array(
+            step_k=step_k,
+            timesteps=self.timesteps,
+            units=self.inputs.storage_units,
+            nondispatch_contracts=self.inputs.ess_contracts,
+            contract_costs=self.inputs.get_timeseries_array("contract_cost_timeseries"),
+            step_hours=self.step_hours,
+        )
+        return [
+            get_objective_terms(
+                self.pdischarge,
+                self.timesteps,
+                self.inputs.storage_units,
+                energy_cost_coeffs,
+            )
+        ]
+
     def add_constraints(self, step_k: int, init_conds: dict, **kwargs) -> None:
         """Add constraints to the model.
 
@@ -206,6 +242,7 @@ class EnergyStorageUnitBuilder(ComponentBuilder):
             charge_efficiency=self.inputs.ess_charge_efficiency,
             discharge_efficiency=self.inputs.ess_discharge_efficiency,
             self_discharge_rate=self.inputs.ess_self_discharge_rate,
+            timesteps=self.timesteps,
         )
 
     def update_variables(self, step_k: int) -> None:
@@ -220,7 +257,9 @@ class EnergyStorageUnitBuilder(ComponentBuilder):
         update_var_with_variable_ub(
             variables=self.charge_state,
             step_k=step_k,
-            capacity_df=self.inputs.ess_derated_capacity,
+            capacity_df=self.inputs.get_timeseries_array("ess_derated_capacity"),
+            step_hours=self.step_hours,
+            timesteps=self.timesteps,
         )
 
     def update_constraints(self, step_k: int, init_conds: dict, **kwargs) -> None:
@@ -233,6 +272,20 @@ class EnergyStorageUnitBuilder(ComponentBuilder):
         Returns:
             None
         """
+        if not self.update_in_place:
+            self._rebuild_constraints(step_k=step_k, init_conds=init_conds)
+            return
+
+        energy_storage_constr.update_c_unit_ess_balance_init(
+            model=self.model,
+            constraints=self.c_unit_ess_balance_init,
+            units=self.inputs.storage_units,
+            charge_state_init=init_conds["initial_charge_state"],
+            self_discharge_rate=self.inputs.ess_self_discharge_rate,
+        )
+
+    def _rebuild_constraints(self, step_k: int, init_conds: dict) -> None:
+        """Remove the time-dependent constraints and add them again."""
         self.model.remove(self.c_unit_ess_balance_init)
         self.c_unit_ess_balance_init = (
             energy_storage_constr.add_c_unit_ess_balance_init(
@@ -3,13 +3,18 @@
 from .basebuilder import ComponentBuilder
 
 import gurobipy as gp
+import numpy as np
 
 from ..input import SystemInput
 from ..optim_model.variable_func import (
     add_var_with_variable_ub,
     update_var_with_variable_ub,
 )
-from ..optim_model.objfunc import get_marginal_cost_coeff
+from ..optim_model.objfunc import (
+    get_marginal_cost_coeff,
+    get_marginal_cost_array,
+    get_objective_terms,
+)
 from ..optim_model.constraints import nondispatch_constr
 
 
@@ -76,7 +81,8 @@ class HydroUnitBuilder(ComponentBuilder):
             timesteps=self.timesteps,
             step_k=step_k,
             units=self.inputs.hydro_unit_node.keys(),
-            capacity_df=self.inputs.hydro_capacity,
+            capacity_df=self.inputs.get_timeseries_array("hydro_capacity"),
+            step_hours=self.step_hours,
         )
 
         # --- Daily/weekly hydropower are limited by contracted capacity
@@ -119,6 +125,7 @@ class HydroUnitBuilder(ComponentBuilder):
                 vtype=gp.GRB.BINARY,
                 name="uhydro",
             )
+            self.relax_lookahead(self.uhydro)
 
     def get_fixed_objective_terms(self) -> gp.LinExpr:
         """Hydropower units have no fixed objective terms."""
@@ -141,11 +148,37 @@ class HydroUnitBuilder(ComponentBuilder):
             units=self.inputs.hydro_units,
             nondispatch_contracts=self.inputs.nondispatch_contracts,
             contract_costs=self.inputs.contract_costs,
+            step_hours=self.step_hours,
         )
         self.total_energy_cost_expr = self.phydro.prod(energy_cost_coeffs)
 
         return self.total_energy_cost_expr
 
+    def get_variable_objective_coeffs(
+        self, step_k: int
+    ) -> list[tuple[list[gp.Var], np.ndarray]]:
+        """Get the energy cost coefficients of phydro at step_k.
+
+        Args:
+            step_k (int): Current time step.
+
+        Returns:
+            list[tuple[list[gp.Var], np.ndarray]]: Pairs of variables and coefficients.
+        """
+        energy_cost_coeffs = get_marginal_cost_array(
+            step_k=step_k,
+            timesteps=self.timesteps,
+            units=self.inputs.hydro_units,
+            nondispatch_contracts=self.inputs.nondispatch_contracts,
+            contract_costs=self.inputs.get_timeseries_array("contract_cost_timeseries"),
+            step_hours=self.step_hours,
+        )
+        return [
+            get_objective_terms(
+                self.phydro, self.timesteps, self.inputs.hydro_units, energy_cost_coeffs
+            )
+        ]
+
     def add_constraints(self, step_k: int, init_conds: dict, **kwargs) -> None:
         # Hourly upper bound
         # Limited by contracted capacity
@@ -165,7 +198,9 @@ class HydroUnitBuilder(ComponentBuilder):
             step_k=step_k,
             sim_horizon=self.inputs.sim_horizon,
             hydro_units=self.inputs.daily_hydro_unit_node.keys(),
-            hydro_capacity=self.inputs.daily_hydro_capacity,
+            hydro_capacity=self.inputs.get_timeseries_array("daily_hydro_capacity"),
+            step_hours=self.step_hours,
+            timesteps=self.timesteps,
         )
 
         # Weekly lower and upper bounds
@@ -177,6 +212,7 @@ class HydroUnitBuilder(ComponentBuilder):
             hydro_units=self.inputs.weekly_hydro_unit_node.keys(),
             hydro_capacity=self.inputs.weekly_hydro_capacity,
             hydro_capacity_min=self.inputs.hydro_min_capacity,
+            timesteps=self.timesteps,
         )
 
         if self.inputs.use_nondispatch_status_var:
@@ -196,7 +232,9 @@ class HydroUnitBuilder(ComponentBuilder):
         update_var_with_variable_ub(
             variables=self.hourly_phydro,
             step_k=step_k,
-            capacity_df=self.inputs.hydro_capacity,
+            capacity_df=self.inputs.get_timeseries_array("hydro_capacity"),
+            step_hours=self.step_hours,
+            timesteps=self.timesteps,
         )
 
     def update_constraints(self, step_k: int, init_conds: dict, **kwargs) -> None:
@@ -208,7 +246,32 @@ class HydroUnitBuilder(ComponentBuilder):
         Returns:
             None
         """
+        if not self.update_in_place:
+            self._rebuild_constraints(step_k=step_k, init_conds=init_conds)
+            return
 
+        nondispatch_constr.update_c_hydro_limit_daily(
+            model=self.model,
+            constraints=self.c_hydro_limit_daily,
+            step_k=step_k,
+            sim_horizon=self.inputs.sim_horizon,
+            hydro_units=self.inputs.daily_hydro_unit_node.keys(),
+            hydro_capacity=self.inputs.get_timeseries_array("daily_hydro_capacity"),
+            step_hours=self.step_hours,
+        )
+
+        self.c_hydro_limit_weekly = nondispatch_constr.update_c_hydro_limit_weekly(
+            model=self.model,
+            constraints=self.c_hydro_limit_weekly,
+            step_k=step_k,
+            sim_horizon=self.inputs.sim_horizon,
+            hydro_units=self.inputs.weekly_hydro_unit_node.keys(),
+            hydro_capacity=self.inputs.weekly_hydro_capacity,
+            hydro_capacity_min=self.inputs.hydro_min_capacity,
+        )
+
+    def _rebuild_constraints(self, step_k: int, init_conds: dict) -> None:
+        """Remove the time-dependent constraints and add them again."""
         self.model.remove(self.c_hydro_limit_daily)
         self.c_hydro_limit_daily = nondispatch_constr.add_c_hydro_limit_daily(
             model=self.model,
@@ -216,7 +279,9 @@ class HydroUnitBuilder(ComponentBuilder):
             step_k=step_k,
             sim_horizon=self.inputs.sim_horizon,
             hydro_units=self.inputs.daily_hydro_unit_node.keys(),
-            hydro_capacity=self.inputs.daily_hydro_capacity,
+            hydro_capacity=self.inputs.get_timeseries_array("daily_hydro_capacity"),
+            step_hours=self.step_hours,
+            timesteps=self.timesteps,
         )
 
         self.model.remove(self.c_hydro_limit_weekly)
@@ -228,11 +293,24 @@ class HydroUnitBuilder(ComponentBuilder):
             hydro_units=self.inputs.weekly_hydro_unit_node.keys(),
             hydro_capacity=self.inputs.weekly_hydro_capacity,
             hydro_capacity_min=self.inputs.hydro_min_capacity,
+            timesteps=self.timesteps,
         )
 
     def update_daily_hydropower_capacity(
         self, step_k: int, new_capacity: dict[tuple[str, int], float]
     ) -> None:
+        if self.update_in_place:
+            nondispatch_constr.update_c_hydro_limit_daily(
+                model=self.model,
+                constraints=self.c_hydro_limit_daily,
+                step_k=step_k,
+                sim_horizon=self.inputs.sim_horizon,
+                hydro_units=self.inputs.daily_hydro_unit_node.keys(),
+                hydro_capacity=new_capacity,
+                step_hours=self.step_hours,
+            )
+            return
+
         self.model.remove(self.c_hydro_limit_daily)
         self.c_hydro_limit_daily = nondispatch_constr.add_c_hydro_limit_daily_dict(
             model=self.model,
@@ -241,6 +319,8 @@ class HydroUnitBuilder(ComponentBuilder):
             sim_horizon=self.inputs.sim_horizon,
             hydro_units=self.inputs.daily_hydro_unit_node.keys(),
             hydro_capacity_dict=new_capacity,
+            step_hours=self.step_hours,
+            timesteps=self.timesteps,
         )
 
     def get_variables(self) -> dict[str, gp.tupledict]:
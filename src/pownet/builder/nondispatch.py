@@ -3,13 +3,18 @@
 from .basebuilder import ComponentBuilder
 
 import gurobipy as gp
+import numpy as np
 
 from ..input import SystemInput
 from ..optim_model.variable_func import (
     add_var_with_variable_ub,
     update_var_with_variable_ub,
 )
-from ..optim_model.objfunc import get_marginal_cost_coeff
+from ..optim_model.objfunc import (
+    get_marginal_cost_coeff,
+    get_marginal_cost_array,
+    get_objective_terms,
+)
 from ..optim_model.constraints import nondispatch_constr
 
 
@@ -89,17 +94,17 @@ class NonDispatchUnitBuilder(ComponentBuilder):
             (
                 "psolar",
                 self.inputs.solar_units,
-                self.inputs.solar_capacity,
+                self.inputs.get_timeseries_array("solar_capacity"),
             ),
             (
                 "pwind",
                 self.inputs.wind_units,
-                self.inputs.wind_capacity,
+                self.inputs.get_timeseries_array("wind_capacity"),
             ),
             (
                 "pimp",
                 self.inputs.import_units,
-                self.inputs.import_capacity,
+                self.inputs.get_timeseries_array("import_capacity"),
             ),
         ]
 
@@ -114,6 +119,7 @@ class NonDispatchUnitBuilder(ComponentBuilder):
                     step_k=step_k,
                     units=units,
                     capacity_df=capacity_df,
+                    step_hours=self.step_hours,
                 ),
             )
 
@@ -135,6 +141,7 @@ class NonDispatchUnitBuilder(ComponentBuilder):
                         name=varname,
                     ),
                 )
+                self.relax_lookahead(getattr(self, varname))
 
     def get_fixed_objective_terms(self) -> gp.LinExpr:
         """Non-dispatchable units have no fixed objective terms."""
@@ -172,11 +179,44 @@ class NonDispatchUnitBuilder(ComponentBuilder):
                 units=units,
                 nondispatch_contracts=self.inputs.nondispatch_contracts,
                 contract_costs=self.inputs.contract_costs,
+                step_hours=self.step_hours,
             )
             self.total_energy_cost.add(var_dict.prod(energy_cost_coeffs))
 
         return self.total_energy_cost
 
+    def get_variable_objective_coeffs(
+        self, step_k: int
+    ) -> list[tuple[list[gp.Var], np.ndarray]]:
+        """Get the energy cost coefficients of psolar, pwind, and pimp at step_k.
+
+        Args:
+            step_k (int): The current simulation step.
+
+        Returns:
+            list[tuple[list[gp.Var], np.ndarray]]: Pairs of variables and coefficients.
+        """
+        objective_terms = []
+        for var_dict, units in [
+            (self.psolar, self.inputs.solar_units),
+            (self.pwind, self.inputs.wind_units),
+            (self.pimp, self.inputs.import_units),
+        ]:
+            energy_cost_coeffs = get_marginal_cost_array(
+                step_k=step_k,
+                timesteps=self.timesteps,
+                units=units,
+                nondispatch_contracts=self.inputs.nondispatch_contracts,
+                contract_costs=self.inputs.get_timeseries_array(
+                    "contract_cost_timeseries"
+                ),
+                step_hours=self.step_hours,
+            )
+            objective_terms.append(
+                get_objective_terms(var_dict, self.timesteps, units, energy_cost_coeffs)
+            )
+        return objective_terms
+
     def _add_unit_link_pu(self) -> None:
         """Add constraints to link the dispatch variable and the unit status variable.
 
@@ -286,6 +326,8 @@ class NonDispatchUnitBuilder(ComponentBuilder):
                 variables=var,
                 step_k=step_k,
                 capacity_df=getattr(self.inputs, f"{unit_type}_capacity"),
+                step_hours=self.step_hours,
+                timesteps=self.timesteps,
             )
 
     def update_constraints(self, step_k: int, init_conds: dict, **kwargs) -> None:
@@ -3,8 +3,10 @@
 import math
 
 import gurobipy as gp
+import numpy as np
 
 from .basebuilder import ComponentBuilder
+from ..data_utils import get_step_window
 from ..input import SystemInput
 from ..optim_model import (
     get_thermal_opex_coeff,
@@ -12,10 +14,17 @@ from ..optim_model import (
     add_var_with_variable_ub,
     update_var_with_variable_ub,
     get_marginal_cost_coeff,
+    get_thermal_opex_array,
+    get_marginal_cost_array,
+    get_objective_terms,
 )
 from ..optim_model.constraints import (
     system_constr,
 )
+from ..optim_model.constraints.system_constr import (
+    _get_kvl_edges,
+    _get_kvl_reactance,
+)
 
 
 class SystemBuilder(ComponentBuilder):
@@ -29,6 +38,7 @@ class SystemBuilder(ComponentBuilder):
     - `pos_pmismatch`: Positive power mismatch at a node. Unit: MW.
     - `neg_pmismatch`: Negative power mismatch at a node. Unit: MW.
     - `theta`: Voltage angle at a node. Unit: Radians.
+    - `pinj`: Net injection of a node into the network with the PTDF formulation. Unit: MW.
 
     Flow variables:
     ---------------------------
@@ -55,6 +65,21 @@ class SystemBuilder(ComponentBuilder):
     - DC-OPF constraints
     - Definition of curtailment variables
 
+    Lazy transmission constraints
+    ===========================
+    With lazy_transmission, the flow limits of a line and the Kirchhoff constraints of
+    a cycle are only added to the model after a solution violates them. The lines and
+    cycles that were added are kept for the following steps.
+
+    PTDF formulation
+    ===========================
+    With dc_opf="ptdf", the flow on a line is the sum of the power transfer distribution
+    factors (PTDF) of the nodes times their net injections. There are no flow variables
+    or Kirchhoff constraints, only flow limits on the lines. Line losses are not modeled,
+    so SystemInput requires line_loss_factor=0. The flows of the solution are found from
+    the expressions of get_flow_expressions. With lazy_transmission, only the lines whose
+    flows exceeded their limits are limited.
+
     """
 
     def __init__(self, model: gp.Model, inputs: SystemInput):
@@ -69,6 +94,7 @@ class SystemBuilder(ComponentBuilder):
         self.flow_fwd = gp.tupledict()
         self.flow_bwd = gp.tupledict()
         self.theta = gp.tupledict()
+        self.pinj = gp.tupledict()
 
         # Curtailment variables
         self.pthermal_curtail = gp.tupledict()
@@ -99,6 +125,9 @@ class SystemBuilder(ComponentBuilder):
         self.c_ref_node = gp.tupledict()
         self.c_angle_diff = gp.tupledict()
         self.c_kirchhoff = gp.tupledict()
+        self.c_ptdf_balance = gp.tupledict()
+        self.c_ptdf_fwd = gp.tupledict()
+        self.c_ptdf_bwd = gp.tupledict()
 
         # Curtailment constraints
         self.c_thermal_curtail = gp.tupledict()
@@ -110,6 +139,17 @@ class SystemBuilder(ComponentBuilder):
         self.c_daily_hydro_curtail_ess = gp.tupledict()
         self.c_weekly_hydro_curtail_ess = gp.tupledict()
 
+        # --- Lazy transmission constraints ---
+        self.lazy_transmission: bool = False
+        # Absolute tolerance of a violation in MW
+        self.lazy_tolerance: float = 1e-4
+        # Lines with flow limits and cycles with Kirchhoff constraints in the model
+        self.binding_lines: set[tuple[str, str]] = set()
+        self.binding_cycles: set[str] = set()
+        # Flow limits of the current step keyed by (source, sink, t)
+        self.line_limits: dict[tuple[str, str, int], float] = {}
+        self.step_k: int = None
+
     def add_variables(self, step_k: int) -> None:
 
         ##############################################
@@ -209,47 +249,49 @@ class SystemBuilder(ComponentBuilder):
         # Unit: MW (Megawatts).
         # The bounds are determined by the line's thermal capacity, potentially adjusted by a capacity factor.
 
-        hours_per_step = 24  # for rolling horizon or len(timesteps) for block horizon
-        self.flow_fwd = self.model.addVars(
-            self.inputs.edges,
-            self.timesteps,
-            lb=0,
-            ub={
-                (source, sink, t): self.inputs.line_capacity_factor
-                * self.inputs.line_capacity.loc[
-                    t + (step_k - 1) * hours_per_step, (source, sink)
-                ]
-                for t in self.timesteps
-                for source, sink in self.inputs.edges
-            },
-            vtype=gp.GRB.CONTINUOUS,
-            name="flow_fwd",
-        )
+        self.step_k = step_k
+        flow_ub = self._get_line_limits(step_k)
+        if self.inputs.dc_opf == "ptdf":
+            # The line flows are expressions of the net injections, which are limited
+            # by the flow limits on the lines
+            self.line_limits = flow_ub
+            self.pinj = self.model.addVars(
+                self.inputs.nodes,
+                self.timesteps,
+                lb=-gp.GRB.INFINITY,
+                vtype=gp.GRB.CONTINUOUS,
+                name="pinj",
+            )
+        else:
+            if self.lazy_transmission:
+                self.line_limits = flow_ub
+                flow_ub = self._get_lazy_flow_ub()
+            self.flow_fwd = self.model.addVars(
+                self.inputs.edges,
+                self.timesteps,
+                lb=0,
+                ub=flow_ub,
+                vtype=gp.GRB.CONTINUOUS,
+                name="flow_fwd",
+            )
 
-        # The backward flow shares the same indexing, so
-        # be careful when formulating the power flow balance constraints.
-        self.flow_bwd = self.model.addVars(
-            self.inputs.edges,
-            self.timesteps,
-            lb=0,
-            ub={
-                (source, sink, t): self.inputs.line_capacity_factor
-                * self.inputs.line_capacity.loc[
-                    t + (step_k - 1) * hours_per_step, (source, sink)
-                ]
-                for t in self.timesteps
-                for source, sink in self.inputs.edges
-            },
-            vtype=gp.GRB.CONTINUOUS,
-            name="flow_bwd",
-        )
+            # The backward flow shares the same indexing, so
+            # be careful when formulating the power flow balance constraints.
+            self.flow_bwd = self.model.addVars(
+                self.inputs.edges,
+                self.timesteps,
+                lb=0,
+                ub=flow_ub,
+                vtype=gp.GRB.CONTINUOUS,
+                name="flow_bwd",
+            )
 
         # Curtailment variables
         var_with_variable_ub_tuples = [
             (
                 "pthermal_curtail",
                 self.inputs.thermal_must_take_units,
-                self.inputs.thermal_derated_capacity,
+                self.inputs.get_timeseries_array("thermal_derated_capacity"),
             )
         ]
         for varname, unit_type, capacity_df in var_with_variable_ub_tuples:
@@ -263,6 +305,7 @@ class SystemBuilder(ComponentBuilder):
                     step_k=step_k,
                     units=unit_type,
                     capacity_df=capacity_df,
+                    step_hours=self.step_hours,
                 ),
             )
 
@@ -280,15 +323,18 @@ class SystemBuilder(ComponentBuilder):
         """
 
         self.load_shortfall_penalty_expr = (
-            self.inputs.load_shortfall_penalty_factor * gp.quicksum(self.pos_pmismatch)
+            self.inputs.load_shortfall_penalty_factor
+            * self.get_duration_weighted_sum(self.pos_pmismatch)
         )
 
         self.load_curtail_penalty_expr = (
-            self.inputs.load_curtail_penalty_factor * gp.quicksum(self.neg_pmismatch)
+            self.inputs.load_curtail_penalty_factor
+            * self.get_duration_weighted_sum(self.neg_pmismatch)
         )
 
         self.spin_shortfall_penalty_expr = (
-            self.inputs.spin_shortfall_penalty_factor * gp.quicksum(self.spin_shortfall)
+            self.inputs.spin_shortfall_penalty_factor
+            * self.get_duration_weighted_sum(self.spin_shortfall)
         )
 
         return (
@@ -320,6 +366,7 @@ class SystemBuilder(ComponentBuilder):
             fuel_contracts=self.inputs.fuel_contracts,
             contract_costs=self.inputs.contract_costs,
             thermal_heat_rate=self.inputs.thermal_heat_rate,
+            step_hours=self.step_hours,
         )
         self.must_take_curtail_penalty_expr += (
             curtail_cost_factor * self.pthermal_curtail.prod(thermal_coeffs)
@@ -332,6 +379,7 @@ class SystemBuilder(ComponentBuilder):
             units=self.inputs.hydro_must_take_units,
             nondispatch_contracts=self.inputs.nondispatch_contracts,
             contract_costs=self.inputs.contract_costs,
+            step_hours=self.step_hours,
         )
         self.must_take_curtail_penalty_expr += (
             curtail_cost_factor * self.phydro_curtail.prod(hourly_hydro_coeffs)
@@ -344,6 +392,7 @@ class SystemBuilder(ComponentBuilder):
             units=self.inputs.daily_hydro_must_take_units,
             nondispatch_contracts=self.inputs.nondispatch_contracts,
             contract_costs=self.inputs.contract_costs,
+            step_hours=self.step_hours,
         )
         self.must_take_curtail_penalty_expr += (
             curtail_cost_factor
@@ -357,6 +406,7 @@ class SystemBuilder(ComponentBuilder):
             units=self.inputs.weekly_hydro_must_take_units,
             nondispatch_contracts=self.inputs.nondispatch_contracts,
             contract_costs=self.inputs.contract_costs,
+            step_hours=self.step_hours,
         )
         self.must_take_curtail_penalty_expr += (
             curtail_cost_factor
@@ -388,6 +438,7 @@ class SystemBuilder(ComponentBuilder):
                 units=units,
                 nondispatch_contracts=contracts,
                 contract_costs=self.inputs.contract_costs,
+                step_hours=self.step_hours,
             )
             self.must_take_curtail_penalty_expr += curtail_cost_factor * var_dict.prod(
                 nondispatch_penalty_cost_coeffs
@@ -395,6 +446,64 @@ class SystemBuilder(ComponentBuilder):
 
         return self.must_take_curtail_penalty_expr
 
+    def get_variable_objective_coeffs(
+        self, step_k: int, curtail_cost_factor: float = 1.0
+    ) -> list[tuple[list[gp.Var], np.ndarray]]:
+        """Get the curtailment penalties of must-take units at step_k.
+
+        The daily and weekly hydro terms of get_variable_objective_terms are products
+        with the constraint tupledicts, whose keys never match (unit, t). They add
+        nothing to the objective and are left out here.
+
+        Args:
+            step_k (int): The current simulation step.
+
+        Returns:
+            list[tuple[list[gp.Var], np.ndarray]]: Pairs of variables and coefficients.
+        """
+        contract_costs = self.inputs.get_timeseries_array("contract_cost_timeseries")
+        thermal_coeffs = get_thermal_opex_array(
+            step_k=step_k,
+            timesteps=self.timesteps,
+            thermal_units=self.inputs.thermal_must_take_units,
+            thermal_opex=self.inputs.thermal_opex,
+            fuel_contracts=self.inputs.fuel_contracts,
+            contract_costs=contract_costs,
+            thermal_heat_rate=self.inputs.thermal_heat_rate,
+            step_hours=self.step_hours,
+        )
+        objective_terms = [
+            get_objective_terms(
+                self.pthermal_curtail,
+                self.timesteps,
+                self.inputs.thermal_must_take_units,
+                curtail_cost_factor * thermal_coeffs,
+            )
+        ]
+        for var_dict, units in [
+            (self.phydro_curtail, self.inputs.hydro_must_take_units),
+            (self.psolar_curtail, self.inputs.solar_must_take_units),
+            (self.pwind_curtail, self.inputs.wind_must_take_units),
+            (self.pimp_curtail, self.inputs.import_must_take_units),
+        ]:
+            penalty_cost_coeffs = get_marginal_cost_array(
+                step_k=step_k,
+                timesteps=self.timesteps,
+                units=units,
+                nondispatch_contracts=self.inputs.nondispatch_contracts,
+                contract_costs=contract_costs,
+                step_hours=self.step_hours,
+            )
+            objective_terms.append(
+                get_objective_terms(
+                    var_dict,
+                    self.timesteps,
+                    units,
+                    curtail_cost_factor * penalty_cost_coeffs,
+                )
+            )
+        return objective_terms
+
     def _add_nondispatchable_unit_curtailment(
         self,
         phydro: gp.tupledict,
@@ -417,13 +526,14 @@ class SystemBuilder(ComponentBuilder):
         Returns:
             None
         """
+        constr = self.get_constr_module(system_constr)
         unit_types_with_ess = {
             "hydro": {
                 "pdispatch": phydro,
                 "pcurtail": self.phydro_curtail,
                 "pcharge": pcharge,
                 "units": self.inputs.hydro_must_take_units,
-                "capacity_df": self.inputs.hydro_capacity,
+                "capacity_df": self.inputs.get_timeseries_array("hydro_capacity"),
                 "ess_attached": self.inputs.ess_hydro_units,
             },
             "solar": {
@@ -431,7 +541,7 @@ class SystemBuilder(ComponentBuilder):
                 "pcurtail": self.psolar_curtail,
                 "pcharge": pcharge,
                 "units": self.inputs.solar_must_take_units,
-                "capacity_df": self.inputs.solar_capacity,
+                "capacity_df": self.inputs.get_timeseries_array("solar_capacity"),
                 "ess_attached": self.inputs.ess_solar_units,
             },
             "wind": {
@@ -439,7 +549,7 @@ class SystemBuilder(ComponentBuilder):
                 "pcurtail": self.pwind_curtail,
                 "pcharge": pcharge,
                 "units": self.inputs.wind_must_take_units,
-                "capacity_df": self.inputs.wind_capacity,
+                "capacity_df": self.inputs.get_timeseries_array("wind_capacity"),
                 "ess_attached": self.inputs.ess_wind_units,
             },
             "import": {
@@ -447,7 +557,7 @@ class SystemBuilder(ComponentBuilder):
                 "pcurtail": self.pimp_curtail,
                 "pcharge": pcharge,
                 "units": self.inputs.import_must_take_units,
-                "capacity_df": self.inputs.import_capacity,
+                "capacity_df": self.inputs.get_timeseries_array("import_capacity"),
                 "ess_attached": {},  # No ESS attached to import sources
             },
         }
@@ -456,7 +566,7 @@ class SystemBuilder(ComponentBuilder):
             setattr(
                 self,
                 f"c_{unit_type}_curtail_ess",
-                system_constr.add_c_unit_curtail_ess(
+                constr.add_c_unit_curtail_ess(
                     model=self.model,
                     pdispatch=params["pdispatch"],
                     pcurtail=params["pcurtail"],
@@ -467,10 +577,12 @@ class SystemBuilder(ComponentBuilder):
                     units=params["units"],
                     capacity_df=params["capacity_df"],
                     ess_attached=params["ess_attached"],
+                    step_hours=self.step_hours,
                 ),
             )
 
     def add_constraints(self, step_k: int, init_conds: dict, **kwargs) -> None:
+        constr = self.get_constr_module(system_constr)
 
         # Thermal-unit specific variables
         spin_vars = kwargs.get("spin_vars", None)
@@ -490,7 +602,7 @@ class SystemBuilder(ComponentBuilder):
 
         # --- Spinning reserve constraints ---
         if self.inputs.use_spin_var:
-            self.c_reserve_req = system_constr.add_c_reserve_req_1(
+            self.c_reserve_req = constr.add_c_reserve_req_1(
                 model=self.model,
                 spin=spin_vars,
                 charge_state=charge_state,
@@ -499,10 +611,11 @@ class SystemBuilder(ComponentBuilder):
                 step_k=step_k,
                 thermal_units=self.inputs.thermal_units,
                 storage_units=self.inputs.storage_units,
-                spin_requirement=self.inputs.spin_requirement,
+                spin_requirement=self.inputs.get_timeseries_array("spin_requirement"),
+                step_hours=self.step_hours,
             )
         else:
-            self.c_reserve_req = system_constr.add_c_reserve_req_2(
+            self.c_reserve_req = constr.add_c_reserve_req_2(
                 model=self.model,
                 pbar=vpowerbar_vars,
                 u=thermal_status_vars,
@@ -513,12 +626,13 @@ class SystemBuilder(ComponentBuilder):
                 thermal_units=self.inputs.thermal_units,
                 thermal_min_capacity=self.inputs.thermal_min_capacity,
                 storage_units=self.inputs.storage_units,
-                total_demand=self.inputs.total_demand,
-                spin_requirement=self.inputs.spin_requirement,
+                total_demand=self.inputs.get_timeseries_array("total_demand"),
+                spin_requirement=self.inputs.get_timeseries_array("spin_requirement"),
+                step_hours=self.step_hours,
             )
 
         # --- Power flow balance constraints ---
-        self.c_flow_balance = system_constr.add_c_flow_balance(
+        self.c_flow_balance = constr.add_c_flow_balance(
             model=self.model,
             pthermal=pthermal,
             phydro=phydro,
@@ -543,10 +657,12 @@ class SystemBuilder(ComponentBuilder):
             node_generator=self.inputs.node_generator,
             ess_charge_units=self.inputs.ess_substation_units,
             ess_discharge_units=self.inputs.ess_attach_unit,
-            demand=self.inputs.demand,
+            demand=self.inputs.get_timeseries_array("demand"),
             demand_nodes=self.inputs.demand_nodes,
             gen_loss_factor=self.inputs.gen_loss_factor,
             line_loss_factor=self.inputs.line_loss_factor,
+            step_hours=self.step_hours,
+            pinj=self.pinj,
         )
 
         # --- DC-OPF constraints ---
@@ -557,7 +673,7 @@ class SystemBuilder(ComponentBuilder):
                 timesteps=self.timesteps,
                 max_demand_node=self.inputs.max_demand_node,
             )
-            self.c_angle_diff = system_constr.add_c_angle_diff(
+            self.c_angle_diff = constr.add_c_angle_diff(
                 model=self.model,
                 flow_fwd=self.flow_fwd,
                 flow_bwd=self.flow_bwd,
@@ -565,34 +681,47 @@ class SystemBuilder(ComponentBuilder):
                 timesteps=self.timesteps,
                 step_k=step_k,
                 edges=self.inputs.edges,
-                susceptance=self.inputs.susceptance,
+                susceptance=self.inputs.get_timeseries_array("susceptance"),
+                step_hours=self.step_hours,
             )
 
         elif self.inputs.dc_opf == "kirchhoff":
-            self.c_kirchhoff = system_constr.add_c_kirchhoff(
+            self.c_kirchhoff = constr.add_c_kirchhoff(
                 model=self.model,
                 flow_fwd=self.flow_fwd,
                 flow_bwd=self.flow_bwd,
                 timesteps=self.timesteps,
                 step_k=step_k,
                 edges=self.inputs.edges,
-                cycle_map=self.inputs.cycle_map,
-                susceptance=self.inputs.susceptance,
+                cycle_map=self.get_cycle_map(),
+                susceptance=self.inputs.get_timeseries_array("susceptance"),
+                step_hours=self.step_hours,
             )
+        elif self.inputs.dc_opf == "ptdf":
+            self.c_ptdf_balance = system_constr.add_c_ptdf_balance(
+                model=self.model,
+                pinj=self.pinj,
+                timesteps=self.timesteps,
+                nodes=self.inputs.nodes,
+            )
+            self._add_c_ptdf_flow(self.get_monitored_lines())
         else:
             raise ValueError(f"Invalid DC-OPF parameter: {self.inputs.dc_opf}.")
 
         # --- Curtailment constraints ---
-        self.c_thermal_curtail = system_constr.add_c_thermal_curtail_ess(
+        self.c_thermal_curtail = constr.add_c_thermal_curtail_ess(
             model=self.model,
             pthermal=pthermal,
             pthermal_curtail=self.pthermal_curtail,
             pcharge=pcharge,
             timesteps=self.timesteps,
             step_k=step_k,
-            thermal_derated_capacity=self.inputs.thermal_derated_capacity,
+            thermal_derated_capacity=self.inputs.get_timeseries_array(
+                "thermal_derated_capacity"
+            ),
             thermal_must_take_units=self.inputs.thermal_must_take_units,
             ess_attached=self.inputs.ess_thermal_units,
+            step_hours=self.step_hours,
         )
 
         # Non-dispatchable units (hydro, solar, wind, import)
@@ -615,8 +744,10 @@ class SystemBuilder(ComponentBuilder):
             sim_horizon=self.inputs.sim_horizon,
             step_k=step_k,
             units=self.inputs.daily_hydro_must_take_units,
-            capacity_df=self.inputs.daily_hydro_capacity,
+            capacity_df=self.inputs.get_timeseries_array("daily_hydro_capacity"),
             ess_attached=self.inputs.ess_daily_hydro_units,
+            step_hours=self.step_hours,
+            timesteps=self.timesteps,
         )
 
     def update_variables(self, step_k: int) -> None:
@@ -628,28 +759,196 @@ class SystemBuilder(ComponentBuilder):
         Returns:
             None
         """
-        update_flow_vars(
-            flow_variables=self.flow_fwd,
-            step_k=step_k,
-            capacity_df=self.inputs.line_capacity,
-            line_capacity_factor=self.inputs.line_capacity_factor,
-        )
-        update_flow_vars(
-            flow_variables=self.flow_bwd,
-            step_k=step_k,
-            capacity_df=self.inputs.line_capacity,
-            line_capacity_factor=self.inputs.line_capacity_factor,
-        )
+        self.step_k = step_k
+        if self.inputs.dc_opf == "ptdf":
+            # The flow limits are the RHS of the PTDF constraints
+            self.line_limits = self._get_line_limits(step_k)
+        elif self.lazy_transmission:
+            self.line_limits = self._get_line_limits(step_k)
+            self._set_flow_ub(self._get_lazy_flow_ub())
+        else:
+            update_flow_vars(
+                flow_variables=self.flow_fwd,
+                step_k=step_k,
+                capacity_df=self.inputs.get_timeseries_array("line_capacity"),
+                line_capacity_factor=self.inputs.line_capacity_factor,
+                step_hours=self.step_hours,
+                timesteps=self.timesteps,
+            )
+            update_flow_vars(
+                flow_variables=self.flow_bwd,
+                step_k=step_k,
+                capacity_df=self.inputs.get_timeseries_array("line_capacity"),
+                line_capacity_factor=self.inputs.line_capacity_factor,
+                step_hours=self.step_hours,
+                timesteps=self.timesteps,
+            )
 
         thermal_unit_vars = [
             self.pthermal_curtail,
         ]
         for var_dict in thermal_unit_vars:
             update_var_with_variable_ub(
-                var_dict, step_k, self.inputs.thermal_derated_capacity
+                var_dict,
+                step_k,
+                self.inputs.get_timeseries_array("thermal_derated_capacity"),
+                step_hours=self.step_hours,
+                timesteps=self.timesteps,
             )
 
     def update_constraints(self, step_k: int, init_conds: dict, **kwargs) -> None:
+        """Update time-dependent constraints:
+        - c_reserve_req: demand and spinning reserve requirement are timeseries
+        - c_flow_balance: demand is a timeseries
+        - c_angle_diff/c_kirchhoff: susceptance is a timeseries
+        - c_ptdf_fwd/c_ptdf_bwd: line capacity is a timeseries
+        - c_thermal_curtail: thermal_derated_capacity is a timeseries
+        - c_{unit_type}_curtail_ess: capacity of non-dispatchable units is a timeseries
+        - c_daily_hydro_curtail_ess: daily hydropower capacity is a timeseries
+
+        Args:
+            step_k (int): The current simulation step.
+            init_conds (dict): Initial conditions for the variables.
+
+        Returns:
+            None
+        """
+        if not self.update_in_place:
+            self._rebuild_constraints(step_k=step_k, init_conds=init_conds, **kwargs)
+            return
+
+        # --- Spinning reserve constraints ---
+        if self.inputs.use_spin_var:
+            system_constr.update_c_reserve_req_1(
+                model=self.model,
+                constraints=self.c_reserve_req,
+                timesteps=self.timesteps,
+                step_k=step_k,
+                spin_requirement=self.inputs.get_timeseries_array("spin_requirement"),
+                step_hours=self.step_hours,
+            )
+        else:
+            system_constr.update_c_reserve_req_2(
+                model=self.model,
+                constraints=self.c_reserve_req,
+                timesteps=self.timesteps,
+                step_k=step_k,
+                total_demand=self.inputs.get_timeseries_array("total_demand"),
+                spin_requirement=self.inputs.get_timeseries_array("spin_requirement"),
+                step_hours=self.step_hours,
+            )
+
+        # --- Power flow balance constraints ---
+        system_constr.update_c_flow_balance(
+            model=self.model,
+            constraints=self.c_flow_balance,
+            timesteps=self.timesteps,
+            step_k=step_k,
+            demand_nodes=self.inputs.demand_nodes,
+            demand=self.inputs.get_timeseries_array("demand"),
+            step_hours=self.step_hours,
+        )
+
+        # --- DC-OPF constraints ---
+        if self.inputs.dc_opf == "voltage_angle":
+            system_constr.update_c_angle_diff(
+                model=self.model,
+                constraints=self.c_angle_diff,
+                theta=self.theta,
+                timesteps=self.timesteps,
+                step_k=step_k,
+                edges=self.inputs.edges,
+                susceptance=self.inputs.get_timeseries_array("susceptance"),
+                step_hours=self.step_hours,
+            )
+
+        elif self.inputs.dc_opf == "kirchhoff":
+            system_constr.update_c_kirchhoff(
+                model=self.model,
+                constraints=self.c_kirchhoff,
+                flow_fwd=self.flow_fwd,
+                flow_bwd=self.flow_bwd,
+                timesteps=self.timesteps,
+                step_k=step_k,
+                edges=self.inputs.edges,
+                cycle_map=self.get_cycle_map(),
+                susceptance=self.inputs.get_timeseries_array("susceptance"),
+                step_hours=self.step_hours,
+            )
+
+        elif self.inputs.dc_opf == "ptdf":
+            for constraints in [self.c_ptdf_fwd, self.c_ptdf_bwd]:
+                system_constr.update_c_ptdf_flow(
+                    model=self.model,
+                    constraints=constraints,
+                    line_limits=self.line_limits,
+                )
+
+        # --- Curtailment constraints ---
+
+        # Thermal units
+        system_constr.update_c_thermal_curtail_ess(
+            model=self.model,
+            constraints=self.c_thermal_curtail,
+            timesteps=self.timesteps,
+            step_k=step_k,
+            thermal_must_take_units=self.inputs.thermal_must_take_units,
+            thermal_derated_capacity=self.inputs.get_timeseries_array(
+                "thermal_derated_capacity"
+            ),
+            step_hours=self.step_hours,
+        )
+
+        # Non-dispatchable units
+        unit_types = [
+            (
+                "hydro",
+                self.inputs.hydro_must_take_units,
+                self.inputs.get_timeseries_array("hydro_capacity"),
+            ),
+            (
+                "solar",
+                self.inputs.solar_must_take_units,
+                self.inputs.get_timeseries_array("solar_capacity"),
+            ),
+            (
+                "wind",
+                self.inputs.wind_must_take_units,
+                self.inputs.get_timeseries_array("wind_capacity"),
+            ),
+            (
+                "import",
+                self.inputs.import_must_take_units,
+                self.inputs.get_timeseries_array("import_capacity"),
+            ),
+        ]
+        for unit_type, units, capacity_df in unit_types:
+            system_constr.update_c_unit_curtail_ess(
+                model=self.model,
+                constraints=getattr(self, f"c_{unit_type}_curtail_ess"),
+                unit_type=unit_type,
+                timesteps=self.timesteps,
+                step_k=step_k,
+                units=units,
+                capacity_df=capacity_df,
+                step_hours=self.step_hours,
+            )
+
+        # Daily hydropower units
+        self.c_daily_hydro_curtail_ess = system_constr.update_c_unit_curtail_ess_daily(
+            model=self.model,
+            constraints=self.c_daily_hydro_curtail_ess,
+            unit_type="hydro",
+            sim_horizon=self.inputs.sim_horizon,
+            step_k=step_k,
+            units=self.inputs.daily_hydro_must_take_units,
+            capacity_df=self.inputs.get_timeseries_array("daily_hydro_capacity"),
+            step_hours=self.step_hours,
+        )
+
+    def _rebuild_constraints(self, step_k: int, init_conds: dict, **kwargs) -> None:
+        """Remove the time-dependent constraints and add them again."""
+        constr = self.get_constr_module(system_constr)
         # Thermal-unit specific variables
         spin_vars = kwargs.get("spin_vars", None)
         vpowerbar_vars = kwargs.get("vpowerbar_vars", None)
@@ -669,7 +968,7 @@ class SystemBuilder(ComponentBuilder):
         # --- Spinning reserve constraints ---
         self.model.remove(self.c_reserve_req)
         if self.inputs.use_spin_var:
-            self.c_reserve_req = system_constr.add_c_reserve_req_1(
+            self.c_reserve_req = constr.add_c_reserve_req_1(
                 model=self.model,
                 spin=spin_vars,
                 charge_state=charge_state,
@@ -678,10 +977,11 @@ class SystemBuilder(ComponentBuilder):
                 step_k=step_k,
                 thermal_units=self.inputs.thermal_units,
                 storage_units=self.inputs.storage_units,
-                spin_requirement=self.inputs.spin_requirement,
+                spin_requirement=self.inputs.get_timeseries_array("spin_requirement"),
+                step_hours=self.step_hours,
             )
         else:
-            self.c_reserve_req = system_constr.add_c_reserve_req_2(
+            self.c_reserve_req = constr.add_c_reserve_req_2(
                 model=self.model,
                 pbar=vpowerbar_vars,
                 u=thermal_status_vars,
@@ -692,13 +992,14 @@ class SystemBuilder(ComponentBuilder):
                 thermal_units=self.inputs.thermal_units,
                 thermal_min_capacity=self.inputs.thermal_min_capacity,
                 storage_units=self.inputs.storage_units,
-                total_demand=self.inputs.total_demand,
-                spin_requirement=self.inputs.spin_requirement,
+                total_demand=self.inputs.get_timeseries_array("total_demand"),
+                spin_requirement=self.inputs.get_timeseries_array("spin_requirement"),
+                step_hours=self.step_hours,
             )
 
         # --- Power flow balance constraints ---
         self.model.remove(self.c_flow_balance)
-        self.c_flow_balance = system_constr.add_c_flow_balance(
+        self.c_flow_balance = constr.add_c_flow_balance(
             model=self.model,
             pthermal=pthermal,
             phydro=phydro,
@@ -723,17 +1024,19 @@ class SystemBuilder(ComponentBuilder):
             node_generator=self.inputs.node_generator,
             ess_charge_units=self.inputs.ess_substation_units,
             ess_discharge_units=self.inputs.ess_attach_unit,
-            demand=self.inputs.demand,
+            demand=self.inputs.get_timeseries_array("demand"),
             demand_nodes=self.inputs.demand_nodes,
             gen_loss_factor=self.inputs.gen_loss_factor,
             line_loss_factor=self.inputs.line_loss_factor,
+            step_hours=self.step_hours,
+            pinj=self.pinj,
         )
 
         # --- DC-OPF constraints ---
 
         if self.inputs.dc_opf == "voltage_angle":
             self.model.remove(self.c_angle_diff)
-            self.c_angle_diff = system_constr.add_c_angle_diff(
+            self.c_angle_diff = constr.add_c_angle_diff(
                 model=self.model,
                 flow_fwd=self.flow_fwd,
                 flow_bwd=self.flow_bwd,
@@ -741,38 +1044,51 @@ class SystemBuilder(ComponentBuilder):
                 timesteps=self.timesteps,
                 step_k=step_k,
                 edges=self.inputs.edges,
-                susceptance=self.inputs.susceptance,
+                susceptance=self.inputs.get_timeseries_array("susceptance"),
+                step_hours=self.step_hours,
             )
 
         elif self.inputs.dc_opf == "kirchhoff":
-            # A simple network might not have any cycles
+            # A simple network might not have any cycles, and a lazy model might
+            # not have any binding cycles yet
             if self.c_kirchhoff:
                 self.model.remove(self.c_kirchhoff)
-                self.c_kirchhoff = system_constr.add_c_kirchhoff(
+                self.c_kirchhoff = constr.add_c_kirchhoff(
                     model=self.model,
                     flow_fwd=self.flow_fwd,
                     flow_bwd=self.flow_bwd,
                     timesteps=self.timesteps,
                     step_k=step_k,
                     edges=self.inputs.edges,
-                    cycle_map=self.inputs.cycle_map,
-                    susceptance=self.inputs.susceptance,
+                    cycle_map=self.get_cycle_map(),
+                    susceptance=self.inputs.get_timeseries_array("susceptance"),
+                    step_hours=self.step_hours,
                 )
 
+        elif self.inputs.dc_opf == "ptdf":
+            self.model.remove(self.c_ptdf_fwd)
+            self.model.remove(self.c_ptdf_bwd)
+            self.c_ptdf_fwd = gp.tupledict()
+            self.c_ptdf_bwd = gp.tupledict()
+            self._add_c_ptdf_flow(self.get_monitored_lines())
+
         # --- Curtailment constraints ---
 
         # Thermal units
         self.model.remove(self.c_thermal_curtail)
-        self.c_thermal_curtail = system_constr.add_c_thermal_curtail_ess(
+        self.c_thermal_curtail = constr.add_c_thermal_curtail_ess(
             model=self.model,
             pthermal=pthermal,
             pthermal_curtail=self.pthermal_curtail,
             pcharge=pcharge,
             timesteps=self.timesteps,
             step_k=step_k,
-            thermal_derated_capacity=self.inputs.thermal_derated_capacity,
+            thermal_derated_capacity=self.inputs.get_timeseries_array(
+                "thermal_derated_capacity"
+            ),
             thermal_must_take_units=self.inputs.thermal_must_take_units,
             ess_attached=self.inputs.ess_thermal_units,
+            step_hours=self.step_hours,
         )
 
         # Non-dispatchable units
@@ -800,10 +1116,221 @@ class SystemBuilder(ComponentBuilder):
             sim_horizon=self.inputs.sim_horizon,
             step_k=step_k,
             units=self.inputs.daily_hydro_must_take_units,
-            capacity_df=self.inputs.daily_hydro_capacity,
+            capacity_df=self.inputs.get_timeseries_array("daily_hydro_capacity"),
             ess_attached=self.inputs.ess_daily_hydro_units,
+            step_hours=self.step_hours,
+            timesteps=self.timesteps,
+        )
+
+    def _get_line_limits(self, step_k: int) -> dict[tuple[str, str, int], float]:
+        """Return the flow limits of the lines at step_k keyed by (source, sink, t)."""
+        line_capacity = get_step_window(
+            self.inputs.get_timeseries_array("line_capacity"),
+            self.timesteps,
+            step_k,
+            self.inputs.edges,
+            step_hours=self.step_hours,
+        )
+        return {
+            (source, sink, t): self.inputs.line_capacity_factor * capacity
+            for t, capacities in zip(self.timesteps, line_capacity.tolist())
+            for (source, sink), capacity in zip(self.inputs.edges, capacities)
+        }
+
+    def _get_lazy_flow_ub(self) -> dict[tuple[str, str, int], float]:
+        """Return the flow limits of the binding lines and no limits otherwise."""
+        return {
+            (source, sink, t): (
+                limit if (source, sink) in self.binding_lines else gp.GRB.INFINITY
+            )
+            for (source, sink, t), limit in self.line_limits.items()
+        }
+
+    def _set_flow_ub(self, flow_ub: dict[tuple[str, str, int], float]) -> None:
+        for flow_variables in [self.flow_fwd, self.flow_bwd]:
+            self.model.setAttr(
+                "UB",
+                [flow_variables[key] for key in flow_ub],
+                list(flow_ub.values()),
+            )
+
+    def get_cycle_map(self) -> dict:
+        """Return the cycles whose Kirchhoff constraints are in the model."""
+        if not self.lazy_transmission:
+            return self.inputs.cycle_map
+        return {
+            cycle_id: cycle_nodes
+            for cycle_id, cycle_nodes in self.inputs.cycle_map.items()
+            if cycle_id in self.binding_cycles
+        }
+
+    def get_monitored_lines(self) -> list[tuple[str, str]]:
+        """Return the lines whose flow limits are PTDF constraints in the model."""
+        if not self.lazy_transmission:
+            return list(self.inputs.edges)
+        return [line for line in self.inputs.edges if line in self.binding_lines]
+
+    def get_flow_expressions(self) -> gp.tupledict:
+        """Return the flow on each line as the PTDF times the net injections keyed by
+        (source, sink, t). There are no expressions when the flows are variables.
+
+        Returns:
+            gp.tupledict: The flow expressions of the PTDF formulation.
+        """
+        if self.inputs.dc_opf != "ptdf":
+            return gp.tupledict()
+        ptdf_factors = system_constr._get_ptdf_factors(
+            self.inputs.ptdf, list(self.inputs.edges)
+        )
+        return gp.tupledict(
+            {
+                (a, b, t): gp.LinExpr(
+                    ptdf_factors[a, b][1],
+                    [self.pinj[node, t] for node in ptdf_factors[a, b][0]],
+                )
+                for (a, b) in self.inputs.edges
+                for t in self.timesteps
+            }
         )
 
+    def _add_c_ptdf_flow(self, lines: list[tuple[str, str]]) -> None:
+        """Add the flow limits of the lines in both directions to the PTDF constraints."""
+        constr = self.get_constr_module(system_constr)
+        for direction, constraints in [
+            ("fwd", self.c_ptdf_fwd),
+            ("bwd", self.c_ptdf_bwd),
+        ]:
+            constraints.update(
+                constr.add_c_ptdf_flow(
+                    model=self.model,
+                    pinj=self.pinj,
+                    timesteps=self.timesteps,
+                    lines=lines,
+                    ptdf=self.inputs.ptdf,
+                    line_limits=self.line_limits,
+                    direction=direction,
+                )
+            )
+
+    def _get_violated_ptdf_lines(self, values: np.ndarray) -> set[tuple[str, str]]:
+        """Return the lines whose flows exceed their limits at any timestep. The flows
+        are the PTDF times the net injections of the solution."""
+        col_idx = np.array(
+            [
+                [self.pinj[node, t].index for node in self.inputs.ptdf.columns]
+                for t in self.timesteps
+            ]
+        )
+        # Flows with one row per timestep and one column per line
+        flows = values[col_idx] @ self.inputs.ptdf.to_numpy().T
+        limits = np.array(
+            [
+                [self.line_limits[a, b, t] for (a, b) in self.inputs.edges]
+                for t in self.timesteps
+            ]
+        )
+        is_violated = (np.abs(flows) > limits + self.lazy_tolerance).any(axis=0)
+        return {
+            line for line, violated in zip(self.inputs.edges, is_violated) if violated
+        }
+
+    def _get_violated_cycles(self, net_flow: dict[tuple[str, str, int], float]) -> dict:
+        """Return the cycles that are not in the model and whose net flows violate
+        the Kirchhoff voltage law at any timestep."""
+        candidate_cycles = {
+            cycle_id: cycle_nodes
+            for cycle_id, cycle_nodes in self.inputs.cycle_map.items()
+            if cycle_id not in self.binding_cycles
+        }
+        kvl_edges = _get_kvl_edges(candidate_cycles, self.inputs.edges)
+        reactance = _get_kvl_reactance(
+            self.inputs.get_timeseries_array("susceptance"),
+            self.timesteps,
+            self.step_k,
+            kvl_edges,
+            step_hours=self.step_hours,
+        )
+        violated_cycles = {}
+        for cycle_id, cycle_edges in kvl_edges.items():
+            for i, t in enumerate(self.timesteps):
+                # The voltage drop around the cycle divided by the total reactance
+                # is the circulating flow in MW
+                voltage_drop = sum(
+                    sign * reactance[a, b][i] * net_flow[a, b, t]
+                    for (a, b), sign in cycle_edges
+                )
+                total_reactance = sum(
+                    abs(reactance[a, b][i]) for (a, b), _ in cycle_edges
+                )
+                if abs(voltage_drop) > self.lazy_tolerance * total_reactance:
+                    violated_cycles[cycle_id] = candidate_cycles[cycle_id]
+                    break
+        return violated_cycles
+
+    def add_violated_transmission_constrs(self, values: np.ndarray) -> int:
+        """Add the flow limits of the lines and the Kirchhoff constraints of the cycles
+        that the solution violates. They are added at all timesteps of the horizon and
+        kept for the following steps.
+
+        Args:
+            values (np.ndarray): The values of all variables ordered by their column index.
+
+        Returns:
+            int: The number of lines and cycles that were added.
+        """
+        if self.inputs.dc_opf == "ptdf":
+            violated_lines = self._get_violated_ptdf_lines(values) - self.binding_lines
+            if violated_lines:
+                self.binding_lines |= violated_lines
+                self._add_c_ptdf_flow(
+                    [line for line in self.inputs.edges if line in violated_lines]
+                )
+                self.model.update()
+            return len(violated_lines)
+
+        net_flow = {}
+        violated_lines = set()
+        for key, limit in self.line_limits.items():
+            fwd = values[self.flow_fwd[key].index]
+            bwd = values[self.flow_bwd[key].index]
+            net_flow[key] = fwd - bwd
+            if max(fwd, bwd) > limit + self.lazy_tolerance:
+                violated_lines.add(key[:2])
+        violated_lines -= self.binding_lines
+
+        violated_cycles = {}
+        if self.inputs.dc_opf == "kirchhoff":
+            violated_cycles = self._get_violated_cycles(net_flow)
+
+        if violated_lines:
+            self.binding_lines |= violated_lines
+            self._set_flow_ub(
+                {
+                    key: limit
+                    for key, limit in self.line_limits.items()
+                    if key[:2] in violated_lines
+                }
+            )
+        if violated_cycles:
+            self.binding_cycles |= set(violated_cycles)
+            constr = self.get_constr_module(system_constr)
+            self.c_kirchhoff.update(
+                constr.add_c_kirchhoff(
+                    model=self.model,
+                    flow_fwd=self.flow_fwd,
+                    flow_bwd=self.flow_bwd,
+                    timesteps=self.timesteps,
+                    step_k=self.step_k,
+                    edges=self.inputs.edges,
+                    cycle_map=violated_cycles,
+                    susceptance=self.inputs.get_timeseries_array("susceptance"),
+                    step_hours=self.step_hours,
+                )
+            )
+        if violated_lines or violated_cycles:
+            self.model.update()
+        return len(violated_lines) + len(violated_cycles)
+
     def get_variables(self) -> dict[str, gp.tupledict]:
         """Get the variables of the system builder.
 
@@ -817,4 +1344,10 @@ class SystemBuilder(ComponentBuilder):
             "flow_fwd": self.flow_fwd,
             "flow_bwd": self.flow_bwd,
             "theta": self.theta,
+            "pinj": self.pinj,
+            "pthermal_curtail": self.pthermal_curtail,
+            "phydro_curtail": self.phydro_curtail,
+            "psolar_curtail": self.psolar_curtail,
+            "pwind_curtail": self.pwind_curtail,
+            "pimp_curtail": self.pimp_curtail,
         }
@@ -3,8 +3,12 @@
 from .basebuilder import ComponentBuilder
 
 import gurobipy as gp
+import highspy
+import numpy as np
 import pandas as pd
 
+from ..data_model import TimeseriesArray
+from ..data_utils import get_step_window
 from ..input import SystemInput
 from ..optim_model import (
     add_var_with_variable_ub,
@@ -12,8 +16,16 @@ from ..optim_model import (
     get_thermal_fixed_coeff,
     get_thermal_startup_coeff,
     get_thermal_opex_coeff,
+    get_thermal_opex_array,
+    get_objective_terms,
 )
 from ..optim_model.constraints import thermal_unit_constr
+from ..optim_model.highs_model import HighsInstance
+from ..optim_model.rounding_algo import optimize_with_rounding_highs
+
+# Number of timesteps whose status is ordered lexicographically for the units
+# in symmetric_units. The weight of the first timestep is 2^(N-1).
+NUM_ORDER_TIMESTEPS = 8
 
 
 class ThermalUnitBuilder(ComponentBuilder):
@@ -46,6 +58,13 @@ class ThermalUnitBuilder(ComponentBuilder):
     - Ramping constraints
     - Assume the start up/down rates are equal to the ramping rates
 
+    With clusters of identical units (unit_count), the status, startup, and shutdown
+    of a cluster are integers that count its units, and the power variables are the
+    totals of its units.
+
+    With groups of identical units (symmetric_units), the status of the units of a
+    group with the same initial conditions is ordered to break their symmetry.
+
     """
 
     def __init__(self, model: gp.Model, inputs: SystemInput) -> None:
@@ -53,9 +72,22 @@ class ThermalUnitBuilder(ComponentBuilder):
         self.thermal_units: list[str] = inputs.thermal_units
 
         self.thermal_rated_capacity: dict[str, float] = inputs.thermal_rated_capacity
-        self.thermal_derated_capacity: pd.DataFrame = inputs.thermal_derated_capacity
+        self.thermal_derated_capacity: TimeseriesArray = inputs.get_timeseries_array(
+            "thermal_derated_capacity"
+        )
         self.thermal_min_capacity: dict[str, float] = inputs.thermal_min_capacity
 
+        # Number of identical units in each cluster of pownet.core.thermal_clusters.
+        # The status, startup, and shutdown of a cluster count its units.
+        self.unit_count: dict[str, int] = {}
+        # Derated capacity times the number of units, which bounds the dispatch
+        self._capacity_bound: TimeseriesArray = None
+        # Groups of identical units at the same node, e.g., the clusters of
+        # pownet.core.thermal_clusters, whose status is ordered
+        self.symmetric_units: list[list[str]] = []
+        # Bounds of the status variables before prefix_commitment fixed them
+        self._free_status_bounds: tuple[np.ndarray, np.ndarray] = None
+
         # Variables
         self.pthermal = gp.tupledict()
         self.vpower = gp.tupledict()
@@ -91,6 +123,8 @@ class ThermalUnitBuilder(ComponentBuilder):
         self.c_ramp_down = gp.tupledict()
         self.c_ramp_up = gp.tupledict()
 
+        self.c_status_order = gp.tupledict()
+
         # The following constraints are mutually exclusive
         self.c_link_spin = gp.tupledict()
         self.c_link_ppbar = gp.tupledict()
@@ -117,7 +151,8 @@ class ThermalUnitBuilder(ComponentBuilder):
                     timesteps=self.timesteps,
                     step_k=step_k,
                     units=self.thermal_units,
-                    capacity_df=self.thermal_derated_capacity,
+                    capacity_df=self.get_capacity_bound(),
+                    step_hours=self.step_hours,
                 ),
             )
 
@@ -134,6 +169,25 @@ class ThermalUnitBuilder(ComponentBuilder):
                     name=varname,
                 ),
             )
+            if self.unit_count:
+                cluster_vars = [
+                    getattr(self, varname)[unit, t]
+                    for unit in self.unit_count
+                    for t in self.timesteps
+                ]
+                self.model.setAttr(
+                    "VType", cluster_vars, [gp.GRB.INTEGER] * len(cluster_vars)
+                )
+                self.model.setAttr(
+                    "UB",
+                    cluster_vars,
+                    [
+                        count
+                        for count in self.unit_count.values()
+                        for _ in self.timesteps
+                    ],
+                )
+            self.relax_lookahead(getattr(self, varname))
 
         # Spinning reserve variable
         if self.inputs.use_spin_var:
@@ -143,6 +197,387 @@ class ThermalUnitBuilder(ComponentBuilder):
                 name="spin",
             )
 
+    def get_capacity_bound(self) -> TimeseriesArray:
+        """Return the derated capacity of each unit times the number of units in its
+        cluster, which is the upper bound of the dispatch variables.
+
+        Returns:
+            TimeseriesArray: The derated capacity without clusters.
+        """
+        if not self.unit_count:
+            return self.thermal_derated_capacity
+        if self._capacity_bound is None:
+            derated_capacity = self.inputs.thermal_derated_capacity
+            unit_count = pd.Series(self.unit_count).reindex(
+                derated_capacity.columns, fill_value=1
+            )
+            self._capacity_bound = TimeseriesArray(derated_capacity * unit_count)
+        return self._capacity_bound
+
+    def bound_cluster_status(self, init_conds: dict) -> None:
+        """Bound the number of online units of each cluster at the start of the
+        horizon. The units that must stay online or offline because of their minimum
+        up and down times are in 'cluster_min_on' and 'cluster_min_off' of the initial
+        conditions, see ThermalClusters.aggregate_init_conds.
+
+        Args:
+            init_conds (dict): Initial conditions for the variables.
+
+        Returns:
+            None
+        """
+        if not self.unit_count:
+            return
+        cluster_vars, lower_bounds, upper_bounds = [], [], []
+        timesteps = np.arange(1, len(self.timesteps) + 1)
+        for unit, count in self.unit_count.items():
+            # Timesteps that start within the remaining up or down time of each unit
+            min_on = [
+                self.timesteps.count_timesteps_before(hours)
+                for hours in init_conds["cluster_min_on"][unit]
+            ]
+            min_off = [
+                self.timesteps.count_timesteps_before(hours)
+                for hours in init_conds["cluster_min_off"][unit]
+            ]
+            cluster_vars.extend(self.status[unit, t] for t in self.timesteps)
+            lower_bounds.extend(
+                (timesteps[:, np.newaxis] <= np.array([min_on])).sum(axis=1)
+            )
+            upper_bounds.extend(
+                count - (timesteps[:, np.newaxis] <= np.array([min_off])).sum(axis=1)
+            )
+        self.model.setAttr("LB", cluster_vars, np.array(lower_bounds).tolist())
+        self.model.setAttr("UB", cluster_vars, np.array(upper_bounds).tolist())
+
+    def get_status_order_pairs(self, init_conds: dict) -> list[tuple[str, str]]:
+        """Return the pairs of consecutive units whose status is ordered. The units
+        of a group in symmetric_units are interchangeable only if they also have the
+        same status, power, and remaining minimum up and down times at the start of
+        the step, so each group is split by its initial conditions.
+
+        Args:
+            init_conds (dict): Initial conditions for the variables.
+
+        Returns:
+            list[tuple[str, str]]: The pairs of units.
+        """
+        unit_pairs = []
+        for units in self.symmetric_units:
+            subgroups: dict[tuple, list[str]] = {}
+            for unit in units:
+                key = tuple(
+                    round(init_conds[name][unit], 6)
+                    for name in [
+                        "initial_u",
+                        "initial_p",
+                        "initial_min_on",
+                        "initial_min_off",
+                    ]
+                )
+                subgroups.setdefault(key, []).append(unit)
+            for subgroup in subgroups.values():
+                unit_pairs.extend(zip(subgroup[:-1], subgroup[1:]))
+        return unit_pairs
+
+    def add_status_order(self, init_conds: dict) -> None:
+        """Replace the constraints that order the status of the identical units
+        with those for the initial conditions of the current step.
+
+        Args:
+            init_conds (dict): Initial conditions for the variables.
+
+        Returns:
+            None
+        """
+        if not self.symmetric_units:
+            return
+        self.model.remove(self.c_status_order)
+        self.c_status_order = thermal_unit_constr.add_c_status_order(
+            model=self.model,
+            u=self.status,
+            unit_pairs=self.get_status_order_pairs(init_conds),
+            timesteps=self.timesteps,
+            num_order_timesteps=NUM_ORDER_TIMESTEPS,
+        )
+
+    def _get_status_list(self) -> list[gp.Var]:
+        """Return the status variables ordered by timestep and then by unit."""
+        return [
+            self.status[unit, t] for t in self.timesteps for unit in self.thermal_units
+        ]
+
+    def get_merit_order_status(
+        self, step_k: int, init_conds: dict, other_supply: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Find the status of the thermal units that the demand, the contract costs,
+        and the derated capacity decide at step_k.
+
+        A unit must run at a timestep when the derated capacity of the other thermal
+        units and the other supply cannot meet the demand, so load would be curtailed
+        without it. A unit is never economic in the step when the units with a lower
+        fuel and operating cost can meet the demand and the spinning reserve at every
+        timestep. Both tests ignore the network, the ramping, and the costs of the
+        status, so they are heuristics. The status within the remaining minimum up
+        and down times of the initial conditions is not decided.
+
+        Args:
+            step_k (int): The current simulation step.
+            init_conds (dict): Initial conditions for the variables.
+            other_supply (np.ndarray): The maximum supply of the units that are not
+                thermal units at each timestep.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Boolean arrays of shape
+                (len(timesteps), len(thermal_units)) of the status that must be on
+                and of the status that must be off.
+        """
+        capacity = get_step_window(
+            self.get_capacity_bound(),
+            self.timesteps,
+            step_k,
+            self.thermal_units,
+            step_hours=self.step_hours,
+        )
+        demand = get_step_window(
+            self.inputs.get_timeseries_array("total_demand"),
+            self.timesteps,
+            step_k,
+            step_hours=self.step_hours,
+        )
+        spin_requirement = get_step_window(
+            self.inputs.get_timeseries_array("spin_requirement"),
+            self.timesteps,
+            step_k,
+            step_hours=self.step_hours,
+        )
+        cost = get_thermal_opex_array(
+            step_k=step_k,
+            timesteps=self.timesteps,
+            thermal_units=self.thermal_units,
+            thermal_opex=self.inputs.thermal_opex,
+            fuel_contracts=self.inputs.fuel_contracts,
+            contract_costs=self.inputs.get_timeseries_array("contract_cost_timeseries"),
+            thermal_heat_rate=self.inputs.thermal_heat_rate,
+            step_hours=self.step_hours,
+        )
+
+        other_capacity = capacity.sum(axis=1, keepdims=True) - capacity
+        must_on = other_capacity + other_supply[:, np.newaxis] < demand[:, np.newaxis]
+
+        # Capacity of the cheaper units with shape (timesteps, units)
+        is_cheaper = cost[:, np.newaxis, :] < cost[:, :, np.newaxis]
+        cheaper_capacity = (is_cheaper * capacity[:, np.newaxis, :]).sum(axis=2)
+        never_economic = (
+            cheaper_capacity >= (demand + spin_requirement)[:, np.newaxis]
+        ).all(axis=0)
+        must_off = np.repeat(never_economic[np.newaxis, :], len(self.timesteps), 0)
+
+        timesteps = np.arange(1, len(self.timesteps) + 1)[:, np.newaxis]
+        min_on = [
+            self.timesteps.count_timesteps_before(init_conds["initial_min_on"][unit])
+            for unit in self.thermal_units
+        ]
+        min_off = [
+            self.timesteps.count_timesteps_before(init_conds["initial_min_off"][unit])
+            for unit in self.thermal_units
+        ]
+        must_on &= timesteps > np.array([min_off])
+        must_off &= (timesteps > np.array([min_on])) & ~must_on
+        return must_on, must_off
+
+    def get_relaxation_status(
+        self,
+        mipgap: float = 1e-3,
+        timelimit: int = 600,
+        reduced_cost_test: bool = True,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Solve the LP relaxation of the model with HiGHS and find the status that
+        any solution better than a feasible solution has.
+
+        The feasible solution is found with the 'slow' rounding heuristic, which rounds
+        the status and the other binary variables but not the startup and shutdown.
+        Raising an integer status from its lower bound by one increases the objective
+        value by at least its reduced cost. If that is more than the gap between the
+        feasible solution and the LP relaxation, the status stays at its lower bound
+        in the optimal solution. The same holds for a status at its upper bound with
+        a negative reduced cost.
+
+        Args:
+            mipgap (float): The MIP gap of the rounding heuristic.
+            timelimit (int): The time limit of each linear program in seconds.
+            reduced_cost_test (bool): Whether to find a feasible solution for the
+                reduced cost test. Default is True.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: Arrays of shape
+                (len(timesteps), len(thermal_units)) of the status in the LP
+                relaxation, which is None if it is not solved to optimality, and
+                boolean arrays of the status that must be at its upper bound and of
+                the status that must be at its lower bound.
+        """
+        shape = (len(self.timesteps), len(self.thermal_units))
+        no_status = np.zeros(shape, dtype=bool)
+
+        self.model.update()
+        highs_instance = HighsInstance()
+        relaxation = highs_instance.load(self.model)
+        arrays = highs_instance.arrays
+        int_cols = np.flatnonzero(
+            arrays["integrality"] != int(highspy.HighsVarType.kContinuous)
+        ).astype(np.int32)
+        relaxation.changeColsIntegrality(
+            len(int_cols),
+            int_cols,
+            np.full(len(int_cols), int(highspy.HighsVarType.kContinuous), np.uint8),
+        )
+        relaxation.setOptionValue("log_to_console", False)
+        relaxation.setOptionValue("time_limit", float(timelimit))
+        relaxation.setOptionValue("solver", "simplex")
+        relaxation.run()
+        if relaxation.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+            return None, no_status, no_status
+
+        status_cols = np.array([var.index for var in self._get_status_list()])
+        solution = relaxation.getSolution()
+        values = np.array(solution.col_value)[status_cols].reshape(shape)
+        if not reduced_cost_test:
+            return values, no_status, no_status
+
+        # The startup and shutdown follow from the rounded status, so they are not
+        # rounded. They are integer in the optimal solution of the linear program.
+        transition_cols = [
+            var.index for var in [*self.startup.values(), *self.shutdown.values()]
+        ]
+        rounding_model, runtime, _ = optimize_with_rounding_highs(
+            self.model,
+            rounding_strategy="slow",
+            threshold=0,
+            max_rounding_iter=len(int_cols),
+            mipgap=mipgap,
+            timelimit=timelimit,
+            num_threads=1,
+            log_to_console=False,
+            rounding_cols=np.setdiff1d(int_cols, transition_cols).astype(np.int32),
+            solve_mip=False,
+        )
+        # The runtime is None if rounding did not find a feasible solution
+        if runtime is None:
+            return values, no_status, no_status
+        upper_bound = rounding_model.getInfo().objective_function_value
+        lower_bound = relaxation.getInfo().objective_function_value
+
+        reduced_cost = np.array(solution.col_dual)[status_cols].reshape(shape)
+        lower = arrays["col_lower"][status_cols].reshape(shape)
+        upper = arrays["col_upper"][status_cols].reshape(shape)
+        is_free = np.isin(status_cols, int_cols).reshape(shape) & (lower < upper)
+
+        cutoff = upper_bound - lower_bound + 1e-6 * max(1, abs(upper_bound))
+        at_upper = is_free & np.isclose(values, upper) & (-reduced_cost > cutoff)
+        at_lower = is_free & np.isclose(values, lower) & (reduced_cost > cutoff)
+        return values, at_upper, at_lower
+
+    def fix_status(self, lower: np.ndarray, upper: np.ndarray) -> int:
+        """Change the bounds of the status variables. The bounds before the first
+        change are kept for release_status.
+
+        Args:
+            lower (np.ndarray): The lower bounds of shape
+                (len(timesteps), len(thermal_units)).
+            upper (np.ndarray): The upper bounds of the same shape.
+
+        Returns:
+            int: The number of status variables whose bounds changed.
+        """
+        status_list = self._get_status_list()
+        current_lower = np.array(self.model.getAttr("LB", status_list))
+        current_upper = np.array(self.model.getAttr("UB", status_list))
+        if self._free_status_bounds is None:
+            self._free_status_bounds = (current_lower, current_upper)
+        lower, upper = lower.ravel(), upper.ravel()
+        self.model.setAttr("LB", status_list, lower.tolist())
+        self.model.setAttr("UB", status_list, upper.tolist())
+        self.model.update()
+        return int(((lower != current_lower) | (upper != current_upper)).sum())
+
+    def release_status(self) -> int:
+        """Restore the bounds of the status variables before fix_status.
+
+        Returns:
+            int: The number of status variables whose bounds were fixed.
+        """
+        if self._free_status_bounds is None:
+            return 0
+        status_list = self._get_status_list()
+        free_lower, free_upper = self._free_status_bounds
+        current_lower = np.array(self.model.getAttr("LB", status_list))
+        current_upper = np.array(self.model.getAttr("UB", status_list))
+        self.model.setAttr("LB", status_list, free_lower.tolist())
+        self.model.setAttr("UB", status_list, free_upper.tolist())
+        self.model.update()
+        self._free_status_bounds = None
+        return int(
+            ((free_lower != current_lower) | (free_upper != current_upper)).sum()
+        )
+
+    def prefix_commitment(
+        self,
+        step_k: int,
+        init_conds: dict,
+        other_supply: np.ndarray,
+        reduced_cost_test: bool = True,
+        mipgap: float = 1e-3,
+        timelimit: int = 600,
+    ) -> dict[str, int]:
+        """Fix the status of the thermal units that is decided before solving the
+        model. The status that must run by the merit order is fixed, see
+        get_merit_order_status. A unit that is never economic by the merit order is
+        only fixed off at the timesteps where it is also off in the LP relaxation.
+        Then the status that the reduced cost test decides is fixed, see
+        get_relaxation_status. release_status restores the bounds, e.g., when the
+        model with the fixed status is infeasible.
+
+        Args:
+            step_k (int): The current simulation step.
+            init_conds (dict): Initial conditions for the variables.
+            other_supply (np.ndarray): The maximum supply of the units that are not
+                thermal units at each timestep.
+            reduced_cost_test (bool): Whether to apply the reduced cost test. The test
+                is only valid when the model has all constraints. Default is True.
+            mipgap (float): The MIP gap of the rounding heuristic of the test.
+            timelimit (int): The time limit of each linear program in seconds.
+
+        Returns:
+            dict[str, int]: The number of status variables fixed by each test.
+        """
+        status_list = self._get_status_list()
+        shape = (len(self.timesteps), len(self.thermal_units))
+        lower = np.array(self.model.getAttr("LB", status_list)).reshape(shape)
+        upper = np.array(self.model.getAttr("UB", status_list)).reshape(shape)
+
+        values, at_upper, at_lower = self.get_relaxation_status(
+            mipgap=mipgap, timelimit=timelimit, reduced_cost_test=reduced_cost_test
+        )
+        must_on, must_off = self.get_merit_order_status(
+            step_k, init_conds, other_supply
+        )
+        # A cluster must run at least one of its units
+        must_on &= upper >= 1
+        must_off &= lower == 0
+        if values is None:
+            must_off[:] = False
+        else:
+            must_off &= np.isclose(values, 0)
+
+        lower = np.where(must_on, np.maximum(lower, 1), lower)
+        fixed_commitment = {"must_run": self.fix_status(lower, upper)}
+        upper = np.where(must_off, 0, upper)
+        fixed_commitment["never_economic"] = self.fix_status(lower, upper)
+        fixed_commitment["reduced_cost"] = self.fix_status(
+            np.where(at_upper, upper, lower), np.where(at_lower, lower, upper)
+        )
+        return fixed_commitment
+
     def get_fixed_objective_terms(self) -> gp.LinExpr:
         """
         Get the fixed objective terms for the thermal units. This includes
@@ -192,10 +627,38 @@ class ThermalUnitBuilder(ComponentBuilder):
             fuel_contracts=self.inputs.fuel_contracts,
             contract_costs=self.inputs.contract_costs,
             thermal_heat_rate=self.inputs.thermal_heat_rate,
+            step_hours=self.step_hours,
         )
         self.thermal_opex_expr = self.pthermal.prod(thermal_opex_coeffs)
         return self.thermal_opex_expr
 
+    def get_variable_objective_coeffs(
+        self, step_k: int
+    ) -> list[tuple[list[gp.Var], np.ndarray]]:
+        """Get the OPEX coefficients of pthermal at step_k.
+
+        Args:
+            step_k (int): The current simulation step.
+
+        Returns:
+            list[tuple[list[gp.Var], np.ndarray]]: Pairs of variables and coefficients.
+        """
+        thermal_opex_coeffs = get_thermal_opex_array(
+            step_k=step_k,
+            timesteps=self.timesteps,
+            thermal_units=self.thermal_units,
+            thermal_opex=self.inputs.thermal_opex,
+            fuel_contracts=self.inputs.fuel_contracts,
+            contract_costs=self.inputs.get_timeseries_array("contract_cost_timeseries"),
+            thermal_heat_rate=self.inputs.thermal_heat_rate,
+            step_hours=self.step_hours,
+        )
+        return [
+            get_objective_terms(
+                self.pthermal, self.timesteps, self.thermal_units, thermal_opex_coeffs
+            )
+        ]
+
     def add_constraints(self, step_k: int, init_conds: dict, **kwargs) -> None:
         """Add constraints to the model.
 
@@ -206,7 +669,10 @@ class ThermalUnitBuilder(ComponentBuilder):
         Returns:
             None
         """
-        self.c_link_uvw_init = thermal_unit_constr.add_c_link_uvw_init(
+        self.bound_cluster_status(init_conds)
+        self.add_status_order(init_conds)
+        constr = self.get_constr_module(thermal_unit_constr)
+        self.c_link_uvw_init = constr.add_c_link_uvw_init(
             model=self.model,
             u=self.status,
             v=self.startup,
@@ -214,15 +680,16 @@ class ThermalUnitBuilder(ComponentBuilder):
             initial_u=init_conds["initial_u"],
             thermal_units=self.thermal_units,
         )
-        self.c_link_uvw = thermal_unit_constr.add_c_link_uvw(
+        self.c_link_uvw = constr.add_c_link_uvw(
             model=self.model,
             u=self.status,
             v=self.startup,
             w=self.shutdown,
             sim_horizon=self.sim_horizon,
             thermal_units=self.thermal_units,
+            timesteps=self.timesteps,
         )
-        self.c_link_pthermal = thermal_unit_constr.add_c_link_pthermal(
+        self.c_link_pthermal = constr.add_c_link_pthermal(
             model=self.model,
             pthermal=self.pthermal,
             p=self.vpower,
@@ -241,7 +708,7 @@ class ThermalUnitBuilder(ComponentBuilder):
         #     thermal_units=self.thermal_units,
         #     thermal_min_capacity=self.thermal_min_capacity,
         # )
-        self.c_link_pu_upper = thermal_unit_constr.add_c_link_pu_upper(
+        self.c_link_pu_upper = constr.add_c_link_pu_upper(
             model=self.model,
             pbar=self.vpowerbar,
             u=self.status,
@@ -250,36 +717,42 @@ class ThermalUnitBuilder(ComponentBuilder):
             thermal_units=self.thermal_units,
             thermal_min_capacity=self.thermal_min_capacity,
             thermal_derated_capacity=self.thermal_derated_capacity,
+            step_hours=self.step_hours,
         )
-        self.c_min_down_init = thermal_unit_constr.add_c_min_down_init(
+        self.c_min_down_init = constr.add_c_min_down_init(
             model=self.model,
             u=self.status,
             sim_horizon=self.sim_horizon,
             thermal_units=self.thermal_units,
             initial_min_off=init_conds["initial_min_off"],
+            timesteps=self.timesteps,
         )
-        self.c_min_up_init = thermal_unit_constr.add_c_min_up_init(
+        self.c_min_up_init = constr.add_c_min_up_init(
             model=self.model,
             u=self.status,
             sim_horizon=self.sim_horizon,
             thermal_units=self.thermal_units,
             initial_min_on=init_conds["initial_min_on"],
+            timesteps=self.timesteps,
         )
-        self.c_min_down = thermal_unit_constr.add_c_min_down(
+        self.c_min_down = constr.add_c_min_down(
             model=self.model,
             u=self.status,
             w=self.shutdown,
             sim_horizon=self.sim_horizon,
             thermal_units=self.thermal_units,
             TD=self.inputs.TD,
+            timesteps=self.timesteps,
+            unit_count=self.unit_count,
         )
-        self.c_min_up = thermal_unit_constr.add_c_min_up(
+        self.c_min_up = constr.add_c_min_up(
             model=self.model,
             u=self.status,
             v=self.startup,
             sim_horizon=self.sim_horizon,
             thermal_units=self.thermal_units,
             TU=self.inputs.TU,
+            timesteps=self.timesteps,
         )
 
         # Currently not implemented because we set SD = SU = ramping
@@ -317,7 +790,7 @@ class ThermalUnitBuilder(ComponentBuilder):
         #     TU=self.inputs.TU,
         # )
 
-        self.c_ramp_down_init = thermal_unit_constr.add_c_ramp_down_init(
+        self.c_ramp_down_init = constr.add_c_ramp_down_init(
             model=self.model,
             p=self.vpower,
             w=self.shutdown,
@@ -328,7 +801,7 @@ class ThermalUnitBuilder(ComponentBuilder):
             RD=self.inputs.RD,
             SD=self.inputs.SD,
         )
-        self.c_ramp_up_init = thermal_unit_constr.add_c_ramp_up_init(
+        self.c_ramp_up_init = constr.add_c_ramp_up_init(
             model=self.model,
             pbar=self.vpowerbar,
             u=self.status,
@@ -339,7 +812,7 @@ class ThermalUnitBuilder(ComponentBuilder):
             RU=self.inputs.RU,
             SU=self.inputs.SU,
         )
-        self.c_ramp_down = thermal_unit_constr.add_c_ramp_down(
+        self.c_ramp_down = constr.add_c_ramp_down(
             model=self.model,
             p=self.vpower,
             u=self.status,
@@ -349,8 +822,9 @@ class ThermalUnitBuilder(ComponentBuilder):
             thermal_min_capacity=self.thermal_min_capacity,
             RD=self.inputs.RD,
             SD=self.inputs.SD,
+            timesteps=self.timesteps,
         )
-        self.c_ramp_up = thermal_unit_constr.add_c_ramp_up(
+        self.c_ramp_up = constr.add_c_ramp_up(
             model=self.model,
             p=self.vpower,
             pbar=self.vpowerbar,
@@ -361,10 +835,11 @@ class ThermalUnitBuilder(ComponentBuilder):
             thermal_min_capacity=self.thermal_min_capacity,
             RU=self.inputs.RU,
             SU=self.inputs.SU,
+            timesteps=self.timesteps,
         )
 
         if self.inputs.use_spin_var:
-            self.c_link_spin = thermal_unit_constr.add_c_link_spin(
+            self.c_link_spin = constr.add_c_link_spin(
                 model=self.model,
                 p=self.vpower,
                 pbar=self.vpowerbar,
@@ -373,7 +848,7 @@ class ThermalUnitBuilder(ComponentBuilder):
                 thermal_units=self.thermal_units,
             )
         else:
-            self.c_link_ppbar = thermal_unit_constr.add_c_link_ppbar(
+            self.c_link_ppbar = constr.add_c_link_ppbar(
                 model=self.model,
                 p=self.vpower,
                 pbar=self.vpowerbar,
@@ -399,7 +874,13 @@ class ThermalUnitBuilder(ComponentBuilder):
             self.vpowerbar,
         ]
         for var_dict in thermal_unit_vars:
-            update_var_with_variable_ub(var_dict, step_k, self.thermal_derated_capacity)
+            update_var_with_variable_ub(
+                var_dict,
+                step_k,
+                self.get_capacity_bound(),
+                step_hours=self.step_hours,
+                timesteps=self.timesteps,
+            )
 
     def update_constraints(self, step_k: int, init_conds: dict, **kwargs) -> None:
         """Update time-dependent constraints:
@@ -409,6 +890,7 @@ class ThermalUnitBuilder(ComponentBuilder):
         - c_min_up_init: initial_min_on is from the previous iteration
         - c_ramp_down_init: initial vpower and u is from the previous iteration
         - c_ramp_up_init: initial vpower is from the previous iteration
+        - c_status_order: the identical units with the same initial conditions
 
         Args:
             step_k (int): The current timestep.
@@ -417,8 +899,73 @@ class ThermalUnitBuilder(ComponentBuilder):
         Returns:
             None
         """
+        self.bound_cluster_status(init_conds)
+        # The pairs of units depend on the initial conditions
+        self.add_status_order(init_conds)
+        if not self.update_in_place:
+            self._rebuild_constraints(step_k=step_k, init_conds=init_conds)
+            return
+
+        thermal_unit_constr.update_c_link_uvw_init(
+            model=self.model,
+            constraints=self.c_link_uvw_init,
+            thermal_units=self.thermal_units,
+            initial_u=init_conds["initial_u"],
+        )
+
+        thermal_unit_constr.update_c_link_pu_upper(
+            model=self.model,
+            constraints=self.c_link_pu_upper,
+            u=self.status,
+            timesteps=self.timesteps,
+            step_k=step_k,
+            thermal_units=self.thermal_units,
+            thermal_min_capacity=self.thermal_min_capacity,
+            thermal_derated_capacity=self.thermal_derated_capacity,
+            step_hours=self.step_hours,
+        )
+
+        thermal_unit_constr.update_c_min_down_init(
+            model=self.model,
+            constraints=self.c_min_down_init,
+            u=self.status,
+            sim_horizon=self.sim_horizon,
+            thermal_units=self.thermal_units,
+            initial_min_off=init_conds["initial_min_off"],
+            timesteps=self.timesteps,
+        )
+
+        thermal_unit_constr.update_c_min_up_init(
+            model=self.model,
+            constraints=self.c_min_up_init,
+            u=self.status,
+            sim_horizon=self.sim_horizon,
+            thermal_units=self.thermal_units,
+            initial_min_on=init_conds["initial_min_on"],
+            timesteps=self.timesteps,
+        )
+
+        thermal_unit_constr.update_c_ramp_down_init(
+            model=self.model,
+            constraints=self.c_ramp_down_init,
+            thermal_units=self.thermal_units,
+            initial_p=init_conds["initial_p"],
+            initial_u=init_conds["initial_u"],
+            RD=self.inputs.RD,
+        )
+
+        thermal_unit_constr.update_c_ramp_up_init(
+            model=self.model,
+            constraints=self.c_ramp_up_init,
+            thermal_units=self.thermal_units,
+            initial_p=init_conds["initial_p"],
+        )
+
+    def _rebuild_constraints(self, step_k: int, init_conds: dict) -> None:
+        """Remove the time-dependent constraints and add them again."""
+        constr = self.get_constr_module(thermal_unit_constr)
         self.model.remove(self.c_link_uvw_init)
-        self.c_link_uvw_init = thermal_unit_constr.add_c_link_uvw_init(
+        self.c_link_uvw_init = constr.add_c_link_uvw_init(
             model=self.model,
             u=self.status,
             v=self.startup,
@@ -428,7 +975,7 @@ class ThermalUnitBuilder(ComponentBuilder):
         )
 
         self.model.remove(self.c_link_pu_upper)
-        self.c_link_pu_upper = thermal_unit_constr.add_c_link_pu_upper(
+        self.c_link_pu_upper = constr.add_c_link_pu_upper(
             model=self.model,
             pbar=self.vpowerbar,
             u=self.status,
@@ -437,28 +984,31 @@ class ThermalUnitBuilder(ComponentBuilder):
             thermal_units=self.thermal_units,
             thermal_min_capacity=self.thermal_min_capacity,
             thermal_derated_capacity=self.thermal_derated_capacity,
+            step_hours=self.step_hours,
         )
 
         self.model.remove(self.c_min_down_init)
-        self.c_min_down_init = thermal_unit_constr.add_c_min_down_init(
+        self.c_min_down_init = constr.add_c_min_down_init(
             model=self.model,
             u=self.status,
             sim_horizon=self.sim_horizon,
             thermal_units=self.thermal_units,
             initial_min_off=init_conds["initial_min_off"],
+            timesteps=self.timesteps,
         )
 
         self.model.remove(self.c_min_up_init)
-        self.c_min_up_init = thermal_unit_constr.add_c_min_up_init(
+        self.c_min_up_init = constr.add_c_min_up_init(
             model=self.model,
             u=self.status,
             sim_horizon=self.sim_horizon,
             thermal_units=self.thermal_units,
             initial_min_on=init_conds["initial_min_on"],
+            timesteps=self.timesteps,
         )
 
         self.model.remove(self.c_ramp_down_init)
-        self.c_ramp_down_init = thermal_unit_constr.add_c_ramp_down_init(
+        self.c_ramp_down_init = constr.add_c_ramp_down_init(
             model=self.model,
             p=self.vpower,
             w=self.shutdown,
@@ -471,7 +1021,7 @@ class ThermalUnitBuilder(ComponentBuilder):
         )
 
         self.model.remove(self.c_ramp_up_init)
-        self.c_ramp_up_init = thermal_unit_constr.add_c_ramp_up_init(
+        self.c_ramp_up_init = constr.add_c_ramp_up_init(
             model=self.model,
             pbar=self.vpowerbar,
             u=self.status,
@@ -496,4 +1046,5 @@ class ThermalUnitBuilder(ComponentBuilder):
             "status": self.status,
             "startup": self.startup,
             "shutdown": self.shutdown,
+            "spin": self.spin,
         }
@@ -7,6 +7,8 @@ from .record import SystemRecord
 from .simulation import Simulator
 from .data_processor import DataProcessor
 from .user_constraint import UserConstraint
+from .ensemble import EnsembleRunner, EnsembleResults, Scenario
+from .time_parallel import TimeParallelRunner
 
 __all__ = [
     "Simulator",
@@ -16,4 +18,8 @@ __all__ = [
     "ModelBuilder",
     "Visualizer",
     "UserConstraint",
+    "EnsembleRunner",
+    "EnsembleResults",
+    "Scenario",
+    "TimeParallelRunner",
 ]
@@ -10,11 +10,21 @@ import pandas as pd
 
 from pownet.folder_utils import get_database_dir
 from pownet.data_utils import get_dates
+from . import network_reduction
+
+# Columns of timeseries files that are not units or nodes
+DATE_COLUMNS = ["year", "month", "day", "hour", "date", "datetime"]
 
 
 class DataProcessor:
     def __init__(
-        self, input_folder: str, model_name: str, year: int, frequency: int
+        self,
+        input_folder: str,
+        model_name: str,
+        year: int,
+        frequency: int,
+        ptdf_threshold: float = 1e-4,
+        reduce_network: bool = False,
     ) -> None:
         """The DataProcessor class is used to process the data provided by the user. The data
         is stored in the model_library/model_name folder. The required files are:
@@ -24,14 +34,24 @@ class DataProcessor:
         3. solar.csv, wind.csv, hydropower.csv, import.csv: Files that contain the renewable unit data.
         4. energy_storage.csv: A file that contains the energy storage system data.
 
+        PTDF entries with an absolute value below ptdf_threshold are set to zero, so
+        each line flow only depends on the nodes that noticeably affect it.
+
+        With reduce_network, the buses without generation, demand, or storage are
+        eliminated with Kron reduction. pownet_transmission.csv then contains the
+        equivalent lines, and pownet_line_map.csv maps their flows to the original lines.
         """
         self.input_folder = input_folder
         self.model_name = model_name
         self.year = year
         self.frequency = frequency
+        self.ptdf_threshold = ptdf_threshold
+        self.reduce_network = reduce_network
 
         # Values that will be calculated
         self.cycle_map: dict = json.loads("{}")
+        self.ptdf: pd.DataFrame = pd.DataFrame()
+        self.line_map: pd.DataFrame = pd.DataFrame()
         self.thermal_derate_factors: pd.DataFrame = pd.DataFrame()
         self.thermal_derated_capacity: pd.DataFrame = pd.DataFrame()
 
@@ -282,6 +302,61 @@ class DataProcessor:
             os.path.join(self.model_folder, "pownet_transmission.csv"), index=False
         )
 
+    def get_terminal_nodes(self) -> set[str]:
+        """Return the nodes with generation, demand, or storage."""
+        terminal_nodes = set()
+        thermal_file = os.path.join(self.model_folder, "thermal_unit.csv")
+        if os.path.exists(thermal_file):
+            terminal_nodes.update(pd.read_csv(thermal_file, header=0)["node"])
+
+        # The second header row of a capacity timeseries is the node of each unit
+        for filename in [
+            "hydropower.csv",
+            "hydropower_daily.csv",
+            "hydropower_weekly.csv",
+            "solar.csv",
+            "wind.csv",
+            "import.csv",
+        ]:
+            capacity_file = os.path.join(self.model_folder, filename)
+            if os.path.exists(capacity_file):
+                columns = pd.read_csv(capacity_file, header=[0, 1], nrows=0).columns
+                terminal_nodes.update(
+                    node for unit, node in columns if unit not in DATE_COLUMNS
+                )
+
+        demand_file = os.path.join(self.model_folder, "demand_export.csv")
+        if os.path.exists(demand_file):
+            columns = pd.read_csv(demand_file, header=0, nrows=0).columns
+            terminal_nodes.update(set(columns) - set(DATE_COLUMNS))
+
+        ess_file = os.path.join(self.model_folder, "energy_storage.csv")
+        if os.path.exists(ess_file):
+            ess_data = pd.read_csv(ess_file, header=0)
+            terminal_nodes.update(ess_data["attach_to"])
+            terminal_nodes.update(ess_data["inject_to"])
+        return terminal_nodes
+
+    def create_reduced_network(self) -> None:
+        """
+        Eliminate the buses without generation, demand, or storage from the transmission
+        data with Kron reduction. The equivalent lines replace the transmission data,
+        and the line map relates their flows to the flows on the original lines.
+        """
+        self.transmission_data, self.line_map = network_reduction.reduce_network(
+            self.transmission_data, self.get_terminal_nodes()
+        )
+
+    def write_line_map(self) -> None:
+        """
+        Save the line map to pownet_line_map.csv in model_library/{model_name}. The flow
+        on an original line (source, sink) is the sum of the flows on the reduced lines
+        (reduced_source, reduced_sink) times their factors.
+        """
+        self.line_map.to_csv(
+            os.path.join(self.model_folder, "pownet_line_map.csv"), index=False
+        )
+
     def create_cycle_map(self) -> None:
         """
         Create a cycle map for the power system. This is used to create the
@@ -305,6 +380,59 @@ class DataProcessor:
         with open(os.path.join(self.model_folder, "pownet_cycle_map.json"), "w") as f:
             json.dump(self.cycle_map, f)
 
+    def create_ptdf(self) -> None:
+        """
+        Create the power transfer distribution factors (PTDF) of the lines. The PTDF
+        of a line and a node is the flow on the line when one MW is injected at the
+        node and withdrawn at the reference node, which is the first node of the
+        transmission data. A flow from source to sink is positive. The PTDF is
+        only created for a connected network.
+        """
+        graph = nx.from_pandas_edgelist(
+            self.transmission_data,
+            source="source",
+            target="sink",
+        )
+        if not nx.is_connected(graph):
+            self.ptdf = pd.DataFrame()
+            return
+
+        nodes = list(graph.nodes)
+        node_idx = {node: idx for idx, node in enumerate(nodes)}
+        num_lines = len(self.transmission_data)
+
+        # Incidence matrix of the lines with +1 at the source and -1 at the sink
+        incidence = np.zeros((num_lines, len(nodes)))
+        lines = np.arange(num_lines)
+        incidence[lines, self.transmission_data["source"].map(node_idx)] = 1
+        incidence[lines, self.transmission_data["sink"].map(node_idx)] = -1
+
+        # Flows are susceptance * incidence @ theta, where the injections are
+        # bus_susceptance @ theta and theta is zero at the reference node
+        line_susceptance = self.transmission_data["susceptance"].to_numpy(dtype=float)
+        weighted_incidence = line_susceptance[:, np.newaxis] * incidence
+        bus_susceptance = incidence.T @ weighted_incidence
+        ptdf = np.zeros((num_lines, len(nodes)))
+        ptdf[:, 1:] = np.linalg.solve(
+            bus_susceptance[1:, 1:], weighted_incidence[:, 1:].T
+        ).T
+        ptdf[np.abs(ptdf) < self.ptdf_threshold] = 0
+
+        self.ptdf = pd.DataFrame(
+            ptdf,
+            index=pd.MultiIndex.from_frame(
+                self.transmission_data[["source", "sink"]]
+            ),
+            columns=nodes,
+        )
+
+    def write_ptdf(self) -> None:
+        """
+        Save the PTDF to pownet_ptdf.csv in model_library/{model_name}. Each row is a
+        line given by its source and sink, and each column after them is a node.
+        """
+        self.ptdf.to_csv(os.path.join(self.model_folder, "pownet_ptdf.csv"))
+
     def _create_derate_factors(
         self, unit_type: str, derate_factor: float = 1.00
     ) -> None:
@@ -441,7 +569,11 @@ class DataProcessor:
         if not self.user_transmission.empty:
             self.calc_line_capacity()
             self.calc_line_susceptance()
+            self.line_map = pd.DataFrame()
+            if self.reduce_network:
+                self.create_reduced_network()
             self.create_cycle_map()
+            self.create_ptdf()
 
         self.create_thermal_derate_factors()
         self.create_thermal_derated_capacity()
@@ -455,6 +587,15 @@ class DataProcessor:
         if not self.transmission_data.empty:
             self.write_transmission_data()
             self.write_cycle_map()
+            if not self.ptdf.empty:
+                self.write_ptdf()
+
+            # A line map of an earlier reduction no longer matches the lines
+            line_map_file = os.path.join(self.model_folder, "pownet_line_map.csv")
+            if not self.line_map.empty:
+                self.write_line_map()
+            elif os.path.exists(line_map_file):
+                os.remove(line_map_file)
 
         self.write_thermal_derated_capacity()
         self.write_ess_derated_capacity()
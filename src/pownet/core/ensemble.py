@@ -0,0 +1,370 @@
+"""ensemble.py: Run many scenarios of a PowNet model over a process pool.
+
+A scenario changes some inputs of a base model, e.g., a synthetic demand year, a
+hydropower timeseries, or the penalty factors. The input data of the base model is
+loaded and checked once in the main process. Worker processes receive it when they
+start and only replace the timeseries and parameters that a scenario overrides. See
+pownet.core.process_pool for how the workers share the input data and the thread
+budget of the solver.
+"""
+
+import copy
+import dataclasses
+import logging
+import os
+from concurrent.futures import as_completed
+
+import pandas as pd
+
+from pownet.data_utils import write_df
+from ..input import SystemInput
+from .process_pool import create_process_pool, get_threads_per_worker, get_worker_data
+from .simulation import Simulator
+
+logger = logging.getLogger(__name__)
+
+
+# Penalty factors that can be changed without reloading the input data
+PENALTY_FACTORS = (
+    "load_shortfall_penalty_factor",
+    "load_curtail_penalty_factor",
+    "spin_shortfall_penalty_factor",
+    "ess_discharge_shortfall_penalty_factor",
+)
+
+# Tables collected from the SystemRecord of each scenario
+RESULT_TABLES = (
+    "node_variables",
+    "flow_variables",
+    "system_variables",
+    "model_stats",
+)
+
+
+@dataclasses.dataclass()
+class Scenario:
+    """
+    Data class to hold the overrides of a scenario.
+
+    Attributes:
+        name (str): The unique name of the scenario.
+        input_folder (str): The folder containing the input data. Defaults to the folder of the runner.
+        demand_csv (str): Path to a CSV file that replaces demand_export.csv. Same format as demand_export.csv.
+        capacity_csvs (dict[str, str]): Paths to CSV files that replace the capacity timeseries keyed by
+            the unit type (hydro, daily_hydro, solar, wind, import). Same format as the input files,
+            e.g., hydropower.csv with the unit and node as headers.
+        penalty_factors (dict[str, float]): Values of the penalty factors in PENALTY_FACTORS.
+    """
+
+    name: str
+    input_folder: str = None
+    demand_csv: str = None
+    capacity_csvs: dict[str, str] = dataclasses.field(default_factory=dict)
+    penalty_factors: dict[str, float] = dataclasses.field(default_factory=dict)
+
+    def __post_init__(self):
+        invalid_factors = set(self.penalty_factors) - set(PENALTY_FACTORS)
+        if invalid_factors:
+            raise ValueError(
+                f"PowNet: Scenario {self.name} has unknown penalty factors {sorted(invalid_factors)}."
+            )
+
+
+def load_scenario_timeseries(csv_path: str, header_levels: int) -> pd.DataFrame:
+    """Load a timeseries with the same conventions as SystemInput.
+    - Date columns are dropped from the DataFrame
+    - PowNet indexing starts at 1
+    - Capacity timeseries (header_levels=1) keep only the unit names as columns
+
+    Args:
+        csv_path (str): Path to the CSV file.
+        header_levels (int): 0 for demand and 1 for capacity timeseries.
+
+    Returns:
+        pd.DataFrame: The timeseries.
+    """
+    date_cols = ["year", "month", "day", "hour", "date", "datetime"]
+    col_level = 0 if header_levels > 0 else None
+    timeseries = pd.read_csv(csv_path, header=list(range(header_levels + 1))).drop(
+        date_cols, level=col_level, axis=1, errors="ignore"
+    )
+    if header_levels > 0:
+        timeseries.columns = timeseries.columns.droplevel(1)
+    timeseries.index += 1
+    return timeseries
+
+
+def apply_scenario(inputs: SystemInput, scenario: Scenario) -> SystemInput:
+    """Return a copy of the input data with the overrides of the scenario. The copy
+    is shallow, so the data that is not overridden is shared with the base inputs.
+
+    Args:
+        inputs (SystemInput): The input data of the base model.
+        scenario (Scenario): The scenario.
+
+    Returns:
+        SystemInput: The input data of the scenario.
+    """
+    scenario_inputs = copy.copy(inputs)
+    if scenario.demand_csv is not None:
+        scenario_inputs.update_demand(
+            load_scenario_timeseries(scenario.demand_csv, header_levels=0)
+        )
+    for unit_type, csv_path in scenario.capacity_csvs.items():
+        scenario_inputs.update_capacity(
+            load_scenario_timeseries(csv_path, header_levels=1), unit_type=unit_type
+        )
+    for factor, value in scenario.penalty_factors.items():
+        setattr(scenario_inputs, factor, value)
+    return scenario_inputs
+
+
+def _run_scenario(
+    scenario: Scenario,
+    input_folder: str,
+    simulator_params: dict,
+    run_params: dict,
+) -> dict[str, pd.DataFrame]:
+    """Run a scenario in a worker process and return its result tables. The input
+    data of the base models is keyed by the input folder.
+    """
+    base_inputs: dict[str, SystemInput] = get_worker_data()
+    inputs = apply_scenario(base_inputs[input_folder], scenario)
+    simulator = Simulator(input_folder=input_folder, **simulator_params)
+    system_record = simulator.simulate(inputs=inputs, **run_params)
+    return {
+        "node_variables": system_record.get_node_variables(),
+        "flow_variables": system_record.get_flow_variables(),
+        "system_variables": system_record.get_systemwide_variables(),
+        "model_stats": system_record.get_model_stats(),
+    }
+
+
+class EnsembleResults:
+    """Results of an ensemble keyed by the scenario name."""
+
+    def __init__(self) -> None:
+        self.records: dict[str, dict[str, pd.DataFrame]] = {}
+        # Error messages of the scenarios that failed
+        self.errors: dict[str, str] = {}
+
+    def add(self, scenario_name: str, tables: dict[str, pd.DataFrame]) -> None:
+        self.records[scenario_name] = tables
+
+    def get_scenario(self, scenario_name: str) -> dict[str, pd.DataFrame]:
+        """Return the result tables of a scenario."""
+        return self.records[scenario_name]
+
+    def get_table(self, table_name: str) -> pd.DataFrame:
+        """Return a result table of all scenarios with a 'scenario' column.
+
+        Args:
+            table_name (str): One of RESULT_TABLES.
+
+        Returns:
+            pd.DataFrame: The stacked tables ordered by scenario name.
+
+        Raises:
+            ValueError: If the table name is not in RESULT_TABLES.
+        """
+        if table_name not in RESULT_TABLES:
+            raise ValueError(
+                f"PowNet: table_name must be one of {list(RESULT_TABLES)}. Got {table_name}."
+            )
+        tables = [
+            self.records[scenario_name][table_name].assign(scenario=scenario_name)
+            for scenario_name in sorted(self.records)
+        ]
+        if not tables:
+            return pd.DataFrame()
+        return pd.concat(tables, axis=0, ignore_index=True)
+
+    def get_node_variables(self) -> pd.DataFrame:
+        return self.get_table("node_variables")
+
+    def get_flow_variables(self) -> pd.DataFrame:
+        return self.get_table("flow_variables")
+
+    def get_systemwide_variables(self) -> pd.DataFrame:
+        return self.get_table("system_variables")
+
+    def get_model_stats(self) -> pd.DataFrame:
+        return self.get_table("model_stats")
+
+    def write_results(self, output_folder: str, model_id: str) -> None:
+        """Write one CSV file per result table with the results of all scenarios."""
+        for table_name in RESULT_TABLES:
+            write_df(
+                self.get_table(table_name),
+                output_folder=output_folder,
+                output_name=table_name,
+                model_id=model_id,
+            )
+
+
+class EnsembleRunner:
+    """Run scenarios of a model in parallel."""
+
+    def __init__(
+        self,
+        input_folder: str,
+        model_name: str,
+        model_year: int,
+        max_workers: int = None,
+        total_threads: int = None,
+        **simulator_params,
+    ) -> None:
+        """Initialize the runner.
+
+        Args:
+            input_folder (str): The folder containing the input data.
+            model_name (str): The name of the model.
+            model_year (int): The year of the model.
+            max_workers (int): The number of worker processes. Defaults to the number of CPUs.
+            total_threads (int): The number of solver threads shared by all workers.
+                Defaults to the number of CPUs.
+            **simulator_params: Other parameters of Simulator, e.g., dc_opf or use_spin_var.
+        """
+        self.input_folder: str = input_folder
+        self.model_name: str = model_name
+        self.model_year: int = model_year
+
+        cpu_count = os.cpu_count() or 1
+        self.max_workers: int = max_workers or cpu_count
+        self.total_threads: int = total_threads or cpu_count
+        if self.max_workers < 1 or self.total_threads < 1:
+            raise ValueError(
+                "PowNet: max_workers and total_threads must be positive integers."
+            )
+        self.simulator_params: dict = simulator_params
+
+    def get_threads_per_worker(self, num_scenarios: int) -> int:
+        """Divide the thread budget among the workers that run at the same time."""
+        return get_threads_per_worker(
+            self.total_threads, self.max_workers, num_tasks=num_scenarios
+        )
+
+    def _load_base_inputs(
+        self,
+        input_folders: set[str],
+        sim_horizon: int,
+        num_sim_days: int,
+        to_process_inputs: bool,
+        step_hours: int = 24,
+        block_hours: int = 1,
+        full_resolution_hours: int = 24,
+    ) -> dict[str, SystemInput]:
+        base_inputs = {}
+        for input_folder in sorted(input_folders):
+            simulator = Simulator(
+                input_folder=input_folder,
+                model_name=self.model_name,
+                model_year=self.model_year,
+                **self.simulator_params,
+            )
+            base_inputs[input_folder] = simulator.load_inputs(
+                sim_horizon=sim_horizon,
+                num_sim_days=num_sim_days,
+                to_process_inputs=to_process_inputs,
+                step_hours=step_hours,
+                block_hours=block_hours,
+                full_resolution_hours=full_resolution_hours,
+            )
+        return base_inputs
+
+    def run(
+        self,
+        scenarios: list[Scenario],
+        sim_horizon: int,
+        steps_to_run: int = None,
+        num_sim_days: int = 365,
+        to_process_inputs: bool = True,
+        solver: str = "gurobi",
+        mipgap: float = 1e-3,
+        timelimit: int = 600,
+        find_lmp: bool = False,
+        step_hours: int = 24,
+        block_hours: int = 1,
+        full_resolution_hours: int = 24,
+    ) -> EnsembleResults:
+        """Run the scenarios over a process pool.
+
+        Args:
+            scenarios (list[Scenario]): The scenarios to run.
+            sim_horizon (int): The simulation horizon in hours.
+            steps_to_run (int): The number of steps to run in each scenario. Default is
+                None, which runs all steps. See Simulator.simulate.
+            num_sim_days (int): The number of days in the simulation.
+            to_process_inputs (bool): Whether to process the input data before loading it.
+            solver (str): The solver to use for optimization.
+            mipgap (float): The MIP gap for the optimization.
+            timelimit (int): The time limit for the optimization in seconds.
+            find_lmp (bool): Whether to find the locational marginal prices.
+            step_hours (int): The number of hours between the starts of consecutive
+                steps. Default is 24.
+            block_hours (int): The number of hours that are merged into one timestep
+                after the first full_resolution_hours of each step. See Simulator.run.
+            full_resolution_hours (int): The number of hours at the start of each step
+                that keep one timestep per hour when block_hours > 1.
+
+        Returns:
+            EnsembleResults: The results keyed by the scenario name. Scenarios that
+                failed are listed in EnsembleResults.errors.
+
+        Raises:
+            ValueError: If the scenario names are not unique.
+        """
+        scenario_names = [scenario.name for scenario in scenarios]
+        if len(set(scenario_names)) != len(scenario_names):
+            raise ValueError("PowNet: Scenario names must be unique.")
+
+        input_folders = {
+            scenario.input_folder or self.input_folder for scenario in scenarios
+        }
+        base_inputs = self._load_base_inputs(
+            input_folders,
+            sim_horizon=sim_horizon,
+            num_sim_days=num_sim_days,
+            to_process_inputs=to_process_inputs,
+            step_hours=step_hours,
+            block_hours=block_hours,
+            full_resolution_hours=full_resolution_hours,
+        )
+
+        simulator_params = {
+            "model_name": self.model_name,
+            "model_year": self.model_year,
+            **self.simulator_params,
+        }
+        run_params = {
+            "steps_to_run": steps_to_run,
+            "solver": solver,
+            "log_to_console": False,
+            "mipgap": mipgap,
+            "timelimit": timelimit,
+            "num_threads": self.get_threads_per_worker(len(scenarios)),
+            "find_lmp": find_lmp,
+        }
+
+        results = EnsembleResults()
+        with create_process_pool(
+            self.max_workers, num_tasks=len(scenarios), worker_data=base_inputs
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _run_scenario,
+                    scenario,
+                    scenario.input_folder or self.input_folder,
+                    simulator_params,
+                    run_params,
+                ): scenario.name
+                for scenario in scenarios
+            }
+            for future in as_completed(futures):
+                scenario_name = futures[future]
+                try:
+                    results.add(scenario_name, future.result())
+                except Exception as e:
+                    logger.warning(f"PowNet: Scenario {scenario_name} failed: {e}")
+                    results.errors[scenario_name] = str(e)
+        return results
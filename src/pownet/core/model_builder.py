@@ -2,36 +2,148 @@
 for constructing and updating the optimization model for the power system.
 """
 
+import functools
+
 from ..input import SystemInput
 
 from gurobipy import GRB
 import gurobipy as gp
+import numpy as np
 
-from ..optim_model import PowerSystemModel
+from ..optim_model import PowerSystemModel, SolutionLayout
 from ..builder.thermal import ThermalUnitBuilder
 from ..builder.hydro import HydroUnitBuilder
 from ..builder.nondispatch import NonDispatchUnitBuilder
 from ..builder.energy_storage import EnergyStorageUnitBuilder
 from ..builder.system import SystemBuilder
+from .thermal_clusters import ThermalClusters
 
 
 class ModelBuilder:
-    def __init__(self, inputs: SystemInput) -> None:
+    def __init__(
+        self,
+        inputs: SystemInput,
+        update_in_place: bool = True,
+        build_backend: str = "expression",
+        update_objective_in_place: bool = True,
+        integer_hours: int = None,
+        lazy_transmission: bool = False,
+        cluster_thermal_units: bool = False,
+        prefix_commitment: bool = False,
+        break_symmetry: bool = False,
+    ) -> None:
+        """Initialize the ModelBuilder.
+
+        Args:
+            inputs (SystemInput): The input data of the power system.
+            update_in_place (bool): Whether to update time-dependent constraints by changing
+                their RHS and coefficients instead of removing and adding them. Default is True.
+            build_backend (str): How the thermal and system constraints are added. "expression"
+                adds one linear expression per constraint. "matrix" assembles each constraint
+                family as a sparse matrix and adds it with addMConstr. Both build the same model.
+                Default is "expression".
+            update_objective_in_place (bool): Whether to write the time-dependent objective
+                coefficients to the Obj attribute of their variables instead of building
+                and setting the whole objective again. Default is True.
+            integer_hours (int): Number of hours at the start of the horizon whose binary
+                variables, e.g., the unit commitment, stay binary. The binary variables of
+                the later hours are relaxed to continuous variables between 0 and 1.
+                Default is None, which keeps all binary variables.
+            lazy_transmission (bool): Whether to start without the flow limits of the
+                lines and the Kirchhoff constraints of the cycles. PowerSystemModel.optimize
+                adds the violated ones and solves again until none is violated. The lines
+                and cycles that were added stay in the model in later steps. Default is False.
+            cluster_thermal_units (bool): Whether to model thermal units with the same
+                parameters as a cluster with integer commitment variables that count
+                its online units. The solution of PowerSystemModel.get_structured_solution
+                is reported per unit. Default is False.
+            prefix_commitment (bool): Whether to fix the status of the thermal units
+                that must run, are never economic, or are decided by the reduced
+                costs of the LP relaxation before each solve. See
+                ThermalUnitBuilder.prefix_commitment. PowerSystemModel.optimize solves
+                the model again without fixing the status if it is infeasible.
+                Default is False.
+            break_symmetry (bool): Whether to order the status of thermal units with
+                the same node and parameters, see ThermalClusters, and the same
+                initial conditions. This removes the symmetric solutions that the
+                solver would otherwise explore. It is not always faster: Gurobi and
+                HiGHS detect symmetry themselves, and the ordering constraints can
+                slow down their search. In benchmarks/bench_symmetry_breaking.py it
+                helps HiGHS with pairs of identical units, but slows down Gurobi and
+                HiGHS with groups of four units. Compare the solve time with and
+                without it before relying on it. Cannot be combined with
+                cluster_thermal_units, which already removes them. Default is False.
+
+        Raises:
+            ValueError: If the build backend is not supported, integer_hours is
+                not positive, or break_symmetry is combined with cluster_thermal_units.
+        """
+        if build_backend not in ("expression", "matrix"):
+            raise ValueError(
+                f"PowNet: Build backend {build_backend} is not supported. "
+                "Use 'expression' or 'matrix'."
+            )
+        if integer_hours is not None and integer_hours < 1:
+            raise ValueError("PowNet: integer_hours must be a positive integer.")
+        if break_symmetry and cluster_thermal_units:
+            raise ValueError(
+                "PowNet: The clusters of identical thermal units have no symmetry "
+                "to break. Do not set break_symmetry with cluster_thermal_units."
+            )
         self.inputs = inputs
         self.model: gp.Model = gp.Model(self.inputs.model_id)
 
+        # The builders see each cluster of identical thermal units as one unit
+        self.thermal_clusters: ThermalClusters = None
+        builder_inputs = self.inputs
+        if cluster_thermal_units:
+            self.thermal_clusters = ThermalClusters(self.inputs)
+            builder_inputs = self.thermal_clusters.get_clustered_inputs()
+        # Initial conditions of the units at the current step
+        self._unit_init_conds: dict[str, dict] = None
+
         # Instantiate specialized builders, passing the model, inputs, and timesteps
-        self.thermal_builder = ThermalUnitBuilder(self.model, self.inputs)
-        self.hydro_builder = HydroUnitBuilder(self.model, self.inputs)
-        self.nondispatch_builder = NonDispatchUnitBuilder(self.model, self.inputs)
-        self.storage_builder = EnergyStorageUnitBuilder(self.model, self.inputs)
-        self.system_builder = SystemBuilder(self.model, self.inputs)
+        self.thermal_builder = ThermalUnitBuilder(self.model, builder_inputs)
+        self.hydro_builder = HydroUnitBuilder(self.model, builder_inputs)
+        self.nondispatch_builder = NonDispatchUnitBuilder(self.model, builder_inputs)
+        self.storage_builder = EnergyStorageUnitBuilder(self.model, builder_inputs)
+        self.system_builder = SystemBuilder(self.model, builder_inputs)
+        if self.thermal_clusters is not None:
+            self.thermal_builder.unit_count = self.thermal_clusters.unit_count
+        if break_symmetry:
+            self.thermal_builder.symmetric_units = list(
+                ThermalClusters(self.inputs).clusters.values()
+            )
+
+        for builder in [
+            self.thermal_builder,
+            self.hydro_builder,
+            self.nondispatch_builder,
+            self.storage_builder,
+            self.system_builder,
+        ]:
+            builder.update_in_place = update_in_place
+            builder.build_backend = build_backend
+            builder.integer_hours = integer_hours
+        self.system_builder.lazy_transmission = lazy_transmission
+        self.prefix_commitment = prefix_commitment
+        # Number of status variables fixed by each test at the current step
+        self.fixed_commitment: dict[str, int] = None
 
         # Model attributes
         self.total_fixed_objective_expr = gp.LinExpr()
+        self.solution_layout: SolutionLayout = None
+
+        # Variables with time-dependent objective coefficients and their fixed
+        # coefficients, which are found at the first in-place update
+        self.update_objective_in_place = update_objective_in_place
+        self._objective_vars: list[gp.Var] = None
+        self._objective_positions: np.ndarray = None
+        self._fixed_objective_coeffs: np.ndarray = None
 
     def build(self, step_k: int, init_conds: dict[str, dict]) -> PowerSystemModel:
         """Build the initial optimization model by delegating to specialized builders."""
+        init_conds = self._get_builder_init_conds(init_conds)
 
         ###########################################
         # Add variables
@@ -110,10 +222,21 @@ class ModelBuilder:
         )
 
         self.model.update()
-        return PowerSystemModel(self.model)
+
+        # Variables are only added here, so the layout is reused in later steps
+        self.solution_layout = SolutionLayout(
+            self.get_variables(),
+            flow_expressions=self.system_builder.get_flow_expressions(),
+        )
+        if self.prefix_commitment:
+            self._prefix_commitment(step_k=step_k, init_conds=init_conds)
+        return self._get_power_system_model()
 
     def update(self, step_k: int, init_conds: dict[str, dict]) -> PowerSystemModel:
         """Update the existing model for a new step_k by delegating to specialized builders."""
+        init_conds = self._get_builder_init_conds(init_conds)
+        # The status fixed at the previous step is free again
+        self.thermal_builder.release_status()
 
         ###########################################
         # Update variables
@@ -128,30 +251,15 @@ class ModelBuilder:
         # Update Objective Function
         ###########################################
 
-        updated_objective_expr = self.total_fixed_objective_expr.copy()
-
-        # Rebuild the objective as terms/coefficients that change with step_k
-        updated_objective_expr += self.thermal_builder.get_variable_objective_terms(
-            step_k=step_k
-        )
-        updated_objective_expr += self.hydro_builder.get_variable_objective_terms(
-            step_k=step_k
-        )
-        updated_objective_expr += self.nondispatch_builder.get_variable_objective_terms(
-            step_k=step_k
-        )
-        updated_objective_expr += self.storage_builder.get_variable_objective_terms(
-            step_k=step_k
-        )
-        updated_objective_expr += self.system_builder.get_variable_objective_terms(
-            step_k=step_k
-        )
-        self.model.setObjective(updated_objective_expr, sense=GRB.MINIMIZE)
+        if self.update_objective_in_place:
+            self._update_objective_coeffs(step_k=step_k)
+        else:
+            self._set_objective(step_k=step_k)
 
         ###########################################
         # Update Constraints
         ###########################################
-        # Builders will handle removing old and adding new/modified constraints
+        # Builders either modify the constraints in place or remove and add them again
         self.thermal_builder.update_constraints(step_k=step_k, init_conds=init_conds)
         self.hydro_builder.update_constraints(step_k=step_k, init_conds=init_conds)
         self.nondispatch_builder.update_constraints(
@@ -175,7 +283,145 @@ class ModelBuilder:
         )
 
         self.model.update()
-        return PowerSystemModel(self.model)
+        if self.prefix_commitment:
+            self._prefix_commitment(step_k=step_k, init_conds=init_conds)
+        return self._get_power_system_model()
+
+    def _get_builder_init_conds(self, init_conds: dict[str, dict]) -> dict[str, dict]:
+        """Keep the initial conditions of the units and return those of the clusters."""
+        if self.thermal_clusters is None:
+            return init_conds
+        self._unit_init_conds = init_conds
+        return self.thermal_clusters.aggregate_init_conds(init_conds)
+
+    def _get_other_supply(self) -> np.ndarray:
+        """Return the sum of the upper bounds of the hydropower, solar, wind, import,
+        and storage discharge at each timestep."""
+        other_supply = np.zeros(len(self.thermal_builder.timesteps))
+        for variables in [
+            self.hydro_builder.phydro,
+            self.nondispatch_builder.psolar,
+            self.nondispatch_builder.pwind,
+            self.nondispatch_builder.pimp,
+            self.storage_builder.pdischarge,
+        ]:
+            if not variables:
+                continue
+            timesteps = np.array([t for _, t in variables.keys()])
+            upper = self.model.getAttr("UB", list(variables.values()))
+            np.add.at(other_supply, timesteps - 1, upper)
+        return other_supply
+
+    def _prefix_commitment(self, step_k: int, init_conds: dict[str, dict]) -> None:
+        """Fix the status of the thermal units that is decided before solving."""
+        # The reduced cost test needs a feasible solution of the full model, which
+        # the model without the lazy transmission constraints does not give
+        self.fixed_commitment = self.thermal_builder.prefix_commitment(
+            step_k=step_k,
+            init_conds=init_conds,
+            other_supply=self._get_other_supply(),
+            reduced_cost_test=not self.system_builder.lazy_transmission,
+        )
+
+    def _set_objective(self, step_k: int) -> None:
+        """Rebuild the objective from the fixed and the time-dependent terms."""
+        updated_objective_expr = self.total_fixed_objective_expr.copy()
+        # Rebuild the objective as terms/coefficients that change with step_k
+        updated_objective_expr += self.thermal_builder.get_variable_objective_terms(
+            step_k=step_k
+        )
+        updated_objective_expr += self.hydro_builder.get_variable_objective_terms(
+            step_k=step_k
+        )
+        updated_objective_expr += self.nondispatch_builder.get_variable_objective_terms(
+            step_k=step_k
+        )
+        updated_objective_expr += self.storage_builder.get_variable_objective_terms(
+            step_k=step_k
+        )
+        updated_objective_expr += self.system_builder.get_variable_objective_terms(
+            step_k=step_k
+        )
+        self.model.setObjective(updated_objective_expr, sense=GRB.MINIMIZE)
+
+    def _update_objective_coeffs(self, step_k: int) -> None:
+        """Write the time-dependent objective coefficients of step_k to the Obj
+        attribute of their variables. The coefficient of a variable is its fixed
+        coefficient plus the sum of its time-dependent coefficients."""
+        variables, coeffs = [], []
+        for builder in [
+            self.thermal_builder,
+            self.hydro_builder,
+            self.nondispatch_builder,
+            self.storage_builder,
+            self.system_builder,
+        ]:
+            for term_vars, term_coeffs in builder.get_variable_objective_coeffs(
+                step_k=step_k
+            ):
+                variables.extend(term_vars)
+                coeffs.append(term_coeffs)
+        if not variables:
+            return
+
+        # The variables of the terms are the same at every step
+        if self._objective_vars is None:
+            var_indices = np.fromiter(
+                (var.index for var in variables), dtype=np.intp, count=len(variables)
+            )
+            unique_indices, first, self._objective_positions = np.unique(
+                var_indices, return_index=True, return_inverse=True
+            )
+            self._objective_vars = [variables[i] for i in first]
+
+            fixed_coeffs = dict.fromkeys(unique_indices.tolist(), 0.0)
+            fixed_expr = self.total_fixed_objective_expr
+            for i in range(fixed_expr.size()):
+                var_index = fixed_expr.getVar(i).index
+                if var_index in fixed_coeffs:
+                    fixed_coeffs[var_index] += fixed_expr.getCoeff(i)
+            self._fixed_objective_coeffs = np.array(list(fixed_coeffs.values()))
+
+        obj_coeffs = self._fixed_objective_coeffs.copy()
+        np.add.at(obj_coeffs, self._objective_positions, np.concatenate(coeffs))
+        self.model.setAttr("Obj", self._objective_vars, obj_coeffs.tolist())
+
+    def _get_power_system_model(self) -> PowerSystemModel:
+        """Wrap the model and attach the solution layout and flow balance constraints."""
+        power_system_model = PowerSystemModel(self.model)
+        power_system_model.solution_layout = self.solution_layout
+        power_system_model.flow_balance_constrs = self.system_builder.c_flow_balance
+        power_system_model.reserve_constrs = self.system_builder.c_reserve_req
+        if self.system_builder.lazy_transmission:
+            power_system_model.add_violated_constrs = (
+                self.system_builder.add_violated_transmission_constrs
+            )
+        if self.prefix_commitment:
+            power_system_model.release_fixed_commitment = (
+                self.thermal_builder.release_status
+            )
+            power_system_model.fixed_commitment = self.fixed_commitment
+        if self.thermal_clusters is not None:
+            power_system_model.disaggregate_node_variables = functools.partial(
+                self.thermal_clusters.disaggregate_node_variables,
+                init_conds=self._unit_init_conds,
+                timesteps=self.thermal_builder.timesteps,
+            )
+        return power_system_model
+
+    def get_variables(self) -> dict[str, gp.tupledict]:
+        """Get the variables from all builders.
+
+        Returns:
+            dict[str, gp.tupledict]: A dictionary of variables keyed by their names.
+        """
+        variables = {}
+        variables.update(self.thermal_builder.get_variables())
+        variables.update(self.hydro_builder.get_variables())
+        variables.update(self.nondispatch_builder.get_variables())
+        variables.update(self.storage_builder.get_variables())
+        variables.update(self.system_builder.get_variables())
+        return variables
 
     def get_phydro(self) -> gp.tupledict:
         """Get the hydro power variable from the model."""
@@ -187,4 +433,4 @@ class ModelBuilder:
         """Update the daily hydro capacity in the model."""
         self.hydro_builder.update_daily_hydropower_capacity(step_k, new_capacity)
         self.model.update()
-        return PowerSystemModel(self.model)
+        return self._get_power_system_model()
@@ -0,0 +1,340 @@
+"""network_reduction.py: Kron reduction of buses without generation, demand, or storage.
+
+A pass-through bus only connects transmission lines. Its flow balance constraint says
+that the flows into the bus sum to zero, so its voltage angle is a linear function of
+the angles of its neighbors. Kron reduction eliminates these buses from the DC power
+flow equations. The lines around a group of connected pass-through buses are replaced
+by equivalent lines between the buses at the boundary of the group. An equivalent line
+between two buses that already share a line is merged with that line.
+
+The flows on the original lines are linear functions of the flows on the reduced lines.
+The coefficients are stored in a line map, which is used to report the results on the
+original topology.
+"""
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+# Equivalent susceptances below this fraction of the largest susceptance are dropped
+SUSCEPTANCE_TOLERANCE = 1e-9
+# Shares of the flow of an equivalent line below this value are dropped
+FACTOR_TOLERANCE = 1e-9
+
+LINE_MAP_COLUMNS = [
+    "source",
+    "sink",
+    "line_capacity",
+    "reduced_source",
+    "reduced_sink",
+    "factor",
+]
+
+
+def get_pass_through_nodes(
+    transmission_data: pd.DataFrame, terminal_nodes: set[str]
+) -> list[str]:
+    """Return the buses of the transmission lines that are not terminal nodes.
+
+    Args:
+        transmission_data (pd.DataFrame): Lines with source and sink columns.
+        terminal_nodes (set[str]): Buses with generation, demand, or storage.
+
+    Returns:
+        list[str]: The pass-through buses in the order they appear in the lines.
+    """
+    nodes = pd.unique(transmission_data[["source", "sink"]].to_numpy().ravel())
+    return [node for node in nodes if node not in terminal_nodes]
+
+
+def _get_incidence(
+    lines: list[tuple[str, str]], node_idx: dict[str, int]
+) -> np.ndarray:
+    """Incidence matrix of the lines with +1 at the source and -1 at the sink."""
+    incidence = np.zeros((len(lines), len(node_idx)))
+    for row, (source, sink) in enumerate(lines):
+        incidence[row, node_idx[source]] = 1
+        incidence[row, node_idx[sink]] = -1
+    return incidence
+
+
+def _reduce_group(
+    lines: list[tuple[str, str]],
+    susceptance: np.ndarray,
+    boundary_nodes: list[str],
+    group_nodes: list[str],
+) -> tuple[list[tuple[str, str]], np.ndarray, np.ndarray]:
+    """Kron-reduce a group of connected pass-through buses.
+
+    Args:
+        lines (list[tuple[str, str]]): The lines with at least one bus in the group.
+        susceptance (np.ndarray): The susceptance of each line.
+        boundary_nodes (list[str]): The terminal buses connected to the group.
+        group_nodes (list[str]): The pass-through buses of the group.
+
+    Returns:
+        tuple: The equivalent lines between pairs of boundary buses, their susceptances,
+            and the matrix that maps the flows on the equivalent lines to the flows on
+            the original lines.
+    """
+    num_boundary = len(boundary_nodes)
+    node_idx = {node: idx for idx, node in enumerate(boundary_nodes + group_nodes)}
+    incidence = _get_incidence(lines, node_idx)
+    weighted_incidence = susceptance[:, np.newaxis] * incidence
+    bus_susceptance = incidence.T @ weighted_incidence
+
+    # The angles of the group are a linear function of the boundary angles
+    group_angles = -np.linalg.solve(
+        bus_susceptance[num_boundary:, num_boundary:],
+        bus_susceptance[num_boundary:, :num_boundary],
+    )
+    reduced_susceptance = (
+        bus_susceptance[:num_boundary, :num_boundary]
+        + bus_susceptance[:num_boundary, num_boundary:] @ group_angles
+    )
+    # Flows on the original lines given the boundary angles
+    line_flows = weighted_incidence @ np.vstack([np.eye(num_boundary), group_angles])
+
+    tolerance = SUSCEPTANCE_TOLERANCE * susceptance.max()
+    equivalent_lines, equivalent_susceptance = [], []
+    for i in range(num_boundary):
+        for j in range(i + 1, num_boundary):
+            if -reduced_susceptance[i, j] > tolerance:
+                equivalent_lines.append((boundary_nodes[i], boundary_nodes[j]))
+                equivalent_susceptance.append(-reduced_susceptance[i, j])
+    equivalent_susceptance = np.array(equivalent_susceptance)
+    if not equivalent_lines:
+        return [], equivalent_susceptance, np.zeros((len(lines), 0))
+
+    # The flows on the equivalent lines given the boundary angles are
+    # equivalent_susceptance * equivalent_incidence. The line flow map solves
+    # line_flow_map @ equivalent_flows = line_flows. When the equivalent lines form
+    # cycles, the solution that minimizes the sum of equivalent_susceptance *
+    # line_flow_map**2 is used. For a bus between three lines, each original line
+    # then carries the flows of the two equivalent lines at its boundary bus.
+    equivalent_incidence = _get_incidence(
+        equivalent_lines, {node: idx for idx, node in enumerate(boundary_nodes)}
+    )
+    scale = np.sqrt(equivalent_susceptance)
+    line_flow_map = (
+        np.linalg.lstsq(
+            (scale[:, np.newaxis] * equivalent_incidence).T, line_flows.T, rcond=None
+        )[0].T
+        / scale
+    )
+    return equivalent_lines, equivalent_susceptance, line_flow_map
+
+
+def reduce_network(
+    transmission_data: pd.DataFrame, terminal_nodes: set[str]
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Eliminate the pass-through buses of a transmission network with Kron reduction.
+
+    The susceptance of an equivalent line is the susceptance of the reduced network
+    between its buses. Its capacity is the largest flow that does not exceed the
+    capacity of any original line that carries part of it. This is exact for lines in
+    series and in parallel. Otherwise, several equivalent lines can share an original
+    line, so the flows mapped back to the original lines should be checked.
+
+    Args:
+        transmission_data (pd.DataFrame): Lines with source, sink, source_kv, sink_kv,
+            line_capacity, and susceptance columns.
+        terminal_nodes (set[str]): Buses with generation, demand, or storage.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: The reduced transmission data with the
+            columns of transmission_data, and the line map with one row per original
+            line and equivalent line that carries part of its flow. An original line
+            without flow has a single row with a factor of zero.
+    """
+    transmission_data = transmission_data.reset_index(drop=True)
+    pass_through_nodes = get_pass_through_nodes(transmission_data, terminal_nodes)
+    is_pass_through = transmission_data["source"].isin(pass_through_nodes) | (
+        transmission_data["sink"].isin(pass_through_nodes)
+    )
+
+    # Node voltages are used for the equivalent lines
+    node_kv = dict(zip(transmission_data["sink"], transmission_data["sink_kv"]))
+    node_kv.update(zip(transmission_data["source"], transmission_data["source_kv"]))
+
+    # Parts of the reduced lines as ((bus, bus), susceptance). A part is either a
+    # line between terminal buses or an equivalent line of a group.
+    parts = []
+    # Flows on the original lines as (line index, part index, factor of the part flow)
+    line_parts = []
+    for idx, line in transmission_data.loc[~is_pass_through].iterrows():
+        line_parts.append((idx, len(parts), 1.0))
+        parts.append(((line["source"], line["sink"]), line["susceptance"]))
+
+    graph = nx.from_pandas_edgelist(
+        transmission_data.loc[is_pass_through], source="source", target="sink"
+    )
+    unmapped_lines = []
+    for group in nx.connected_components(graph.subgraph(pass_through_nodes)):
+        group_lines = transmission_data.loc[
+            transmission_data["source"].isin(group)
+            | transmission_data["sink"].isin(group)
+        ]
+        boundary_nodes = [
+            node
+            for node in pd.unique(group_lines[["source", "sink"]].to_numpy().ravel())
+            if node not in group
+        ]
+        # A group with at most one boundary bus carries no flow
+        if len(boundary_nodes) < 2:
+            unmapped_lines.extend(group_lines.index)
+            continue
+        equivalent_lines, equivalent_susceptance, line_flow_map = _reduce_group(
+            lines=list(zip(group_lines["source"], group_lines["sink"])),
+            susceptance=group_lines["susceptance"].to_numpy(dtype=float),
+            boundary_nodes=boundary_nodes,
+            group_nodes=[node for node in pass_through_nodes if node in group],
+        )
+        first_part = len(parts)
+        parts.extend(zip(equivalent_lines, equivalent_susceptance))
+        for row, idx in enumerate(group_lines.index):
+            cols = np.flatnonzero(np.abs(line_flow_map[row]) > FACTOR_TOLERANCE)
+            if len(cols) == 0:
+                unmapped_lines.append(idx)
+            line_parts.extend(
+                (idx, first_part + col, line_flow_map[row, col]) for col in cols
+            )
+
+    # Parts between the same buses are merged into one reduced line, which
+    # keeps the direction of a line between terminal buses
+    reduced_pairs = {}
+    for (source, sink), _ in parts:
+        if (source, sink) not in reduced_pairs:
+            reduced_pairs[source, sink] = reduced_pairs[sink, source] = (source, sink)
+    num_parts, total_susceptance = {}, {}
+    for pair, susceptance in parts:
+        reduced_pair = reduced_pairs[pair]
+        num_parts[reduced_pair] = num_parts.get(reduced_pair, 0) + 1
+        total_susceptance[reduced_pair] = (
+            total_susceptance.get(reduced_pair, 0) + susceptance
+        )
+
+    # The flow of a part is its share of the susceptance of the reduced line
+    line_map = []
+    for idx, part, factor in line_parts:
+        pair, susceptance = parts[part]
+        reduced_pair = reduced_pairs[pair]
+        sign = 1 if pair == reduced_pair else -1
+        line_map.append(
+            (
+                idx,
+                reduced_pair,
+                sign * factor * susceptance / total_susceptance[reduced_pair],
+            )
+        )
+    for idx in unmapped_lines:
+        line_map.append((idx, (None, None), 0.0))
+
+    line_map = pd.DataFrame(
+        [
+            (
+                transmission_data.at[idx, "source"],
+                transmission_data.at[idx, "sink"],
+                transmission_data.at[idx, "line_capacity"],
+                reduced_source,
+                reduced_sink,
+                factor,
+            )
+            for idx, (reduced_source, reduced_sink), factor in line_map
+        ],
+        columns=LINE_MAP_COLUMNS,
+    )
+
+    # A reduced line can carry flows up to the capacity of each original line
+    # divided by the share of the flow that the original line carries
+    shares = line_map.loc[line_map["factor"] != 0]
+    reduced_capacity = (
+        (shares["line_capacity"] / shares["factor"].abs())
+        .groupby([shares["reduced_source"], shares["reduced_sink"]], sort=False)
+        .min()
+    )
+
+    reduced_data = []
+    for (source, sink), capacity in reduced_capacity.items():
+        direct_line = transmission_data.loc[
+            (transmission_data["source"] == source)
+            & (transmission_data["sink"] == sink)
+        ]
+        # A line that is not merged with an equivalent line is unchanged
+        if num_parts[source, sink] == 1 and not direct_line.empty:
+            reduced_data.append(direct_line.iloc[0].to_dict())
+            continue
+        susceptance = total_susceptance[source, sink]
+        reduced_data.append(
+            {
+                "source": source,
+                "sink": sink,
+                "source_kv": node_kv[source],
+                "sink_kv": node_kv[sink],
+                "line_capacity": capacity,
+                "max_kv": max(node_kv[source], node_kv[sink]),
+                "reactance": node_kv[source] * node_kv[sink] / susceptance,
+                "susceptance": susceptance,
+            }
+        )
+    reduced_data = pd.DataFrame(reduced_data).reindex(columns=transmission_data.columns)
+    return reduced_data, line_map
+
+
+def map_flows_to_original_lines(
+    flow_variables: pd.DataFrame, line_map: pd.DataFrame
+) -> pd.DataFrame:
+    """Map the flows on the lines of a reduced network to the original lines.
+
+    Args:
+        flow_variables (pd.DataFrame): Flows with columns node_a, node_b, value,
+            type ('fwd' or 'bwd'), and hour.
+        line_map (pd.DataFrame): The line map from reduce_network.
+
+    Returns:
+        pd.DataFrame: Flows on the original lines with the same columns. The net flow
+            on a line is its 'fwd' value minus its 'bwd' value.
+    """
+    flows = flow_variables.assign(
+        value=flow_variables["value"].where(flow_variables["type"] == "fwd", 0)
+        - flow_variables["value"].where(flow_variables["type"] == "bwd", 0)
+    )
+    net_flows = flows.groupby(["node_a", "node_b", "hour"], as_index=False)[
+        "value"
+    ].sum()
+    hours = net_flows["hour"].unique()
+
+    mapped = line_map.merge(
+        net_flows,
+        how="left",
+        left_on=["reduced_source", "reduced_sink"],
+        right_on=["node_a", "node_b"],
+    )
+    mapped["value"] = mapped["value"].fillna(0) * mapped["factor"]
+    # Lines without flow are reported with zero flow at every hour
+    mapped = pd.concat(
+        [
+            mapped.dropna(subset=["hour"]),
+            line_map.loc[line_map["factor"] == 0, ["source", "sink"]]
+            .merge(pd.DataFrame({"hour": hours}), how="cross")
+            .assign(value=0.0),
+        ]
+    )
+    net_original = mapped.groupby(["source", "sink", "hour"], as_index=False)[
+        "value"
+    ].sum()
+
+    original_flows = []
+    for flow_type, sign in [("fwd", 1), ("bwd", -1)]:
+        original_flows.append(
+            pd.DataFrame(
+                {
+                    "node_a": net_original["source"],
+                    "node_b": net_original["sink"],
+                    "value": (sign * net_original["value"]).clip(lower=0),
+                    "type": flow_type,
+                    "hour": net_original["hour"].astype(int),
+                }
+            )
+        )
+    return pd.concat(original_flows, ignore_index=True)
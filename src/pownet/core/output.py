@@ -3,6 +3,7 @@
 import pandas as pd
 
 from ..input import SystemInput
+from .network_reduction import map_flows_to_original_lines
 from pownet.data_utils import get_dates, get_fuel_mix_order
 
 
@@ -396,6 +397,7 @@ class OutputProcessor:
         flow_variables: pd.DataFrame,
         line_locations: pd.DataFrame,
         rated_line_capacities: dict[tuple[str, str], int],
+        line_map: pd.DataFrame = None,
     ) -> pd.DataFrame:
         """Calculates the maximum utilization for each transmission line.
 
@@ -414,6 +416,9 @@ class OutputProcessor:
             rated_line_capacities (dict[tuple[str, str], int]): Dictionary mapping
                 line tuples (source_node, sink_node) to their rated
                 power capacity (e.g., in MW).
+            line_map (pd.DataFrame, optional): The line map of a reduced network
+                (SystemInput.line_map). If given, the flows are mapped to the original
+                lines and their rated capacities are taken from the line map.
 
         Returns:
             pd.DataFrame: A DataFrame indexed by ('source', 'sink') with columns
@@ -424,6 +429,15 @@ class OutputProcessor:
         # Prevent unintentional modification to the original dataframe
         flow_vars = flow_variables.copy()
 
+        # Report the flows of a reduced network on the original lines
+        if line_map is not None and not line_map.empty:
+            flow_vars = map_flows_to_original_lines(flow_vars, line_map)
+            rated_line_capacities = (
+                line_map.drop_duplicates(subset=["source", "sink"])
+                .set_index(["source", "sink"])["line_capacity"]
+                .to_dict()
+            )
+
         # Standardize column names and remove unnecessary columns
         flow_vars = flow_vars.rename(
             columns={"node_a": "source", "node_b": "sink"}
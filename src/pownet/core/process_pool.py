@@ -0,0 +1,66 @@
+"""process_pool.py: Process pool shared by the runners that solve in parallel, i.e.,
+EnsembleRunner and TimeParallelRunner.
+
+The data that all tasks need, e.g., the loaded input data, is passed once when the
+pool is created. With the 'fork' start method, the workers inherit it copy-on-write
+without pickling. The thread budget of the solver is divided among the workers so
+that they do not oversubscribe the CPU.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Data passed to create_process_pool, set in each worker process
+_WORKER_DATA = None
+
+
+def _init_worker(worker_data) -> None:
+    global _WORKER_DATA
+    _WORKER_DATA = worker_data
+
+
+def get_worker_data():
+    """Return the data passed to create_process_pool. Only set in a worker process."""
+    return _WORKER_DATA
+
+
+def get_threads_per_worker(total_threads: int, max_workers: int, num_tasks: int) -> int:
+    """Divide the thread budget among the workers that run at the same time.
+
+    Args:
+        total_threads (int): The number of solver threads shared by all workers.
+        max_workers (int): The maximum number of worker processes.
+        num_tasks (int): The number of tasks, which limits the number of workers.
+
+    Returns:
+        int: The number of solver threads of each worker, at least 1.
+    """
+    num_workers = max(1, min(max_workers, num_tasks))
+    return max(1, total_threads // num_workers)
+
+
+def create_process_pool(
+    max_workers: int, num_tasks: int, worker_data
+) -> ProcessPoolExecutor:
+    """Create a process pool whose workers can read worker_data with get_worker_data.
+
+    Args:
+        max_workers (int): The maximum number of worker processes.
+        num_tasks (int): The number of tasks, which limits the number of workers.
+        worker_data: The data that all tasks need.
+
+    Returns:
+        ProcessPoolExecutor: The process pool.
+    """
+    # Workers inherit the data without pickling when forked
+    if "fork" in multiprocessing.get_all_start_methods():
+        mp_context = multiprocessing.get_context("fork")
+    else:
+        mp_context = multiprocessing.get_context()
+
+    return ProcessPoolExecutor(
+        max_workers=min(max_workers, max(1, num_tasks)),
+        mp_context=mp_context,
+        initializer=_init_worker,
+        initargs=(worker_data,),
+    )
@@ -6,6 +6,8 @@ import json
 import pandas as pd
 
 from ..input import SystemInput
+from .record_store import ColumnarTable
+from .results_sink import ResultsSink, create_results_sink
 from pownet.data_utils import (
     parse_node_variables,
     parse_flow_variables,
@@ -28,27 +30,41 @@ class SystemRecord:
         system_input: SystemInput,
         batch_mode: bool = True,
         keep_record_each_step: bool = False,
+        output_format: str = "csv",
     ) -> None:
         """Initialize the SystemRecord object.
         Args:
             system_input (SystemInput): The input object containing the simulation parameters.
+            batch_mode (bool): Whether to keep the results of all steps in memory. Default is True.
+            keep_record_each_step (bool): Whether to write the results of each step to disk. Default is False.
+            output_format (str): Format of the results of each step, either 'csv' or 'parquet'. Default is 'csv'.
         """
 
         self.inputs: SystemInput = system_input
         self.batch_mode: bool = batch_mode
         self.keep_record_each_step: bool = keep_record_each_step
 
+        self.results_sink: ResultsSink = None
+        if keep_record_each_step:
+            self.results_sink = create_results_sink(
+                output_format=output_format,
+                output_folder=f"{self.inputs.model_id}_outputs",
+                model_id=self.inputs.model_id,  # Use model_name as the identifier
+            )
+
         if not batch_mode and not keep_record_each_step:
             print(
                 '\nWarning: No data will be stored because both "batch_mode" and "keep_record_each_step" are False.'
             )
 
+        # Results are stored in preallocated arrays with one row per step
+        num_steps = self.inputs.num_sim_days * 24 // self.inputs.step_hours
         # Format of variable name: var(node, t)
-        self.node_vars: pd.DataFrame = pd.DataFrame()
+        self.node_table = ColumnarTable(num_steps)
         # Format of variable name: flow(node_a, node_b, t)
-        self.flow_vars: pd.DataFrame = pd.DataFrame()
+        self.flow_table = ColumnarTable(num_steps)
         # Format of variable name: var(t)
-        self.syswide_vars: pd.DataFrame = pd.DataFrame()
+        self.syswide_table = ColumnarTable(num_steps)
 
         # Locational marginal prices (LMP)
         self.lmp_df: pd.DataFrame = pd.DataFrame()
@@ -56,6 +72,18 @@ class SystemRecord:
         self.objvals: list = []
         self.runtimes: list = []
 
+        # Runtimes of the steps solved with a MIP start from the previous step
+        self.warm_start_stats: list[dict] = []
+
+        # Bounds of the steps solved with the Lagrangian decomposition
+        self.duality_gaps: list[dict] = []
+
+        # Strategies of the steps solved with the portfolio
+        self.portfolio_stats: list[dict] = []
+
+        # Status variables fixed before solving each step
+        self.fixed_commitment: list[dict] = []
+
         # These are vpower, unit status, unit switching, etc.
         self.current_p: dict[str] = {}
         self.current_u: dict[str] = {}
@@ -69,7 +97,7 @@ class SystemRecord:
         self,
         runtime: float,
         objval: float,
-        solution: pd.DataFrame,
+        solution: pd.DataFrame | dict[str, pd.DataFrame],
         step_k: int,
         lmp: dict[str, float] = None,
     ) -> None:
@@ -78,7 +106,8 @@ class SystemRecord:
         Args:
             runtime (float): The runtime of the model.
             objval (float): The objective value of the model.
-            solution (pd.DataFrame): The solution dataframe from the model.
+            solution (pd.DataFrame | dict[str, pd.DataFrame]): The solution dataframe from
+                PowerSystemModel.get_solution or the tables from PowerSystemModel.get_structured_solution.
             step_k (int): The current simulation period.
             lmp (dict[str, float], optional): The locational marginal prices. Defaults to None.
 
@@ -90,25 +119,27 @@ class SystemRecord:
             """Extracts data for a specific 'vartype' from the DataFrame and converts it to a dictionary."""
             return (
                 df[
-                    (df["vartype"] == vartype) & (df["timestep"] == 24)
-                ]  # Only considers values of the last hour
+                    (df["vartype"] == vartype) & (df["timestep"] == step_hours)
+                ]  # Only considers values of the last hour before the next step
                 .drop("vartype", axis=1)
                 .set_index(["node"])  # Assume generator names do not repeat
                 .to_dict()["value"]
             )
 
+        step_hours = self.inputs.step_hours
         self.runtimes.append(runtime)
         self.objvals.append(objval)
 
-        # Create a col of variable types for filtering
-        pat_vartype = r"(\w+)\["
-        solution[["vartype"]] = solution["varname"].str.extract(
-            pat_vartype, expand=True
-        )
+        if isinstance(solution, dict):
+            node_vars, flow_vars, syswide_vars = self._get_hourly_tables(
+                solution, step_k
+            )
+        else:
+            node_vars, flow_vars, syswide_vars = self._parse_solution(solution, step_k)
+
+        # Only keep the hours before the next step as we are doing rolling horizon
+        node_vars = node_vars[node_vars["timestep"] <= step_hours]
 
-        node_vars = parse_node_variables(solution, self.inputs.sim_horizon, step_k)
-        # Only keep 24-hours as we are doing rolling horizon
-        node_vars = node_vars[node_vars["timestep"] <= 24]
         ##################
         # Initial conditions: vpower (p), commitment (u),
         # startup (v), shutdown (w), and storage's charge_state
@@ -122,13 +153,13 @@ class SystemRecord:
         # Need to calculate the minimum time on/off
         self.current_min_on = calc_remaining_on_duration(
             node_vars,
-            sim_horizon=24,
+            sim_horizon=step_hours,
             thermal_units=self.inputs.thermal_units,
             TU=self.inputs.TU,
         )
         self.current_min_off = calc_remaining_off_duration(
             node_vars,
-            sim_horizon=24,
+            sim_horizon=step_hours,
             thermal_units=self.inputs.thermal_units,
             TD=self.inputs.TD,
         )
@@ -136,60 +167,197 @@ class SystemRecord:
         ##################
         # Locational Marginal Prices (LMP)
         ##################
+        step_tables = {}
         if lmp is not None:
-            self.lmp_df = pd.concat(
-                [
-                    self.lmp_df,
-                    parse_lmp(lmp, self.inputs.sim_horizon, step_k).drop(
-                        "timestep", axis=1
-                    ),
-                ],
-                axis=0,
-            )
+            step_lmp = parse_lmp(
+                lmp, self.inputs.sim_horizon, step_k, step_hours=step_hours
+            ).drop("timestep", axis=1)
+            if self.batch_mode:
+                self.lmp_df = pd.concat([self.lmp_df, step_lmp], axis=0)
+            step_tables["lmp"] = step_lmp
 
         ##################
         # Append results to the existing dataframes in batch mode
         # otherwise, write to disk at each step_k if specified
         ##################
-        # Keep outputs from the first 24-hr under rolling horizon for day-ahead planning
-        node_vars = node_vars[node_vars["timestep"] <= 24]
-        node_vars = node_vars.drop(["varname", "timestep"], axis=1)
+        # Keep outputs before the next step under rolling horizon for day-ahead planning
+        node_vars = node_vars.drop(["varname", "timestep"], axis=1, errors="ignore")
 
-        flow_vars = parse_flow_variables(
-            solution=solution, sim_horizon=self.inputs.sim_horizon, step_k=step_k
-        )
-        flow_vars = flow_vars[flow_vars["timestep"] <= 24]
+        flow_vars = flow_vars[flow_vars["timestep"] <= step_hours]
         flow_vars = flow_vars.drop("timestep", axis=1)
 
-        syswide_vars = parse_syswide_variables(
-            solution=solution, sim_horizon=self.inputs.sim_horizon, step_k=step_k
-        )
-        syswide_vars = syswide_vars[syswide_vars["timestep"] <= 24]
+        syswide_vars = syswide_vars[syswide_vars["timestep"] <= step_hours]
         syswide_vars = syswide_vars.drop("timestep", axis=1)
 
         if self.batch_mode:
-            self.node_vars = pd.concat([self.node_vars, node_vars], axis=0)
-            self.flow_vars = pd.concat([self.flow_vars, flow_vars], axis=0)
-            self.syswide_vars = pd.concat([self.syswide_vars, syswide_vars], axis=0)
+            self.node_table.append(node_vars)
+            self.flow_table.append(flow_vars)
+            self.syswide_table.append(syswide_vars)
 
         if self.keep_record_each_step:
-            output_folder = f"{self.inputs.model_id}_outputs"
-            data_to_write = [
-                (node_vars, f"node_variables_{step_k}"),
-                (flow_vars, f"flow_variables_{step_k}"),
-                (syswide_vars, f"system_variables_{step_k}"),
-                (
-                    pd.DataFrame({"objval": [objval], "runtime": [runtime]}),
-                    f"model_stats_{step_k}",
-                ),
-            ]
-            for df, output_name in data_to_write:
-                write_df(
-                    df,
-                    output_folder=output_folder,
-                    output_name=output_name,
-                    model_id=self.inputs.model_id,  # Use model_name as the identifier
-                )
+            self.results_sink.write_step(
+                step_k,
+                {
+                    "node_variables": node_vars,
+                    "flow_variables": flow_vars,
+                    "system_variables": syswide_vars,
+                    "model_stats": pd.DataFrame(
+                        {"objval": [objval], "runtime": [runtime]}
+                    ),
+                    **step_tables,
+                },
+            )
+
+    def keep_warm_start(
+        self,
+        step_k: int,
+        num_start_vars: int,
+        runtime: float,
+        cold_runtime: float = None,
+    ) -> None:
+        """Keep the runtime of a step solved with a MIP start.
+
+        Args:
+            step_k (int): The current simulation period.
+            num_start_vars (int): The number of variables with a start value.
+            runtime (float): The runtime with the MIP start.
+            cold_runtime (float, optional): The runtime of the same step without
+                the MIP start. Defaults to None if it was not measured.
+
+        Returns:
+            None
+        """
+        if cold_runtime is None:
+            cold_runtime = float("nan")
+        self.warm_start_stats.append(
+            {
+                "step_k": step_k,
+                "num_start_vars": num_start_vars,
+                "runtime": runtime,
+                "cold_runtime": cold_runtime,
+                "time_saved": cold_runtime - runtime,
+            }
+        )
+
+    def keep_duality_gap(
+        self,
+        step_k: int,
+        objval: float,
+        lower_bound: float,
+        duality_gap: float,
+        iterations: int,
+    ) -> None:
+        """Keep the bounds of a step solved with the Lagrangian decomposition.
+
+        Args:
+            step_k (int): The current simulation period.
+            objval (float): The objective value of the solution.
+            lower_bound (float): The best value of the Lagrangian dual function.
+            duality_gap (float): The relative gap between objval and lower_bound.
+            iterations (int): The number of subgradient iterations.
+
+        Returns:
+            None
+        """
+        self.duality_gaps.append(
+            {
+                "step_k": step_k,
+                "objval": objval,
+                "lower_bound": lower_bound,
+                "duality_gap": duality_gap,
+                "iterations": iterations,
+            }
+        )
+
+    def keep_portfolio(
+        self, step_k: int, winner: str, results: dict[str, dict]
+    ) -> None:
+        """Keep the result of each strategy of a step solved with the portfolio.
+
+        Args:
+            step_k (int): The current simulation period.
+            winner (str): The strategy whose solution is kept.
+            results (dict[str, dict]): The objective value, runtime, and whether the
+                gap target is met for each strategy. See PortfolioSolver.results.
+
+        Returns:
+            None
+        """
+        for strategy, result in results.items():
+            self.portfolio_stats.append(
+                {
+                    "step_k": step_k,
+                    "strategy": strategy,
+                    "objval": result["objval"],
+                    "runtime": result["runtime"],
+                    "meets_gap": result["meets_gap"],
+                    "cancelled": result["cancelled"],
+                    "winner": strategy == winner,
+                }
+            )
+
+    def keep_fixed_commitment(
+        self, step_k: int, fixed_commitment: dict[str, int], released: bool
+    ) -> None:
+        """Keep the number of status variables fixed before solving a step.
+
+        Args:
+            step_k (int): The current simulation period.
+            fixed_commitment (dict[str, int]): The number of status variables fixed
+                by each test. See ThermalUnitBuilder.prefix_commitment.
+            released (bool): Whether the step was solved again without the fixed
+                status because it was infeasible.
+
+        Returns:
+            None
+        """
+        self.fixed_commitment.append(
+            {"step_k": step_k, **fixed_commitment, "released": released}
+        )
+
+    def close(self) -> None:
+        """Finalize the files of the results of each step. Must be called after the
+        last step when output_format is 'parquet'.
+        """
+        if self.results_sink is not None:
+            self.results_sink.close()
+
+    def _parse_solution(
+        self, solution: pd.DataFrame, step_k: int
+    ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Parse the node, flow, and system-wide variables from the variable names."""
+        # Create a col of variable types for filtering
+        pat_vartype = r"(\w+)\["
+        solution[["vartype"]] = solution["varname"].str.extract(
+            pat_vartype, expand=True
+        )
+        node_vars = parse_node_variables(
+            solution, self.inputs.sim_horizon, step_k, step_hours=self.inputs.step_hours
+        )
+        flow_vars = parse_flow_variables(
+            solution=solution,
+            sim_horizon=self.inputs.sim_horizon,
+            step_k=step_k,
+            step_hours=self.inputs.step_hours,
+        )
+        syswide_vars = parse_syswide_variables(
+            solution=solution,
+            sim_horizon=self.inputs.sim_horizon,
+            step_k=step_k,
+            step_hours=self.inputs.step_hours,
+        )
+        return node_vars, flow_vars, syswide_vars
+
+    def _get_hourly_tables(
+        self, solution: dict[str, pd.DataFrame], step_k: int
+    ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Add the simulation hour to the tables from PowerSystemModel.get_structured_solution."""
+        tables = []
+        for table_name in ["node", "flow", "syswide"]:
+            df = solution[table_name].copy()
+            df["hour"] = df["timestep"] + self.inputs.step_hours * (step_k - 1)
+            tables.append(df)
+        return tuple(tables)
 
     def get_init_conds(self) -> dict[str, dict]:
         """Return the initial conditions for the simulation."""
@@ -208,6 +376,18 @@ class SystemRecord:
         with open(f"{output_folder}/ilp_init_conds.json", "w") as f:
             json.dump(init_conds, f, indent=4)
 
+    @property
+    def node_vars(self) -> pd.DataFrame:
+        return self.node_table.to_dataframe()
+
+    @property
+    def flow_vars(self) -> pd.DataFrame:
+        return self.flow_table.to_dataframe()
+
+    @property
+    def syswide_vars(self) -> pd.DataFrame:
+        return self.syswide_table.to_dataframe()
+
     def get_node_variables(self) -> pd.DataFrame:
         """Return node-specific variables. These variables include
         dispatch, unit status, unit switching, etc.
@@ -241,6 +421,63 @@ class SystemRecord:
     def get_model_stats(self) -> pd.DataFrame:
         return pd.DataFrame({"objval": self.objvals, "runtime": self.runtimes})
 
+    def get_warm_start_stats(self) -> pd.DataFrame:
+        """Return the runtime of each warm-started step. The time saved is the
+        runtime without the MIP start minus the runtime with it, and is NaN
+        when the runtime without the MIP start was not measured.
+        """
+        return pd.DataFrame(
+            self.warm_start_stats,
+            columns=[
+                "step_k",
+                "num_start_vars",
+                "runtime",
+                "cold_runtime",
+                "time_saved",
+            ],
+        )
+
+    def get_duality_gaps(self) -> pd.DataFrame:
+        """Return the lower bound and duality gap of each step solved with the
+        Lagrangian decomposition.
+        """
+        return pd.DataFrame(
+            self.duality_gaps,
+            columns=["step_k", "objval", "lower_bound", "duality_gap", "iterations"],
+        )
+
+    def get_portfolio_stats(self) -> pd.DataFrame:
+        """Return the result of each strategy of the steps solved with the
+        portfolio. The runtime is the wall time until the strategy finished.
+        """
+        return pd.DataFrame(
+            self.portfolio_stats,
+            columns=[
+                "step_k",
+                "strategy",
+                "objval",
+                "runtime",
+                "meets_gap",
+                "cancelled",
+                "winner",
+            ],
+        )
+
+    def get_fixed_commitment(self) -> pd.DataFrame:
+        """Return the number of status variables fixed by each test before solving
+        each step and whether the step was solved again without them.
+        """
+        return pd.DataFrame(
+            self.fixed_commitment,
+            columns=[
+                "step_k",
+                "must_run",
+                "never_economic",
+                "reduced_cost",
+                "released",
+            ],
+        )
+
     def write_simulation_results(self, output_folder: str) -> None:
         """
         Write CSV files containing modeling results to the output directory.
@@ -280,6 +517,42 @@ class SystemRecord:
             model_id=self.inputs.model_id,
         )
 
+        # Runtimes of the warm-started steps if any
+        if self.warm_start_stats:
+            write_df(
+                self.get_warm_start_stats(),
+                output_folder=output_folder,
+                output_name="warm_start_stats",
+                model_id=self.inputs.model_id,
+            )
+
+        # Duality gaps of the Lagrangian decomposition if any
+        if self.duality_gaps:
+            write_df(
+                self.get_duality_gaps(),
+                output_folder=output_folder,
+                output_name="duality_gaps",
+                model_id=self.inputs.model_id,
+            )
+
+        # Strategies of the portfolio if any
+        if self.portfolio_stats:
+            write_df(
+                self.get_portfolio_stats(),
+                output_folder=output_folder,
+                output_name="portfolio_stats",
+                model_id=self.inputs.model_id,
+            )
+
+        # Status fixed before solving if any
+        if self.fixed_commitment:
+            write_df(
+                self.get_fixed_commitment(),
+                output_folder=output_folder,
+                output_name="fixed_commitment",
+                model_id=self.inputs.model_id,
+            )
+
         # LMP data if it exists
         if not self.lmp_df.empty:
             write_df(
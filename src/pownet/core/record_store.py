@@ -0,0 +1,146 @@
+"""record_store.py: Columnar storage of the simulation results.
+
+The variables of a PowNet model do not change between steps. The tables kept by
+SystemRecord at each step therefore have the same rows, only the values and hours differ.
+ColumnarTable stores the row labels once and writes the values and hours of each step
+into preallocated NumPy arrays. A DataFrame is only created when requested. The labels
+of each step are compared with those of the first step, and rows in a different order
+are put in the order of the first step.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnarTable:
+    """Table of results with a fixed set of rows at each step. The 'value' and 'hour'
+    columns change between steps while other columns (vartype, node, etc.) are labels
+    taken from the first step.
+    """
+
+    dynamic_columns = ("value", "hour")
+
+    def __init__(self, num_steps: int) -> None:
+        """Initialize the table. The arrays are allocated when the first step is appended.
+
+        Args:
+            num_steps (int): Expected number of steps. The table grows if more steps are appended.
+        """
+        self.capacity: int = max(num_steps, 1)
+        self.num_steps: int = 0
+
+        self.columns: list[str] = None
+        self.label_columns: dict[str, np.ndarray] = {}
+        # Arrays of shape (num_steps, rows per step)
+        self.values: np.ndarray = None
+        self.hours: np.ndarray = None
+        # Hours of the rows of the first step relative to its first hour
+        self._hour_offsets: np.ndarray = None
+
+    @property
+    def num_rows_per_step(self) -> int:
+        return 0 if self.values is None else self.values.shape[1]
+
+    def _allocate(self, df: pd.DataFrame) -> None:
+        """Allocate the arrays given the table of the first step."""
+        missing_columns = set(self.dynamic_columns) - set(df.columns)
+        if missing_columns:
+            raise ValueError(
+                f"PowNet: The table is missing the columns {sorted(missing_columns)}."
+            )
+        self.columns = list(df.columns)
+        self.label_columns = {
+            column: df[column].to_numpy(dtype=object)
+            for column in self.columns
+            if column not in self.dynamic_columns
+        }
+        self.values = np.empty((self.capacity, len(df)), dtype=float)
+        self.hours = np.empty((self.capacity, len(df)), dtype=np.int64)
+        self._hour_offsets = self._get_hour_offsets(df)
+
+    @staticmethod
+    def _get_hour_offsets(df: pd.DataFrame) -> np.ndarray:
+        """Return the hours of the rows relative to the first hour of the step."""
+        hours = df["hour"].to_numpy(dtype=np.int64)
+        return hours - hours.min() if len(hours) > 0 else hours
+
+    def _labels_match(self, df: pd.DataFrame) -> bool:
+        """Check whether the labels and relative hours of the rows are those of the
+        first step."""
+        return np.array_equal(self._get_hour_offsets(df), self._hour_offsets) and all(
+            np.array_equal(df[column].to_numpy(dtype=object), labels)
+            for column, labels in self.label_columns.items()
+        )
+
+    def _reorder(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Put the rows in the order of the first step. A row is identified by its
+        labels and its hour relative to the first hour of the step.
+
+        Raises:
+            ValueError: If the rows are not those of the first step.
+        """
+        label_names = list(self.label_columns)
+        first_keys = pd.MultiIndex.from_arrays(
+            [*self.label_columns.values(), self._hour_offsets]
+        )
+        keys = pd.MultiIndex.from_arrays(
+            [df[column].to_numpy(dtype=object) for column in label_names]
+            + [self._get_hour_offsets(df)]
+        )
+        positions = keys.get_indexer(first_keys) if keys.is_unique else None
+        if positions is None or (positions < 0).any():
+            raise ValueError(
+                "PowNet: The rows of the step do not match the rows of the first step."
+            )
+        return df.iloc[positions]
+
+    def _grow(self) -> None:
+        """Double the capacity when more steps are appended than expected."""
+        self.capacity *= 2
+        self.values = np.resize(self.values, (self.capacity, self.num_rows_per_step))
+        self.hours = np.resize(self.hours, (self.capacity, self.num_rows_per_step))
+
+    def append(self, df: pd.DataFrame) -> None:
+        """Write the values and hours of a step in place.
+
+        Args:
+            df (pd.DataFrame): Table of the current step with the same rows as the
+                table of the first step. Rows in a different order are reordered.
+
+        Raises:
+            ValueError: If the columns or the rows differ from the first step.
+        """
+        if self.columns is None:
+            self._allocate(df)
+        elif len(df) != self.num_rows_per_step:
+            raise ValueError(
+                f"PowNet: Expected {self.num_rows_per_step} rows per step but got {len(df)}."
+            )
+        elif list(df.columns) != self.columns:
+            raise ValueError(
+                f"PowNet: Expected the columns {self.columns} but got {list(df.columns)}."
+            )
+        elif not self._labels_match(df):
+            df = self._reorder(df)
+
+        if self.num_steps == self.capacity:
+            self._grow()
+
+        self.values[self.num_steps] = df["value"].to_numpy(dtype=float)
+        self.hours[self.num_steps] = df["hour"].to_numpy(dtype=np.int64)
+        self.num_steps += 1
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Return the rows of all steps stacked in the order they were appended."""
+        if self.columns is None:
+            return pd.DataFrame()
+
+        data = {}
+        for column in self.columns:
+            if column == "value":
+                data[column] = self.values[: self.num_steps].ravel()
+            elif column == "hour":
+                data[column] = self.hours[: self.num_steps].ravel()
+            else:
+                data[column] = np.tile(self.label_columns[column], self.num_steps)
+        return pd.DataFrame(data, columns=self.columns)
@@ -0,0 +1,130 @@
+"""results_sink.py: Sinks that write the simulation results of each step to disk.
+
+SystemRecord passes the node, flow, system-wide, and model statistics tables of
+each step to a sink when keep_record_each_step is True.
+
+- CSVResultsSink writes one CSV file per table and step.
+- ParquetResultsSink appends each step to one Parquet file per table, so the memory
+use is constant and the results of a long simulation are in a few files.
+"""
+
+from abc import ABC, abstractmethod
+import os
+
+import pandas as pd
+
+from pownet.data_utils import write_df
+
+
+class ResultsSink(ABC):
+    """Base class of the sinks for the results of each step."""
+
+    def __init__(self, output_folder: str, model_id: str) -> None:
+        """Initialize the sink.
+
+        Args:
+            output_folder (str): The directory where the output files will be saved.
+            model_id (str): The model ID used as the prefix of the output files.
+        """
+        self.output_folder: str = output_folder
+        self.model_id: str = model_id
+
+    @abstractmethod
+    def write_step(self, step_k: int, tables: dict[str, pd.DataFrame]) -> None:
+        """Write the tables of the current step.
+
+        Args:
+            step_k (int): The current simulation period.
+            tables (dict[str, pd.DataFrame]): Tables keyed by their output names.
+        """
+        pass
+
+    def close(self) -> None:
+        """Finalize the output files. Nothing to do by default."""
+        pass
+
+
+class CSVResultsSink(ResultsSink):
+    """Write each table of each step to its own CSV file, e.g. {model_id}_node_variables_1.csv"""
+
+    def write_step(self, step_k: int, tables: dict[str, pd.DataFrame]) -> None:
+        for output_name, df in tables.items():
+            write_df(
+                df,
+                output_folder=self.output_folder,
+                output_name=f"{output_name}_{step_k}",
+                model_id=self.model_id,
+            )
+
+
+class ParquetResultsSink(ResultsSink):
+    """Append each table to a Parquet file, e.g. {model_id}_node_variables.parquet,
+    with one row group per step. The schema is fixed by the first step. The files
+    are complete only after close() is called.
+    """
+
+    def __init__(self, output_folder: str, model_id: str) -> None:
+        super().__init__(output_folder, model_id)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                "PowNet: pyarrow is required to write results to Parquet. "
+                "Install it with 'pip install pyarrow'."
+            ) from e
+        self._pa = pa
+        self._pq = pq
+        self.writers: dict = {}
+
+    def write_step(self, step_k: int, tables: dict[str, pd.DataFrame]) -> None:
+        for output_name, df in tables.items():
+            if output_name not in self.writers:
+                if not os.path.exists(self.output_folder):
+                    os.makedirs(self.output_folder)
+                table = self._pa.Table.from_pandas(df, preserve_index=False)
+                self.writers[output_name] = self._pq.ParquetWriter(
+                    os.path.join(
+                        self.output_folder, f"{self.model_id}_{output_name}.parquet"
+                    ),
+                    table.schema,
+                )
+            else:
+                table = self._pa.Table.from_pandas(
+                    df,
+                    schema=self.writers[output_name].schema,
+                    preserve_index=False,
+                )
+            self.writers[output_name].write_table(table)
+
+    def close(self) -> None:
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+
+
+def create_results_sink(
+    output_format: str, output_folder: str, model_id: str
+) -> ResultsSink:
+    """Create a sink for the results of each step.
+
+    Args:
+        output_format (str): Either 'csv' or 'parquet'.
+        output_folder (str): The directory where the output files will be saved.
+        model_id (str): The model ID used as the prefix of the output files.
+
+    Returns:
+        ResultsSink: The sink for the given format.
+
+    Raises:
+        ValueError: If the output format is not supported.
+    """
+    sinks = {
+        "csv": CSVResultsSink,
+        "parquet": ParquetResultsSink,
+    }
+    if output_format not in sinks:
+        raise ValueError(
+            f"PowNet: output_format must be one of {list(sinks)}. Got {output_format}."
+        )
+    return sinks[output_format](output_folder=output_folder, model_id=model_id)
@@ -1,5 +1,7 @@
 """simulation.py: Main class to run the simulation of the power system model"""
 
+import logging
+
 import pandas as pd
 from pownet.data_utils import (
     create_init_condition,
@@ -7,10 +9,14 @@ from pownet.data_utils import (
 from .model_builder import ModelBuilder
 from .data_processor import DataProcessor
 from ..input import SystemInput
+from ..optim_model import PowerSystemModel
 from .output import OutputProcessor
 from .record import SystemRecord
+from .time_parallel import TimeParallelRunner
 from .visualizer import Visualizer
 
+logger = logging.getLogger(__name__)
+
 
 class Simulator:
     """Main class to run the simulation of the power system model"""
@@ -39,7 +45,7 @@ class Simulator:
             model_year (int): The year of the model.
             frequency (int): The frequency of the power system model.
             use_spin_var (bool): Whether to use spinning reserve.
-            dc_opf (str): The type of DC OPF to use.
+            dc_opf (str): The type of DC OPF to use. The "ptdf" formulation requires line_loss_factor=0.
             spin_reserve_factor (float): The spinning reserve factor.
             line_loss_factor (float): The line loss factor.
             line_capacity_factor (float): The line capacity factor.
@@ -70,6 +76,8 @@ class Simulator:
         self.inputs: SystemInput = None
         self.system_record: SystemRecord = None
         self.node_variables: pd.DataFrame = pd.DataFrame()
+        # Steps and repairs of each chunk when the steps are run in parallel chunks
+        self.time_parallel_report: pd.DataFrame = pd.DataFrame()
 
     def run(
         self,
@@ -83,6 +91,24 @@ class Simulator:
         timelimit: int = 600,
         num_threads: int = 0,
         find_lmp: bool = False,
+        warm_start: bool = False,
+        measure_warm_start: bool = False,
+        use_input_cache: bool = False,
+        integer_hours: int = None,
+        step_hours: int = 24,
+        block_hours: int = 1,
+        full_resolution_hours: int = 24,
+        num_chunks: int = 1,
+        overlap_steps: int = 2,
+        lazy_transmission: bool = False,
+        cluster_thermal_units: bool = False,
+        rounding_strategy: str = None,
+        portfolio: bool = False,
+        prefix_commitment: bool = False,
+        break_symmetry: bool = False,
+        batch_mode: bool = True,
+        keep_record_each_step: bool = False,
+        output_format: str = "csv",
     ) -> SystemRecord:
         """Run the simulation of the power system model
 
@@ -90,20 +116,144 @@ class Simulator:
             sim_horizon (int): The simulation horizon in hours.
             steps_to_run (int): The number of steps to run the simulation.
             to_process_inputs (bool): Whether to process the input data.
-            solver (str): The solver to use for optimization.
+            solver (str): The solver to use for optimization, either 'gurobi', 'highs',
+                or 'lagrangian'. The 'lagrangian' solver decomposes each step into
+                thermal unit subproblems and keeps the duality gap of each step in
+                SystemRecord.get_duality_gaps.
             log_to_console (bool): Whether to log the optimization output to the console.
             mipgap (float): The MIP gap for the optimization.
             timelimit (int): The time limit for the optimization in seconds.
             num_threads (int): The number of threads to use for optimization.
             find_lmp (bool): Whether to find the locational marginal prices.
+            warm_start (bool): Whether to start each step from the solution of the previous
+                step shifted by step_hours. Only the overlapping hours have start values,
+                so this requires sim_horizon > step_hours. Cannot be combined with
+                rounding_strategy, which starts from the LP relaxation.
+            measure_warm_start (bool): Whether to also solve each warm-started step without
+                the MIP start to report the time saved. This doubles the solves. Both
+                solves use the same method, e.g., the portfolio.
+            use_input_cache (bool): Whether to restore the input data from a snapshot of an
+                earlier run with unchanged inputs instead of parsing the CSV files.
+            integer_hours (int): Number of hours at the start of each step whose binary
+                variables, e.g., the unit commitment, stay binary. The binary variables in
+                the rest of the look-ahead are relaxed to continuous variables. It must be
+                at least step_hours, so the hours that are recorded stay a MIP. Default is
+                None, which keeps all binary variables.
+            step_hours (int): The number of hours between the starts of consecutive steps.
+                Only these hours of each step are recorded. Default is 24.
+            block_hours (int): The number of hours that are merged into one timestep
+                after the first full_resolution_hours of each step, e.g., for a weekly
+                look-ahead. Must divide 24. Default is 1, which keeps every hour.
+            full_resolution_hours (int): The number of hours at the start of each step
+                that keep one timestep per hour when block_hours > 1. Default is 24.
+            num_chunks (int): The number of chunks of steps that are solved in parallel
+                processes. Default is 1, which solves the steps one after another. The
+                num_threads solver threads are divided among the processes. See
+                pownet.core.time_parallel.
+            overlap_steps (int): The number of steps before each chunk that are solved
+                to estimate its initial conditions but are not recorded. Default is 2.
+            lazy_transmission (bool): Whether to add the flow limits of the lines and the
+                Kirchhoff constraints of the cycles only after a solution violates them.
+                See ModelBuilder. Default is False.
+            cluster_thermal_units (bool): Whether to model identical thermal units as
+                clusters with integer commitment. The results are still reported per
+                unit. See ModelBuilder. Default is False.
+            rounding_strategy (str): Solve each step with the iterative rounding
+                heuristic of the solver instead of as a MIP, either 'fast' or 'slow'.
+                See PowerSystemModel.optimize_with_rounding. Default is None, which
+                solves the MIP.
+            portfolio (bool): Whether to solve the MIP and both rounding strategies
+                of each step concurrently and keep the first solution that meets the
+                MIP gap. The winning strategy of each step is logged and kept in
+                SystemRecord.get_portfolio_stats. Cannot be combined with
+                rounding_strategy. See PowerSystemModel.optimize_portfolio. Default
+                is False.
+            prefix_commitment (bool): Whether to fix the status of the thermal units
+                that must run, are never economic, or are decided by the reduced costs
+                of the LP relaxation before each step is solved. The number of fixed
+                status variables of each step is logged and kept in
+                SystemRecord.get_fixed_commitment. A step that is infeasible with the
+                fixed status is solved again without it. Cannot be combined with
+                rounding_strategy or portfolio. See ModelBuilder. Default is False.
+            break_symmetry (bool): Whether to order the status of identical thermal
+                units to break their symmetry. It can make the steps slower to
+                solve. Cannot be combined with cluster_thermal_units. See
+                ModelBuilder. Default is False.
+            batch_mode (bool): Whether to keep the results of all steps in memory.
+                With batch_mode=False and keep_record_each_step=True, the results
+                are only written to disk, and the memory of a sequential run does
+                not grow with the number of steps when output_format='parquet'.
+                The get and plot methods then have no results. Default is True.
+            keep_record_each_step (bool): Whether to write the results of each step
+                to disk as the simulation runs. See SystemRecord. Default is False.
+            output_format (str): Format of the results of each step, either 'csv' or
+                'parquet'. Default is 'csv'.
 
         Returns:
             SystemRecord: The system record object containing the simulation results.
         """
 
-        if steps_to_run is None:
-            steps_to_run = num_sim_days - (sim_horizon // 24 - 1)
+        self.load_inputs(
+            sim_horizon=sim_horizon,
+            num_sim_days=num_sim_days,
+            to_process_inputs=to_process_inputs,
+            use_input_cache=use_input_cache,
+            step_hours=step_hours,
+            block_hours=block_hours,
+            full_resolution_hours=full_resolution_hours,
+        )
+        return self.simulate(
+            inputs=self.inputs,
+            steps_to_run=steps_to_run,
+            solver=solver,
+            log_to_console=log_to_console,
+            mipgap=mipgap,
+            timelimit=timelimit,
+            num_threads=num_threads,
+            find_lmp=find_lmp,
+            warm_start=warm_start,
+            measure_warm_start=measure_warm_start,
+            integer_hours=integer_hours,
+            num_chunks=num_chunks,
+            overlap_steps=overlap_steps,
+            lazy_transmission=lazy_transmission,
+            cluster_thermal_units=cluster_thermal_units,
+            rounding_strategy=rounding_strategy,
+            portfolio=portfolio,
+            prefix_commitment=prefix_commitment,
+            break_symmetry=break_symmetry,
+            batch_mode=batch_mode,
+            keep_record_each_step=keep_record_each_step,
+            output_format=output_format,
+        )
+
+    def load_inputs(
+        self,
+        sim_horizon: int,
+        num_sim_days: int = 365,
+        to_process_inputs: bool = True,
+        use_input_cache: bool = False,
+        step_hours: int = 24,
+        block_hours: int = 1,
+        full_resolution_hours: int = 24,
+    ) -> SystemInput:
+        """Process (optional), load, and check the input data of the model.
 
+        Args:
+            sim_horizon (int): The simulation horizon in hours.
+            num_sim_days (int): The number of days in the simulation.
+            to_process_inputs (bool): Whether to process the input data.
+            use_input_cache (bool): Whether to restore the input data from a snapshot.
+                See SystemInput.load_and_check_data.
+            step_hours (int): The number of hours between the starts of consecutive steps.
+            block_hours (int): The number of hours that are merged into one timestep
+                after the first full_resolution_hours of each step.
+            full_resolution_hours (int): The number of hours at the start of each step
+                that keep one timestep per hour when block_hours > 1.
+
+        Returns:
+            SystemInput: The loaded input data.
+        """
         # To create files with "pownet_" prefix
         if to_process_inputs:
             data_processor = DataProcessor(
@@ -129,32 +279,271 @@ class Simulator:
             load_shortfall_penalty_factor=self.load_shortfall_penalty_factor,
             load_curtail_penalty_factor=self.load_curtail_penalty_factor,
             spin_shortfall_penalty_factor=self.spin_shortfall_penalty_factor,
+            step_hours=step_hours,
+            block_hours=block_hours,
+            full_resolution_hours=full_resolution_hours,
         )
         # Produce an error if the data is not making sense
-        self.inputs.load_and_check_data()
+        self.inputs.load_and_check_data(use_cache=use_input_cache)
+        return self.inputs
+
+    def simulate(
+        self,
+        inputs: SystemInput,
+        steps_to_run: int = None,
+        solver: str = "gurobi",
+        log_to_console: bool = True,
+        mipgap: float = 1e-3,
+        timelimit: int = 600,
+        num_threads: int = 0,
+        find_lmp: bool = False,
+        warm_start: bool = False,
+        measure_warm_start: bool = False,
+        integer_hours: int = None,
+        num_chunks: int = 1,
+        overlap_steps: int = 2,
+        lazy_transmission: bool = False,
+        cluster_thermal_units: bool = False,
+        rounding_strategy: str = None,
+        portfolio: bool = False,
+        prefix_commitment: bool = False,
+        break_symmetry: bool = False,
+        batch_mode: bool = True,
+        keep_record_each_step: bool = False,
+        output_format: str = "csv",
+    ) -> SystemRecord:
+        """Run the rolling horizon simulation with input data that is already loaded.
+        See run for the description of the arguments.
+
+        Args:
+            inputs (SystemInput): The loaded input data.
+            steps_to_run (int): The number of steps to run the simulation. Default is
+                None, which runs all steps whose horizon ends within num_sim_days.
+
+        Returns:
+            SystemRecord: The system record object containing the simulation results.
+
+        Raises:
+            ValueError: If warm starts are combined with num_chunks > 1 or a
+                rounding strategy.
+            ValueError: If the portfolio is combined with a rounding strategy.
+            ValueError: If the commitment is fixed before solving with a rounding
+                strategy or the portfolio.
+            ValueError: If integer_hours is less than the step hours of the inputs.
+        """
+        self.inputs = inputs
+
+        if steps_to_run is None:
+            steps_to_run = (
+                self.inputs.num_sim_hours - self.inputs.sim_horizon
+            ) // self.inputs.step_hours + 1
+
+        # The recorded hours and the initial conditions of the next step must be
+        # integer
+        if integer_hours is not None and integer_hours < self.inputs.step_hours:
+            raise ValueError(
+                f"PowNet: integer_hours ({integer_hours}) must be at least the step "
+                f"hours ({self.inputs.step_hours})."
+            )
+
+        if portfolio and rounding_strategy is not None:
+            raise ValueError(
+                "PowNet: The portfolio already races the rounding strategies. "
+                "Do not set rounding_strategy."
+            )
+        # Rounding starts from the LP relaxation, so it cannot use a MIP start
+        if rounding_strategy is not None and (warm_start or measure_warm_start):
+            raise ValueError(
+                "PowNet: Warm starts cannot be combined with rounding_strategy."
+            )
+        # Only PowerSystemModel.optimize solves again without the fixed commitment
+        if prefix_commitment and (portfolio or rounding_strategy is not None):
+            raise ValueError(
+                "PowNet: prefix_commitment cannot be combined with rounding_strategy "
+                "or portfolio."
+            )
+
+        if num_chunks > 1:
+            if warm_start or measure_warm_start:
+                raise ValueError(
+                    "PowNet: Warm starts are not supported when the steps are run in chunks."
+                )
+            runner = TimeParallelRunner(
+                inputs=self.inputs,
+                num_chunks=num_chunks,
+                overlap_steps=overlap_steps,
+                total_threads=num_threads or None,
+            )
+            self.system_record = runner.run(
+                steps_to_run=steps_to_run,
+                solver=solver,
+                mipgap=mipgap,
+                timelimit=timelimit,
+                find_lmp=find_lmp,
+                integer_hours=integer_hours,
+                lazy_transmission=lazy_transmission,
+                cluster_thermal_units=cluster_thermal_units,
+                rounding_strategy=rounding_strategy,
+                portfolio=portfolio,
+                prefix_commitment=prefix_commitment,
+                break_symmetry=break_symmetry,
+                batch_mode=batch_mode,
+                keep_record_each_step=keep_record_each_step,
+                output_format=output_format,
+            )
+            self.time_parallel_report = runner.get_report()
+            return self.system_record
 
         ####################### Simulation
-        self.system_record = SystemRecord(self.inputs)
-        model_builder = ModelBuilder(self.inputs)
+        self.system_record = SystemRecord(
+            self.inputs,
+            batch_mode=batch_mode,
+            keep_record_each_step=keep_record_each_step,
+            output_format=output_format,
+        )
+        model_builder = ModelBuilder(
+            self.inputs,
+            integer_hours=integer_hours,
+            lazy_transmission=lazy_transmission,
+            cluster_thermal_units=cluster_thermal_units,
+            prefix_commitment=prefix_commitment,
+            break_symmetry=break_symmetry,
+        )
 
         # Initially, all thermal units are off. They have to be switched on from cold start
         init_conditions = create_init_condition(
             self.inputs.thermal_units, self.inputs.storage_units
         )
 
-        for step_k in range(1, steps_to_run + 1):
-            # Build or update the model
-            if step_k == 1:
-                power_system_model = model_builder.build(
-                    step_k=step_k,
-                    init_conds=init_conditions,
-                )
-            else:
-                power_system_model = model_builder.update(
+        # Values of all variables from the previous step for warm starting
+        previous_values = None
+        # Aggregated timesteps do not line up after the shift, so only the hourly
+        # timesteps of both steps get a start
+        max_start_timestep = None
+        if not model_builder.thermal_builder.timesteps.is_hourly:
+            max_start_timestep = (
+                self.inputs.full_resolution_hours - self.inputs.step_hours
+            )
+
+        # The files of the results of each step are finalized even if a step fails
+        try:
+            for step_k in range(1, steps_to_run + 1):
+                # Build or update the model
+                if step_k == 1:
+                    power_system_model = model_builder.build(
+                        step_k=step_k,
+                        init_conds=init_conditions,
+                    )
+                else:
+                    power_system_model = model_builder.update(
+                        step_k=step_k,
+                        init_conds=init_conditions,
+                    )
+                # The next step starts step_hours after the current step
+                start_cols, start_values = [], []
+                if previous_values is not None:
+                    start_cols, start_values = (
+                        power_system_model.solution_layout.get_shifted_start(
+                            previous_values,
+                            shift=self.inputs.step_hours,
+                            max_timestep=max_start_timestep,
+                        )
+                    )
+
+                # Optimization. The step without the MIP start is solved with the
+                # same method, so the time saved only comes from the start.
+                solve_params = {
+                    "solver": solver,
+                    "log_to_console": log_to_console,
+                    "mipgap": mipgap,
+                    "timelimit": timelimit,
+                    "num_threads": num_threads,
+                    "rounding_strategy": rounding_strategy,
+                    "portfolio": portfolio,
+                }
+                cold_runtime = None
+                if len(start_cols) > 0 and measure_warm_start:
+                    self._solve_step(power_system_model, **solve_params)
+                    cold_runtime = power_system_model.get_runtime()
+                    power_system_model.discard_solution()
+
+                if len(start_cols) > 0:
+                    power_system_model.set_mip_start(start_cols, start_values)
+
+                self._solve_step(power_system_model, **solve_params)
+                if portfolio:
+                    logger.info(
+                        f"PowNet: The '{power_system_model.portfolio_winner}' strategy "
+                        f"won step {step_k}."
+                    )
+                    self.system_record.keep_portfolio(
+                        step_k=step_k,
+                        winner=power_system_model.portfolio_winner,
+                        results=power_system_model.portfolio_results,
+                    )
+
+                if len(start_cols) > 0:
+                    self.system_record.keep_warm_start(
+                        step_k=step_k,
+                        num_start_vars=len(start_cols),
+                        runtime=power_system_model.get_runtime(),
+                        cold_runtime=cold_runtime,
+                    )
+                if solver == "lagrangian":
+                    self.system_record.keep_duality_gap(
+                        step_k=step_k,
+                        objval=power_system_model.get_objval(),
+                        lower_bound=power_system_model.lagrangian_bound,
+                        duality_gap=power_system_model.duality_gap,
+                        iterations=power_system_model.lagrangian_iterations,
+                    )
+                if prefix_commitment:
+                    logger.info(
+                        f"PowNet: Fixed {sum(power_system_model.fixed_commitment.values())} "
+                        f"status variables before solving step {step_k}."
+                    )
+                    self.system_record.keep_fixed_commitment(
+                        step_k=step_k,
+                        fixed_commitment=power_system_model.fixed_commitment,
+                        released=power_system_model.commitment_released,
+                    )
+                if warm_start:
+                    previous_values = power_system_model.get_values()
+
+                self.system_record.keep(
+                    runtime=power_system_model.get_runtime(),
+                    objval=power_system_model.get_objval(),
+                    solution=power_system_model.get_structured_solution(),
                     step_k=step_k,
-                    init_conds=init_conditions,
+                    lmp=power_system_model.solve_for_lmp() if find_lmp else None,
                 )
-            # Optimization
+                # Update the initial conditions for the next step
+                init_conditions = self.system_record.get_init_conds()
+        finally:
+            self.system_record.close()
+
+        return self.system_record
+
+    @staticmethod
+    def _solve_step(
+        power_system_model: PowerSystemModel,
+        solver: str,
+        log_to_console: bool,
+        mipgap: float,
+        timelimit: int,
+        num_threads: int,
+        rounding_strategy: str,
+        portfolio: bool,
+    ) -> None:
+        """Solve a step with the portfolio, the rounding heuristic, or as a MIP."""
+        if portfolio:
+            power_system_model.optimize_portfolio(
+                solver=solver,
+                mipgap=mipgap,
+                timelimit=timelimit,
+                num_threads=num_threads,
+            )
+        elif rounding_strategy is None:
             power_system_model.optimize(
                 solver=solver,
                 log_to_console=log_to_console,
@@ -162,15 +551,15 @@ class Simulator:
                 timelimit=timelimit,
                 num_threads=num_threads,
             )
-            self.system_record.keep(
-                runtime=power_system_model.get_runtime(),
-                objval=power_system_model.get_objval(),
-                solution=power_system_model.get_solution(),
-                step_k=step_k,
-                lmp=power_system_model.solve_for_lmp() if find_lmp else None,
+        else:
+            power_system_model.optimize_with_rounding(
+                rounding_strategy=rounding_strategy,
+                solver=solver,
+                log_to_console=log_to_console,
+                mipgap=mipgap,
+                timelimit=timelimit,
+                num_threads=num_threads,
             )
-            # Update the initial conditions for the next step
-            init_conditions = self.system_record.get_init_conds()
 
     def get_node_variables(self) -> pd.DataFrame:
         """Return the node-specific variables."""
@@ -0,0 +1,318 @@
+"""thermal_clusters.py: Clusters of identical thermal units with integer commitment.
+
+Thermal units with the same node, fuel, costs, capacities, ramp rates, minimum up
+and down times, and derated capacity are interchangeable in the model. A cluster
+replaces them with a single unit whose status, startup, and shutdown variables are
+integers that count the online, starting, and stopping units. The dispatch
+variables of the cluster are the totals of its units. The constraints of a unit
+hold for the cluster because their coefficients are multiplied by these counts,
+except for the minimum downtime, whose right-hand side becomes the number of units.
+
+After a solve, the commitment of a cluster is assigned to its units. A unit that
+has been online (offline) the longest is shut down (started up) first, and the
+dispatch is split equally among the online units. The results are reported for
+each unit, so SystemRecord does not know about the clusters.
+
+Must-take units and units with an attached energy storage system are not clustered.
+"""
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+from ..data_model import Timesteps
+from ..input import SystemInput
+
+# Values of the units that must match for them to be in the same cluster
+CLUSTER_ATTRS = (
+    "thermal_unit_node",
+    "fuelmap",
+    "fuel_contracts",
+    "thermal_fixed_cost",
+    "thermal_opex",
+    "thermal_startup_cost",
+    "thermal_heat_rate",
+    "thermal_rated_capacity",
+    "thermal_min_capacity",
+    "TD",
+    "TU",
+    "SD",
+    "SU",
+    "RD",
+    "RU",
+)
+
+# Commitment variables, which are counts of units in a cluster
+COMMITMENT_VARTYPES = ("status", "startup", "shutdown")
+# Dispatch variables, which are split equally among the online units of a cluster
+DISPATCH_VARTYPES = ("pthermal", "vpower", "vpowerbar", "spin")
+
+# Commitment values within this tolerance of an integer are treated as integers
+INTEGRALITY_TOLERANCE = 1e-4
+
+
+class ThermalClusters:
+    """Groups identical thermal units into clusters and maps the results of a model
+    with clusters back to the units.
+
+    Attributes:
+        clusters (dict[str, list[str]]): The units of each cluster with at least two
+            units. A cluster is named after its first unit.
+        unit_count (dict[str, int]): The number of units in each cluster.
+    """
+
+    def __init__(self, inputs: SystemInput) -> None:
+        self.inputs = inputs
+        excluded_units = set(inputs.thermal_must_take_units).union(
+            inputs.ess_thermal_units
+        )
+
+        groups: dict[tuple, list[str]] = {}
+        for unit in inputs.thermal_units:
+            if unit in excluded_units:
+                groups[(unit,)] = [unit]
+                continue
+            groups.setdefault(self._get_unit_key(unit), []).append(unit)
+
+        self.clusters: dict[str, list[str]] = {
+            units[0]: units for units in groups.values() if len(units) > 1
+        }
+        self.unit_count: dict[str, int] = {
+            cluster: len(units) for cluster, units in self.clusters.items()
+        }
+
+    def _get_unit_key(self, unit: str) -> tuple:
+        """Return the values that identify the units of the same cluster."""
+        key = tuple(getattr(self.inputs, attr).get(unit) for attr in CLUSTER_ATTRS)
+        derated_capacity = self.inputs.thermal_derated_capacity[unit].to_numpy()
+        return key + (derated_capacity.tobytes(),)
+
+    def get_clustered_inputs(self) -> SystemInput:
+        """Return a shallow copy of the inputs where each cluster is a single unit.
+        The parameters of a cluster are those of one of its units.
+
+        Returns:
+            SystemInput: The inputs with the clusters instead of their units.
+        """
+        clustered_units = {
+            unit for units in self.clusters.values() for unit in units[1:]
+        }
+        inputs = copy.copy(self.inputs)
+        for attr in CLUSTER_ATTRS:
+            setattr(
+                inputs,
+                attr,
+                {
+                    unit: value
+                    for unit, value in getattr(self.inputs, attr).items()
+                    if unit not in clustered_units
+                },
+            )
+        inputs.thermal_units = [
+            unit for unit in self.inputs.thermal_units if unit not in clustered_units
+        ]
+        inputs.thermal_derated_capacity = self.inputs.thermal_derated_capacity.drop(
+            columns=list(clustered_units)
+        )
+        inputs.node_generator = {
+            node: [unit for unit in units if unit not in clustered_units]
+            for node, units in self.inputs.node_generator.items()
+        }
+        inputs.all_generators = set(self.inputs.all_generators) - clustered_units
+        # The cached arrays of the thermal units are created again for the clusters
+        inputs._timeseries_arrays = dict(self.inputs._timeseries_arrays)
+        return inputs
+
+    def aggregate_init_conds(self, init_conds: dict[str, dict]) -> dict[str, dict]:
+        """Return the initial conditions of the clusters from those of the units.
+
+        The status, startup, shutdown, and power above the minimum capacity of a
+        cluster are the sums over its units. The remaining minimum up and down times
+        cannot be summed, so they are zero for the clusters. Instead, those of the
+        units are kept under 'cluster_min_on' and 'cluster_min_off'. ThermalUnitBuilder
+        uses them to bound the number of online units.
+
+        Args:
+            init_conds (dict[str, dict]): The initial conditions of the units.
+
+        Returns:
+            dict[str, dict]: The initial conditions of the clusters.
+        """
+        clustered_init_conds = {
+            name: values.copy() for name, values in init_conds.items()
+        }
+        for cluster, units in self.clusters.items():
+            for name in ["initial_p", "initial_u", "initial_v", "initial_w"]:
+                values = clustered_init_conds[name]
+                values[cluster] = sum(init_conds[name][unit] for unit in units)
+                for unit in units[1:]:
+                    values.pop(unit, None)
+            for name in ["initial_min_on", "initial_min_off"]:
+                values = clustered_init_conds[name]
+                values[cluster] = 0
+                for unit in units[1:]:
+                    values.pop(unit, None)
+
+        clustered_init_conds["cluster_min_on"] = {
+            cluster: [init_conds["initial_min_on"][unit] for unit in units]
+            for cluster, units in self.clusters.items()
+        }
+        clustered_init_conds["cluster_min_off"] = {
+            cluster: [init_conds["initial_min_off"][unit] for unit in units]
+            for cluster, units in self.clusters.items()
+        }
+        return clustered_init_conds
+
+    def _assign_commitment(
+        self,
+        units: list[str],
+        commitment: dict[str, np.ndarray],
+        init_conds: dict[str, dict],
+        timesteps: Timesteps,
+    ) -> np.ndarray:
+        """Assign the number of online units of a cluster to its units.
+
+        Args:
+            units (list[str]): The units of the cluster.
+            commitment (dict[str, np.ndarray]): The status, startup, and shutdown of
+                the cluster at each timestep.
+            init_conds (dict[str, dict]): The initial conditions of the units.
+            timesteps (Timesteps): The timesteps of the model.
+
+        Returns:
+            np.ndarray: The status of each unit (rows) at each timestep (columns).
+                The status is fractional at the timesteps where the cluster status
+                is not an integer, e.g., in a relaxed look-ahead.
+        """
+        num_units = len(units)
+        min_up = self.inputs.TU[units[0]]
+        min_down = self.inputs.TD[units[0]]
+        is_on = np.array([init_conds["initial_u"][unit] > 0.5 for unit in units])
+        remaining_on = np.array(
+            [init_conds["initial_min_on"][unit] for unit in units], dtype=float
+        )
+        remaining_off = np.array(
+            [init_conds["initial_min_off"][unit] for unit in units], dtype=float
+        )
+        # Hours since the last startup or shutdown, estimated from the remaining time
+        hours_in_state = np.where(
+            is_on, min_up - remaining_on, min_down - remaining_off
+        )
+
+        status = np.zeros((num_units, len(timesteps)))
+        for idx, t in enumerate(timesteps):
+            values = np.array(
+                [commitment[vartype][idx] for vartype in COMMITMENT_VARTYPES]
+            )
+            if not np.allclose(values, np.round(values), atol=INTEGRALITY_TOLERANCE):
+                # The remaining timesteps are relaxed, so each unit gets an equal share
+                status[:, idx:] = commitment["status"][idx:] / num_units
+                break
+            num_on, num_startups, num_shutdowns = np.round(values).astype(int)
+
+            # Units that can change their state and have been in it longest come first
+            online_order = np.lexsort((-hours_in_state, remaining_on > 0))
+            stopping = [i for i in online_order if is_on[i]][:num_shutdowns]
+            offline_order = np.lexsort((-hours_in_state, remaining_off > 0))
+            starting = [i for i in offline_order if not is_on[i]][:num_startups]
+            is_on[stopping] = False
+            is_on[starting] = True
+
+            # Match the number of online units if the transitions do not add up
+            surplus = int(is_on.sum()) - num_on
+            if surplus > 0:
+                stopping += [i for i in online_order if is_on[i] and i not in starting][
+                    :surplus
+                ]
+                is_on[stopping] = False
+            elif surplus < 0:
+                starting += [
+                    i for i in offline_order if not is_on[i] and i not in stopping
+                ][:-surplus]
+                is_on[starting] = True
+
+            remaining_on[starting] = min_up
+            remaining_off[stopping] = min_down
+            hours_in_state[starting + stopping] = 0
+
+            duration = timesteps.get_duration(t)
+            remaining_on = np.maximum(remaining_on - duration, 0)
+            remaining_off = np.maximum(remaining_off - duration, 0)
+            hours_in_state += duration
+            status[:, idx] = is_on
+        return status
+
+    def disaggregate_node_variables(
+        self,
+        node_variables: pd.DataFrame,
+        init_conds: dict[str, dict],
+        timesteps: Timesteps,
+    ) -> pd.DataFrame:
+        """Replace the thermal variables of the clusters with those of their units.
+
+        Args:
+            node_variables (pd.DataFrame): Node variables of the model with columns
+                (value, vartype, node, timestep), e.g., from SolutionLayout.
+            init_conds (dict[str, dict]): The initial conditions of the units at the
+                start of the step.
+            timesteps (Timesteps): The timesteps of the model.
+
+        Returns:
+            pd.DataFrame: The node variables with one row per unit instead of cluster.
+        """
+        is_cluster_var = node_variables["node"].isin(self.clusters) & node_variables[
+            "vartype"
+        ].isin(COMMITMENT_VARTYPES + DISPATCH_VARTYPES)
+        if not is_cluster_var.any():
+            return node_variables
+
+        cluster_values = node_variables.loc[is_cluster_var].pivot_table(
+            index="timestep", columns=["node", "vartype"], values="value"
+        )
+        cluster_values = cluster_values.reindex(list(timesteps))
+
+        unit_tables = [node_variables.loc[~is_cluster_var]]
+        for cluster, units in self.clusters.items():
+            values = cluster_values[cluster]
+            status = self._assign_commitment(
+                units,
+                {
+                    vartype: values[vartype].to_numpy()
+                    for vartype in COMMITMENT_VARTYPES
+                },
+                init_conds,
+                timesteps,
+            )
+            initial_status = np.array(
+                [[init_conds["initial_u"][unit]] for unit in units], dtype=float
+            )
+            previous_status = np.hstack([initial_status, status[:, :-1]])
+            unit_values = {
+                "status": status,
+                "startup": np.maximum(status - previous_status, 0),
+                "shutdown": np.maximum(previous_status - status, 0),
+            }
+            # Dispatch is split in proportion to the status of the units
+            num_on = status.sum(axis=0)
+            share = np.divide(
+                status, num_on, out=np.zeros_like(status), where=num_on > 0
+            )
+            for vartype in DISPATCH_VARTYPES:
+                if vartype in values:
+                    unit_values[vartype] = share * values[vartype].to_numpy()
+
+            for vartype, array in unit_values.items():
+                unit_tables.append(
+                    pd.DataFrame(
+                        {
+                            "value": array.ravel(),
+                            "vartype": vartype,
+                            "node": np.repeat(units, len(timesteps)),
+                            "timestep": np.tile(
+                                np.arange(1, len(timesteps) + 1), len(units)
+                            ),
+                        }
+                    )
+                )
+        return pd.concat(unit_tables, ignore_index=True)
@@ -0,0 +1,449 @@
+"""time_parallel.py: Run the steps of a rolling horizon simulation in parallel chunks.
+
+Each step of a rolling horizon simulation starts from the initial conditions at the
+end of the previous step, so the steps are usually solved one after another. Here the
+steps are split into chunks that are solved at the same time over a process pool.
+Except for the first chunk, the initial conditions at the start of a chunk are not
+known. A chunk therefore starts a few warm-up steps earlier with all thermal units off.
+The warm-up steps are solved but not recorded, so the commitment has time to settle.
+
+The chunk boundaries are then repaired one after another. If the initial conditions
+after the warm-up, or the all-off state without warm-up steps, differ from those at the
+end of the previous chunk, the steps of the chunk are solved again from the correct
+initial conditions. This stops at the first
+step whose initial conditions for the next step match the parallel run, because the
+remaining steps of the chunk then start from the same state. Without a match, the
+whole chunk is solved again. The recorded results are then the same as a sequential
+run up to differences between alternative optimal solutions.
+"""
+
+import dataclasses
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from pownet.data_utils import create_init_condition
+from ..input import SystemInput
+from .model_builder import ModelBuilder
+from .process_pool import create_process_pool, get_threads_per_worker, get_worker_data
+from .record import SystemRecord
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class TimeChunk:
+    """
+    Data class to hold the steps of a chunk.
+
+    Attributes:
+        index (int): The position of the chunk starting at 0.
+        first_step (int): The first step that is recorded.
+        last_step (int): The last step that is recorded.
+        warmup_steps (int): The number of steps before first_step that are solved
+            but not recorded.
+    """
+
+    index: int
+    first_step: int
+    last_step: int
+    warmup_steps: int
+
+    @property
+    def start_step(self) -> int:
+        """The first step that is solved."""
+        return self.first_step - self.warmup_steps
+
+
+def split_into_chunks(
+    steps_to_run: int, num_chunks: int, overlap_steps: int
+) -> list[TimeChunk]:
+    """Split the steps into chunks of almost equal length. Each chunk except the first
+    starts overlap_steps earlier, or at the first step if it is closer.
+
+    Args:
+        steps_to_run (int): The number of steps of the simulation.
+        num_chunks (int): The number of chunks. Reduced to steps_to_run if it is larger.
+        overlap_steps (int): The number of warm-up steps of each chunk.
+
+    Returns:
+        list[TimeChunk]: The chunks in the order of the steps.
+
+    Raises:
+        ValueError: If a parameter is not a positive integer or overlap_steps is negative.
+    """
+    if steps_to_run < 1 or num_chunks < 1:
+        raise ValueError("PowNet: steps_to_run and num_chunks must be positive.")
+    if overlap_steps < 0:
+        raise ValueError("PowNet: overlap_steps must be a non-negative integer.")
+
+    num_chunks = min(num_chunks, steps_to_run)
+    # The first steps_to_run % num_chunks chunks have one more step
+    chunk_sizes = np.full(num_chunks, steps_to_run // num_chunks)
+    chunk_sizes[: steps_to_run % num_chunks] += 1
+    last_steps = np.cumsum(chunk_sizes)
+
+    chunks = []
+    for index, (size, last_step) in enumerate(zip(chunk_sizes, last_steps)):
+        first_step = int(last_step - size + 1)
+        chunks.append(
+            TimeChunk(
+                index=index,
+                first_step=first_step,
+                last_step=int(last_step),
+                warmup_steps=min(overlap_steps, first_step - 1),
+            )
+        )
+    return chunks
+
+
+def init_conds_match(
+    init_conds: dict[str, dict], other: dict[str, dict], atol: float = 1e-4
+) -> bool:
+    """Check whether two sets of initial conditions from SystemRecord.get_init_conds
+    are the same within a tolerance.
+
+    Args:
+        init_conds (dict[str, dict]): The initial conditions.
+        other (dict[str, dict]): The initial conditions to compare with.
+        atol (float): The absolute tolerance of the values, e.g., of the dispatch.
+
+    Returns:
+        bool: Whether the initial conditions match.
+    """
+    if init_conds.keys() != other.keys():
+        return False
+    for name, values in init_conds.items():
+        other_values = other[name]
+        if values.keys() != other_values.keys():
+            return False
+        units = list(values)
+        if not np.allclose(
+            [values[unit] for unit in units],
+            [other_values[unit] for unit in units],
+            rtol=0,
+            atol=atol,
+        ):
+            return False
+    return True
+
+
+def _solve_steps(
+    inputs: SystemInput,
+    start_step: int,
+    last_step: int,
+    init_conds: dict[str, dict],
+    solve_params: dict,
+    reference_init_conds: dict[int, dict] = None,
+    atol: float = 1e-4,
+) -> dict[int, dict]:
+    """Solve the steps from start_step to last_step one after another.
+
+    Args:
+        inputs (SystemInput): The input data.
+        start_step (int): The first step to solve.
+        last_step (int): The last step to solve.
+        init_conds (dict[str, dict]): The initial conditions of start_step.
+        solve_params (dict): The parameters of the solver and the model builder.
+        reference_init_conds (dict[int, dict]): The initial conditions after each step
+            of an earlier run. The steps stop after the first step that gives the same
+            initial conditions. Defaults to None, which solves all steps.
+        atol (float): The absolute tolerance when comparing initial conditions.
+
+    Returns:
+        dict[int, dict]: The runtime, objective value, solution tables, LMP, and
+            initial conditions for the next step keyed by the step.
+    """
+    model_builder = ModelBuilder(
+        inputs,
+        integer_hours=solve_params["integer_hours"],
+        lazy_transmission=solve_params["lazy_transmission"],
+        cluster_thermal_units=solve_params["cluster_thermal_units"],
+        prefix_commitment=solve_params["prefix_commitment"],
+        break_symmetry=solve_params["break_symmetry"],
+    )
+    # Only used for the initial conditions, so nothing is written to disk
+    system_record = SystemRecord(inputs)
+
+    step_results = {}
+    for step_k in range(start_step, last_step + 1):
+        if step_k == start_step:
+            power_system_model = model_builder.build(step_k, init_conds)
+        else:
+            power_system_model = model_builder.update(step_k, init_conds)
+        if solve_params["portfolio"]:
+            power_system_model.optimize_portfolio(
+                solver=solve_params["solver"],
+                mipgap=solve_params["mipgap"],
+                timelimit=solve_params["timelimit"],
+                num_threads=solve_params["num_threads"],
+            )
+            logger.info(
+                f"PowNet: The '{power_system_model.portfolio_winner}' strategy "
+                f"won step {step_k}."
+            )
+        elif solve_params["rounding_strategy"] is None:
+            power_system_model.optimize(
+                solver=solve_params["solver"],
+                log_to_console=False,
+                mipgap=solve_params["mipgap"],
+                timelimit=solve_params["timelimit"],
+                num_threads=solve_params["num_threads"],
+            )
+            if solve_params["prefix_commitment"]:
+                logger.info(
+                    "PowNet: Fixed "
+                    f"{sum(power_system_model.fixed_commitment.values())} status "
+                    f"variables before solving step {step_k}."
+                )
+        else:
+            power_system_model.optimize_with_rounding(
+                rounding_strategy=solve_params["rounding_strategy"],
+                solver=solve_params["solver"],
+                log_to_console=False,
+                mipgap=solve_params["mipgap"],
+                timelimit=solve_params["timelimit"],
+                num_threads=solve_params["num_threads"],
+            )
+
+        step_result = {
+            "runtime": power_system_model.get_runtime(),
+            "objval": power_system_model.get_objval(),
+            "solution": power_system_model.get_structured_solution(),
+            "lmp": (
+                power_system_model.solve_for_lmp() if solve_params["find_lmp"] else None
+            ),
+        }
+        system_record.keep(step_k=step_k, **step_result)
+        init_conds = system_record.get_init_conds()
+        step_result["init_conds"] = init_conds
+        step_results[step_k] = step_result
+
+        if reference_init_conds is not None and init_conds_match(
+            init_conds, reference_init_conds[step_k], atol=atol
+        ):
+            break
+    return step_results
+
+
+def _run_chunk(chunk: TimeChunk, solve_params: dict) -> dict[int, dict]:
+    """Solve the steps of a chunk in a worker process starting with all units off."""
+    inputs: SystemInput = get_worker_data()
+    init_conds = create_init_condition(inputs.thermal_units, inputs.storage_units)
+    return _solve_steps(
+        inputs,
+        start_step=chunk.start_step,
+        last_step=chunk.last_step,
+        init_conds=init_conds,
+        solve_params=solve_params,
+    )
+
+
+class TimeParallelRunner:
+    """Run the steps of a simulation in parallel chunks and repair the chunk boundaries."""
+
+    def __init__(
+        self,
+        inputs: SystemInput,
+        num_chunks: int,
+        overlap_steps: int = 2,
+        max_workers: int = None,
+        total_threads: int = None,
+        atol: float = 1e-4,
+    ) -> None:
+        """Initialize the runner.
+
+        Args:
+            inputs (SystemInput): The loaded input data.
+            num_chunks (int): The number of chunks of steps.
+            overlap_steps (int): The number of warm-up steps of each chunk. Default is 2.
+            max_workers (int): The number of worker processes. Defaults to the number of
+                chunks or CPUs, whichever is smaller.
+            total_threads (int): The number of solver threads shared by all workers.
+                Defaults to the number of CPUs.
+            atol (float): The absolute tolerance when comparing initial conditions.
+        """
+        cpu_count = os.cpu_count() or 1
+        self.inputs: SystemInput = inputs
+        self.num_chunks: int = num_chunks
+        self.overlap_steps: int = overlap_steps
+        self.max_workers: int = max_workers or min(num_chunks, cpu_count)
+        self.total_threads: int = total_threads or cpu_count
+        if self.num_chunks < 1 or self.max_workers < 1 or self.total_threads < 1:
+            raise ValueError(
+                "PowNet: num_chunks, max_workers, and total_threads must be positive integers."
+            )
+        self.atol: float = atol
+
+        # Steps and repairs of each chunk of the last run
+        self.report: pd.DataFrame = pd.DataFrame()
+
+    def get_threads_per_worker(self, num_chunks: int) -> int:
+        """Divide the thread budget among the workers that run at the same time."""
+        return get_threads_per_worker(
+            self.total_threads, self.max_workers, num_tasks=num_chunks
+        )
+
+    def _run_chunks(
+        self, chunks: list[TimeChunk], solve_params: dict
+    ) -> list[dict[int, dict]]:
+        with create_process_pool(
+            self.max_workers, num_tasks=len(chunks), worker_data=self.inputs
+        ) as executor:
+            futures = [
+                executor.submit(_run_chunk, chunk, solve_params) for chunk in chunks
+            ]
+            return [future.result() for future in futures]
+
+    def run(
+        self,
+        steps_to_run: int,
+        solver: str = "gurobi",
+        mipgap: float = 1e-3,
+        timelimit: int = 600,
+        find_lmp: bool = False,
+        integer_hours: int = None,
+        lazy_transmission: bool = False,
+        cluster_thermal_units: bool = False,
+        rounding_strategy: str = None,
+        portfolio: bool = False,
+        prefix_commitment: bool = False,
+        break_symmetry: bool = False,
+        batch_mode: bool = True,
+        keep_record_each_step: bool = False,
+        output_format: str = "csv",
+    ) -> SystemRecord:
+        """Run the simulation in parallel chunks. See Simulator.run for the description
+        of the arguments. The results of each step are only written to disk after all
+        chunks are repaired, so the results of all steps are held in memory until
+        then even with batch_mode=False.
+
+        Args:
+            steps_to_run (int): The number of steps to run the simulation.
+
+        Returns:
+            SystemRecord: The results of all steps in the same form as a sequential run.
+
+        Raises:
+            ValueError: If integer_hours is less than the step hours of the inputs.
+        """
+        # The recorded hours and the initial conditions of the next step must be
+        # integer
+        if integer_hours is not None and integer_hours < self.inputs.step_hours:
+            raise ValueError(
+                f"PowNet: integer_hours ({integer_hours}) must be at least the step "
+                f"hours ({self.inputs.step_hours})."
+            )
+        chunks = split_into_chunks(steps_to_run, self.num_chunks, self.overlap_steps)
+        solve_params = {
+            "solver": solver,
+            "mipgap": mipgap,
+            "timelimit": timelimit,
+            "num_threads": self.get_threads_per_worker(len(chunks)),
+            "find_lmp": find_lmp,
+            "integer_hours": integer_hours,
+            "lazy_transmission": lazy_transmission,
+            "cluster_thermal_units": cluster_thermal_units,
+            "rounding_strategy": rounding_strategy,
+            "portfolio": portfolio,
+            "prefix_commitment": prefix_commitment,
+            "break_symmetry": break_symmetry,
+        }
+
+        parallel_start = time.perf_counter()
+        chunk_results = self._run_chunks(chunks, solve_params)
+        parallel_time = time.perf_counter() - parallel_start
+
+        # The initial conditions of the first chunk are known, so its steps are final
+        cold_init_conds = create_init_condition(
+            self.inputs.thermal_units, self.inputs.storage_units
+        )
+        init_conds = cold_init_conds
+        report = []
+        for chunk, step_results in zip(chunks, chunk_results):
+            repair_start = time.perf_counter()
+            repaired_steps = 0
+            # A chunk without warm-up steps started its first step with all units off
+            chunk_init_conds = cold_init_conds
+            if chunk.warmup_steps > 0:
+                chunk_init_conds = step_results[chunk.first_step - 1]["init_conds"]
+            if not init_conds_match(init_conds, chunk_init_conds, atol=self.atol):
+                repaired_results = _solve_steps(
+                    self.inputs,
+                    start_step=chunk.first_step,
+                    last_step=chunk.last_step,
+                    init_conds=init_conds,
+                    solve_params=solve_params,
+                    reference_init_conds={
+                        step_k: step_results[step_k]["init_conds"]
+                        for step_k in range(chunk.first_step, chunk.last_step + 1)
+                    },
+                    atol=self.atol,
+                )
+                step_results.update(repaired_results)
+                repaired_steps = len(repaired_results)
+                logger.info(
+                    f"PowNet: Repaired {repaired_steps} steps of chunk {chunk.index}."
+                )
+            init_conds = step_results[chunk.last_step]["init_conds"]
+
+            report.append(
+                {
+                    "chunk": chunk.index,
+                    "first_step": chunk.first_step,
+                    "last_step": chunk.last_step,
+                    "warmup_steps": chunk.warmup_steps,
+                    "repaired_steps": repaired_steps,
+                    "repair_time": time.perf_counter() - repair_start,
+                }
+            )
+
+        system_record = SystemRecord(
+            self.inputs,
+            batch_mode=batch_mode,
+            keep_record_each_step=keep_record_each_step,
+            output_format=output_format,
+        )
+        try:
+            for chunk, step_results in zip(chunks, chunk_results):
+                for step_k in range(chunk.first_step, chunk.last_step + 1):
+                    step_result = step_results[step_k]
+                    system_record.keep(
+                        runtime=step_result["runtime"],
+                        objval=step_result["objval"],
+                        solution=step_result["solution"],
+                        step_k=step_k,
+                        lmp=step_result["lmp"],
+                    )
+        finally:
+            system_record.close()
+
+        self.report = pd.DataFrame(report)
+        self.report["parallel_time"] = parallel_time
+        return system_record
+
+    def get_report(self) -> pd.DataFrame:
+        """Return the steps of each chunk of the last run, the number of steps that were
+        solved again to repair the start of the chunk, and the time of the repair. The
+        parallel time is the wall time of solving all chunks over the process pool.
+        """
+        return self.report
+
+
+def get_cost_error(system_record: SystemRecord, reference: SystemRecord) -> float:
+    """Return the relative difference between the sum of the objective values of two
+    runs, e.g., of a parallel run and a sequential run of the same steps.
+
+    Args:
+        system_record (SystemRecord): The results of the run to compare.
+        reference (SystemRecord): The results of the reference run.
+
+    Returns:
+        float: The relative cost error.
+    """
+    total_cost = sum(system_record.get_objvals())
+    reference_cost = sum(reference.get_objvals())
+    return (total_cost - reference_cost) / abs(reference_cost)
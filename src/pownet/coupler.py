@@ -32,6 +32,16 @@ class PowerWaterCoupler:
         Returns:
             None
         """
+        # The reservoirs are reoperated day by day
+        if model_builder.inputs.step_hours != 24:
+            raise ValueError(
+                "PowNet: The power and water systems can only be coupled with step_hours of 24."
+            )
+        # The daily dispatch is summed over hourly timesteps
+        if model_builder.inputs.block_hours > 1:
+            raise ValueError(
+                "PowNet: The power and water systems can only be coupled with hourly timesteps."
+            )
         self.model_builder = model_builder
         self.reservoir_manager = reservoir_manager
 
@@ -1,7 +1,13 @@
 """This is the core module."""
 
 from .reservoir import ReservoirParams
+from .timeseries import TimeseriesArray, as_timeseries_array
+from .timesteps import Timesteps, as_timesteps
 
 __all__ = [
     "ReservoirParams",
+    "TimeseriesArray",
+    "as_timeseries_array",
+    "Timesteps",
+    "as_timesteps",
 ]
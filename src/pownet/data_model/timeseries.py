@@ -0,0 +1,132 @@
+"""timeseries.py: Dense NumPy view of a timeseries of SystemInput."""
+
+import numpy as np
+import pandas as pd
+
+
+class TimeseriesArray:
+    """
+    Read-only NumPy view of a timeseries with integer index maps. The rows are
+    the time labels of the timeseries (hours or days starting at 1) and the
+    columns are the units, nodes, or edges.
+
+    Optimization models slice a whole window of a step at once instead of looking
+    up one value per unit and timestep with DataFrame.loc.
+
+    Attributes:
+        values (np.ndarray): 2D array (time, column) for a DataFrame or 1D array for a Series.
+        start (int): The time label of the first row.
+        row_idx (dict): Maps a time label to its row when the labels are not
+            consecutive integers. None otherwise.
+        columns (list): The column labels. Empty for a Series.
+        col_idx (dict): Maps a column label to its position. Duplicated labels map
+            to their first occurrence.
+    """
+
+    def __init__(self, timeseries: pd.DataFrame | pd.Series) -> None:
+        # A view, so that the timeseries itself stays writeable
+        self.values: np.ndarray = timeseries.to_numpy(dtype=float).view()
+        self.values.flags.writeable = False
+
+        index = timeseries.index
+        self.start: int = int(index[0]) if len(index) > 0 else 1
+        self.row_idx: dict = None
+        if not np.array_equal(
+            index.to_numpy(), np.arange(self.start, self.start + len(index))
+        ):
+            self.row_idx = {label: row for row, label in enumerate(index)}
+
+        if isinstance(timeseries, pd.DataFrame):
+            self.columns: list = list(timeseries.columns)
+        else:
+            self.columns = []
+        self.col_idx: dict = {}
+        for idx, column in enumerate(self.columns):
+            self.col_idx.setdefault(column, idx)
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    def get_col_indices(self, columns) -> np.ndarray:
+        """Return the positions of the given columns.
+
+        Raises:
+            ValueError: If a column is not in the timeseries.
+        """
+        try:
+            return np.fromiter(
+                (self.col_idx[column] for column in columns), dtype=np.intp
+            )
+        except KeyError as e:
+            raise ValueError(f"PowNet: Column {e} is not in the timeseries.") from None
+
+    def get_window(self, start: int, length: int, columns=None) -> np.ndarray:
+        """Return the rows from the time label start to start + length - 1.
+
+        Args:
+            start (int): The time label of the first row.
+            length (int): The number of rows.
+            columns (list): The columns to select in this order. Default is all columns.
+
+        Returns:
+            np.ndarray: Array of shape (length, len(columns)), or (length,) for a Series.
+
+        Raises:
+            ValueError: If the window is outside the timeseries.
+        """
+        if columns is not None:
+            columns = list(columns)
+            if not columns:
+                return np.empty((length, 0))
+        if self.row_idx is None:
+            row = start - self.start
+            if row < 0 or row + length > len(self):
+                raise ValueError(
+                    f"PowNet: Window {start} to {start + length - 1} is outside the "
+                    f"timeseries from {self.start} to {self.start + len(self) - 1}."
+                )
+            window = self.values[row : row + length]
+        else:
+            window = self.values[self.get_rows(range(start, start + length))]
+        if columns is None or window.ndim == 1:
+            return window
+        return window[:, self.get_col_indices(columns)]
+
+    def get_rows(self, time_labels) -> np.ndarray:
+        """Return the rows of the given time labels.
+
+        Raises:
+            ValueError: If a time label is not in the timeseries.
+        """
+        if self.row_idx is None:
+            rows = np.asarray(time_labels, dtype=np.intp) - self.start
+            if rows.size and (rows.min() < 0 or rows.max() >= len(self)):
+                raise ValueError(
+                    f"PowNet: Time is outside the timeseries from {self.start} "
+                    f"to {self.start + len(self) - 1}."
+                )
+            return rows
+        try:
+            return np.fromiter(
+                (self.row_idx[label] for label in time_labels), dtype=np.intp
+            )
+        except KeyError as e:
+            raise ValueError(f"PowNet: Time {e} is not in the timeseries.") from None
+
+    def get(self, time_label: int, column=None) -> float:
+        """Return a single value. The column is omitted for a Series."""
+        row = self.get_rows([time_label])[0]
+        if column is None:
+            return float(self.values[row])
+        if column not in self.col_idx:
+            raise ValueError(f"PowNet: Column {column} is not in the timeseries.")
+        return float(self.values[row, self.col_idx[column]])
+
+
+def as_timeseries_array(
+    timeseries: "pd.DataFrame | pd.Series | TimeseriesArray",
+) -> TimeseriesArray:
+    """Return the timeseries as a TimeseriesArray without copying an existing one."""
+    if isinstance(timeseries, TimeseriesArray):
+        return timeseries
+    return TimeseriesArray(timeseries)
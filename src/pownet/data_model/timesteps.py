@@ -0,0 +1,127 @@
+"""timesteps.py: Timesteps of a simulation horizon with hourly or aggregated resolution."""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+
+class Timesteps(Sequence):
+    """
+    The timesteps 1, 2, ..., n of a simulation horizon. The first full_resolution_hours
+    of the horizon have one timestep per hour. The remaining hours are merged into
+    blocks of block_hours, so the look-ahead has fewer variables and constraints. The
+    last block is shorter when the remaining hours are not a multiple of block_hours.
+
+    Timesteps can be used like range(1, n + 1), e.g., as an index of gp.Model.addVars.
+    Without aggregation, they are the same as range(1, sim_horizon + 1).
+
+    Attributes:
+        sim_horizon (int): The number of hours in the simulation horizon.
+        durations (np.ndarray): The number of hours of each timestep.
+        starts (np.ndarray): The hours before the start of each timestep, i.e., zero
+            for the first timestep.
+        is_hourly (bool): Whether each timestep is one hour.
+    """
+
+    def __init__(
+        self,
+        sim_horizon: int,
+        full_resolution_hours: int = None,
+        block_hours: int = 1,
+    ) -> None:
+        for name, value in [("sim_horizon", sim_horizon), ("block_hours", block_hours)]:
+            if not isinstance(value, int) or value < 1:
+                raise ValueError(f"PowNet: {name} must be a positive integer.")
+        if full_resolution_hours is None:
+            full_resolution_hours = sim_horizon
+        if not isinstance(full_resolution_hours, int) or full_resolution_hours < 0:
+            raise ValueError(
+                "PowNet: full_resolution_hours must be a non-negative integer."
+            )
+
+        num_hourly = min(full_resolution_hours, sim_horizon)
+        num_blocks, remainder = divmod(sim_horizon - num_hourly, block_hours)
+        durations = [1] * num_hourly + [block_hours] * num_blocks
+        if remainder > 0:
+            durations.append(remainder)
+
+        self.sim_horizon: int = sim_horizon
+        self.durations: np.ndarray = np.array(durations, dtype=np.int64)
+        self.starts: np.ndarray = np.concatenate(([0], np.cumsum(self.durations)[:-1]))
+        self.is_hourly: bool = bool((self.durations == 1).all())
+        self._range = range(1, len(durations) + 1)
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def __getitem__(self, index):
+        return self._range[index]
+
+    def __iter__(self):
+        return iter(self._range)
+
+    def __contains__(self, t) -> bool:
+        return t in self._range
+
+    def __repr__(self) -> str:
+        return (
+            f"Timesteps(sim_horizon={self.sim_horizon}, "
+            f"num_timesteps={len(self)}, is_hourly={self.is_hourly})"
+        )
+
+    def get_duration(self, t: int) -> int:
+        """Return the number of hours of timestep t."""
+        return int(self.durations[t - 1])
+
+    def get_hours(self, t: int) -> range:
+        """Return the hours of the horizon (starting at 1) that belong to timestep t."""
+        start = int(self.starts[t - 1])
+        return range(start + 1, start + self.get_duration(t) + 1)
+
+    def get_ramp_hours(self, t: int) -> float:
+        """Return the hours between the middle of timestep t - 1 and the middle of
+        timestep t. Ramp rates per hour are multiplied by this value.
+        """
+        return (self.get_duration(t - 1) + self.get_duration(t)) / 2
+
+    def count_timesteps_before(self, hours: int) -> int:
+        """Return the number of timesteps that start within the first hours of the horizon."""
+        return int(np.searchsorted(self.starts, hours))
+
+    def get_window_start(self, t: int, hours: int) -> int:
+        """Return the first timestep that starts less than hours before timestep t."""
+        return (
+            int(np.searchsorted(self.starts, self.starts[t - 1] - hours, side="right"))
+            + 1
+        )
+
+    def get_timesteps_between(self, first_hour: int, last_hour: int) -> range:
+        """Return the timesteps within the hours first_hour to last_hour of the horizon.
+        The hours must be at the boundaries of timesteps, e.g., the hours of a day.
+        """
+        first = self.count_timesteps_before(first_hour - 1) + 1
+        return range(first, self.count_timesteps_before(last_hour) + 1)
+
+    def aggregate(self, values: np.ndarray) -> np.ndarray:
+        """Average hourly values over the hours of each timestep.
+
+        Args:
+            values (np.ndarray): Array with one row per hour of the horizon.
+
+        Returns:
+            np.ndarray: Array with one row per timestep.
+        """
+        if self.is_hourly:
+            return values
+        values = np.asarray(values, dtype=float)
+        durations = self.durations.reshape((-1,) + (1,) * (values.ndim - 1))
+        return np.add.reduceat(values, self.starts, axis=0) / durations
+
+
+def as_timesteps(timesteps: "range | Timesteps") -> Timesteps:
+    """Return range(1, n + 1) as hourly Timesteps without copying existing Timesteps."""
+    if isinstance(timesteps, Timesteps):
+        return timesteps
+    if timesteps.start != 1 or timesteps.step != 1:
+        raise ValueError("PowNet: Timesteps must be consecutive and start at 1.")
+    return Timesteps(len(timesteps))
@@ -9,6 +9,7 @@ import geopandas as gpd
 import pandas as pd
 from shapely.geometry import LineString, Point
 
+from .data_model import Timesteps, TimeseriesArray, as_timeseries_array
 from .folder_utils import get_database_dir
 
 
@@ -285,7 +286,7 @@ def calc_remaining_off_duration(
 
 
 def parse_node_variables(
-    solution: pd.DataFrame, sim_horizon: int, step_k: int
+    solution: pd.DataFrame, sim_horizon: int, step_k: int, step_hours: int = None
 ) -> pd.DataFrame:
     """Parse the node variables from the solution DataFrame. Node variables are in the (node, t) format.
     Also, ensure binary values are rounded to 0 or 1.
@@ -294,6 +295,8 @@ def parse_node_variables(
         solution: The solution DataFrame.
         sim_horizon: The length of the simulation horizon.
         step_k: The current simulation period.
+        step_hours: Hours between the starts of consecutive simulation periods.
+            Default is sim_horizon.
 
     Returns:
         pd.DataFrame: The node variables DataFrame"""
@@ -312,7 +315,9 @@ def parse_node_variables(
 
     current_node_vars["timestep"] = current_node_vars["timestep"].astype(int)
 
-    current_node_vars["hour"] = current_node_vars["timestep"] + sim_horizon * (
+    if step_hours is None:
+        step_hours = sim_horizon
+    current_node_vars["hour"] = current_node_vars["timestep"] + step_hours * (
         step_k - 1
     )
 
@@ -327,7 +332,7 @@ def parse_node_variables(
 
 
 def parse_flow_variables(
-    solution: pd.DataFrame, sim_horizon: int, step_k: int
+    solution: pd.DataFrame, sim_horizon: int, step_k: int, step_hours: int = None
 ) -> pd.DataFrame:
     """
     Parses flow variables from the solution DataFrame.
@@ -338,6 +343,8 @@ def parse_flow_variables(
         solution: The solution DataFrame with a 'varname' column.
         sim_horizon: The length of the simulation horizon for a single step_k (e.g., 24 hours).
         step_k: The current simulation period (1-indexed).
+        step_hours: Hours between the starts of consecutive simulation periods.
+            Default is sim_horizon.
 
     Returns:
         pd.DataFrame: A DataFrame with parsed flow variables, including
@@ -367,16 +374,17 @@ def parse_flow_variables(
     cur_flow_vars["timestep"] = cur_flow_vars["timestep"].astype(int)
 
     # Calculate absolute hour
-    # Assuming sim_horizon is the number of timesteps within one step_k
-    # and step_k is 1-indexed.
-    cur_flow_vars["hour"] = cur_flow_vars["timestep"] + sim_horizon * (step_k - 1)
+    # step_k is 1-indexed and each step starts step_hours after the previous one.
+    if step_hours is None:
+        step_hours = sim_horizon
+    cur_flow_vars["hour"] = cur_flow_vars["timestep"] + step_hours * (step_k - 1)
 
     final_columns = ["node_a", "node_b", "value", "type", "timestep", "hour"]
     return cur_flow_vars[final_columns]
 
 
 def parse_syswide_variables(
-    solution: pd.DataFrame, sim_horizon: int, step_k: int
+    solution: pd.DataFrame, sim_horizon: int, step_k: int, step_hours: int = None
 ) -> pd.DataFrame:
     """
     The system-wide variables are in the (t) format.
@@ -385,6 +393,8 @@ def parse_syswide_variables(
         solution: The solution DataFrame.
         sim_horizon: The length of the simulation horizon.
         step_k: The current simulation period.
+        step_hours: Hours between the starts of consecutive simulation periods.
+            Default is sim_horizon.
 
     Returns:
         pd.DataFrame: The system-wide variables DataFrame
@@ -398,18 +408,25 @@ def parse_syswide_variables(
         syswide_var_pattern, expand=True
     )[1]
     cur_syswide_vars["timestep"] = cur_syswide_vars["timestep"].astype(int)
-    cur_syswide_vars["hour"] = cur_syswide_vars["timestep"] + sim_horizon * (step_k - 1)
+    if step_hours is None:
+        step_hours = sim_horizon
+    cur_syswide_vars["hour"] = cur_syswide_vars["timestep"] + step_hours * (step_k - 1)
     cur_syswide_vars = cur_syswide_vars.drop("varname", axis=1)
     return cur_syswide_vars
 
 
-def parse_lmp(lmp: dict[str, float], sim_horizon: int, step_k: int) -> pd.DataFrame:
+def parse_lmp(
+    lmp: dict[str, float], sim_horizon: int, step_k: int, step_hours: int = None
+) -> pd.DataFrame:
     """Parse the LMP dictionary and return a DataFrame.
 
     Args:
         lmp: The dictionary of LMP values.
         sim_horizon: The length of the simulation horizon.
         step_k: The current simulation period.
+        step_hours: Hours between the starts of consecutive simulation periods.
+            Only these hours of the period are kept. Default is to offset the hours
+            by sim_horizon and keep the first 24 hours.
 
     Returns:
         pd.DataFrame: The LMP DataFrame.
@@ -418,9 +435,14 @@ def parse_lmp(lmp: dict[str, float], sim_horizon: int, step_k: int) -> pd.DataFr
     lmp_df = lmp_df.reset_index().rename(columns={"index": "name"})
     lmp_df[["node", "timestep"]] = lmp_df["name"].str.extract(r"flowBal\[(.*),(\d+)\]")
     lmp_df["timestep"] = lmp_df["timestep"].astype(int)
-    lmp_df["hour"] = lmp_df["timestep"] + sim_horizon * (step_k - 1)
-    # Keep only the first 24-hours of the simulation
-    lmp_df = lmp_df[lmp_df["timestep"] <= 24]
+    if step_hours is None:
+        lmp_df["hour"] = lmp_df["timestep"] + sim_horizon * (step_k - 1)
+        # Keep only the first 24-hours of the simulation
+        lmp_df = lmp_df[lmp_df["timestep"] <= 24]
+    else:
+        lmp_df["hour"] = lmp_df["timestep"] + step_hours * (step_k - 1)
+        # Keep only the hours before the next simulation period
+        lmp_df = lmp_df[lmp_df["timestep"] <= step_hours]
     lmp_df = lmp_df.drop(["name"], axis=1)
     return lmp_df
 
@@ -482,19 +504,66 @@ def create_geoseries_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def get_capacity_value(t: int, unit: str, step_k: int, capacity_df) -> float:
+def get_capacity_value(
+    t: int, unit: str, step_k: int, capacity_df, step_hours: int = 24
+) -> float:
     """Get the capacity value for a given unit and timestep.
     Args:
         t: The timestep.
         unit: The unit name.
         step_k: The current simulation period.
         capacity_df: The dataframe containing the capacity values.
+        step_hours: Hours between the starts of consecutive simulation periods.
 
     Returns:
         The capacity value for the given unit and timestep.
     """
-    hours_per_timestep = 24  # For rolling horizon
-    value = capacity_df.loc[t + (step_k - 1) * hours_per_timestep, unit]
+    value = capacity_df.loc[t + (step_k - 1) * step_hours, unit]
     if isinstance(value, pd.Series):
         return value.iloc[0]
     return value
+
+
+def get_step_window(
+    timeseries: pd.DataFrame | pd.Series | TimeseriesArray,
+    timesteps: range | Timesteps,
+    step_k: int,
+    columns: list = None,
+    step_hours: int = 24,
+) -> np.ndarray:
+    """Get the values of a timeseries at the timesteps of the current simulation period.
+    The values of aggregated timesteps are the averages over their hours.
+
+    Args:
+        timeseries: The timeseries indexed by hour.
+        timesteps: The consecutive timesteps of the model.
+        step_k: The current simulation period.
+        columns: The columns to select in this order. Default is all columns.
+        step_hours: Hours between the starts of consecutive simulation periods.
+
+    Returns:
+        Array of shape (len(timesteps), len(columns)), or (len(timesteps),) for a Series.
+    """
+    if isinstance(timesteps, Timesteps) and not timesteps.is_hourly:
+        return timesteps.aggregate(
+            as_timeseries_array(timeseries).get_window(
+                1 + (step_k - 1) * step_hours, timesteps.sim_horizon, columns
+            )
+        )
+    return as_timeseries_array(timeseries).get_window(
+        timesteps[0] + (step_k - 1) * step_hours, len(timesteps), columns
+    )
+
+
+def get_first_day(step_k: int, step_hours: int = 24) -> int:
+    """Get the day of the year at the first hour of the current simulation period.
+    Daily timeseries are indexed by this day.
+
+    Args:
+        step_k: The current simulation period.
+        step_hours: Hours between the starts of consecutive simulation periods.
+
+    Returns:
+        The day of the year starting from 1.
+    """
+    return (step_k - 1) * step_hours // 24 + 1
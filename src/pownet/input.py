@@ -10,6 +10,9 @@ import gurobipy as gp
 from gurobipy import GRB
 import pandas as pd
 
+from .data_model import TimeseriesArray
+from .input_cache import load_input_cache, save_input_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,6 +36,9 @@ class SystemInput:
         load_curtail_penalty_factor: float = 1000,
         spin_shortfall_penalty_factor: float = 900,
         ess_discharge_shortfall_penalty_factor: float = 900,
+        step_hours: int = 24,
+        block_hours: int = 1,
+        full_resolution_hours: int = 24,
     ) -> None:
         """This class reads the input data for the power system model.
 
@@ -44,7 +50,8 @@ class SystemInput:
             num_sim_days (int): Number of days in the simulation. Default is 365.
             use_spin_var (bool): Whether to use spin reserve variable. Default is True.
             use_nondispatch_status_var (bool): Whether to use nondispatch status variable. Default is False.
-            dc_opf (str): DC OPF formulation. Can be "kirchhoff" or "voltage_angle". Default is "kirchhoff".
+            dc_opf (str): DC OPF formulation. Can be "kirchhoff", "voltage_angle", or "ptdf". Default is "kirchhoff".
+                The "ptdf" formulation requires line_loss_factor=0.
             spin_reserve_factor (float): Spin reserve factor. Default is 0.15.
             spin_reserve_mw (float): Spin reserve in MW. Default is None.
             gen_loss_factor (float): Generator loss factor. Default is 0.01.
@@ -54,6 +61,14 @@ class SystemInput:
             load_curtail_penalty_factor (float): Load curtail penalty factor. Default is 1000.
             spin_shortfall_penalty_factor (float): Spin shortfall penalty factor. Default is 900.
             ess_discharge_shortfall_penalty_factor (float): ESS discharge shortfall penalty factor. Default is 900.
+            step_hours (int): Hours between the starts of consecutive steps of the rolling horizon.
+                Only these hours of each step are kept. Default is 24.
+            block_hours (int): Hours that are merged into one timestep after the first
+                full_resolution_hours of the horizon. Must divide 24. Default is 1,
+                which keeps every hour of the horizon.
+            full_resolution_hours (int): Hours at the start of the horizon that keep
+                one timestep per hour when block_hours > 1. Must be a multiple of
+                block_hours and at least step_hours. Default is 24.
         """
 
         self.model_name: str = model_name
@@ -61,6 +76,25 @@ class SystemInput:
         self.year: int = year
         self.sim_horizon: int = sim_horizon
 
+        # The rolling horizon advances by step_hours at each step
+        if not isinstance(step_hours, int) or step_hours < 1:
+            raise ValueError("PowNet: step_hours must be a positive integer.")
+        self.step_hours: int = step_hours
+
+        # The look-ahead after full_resolution_hours is aggregated into blocks
+        if not isinstance(block_hours, int) or block_hours < 1 or 24 % block_hours != 0:
+            raise ValueError("PowNet: block_hours must be a positive divisor of 24.")
+        if (
+            not isinstance(full_resolution_hours, int)
+            or full_resolution_hours < 1
+            or full_resolution_hours % block_hours != 0
+        ):
+            raise ValueError(
+                "PowNet: full_resolution_hours must be a positive multiple of block_hours."
+            )
+        self.block_hours: int = block_hours
+        self.full_resolution_hours: int = full_resolution_hours
+
         self.num_sim_days: int = num_sim_days
         self.num_sim_hours: int = num_sim_days * 24
 
@@ -74,9 +108,9 @@ class SystemInput:
         self.model_id: str = f"{self.timestamp}_{self.model_name}_{self.sim_horizon}"
 
         # DC representation of the power flow model
-        if dc_opf not in ["kirchhoff", "voltage_angle"]:
+        if dc_opf not in ["kirchhoff", "voltage_angle", "ptdf"]:
             raise ValueError(
-                "PowNet: Line flow must be either 'kirchhoff' or 'voltage_angle'."
+                "PowNet: Line flow must be either 'kirchhoff', 'voltage_angle', or 'ptdf'."
             )
         self.dc_opf: str = dc_opf
 
@@ -87,6 +121,13 @@ class SystemInput:
         self.spin_reserve_mw: float = spin_reserve_mw
 
         self.gen_loss_factor: float = gen_loss_factor
+
+        # The PTDF formulation has no flow variables to apply the line losses to
+        if dc_opf == "ptdf" and line_loss_factor > 0:
+            raise ValueError(
+                "PowNet: The 'ptdf' formulation does not model line losses. "
+                "Set line_loss_factor=0 or use 'kirchhoff' or 'voltage_angle'."
+            )
         self.line_loss_factor: float = line_loss_factor
 
         # The line capacity factor is the fraction of the line capacity
@@ -190,6 +231,10 @@ class SystemInput:
         self.line_locations: pd.DataFrame = pd.DataFrame()
         self.susceptance: pd.DataFrame = pd.DataFrame()
         self.cycle_map: dict = {}
+        # Power transfer distribution factors with lines as rows and nodes as columns
+        self.ptdf: pd.DataFrame = pd.DataFrame()
+        # Maps the lines of a reduced network to the original lines
+        self.line_map: pd.DataFrame = pd.DataFrame()
 
         self.max_line_capacity: int = 0
         self.spin_requirement: pd.Series = pd.Series()
@@ -202,6 +247,8 @@ class SystemInput:
         self.ess_contracts: dict[str, str] = {}
         # Contract costs are dicts of (contract, timestep) -> cost_per_mw
         self.contract_costs: dict[tuple[str, int], float] = {}
+        # The same contract costs as a timeseries with the contracts as columns
+        self.contract_cost_timeseries: pd.DataFrame = pd.DataFrame()
 
         # List of units
         self.thermal_units: list[str] = []
@@ -229,6 +276,9 @@ class SystemInput:
         self.nodes: set[str] = set(["b1"])  # Will get overwritten by the actual nodes
         self.node_edge: dict[str, list[str]] = {}
 
+        # NumPy views of the timeseries created by get_timeseries_array
+        self._timeseries_arrays: dict[str, tuple[object, TimeseriesArray]] = {}
+
     def _load_timeseries_from_csv(
         self, filename: str, header_levels: int
     ) -> pd.DataFrame:
@@ -487,6 +537,7 @@ class SystemInput:
                 f"PowNet: Marginal cost timeseries must be of length {self.num_sim_hours}."
             )
 
+        self.contract_cost_timeseries = contract_costs_df
         self.contract_costs = {
             (col, idx): value
             for col in contract_costs_df.columns
@@ -794,6 +845,20 @@ class SystemInput:
                     ) as f:
                         self.cycle_map = json.load(f)
 
+            # DataProcessor also generates pownet_ptdf.csv for a connected network
+            elif self.dc_opf == "ptdf":
+                ptdf_file = os.path.join(self.model_dir, "pownet_ptdf.csv")
+                if not os.path.exists(ptdf_file):
+                    raise ValueError(
+                        "PowNet: pownet_ptdf.csv is required for the 'ptdf' formulation. "
+                        "Run DataProcessor on a connected transmission network to create it."
+                    )
+                self.ptdf = pd.read_csv(ptdf_file, header=0, index_col=[0, 1])
+                self.ptdf = self.ptdf.reindex(index=list(self.edges))
+
+            # DataProcessor creates pownet_line_map.csv when it reduces the network
+            self.line_map = self._check_and_load_csv("pownet_line_map.csv")
+
         # When there is no transmission.csv, we expect only one demand node
         else:
             if len(self.demand_nodes) != 1:
@@ -856,6 +921,26 @@ class SystemInput:
                 "PowNet: Simulation horizon must be a multiple of 24 and greater than 24."
             )
 
+        if self.step_hours > self.sim_horizon:
+            raise ValueError(
+                "PowNet: step_hours must not be longer than the simulation horizon."
+            )
+
+        # The kept hours of each step must not be aggregated
+        if self.block_hours > 1 and self.full_resolution_hours < self.step_hours:
+            raise ValueError(
+                "PowNet: full_resolution_hours must not be shorter than step_hours."
+            )
+
+        # Daily and weekly hydropower are limited by day, so the steps must start at midnight
+        has_daily_constraints = (
+            len(self.daily_hydro_unit_node) > 0 or len(self.weekly_hydro_unit_node) > 0
+        )
+        if has_daily_constraints and self.step_hours % 24 != 0:
+            raise ValueError(
+                "PowNet: step_hours must be a multiple of 24 with daily or weekly hydropower units."
+            )
+
         ##################################
         # Nodes are connected to the grid
         ##################################
@@ -1053,6 +1138,13 @@ class SystemInput:
             )
 
     def print_summary(self):
+        # Look-ahead blocks are only reported when the horizon is aggregated
+        look_ahead_line = ""
+        if self.block_hours > 1:
+            look_ahead_line = (
+                f"\n        {'Look-ahead blocks':<25} = {self.block_hours} hours"
+                f" after {self.full_resolution_hours} hours"
+            )
         input_summary = textwrap.dedent(
             f"""
         \n\nPowNet Input Data Summary:
@@ -1085,6 +1177,7 @@ class SystemInput:
 
         ---- Modeling parameters ----
         {'Simulation horizon':<25} = {self.sim_horizon} hours
+        {'Step length':<25} = {self.step_hours} hours{look_ahead_line}
         {'Number of simulation days':<25} = {self.num_sim_days}
         {'Use spin variable':<25} = {self.use_spin_var}
         {'Power flow':<25} = {self.dc_opf}
@@ -1100,10 +1193,26 @@ class SystemInput:
         )
         logger.warning(input_summary)
 
-    def load_and_check_data(self):
-        """Load and check the input data."""
+    def load_and_check_data(self, use_cache: bool = False, cache_folder: str = None):
+        """Load and check the input data.
+
+        Args:
+            use_cache (bool): Whether to restore the data from a snapshot of an earlier
+                run with the same inputs and parameters. A snapshot is saved when none
+                exists. Default is False.
+            cache_folder (str): Folder of the snapshots. Default is ".pownet_cache" in the model folder.
+        """
+        if use_cache:
+            if cache_folder is None:
+                cache_folder = os.path.join(self.model_dir, ".pownet_cache")
+            if load_input_cache(self, cache_folder):
+                self.print_summary()
+                return
+
         self.load_data()
         self.check_data()
+        if use_cache:
+            save_input_cache(self, cache_folder)
         self.print_summary()
 
     def update_capacity(self, capacity_df: pd.DataFrame, unit_type: str) -> None:
@@ -1143,6 +1252,59 @@ class SystemInput:
             )
         # Save a copy to prevent unintended changes
         setattr(self, f"{unit_type}_capacity", capacity_df.copy())
+        # Copies of SystemInput share the views, so replace them instead of clearing
+        self._timeseries_arrays = {}
+
+    def update_demand(self, demand_df: pd.DataFrame) -> None:
+        """Replace the demand timeseries, e.g., with a synthetic demand scenario.
+        The total demand, the node with the maximum demand, and the spinning reserve
+        requirement (when it is a factor of demand) are updated accordingly.
+
+        Args:
+            demand_df: The new demand timeseries with the demand nodes as columns.
+
+        Raises:
+            ValueError: If the index of the timeseries does not match the existing demand.
+            ValueError: If the timeseries does not contain the same demand nodes.
+        """
+        if not demand_df.index.equals(self.demand.index):
+            raise ValueError(
+                "PowNet: The index of the demand timeseries must remain the same."
+            )
+        if set(demand_df.columns) != set(self.demand_nodes):
+            raise ValueError(
+                "PowNet: Demand nodes in the demand timeseries must remain the same."
+            )
+        # Save a copy to prevent unintended changes
+        self.demand = demand_df[self.demand_nodes].copy()
+        self.total_demand = self.demand.sum(axis=1)
+        self.max_demand_node = self.demand.idxmax().idxmax()
+        if self.spin_reserve_mw is None:
+            self.spin_requirement = self.total_demand * self.spin_reserve_factor
+        self._timeseries_arrays = {}
+
+    def get_timeseries_array(self, name: str) -> TimeseriesArray:
+        """Return a NumPy view of a timeseries attribute, e.g., demand, susceptance,
+        or thermal_derated_capacity. The view is created once and reused until the
+        timeseries is replaced.
+
+        Args:
+            name: The name of the timeseries attribute.
+
+        Returns:
+            TimeseriesArray: The values with index maps of the time and columns.
+
+        Raises:
+            ValueError: If the attribute is not a timeseries.
+        """
+        timeseries = getattr(self, name, None)
+        if not isinstance(timeseries, (pd.DataFrame, pd.Series)):
+            raise ValueError(f"PowNet: {name} is not a timeseries of SystemInput.")
+        cached = self._timeseries_arrays.get(name)
+        if cached is None or cached[0] is not timeseries:
+            cached = (timeseries, TimeseriesArray(timeseries))
+            self._timeseries_arrays[name] = cached
+        return cached[1]
 
     def get_unit_contracts(self) -> dict[str, str]:
         all_contracts = self.fuel_contracts.copy()
@@ -0,0 +1,350 @@
+"""input_cache.py: On-disk cache of the loaded and checked SystemInput.
+
+A snapshot is keyed by a hash of the parameters of SystemInput and the content
+of every file in the model folder, so any change to the inputs creates a new
+snapshot. A snapshot is a folder with:
+
+- arrays.npz: Numeric columns of the timeseries (DataFrame and Series) as NumPy arrays
+- state.json: Labels of the timeseries and the remaining attributes, e.g., dictionaries,
+  sets, and tuplelists. Types that JSON does not have are tagged with their type.
+- metadata.json: Hash, cache format, and the stored attributes
+
+Neither file is a pickle, so loading a snapshot cannot run code even if the model
+folder comes from an untrusted source.
+"""
+
+from datetime import datetime
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+import gurobipy as gp
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Increase when the attributes of SystemInput change to invalidate old snapshots
+CACHE_FORMAT_VERSION = 5
+
+# Maximum number of snapshots kept in a cache folder
+MAX_SNAPSHOTS = 4
+
+# Parameters of SystemInput that affect the loaded data
+INPUT_PARAMS = (
+    "model_name",
+    "year",
+    "sim_horizon",
+    "step_hours",
+    "block_hours",
+    "full_resolution_hours",
+    "num_sim_days",
+    "use_spin_var",
+    "use_nondispatch_status_var",
+    "dc_opf",
+    "spin_reserve_factor",
+    "spin_reserve_mw",
+    "gen_loss_factor",
+    "line_loss_factor",
+    "line_capacity_factor",
+    "load_shortfall_penalty_factor",
+    "load_curtail_penalty_factor",
+    "spin_shortfall_penalty_factor",
+    "ess_discharge_shortfall_penalty_factor",
+)
+
+# Attributes that belong to the current run and are never taken from a snapshot
+EXCLUDED_ATTRS = ("model_dir", "timestamp", "model_id", "_timeseries_arrays")
+
+
+def _encode_values(values: np.ndarray, arrays: dict[str, np.ndarray]) -> dict:
+    """Add numeric values to arrays and return a reference to them. Other values,
+    e.g., strings, are written to the JSON file.
+    """
+    if values.dtype.kind in "biufcmM":
+        key = f"array_{len(arrays)}"
+        arrays[key] = values
+        return {"type": "array", "key": key}
+    return {"type": "object_array", "items": [_encode(v, arrays) for v in values]}
+
+
+def _encode_index(index: pd.Index, arrays: dict[str, np.ndarray]) -> dict:
+    if isinstance(index, pd.RangeIndex):
+        return {
+            "type": "range_index",
+            "start": index.start,
+            "stop": index.stop,
+            "step": index.step,
+            "name": _encode(index.name, arrays),
+        }
+    if isinstance(index, pd.MultiIndex):
+        return {
+            "type": "multi_index",
+            "levels": [
+                _encode_values(index.get_level_values(i).to_numpy(), arrays)
+                for i in range(index.nlevels)
+            ],
+            "names": [_encode(name, arrays) for name in index.names],
+        }
+    return {
+        "type": "index",
+        "values": _encode_values(index.to_numpy(), arrays),
+        "dtype": str(index.dtype),
+        "name": _encode(index.name, arrays),
+    }
+
+
+def _encode(value, arrays: dict[str, np.ndarray]):
+    """Return a JSON representation of an attribute of SystemInput. The numeric
+    values of the timeseries are added to arrays and referenced by their key.
+
+    Raises:
+        ValueError: If the type of the value is not supported.
+    """
+    # NumPy scalars are checked first because np.float64 is also a float
+    if isinstance(value, np.generic):
+        return {"type": "numpy", "dtype": value.dtype.str, "value": value.item()}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, pd.Timestamp):
+        return {"type": "timestamp", "value": value.isoformat()}
+    # A gp.tuplelist is also a list
+    if isinstance(value, gp.tuplelist):
+        return {"type": "tuplelist", "items": [_encode(v, arrays) for v in value]}
+    if isinstance(value, list):
+        return [_encode(v, arrays) for v in value]
+    if isinstance(value, tuple):
+        return {"type": "tuple", "items": [_encode(v, arrays) for v in value]}
+    if isinstance(value, set):
+        return {"type": "set", "items": [_encode(v, arrays) for v in value]}
+    if isinstance(value, dict):
+        return {
+            "type": "dict",
+            "items": [
+                [_encode(k, arrays), _encode(v, arrays)] for k, v in value.items()
+            ],
+        }
+    if isinstance(value, pd.Index):
+        return _encode_index(value, arrays)
+    if isinstance(value, pd.Series):
+        return {
+            "type": "series",
+            "index": _encode_index(value.index, arrays),
+            "name": _encode(value.name, arrays),
+            "dtype": str(value.dtype),
+            "values": _encode_values(value.to_numpy(), arrays),
+        }
+    if isinstance(value, pd.DataFrame):
+        return {
+            "type": "dataframe",
+            "index": _encode_index(value.index, arrays),
+            "columns": _encode_index(value.columns, arrays),
+            "dtypes": [str(dtype) for dtype in value.dtypes],
+            "values": [
+                _encode_values(value.iloc[:, i].to_numpy(), arrays)
+                for i in range(value.shape[1])
+            ],
+        }
+    raise ValueError(
+        f"PowNet: Values of type {type(value).__name__} cannot be stored in the "
+        "input cache."
+    )
+
+
+def _decode_values(value: dict, arrays: np.lib.npyio.NpzFile) -> np.ndarray:
+    if value["type"] == "array":
+        return arrays[value["key"]]
+    items = [_decode(v, arrays) for v in value["items"]]
+    values = np.empty(len(items), dtype=object)
+    values[:] = items
+    return values
+
+
+def _decode_index(value: dict, arrays: np.lib.npyio.NpzFile) -> pd.Index:
+    if value["type"] == "range_index":
+        return pd.RangeIndex(
+            value["start"],
+            value["stop"],
+            value["step"],
+            name=_decode(value["name"], arrays),
+        )
+    if value["type"] == "multi_index":
+        return pd.MultiIndex.from_arrays(
+            [_decode_values(level, arrays) for level in value["levels"]],
+            names=[_decode(name, arrays) for name in value["names"]],
+        )
+    return pd.Index(
+        _decode_values(value["values"], arrays),
+        dtype=value["dtype"],
+        name=_decode(value["name"], arrays),
+    )
+
+
+def _decode(value, arrays: np.lib.npyio.NpzFile):
+    """Restore an attribute of SystemInput from its JSON representation."""
+    if isinstance(value, list):
+        return [_decode(v, arrays) for v in value]
+    if not isinstance(value, dict):
+        return value
+
+    value_type = value["type"]
+    if value_type == "numpy":
+        return np.dtype(value["dtype"]).type(value["value"])
+    if value_type == "timestamp":
+        return pd.Timestamp(value["value"])
+    if value_type == "tuplelist":
+        return gp.tuplelist([_decode(v, arrays) for v in value["items"]])
+    if value_type == "tuple":
+        return tuple(_decode(v, arrays) for v in value["items"])
+    if value_type == "set":
+        return {_decode(v, arrays) for v in value["items"]}
+    if value_type == "dict":
+        return {_decode(k, arrays): _decode(v, arrays) for k, v in value["items"]}
+    if value_type in ("range_index", "multi_index", "index"):
+        return _decode_index(value, arrays)
+    if value_type == "series":
+        return pd.Series(
+            _decode_values(value["values"], arrays),
+            index=_decode_index(value["index"], arrays),
+            name=_decode(value["name"], arrays),
+            dtype=value["dtype"],
+        )
+    if value_type == "dataframe":
+        index = _decode_index(value["index"], arrays)
+        frame = pd.DataFrame(
+            {
+                i: pd.Series(_decode_values(values, arrays), index=index, dtype=dtype)
+                for i, (values, dtype) in enumerate(
+                    zip(value["values"], value["dtypes"])
+                )
+            },
+            index=index,
+        )
+        frame.columns = _decode_index(value["columns"], arrays)
+        return frame
+    raise ValueError(f"PowNet: Unknown type {value_type} in the input cache.")
+
+
+def get_input_hash(inputs) -> str:
+    """Return a hash of the parameters of SystemInput and the files in the model folder.
+
+    Args:
+        inputs (SystemInput): The input object. Only the parameters are used.
+
+    Returns:
+        str: The hexadecimal SHA-256 hash.
+    """
+    hasher = hashlib.sha256()
+    params = {param: getattr(inputs, param) for param in INPUT_PARAMS}
+    params["cache_format_version"] = CACHE_FORMAT_VERSION
+    hasher.update(json.dumps(params, sort_keys=True, default=str).encode())
+
+    for root, dirs, files in os.walk(inputs.model_dir):
+        # Skip hidden folders such as the cache itself
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for filename in sorted(files):
+            filepath = os.path.join(root, filename)
+            hasher.update(os.path.relpath(filepath, inputs.model_dir).encode())
+            with open(filepath, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def save_input_cache(inputs, cache_folder: str) -> str:
+    """Save a snapshot of the loaded SystemInput.
+
+    Args:
+        inputs (SystemInput): The input object after load_data and check_data.
+        cache_folder (str): The folder of the snapshots.
+
+    Returns:
+        str: The folder of the snapshot.
+
+    Raises:
+        ValueError: If an attribute has a type that cannot be stored.
+    """
+    input_hash = get_input_hash(inputs)
+    snapshot_folder = os.path.join(cache_folder, input_hash)
+    temp_folder = f"{snapshot_folder}.tmp{os.getpid()}"
+    os.makedirs(temp_folder, exist_ok=True)
+
+    arrays = {}
+    state = {
+        attr: _encode(value, arrays)
+        for attr, value in vars(inputs).items()
+        if attr not in EXCLUDED_ATTRS
+    }
+
+    np.savez(os.path.join(temp_folder, "arrays.npz"), **arrays)
+    with open(os.path.join(temp_folder, "state.json"), "w") as f:
+        json.dump(state, f)
+    with open(os.path.join(temp_folder, "metadata.json"), "w") as f:
+        json.dump(
+            {
+                "hash": input_hash,
+                "cache_format_version": CACHE_FORMAT_VERSION,
+                "model_name": inputs.model_name,
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "attributes": sorted(state),
+            },
+            f,
+            indent=4,
+        )
+
+    # Another process may have saved the same snapshot in the meantime
+    if os.path.exists(snapshot_folder):
+        shutil.rmtree(temp_folder, ignore_errors=True)
+    else:
+        os.replace(temp_folder, snapshot_folder)
+
+    _remove_old_snapshots(cache_folder)
+    return snapshot_folder
+
+
+def _remove_old_snapshots(cache_folder: str) -> None:
+    """Keep the MAX_SNAPSHOTS most recent snapshots."""
+    snapshots = [
+        os.path.join(cache_folder, name)
+        for name in os.listdir(cache_folder)
+        if os.path.exists(os.path.join(cache_folder, name, "metadata.json"))
+    ]
+    snapshots.sort(key=os.path.getmtime, reverse=True)
+    for snapshot_folder in snapshots[MAX_SNAPSHOTS:]:
+        shutil.rmtree(snapshot_folder, ignore_errors=True)
+
+
+def load_input_cache(inputs, cache_folder: str) -> bool:
+    """Restore the attributes of SystemInput from a snapshot with the same hash.
+
+    Args:
+        inputs (SystemInput): The input object to restore.
+        cache_folder (str): The folder of the snapshots.
+
+    Returns:
+        bool: Whether a snapshot was found and restored.
+    """
+    snapshot_folder = os.path.join(cache_folder, get_input_hash(inputs))
+    if not os.path.exists(os.path.join(snapshot_folder, "metadata.json")):
+        return False
+
+    try:
+        with open(os.path.join(snapshot_folder, "state.json")) as f:
+            state = json.load(f)
+        # Object arrays would need a pickle, so they are never read
+        with np.load(
+            os.path.join(snapshot_folder, "arrays.npz"), allow_pickle=False
+        ) as arrays:
+            state = {attr: _decode(value, arrays) for attr, value in state.items()}
+    except Exception as e:
+        logger.warning(
+            f"PowNet: Ignoring the unreadable input cache {snapshot_folder}: {e}"
+        )
+        return False
+
+    vars(inputs).update(state)
+    # Mark the snapshot as recently used
+    os.utime(snapshot_folder)
+    return True
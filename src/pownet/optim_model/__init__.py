@@ -1,6 +1,7 @@
 """The optim_model module provides the core optimization model for power system operations."""
 
 from .model import PowerSystemModel
+from .solution import SolutionLayout
 from .variable_func import (
     add_var_with_variable_ub,
     update_var_with_variable_ub,
@@ -12,4 +13,7 @@ from .objfunc import (
     get_thermal_opex_coeff,
     get_thermal_startup_coeff,
     get_marginal_cost_coeff,
+    get_thermal_opex_array,
+    get_marginal_cost_array,
+    get_objective_terms,
 )
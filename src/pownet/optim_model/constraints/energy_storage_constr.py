@@ -2,6 +2,8 @@
 
 import gurobipy as gp
 
+from pownet.data_model import Timesteps
+
 
 def add_c_link_ess_charge(
     model: gp.Model,
@@ -146,10 +148,12 @@ def add_c_unit_ess_balance(
     charge_efficiency: dict[str, float],
     discharge_efficiency: dict[str, float],
     self_discharge_rate: dict[str, float],
+    timesteps: Timesteps = None,
 ) -> gp.tupledict:
     """Balance for energy storage units at the second time step and onwards.
     The balance equation ensures that the charge state at time t is equal to the charge state at time t-1,
     adjusted for the charging and discharging variables, as well as the self-discharge rate.
+    The charging, discharging, and self-discharge of an aggregated timestep last for its hours.
 
     Args:
         model (gp.Model): The Gurobi model.
@@ -161,18 +165,51 @@ def add_c_unit_ess_balance(
         charge_efficiency (dict[str, float]): Charging efficiency for each unit.
         discharge_efficiency (dict[str, float]): Discharging efficiency for each unit.
         self_discharge_rate (dict[str, float]): Self-discharge rate for each unit.
+        timesteps (Timesteps): The timesteps of the horizon. Default is one per hour.
 
     Returns:
         gp.tupledict: The added constraints.
     """
+    if timesteps is None:
+        timesteps = Timesteps(sim_horizon)
     return model.addConstrs(
         (
             charge_state[unit, t]
-            == (1 - self_discharge_rate[unit]) * charge_state[unit, t - 1]
-            + charge_efficiency[unit] * pcharge[unit, t]
-            - pdischarge[unit, t] / discharge_efficiency[unit]
+            == (1 - self_discharge_rate[unit]) ** timesteps.get_duration(t)
+            * charge_state[unit, t - 1]
+            + timesteps.get_duration(t) * charge_efficiency[unit] * pcharge[unit, t]
+            - timesteps.get_duration(t)
+            * pdischarge[unit, t]
+            / discharge_efficiency[unit]
             for unit in units
-            for t in range(2, sim_horizon + 1)
+            for t in timesteps[1:]
         ),
         name="unit_ess_balance",
     )
+
+
+def update_c_unit_ess_balance_init(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    units: list,
+    charge_state_init: dict[str, float],
+    self_discharge_rate: dict[str, float],
+) -> None:
+    """Update the RHS of the constraints from add_c_unit_ess_balance_init with the
+    initial charge state.
+
+    Args:
+        model (gp.Model): The Gurobi model.
+        constraints (gp.tupledict): The constraints from add_c_unit_ess_balance_init.
+        units (list): List of energy storage units.
+        charge_state_init (dict[str, float]): Initial charge state for each unit.
+        self_discharge_rate (dict[str, float]): Self-discharge rate for each unit.
+
+    Returns:
+        None
+    """
+    model.setAttr(
+        "RHS",
+        [constraints[unit] for unit in units],
+        [(1 - self_discharge_rate[unit]) * charge_state_init[unit] for unit in units],
+    )
@@ -0,0 +1,904 @@
+"""matrix_constr.py: Constraints assembled as sparse matrices.
+
+The functions have the same signatures and return the same keys as their counterparts
+in thermal_unit_constr and system_constr. Instead of building one linear expression per
+constraint, the coefficients of a constraint family are collected in NumPy arrays and
+added at once with gp.Model.addMConstr. The constraints are written as A @ x (sense) rhs
+with the same coefficients, right-hand sides, and names as the expression-based
+constraints, so both build the same model and the update_c_* functions apply to both.
+"""
+
+import gurobipy as gp
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from pownet.data_model import Timesteps, TimeseriesArray
+from pownet.data_utils import get_step_window
+from .system_constr import _get_kvl_edges, _get_kvl_reactance, _get_ptdf_factors
+
+
+class ConstraintMatrix:
+    """Coefficients of a family of constraints in coordinate format.
+
+    Each call of add_terms adds one variable with a coefficient to some rows, like
+    the terms of a linear expression. Gurobi sums the coefficients of a variable that
+    appears more than once in a row and drops zero coefficients.
+
+    Attributes:
+        keys (list): The keys of the constraints in the returned tupledict.
+        names (list[str]): The names of the constraints.
+        rhs (np.ndarray): The right-hand side of each constraint.
+    """
+
+    def __init__(self, keys: list, names: list[str]) -> None:
+        self.keys = keys
+        self.names = names
+        self.rhs = np.zeros(len(keys))
+        self._rows: list[np.ndarray] = []
+        self._coeffs: list[np.ndarray] = []
+        self._variables: list[gp.Var] = []
+
+    def add_terms(
+        self, rows: np.ndarray, variables: list[gp.Var], coeffs: float | np.ndarray
+    ) -> None:
+        """Add coeffs[i] * variables[i] to the row rows[i].
+
+        Args:
+            rows (np.ndarray): The rows of the terms.
+            variables (list[gp.Var]): The variable of each term.
+            coeffs (float | np.ndarray): The coefficient of all terms or of each term.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        self._rows.append(rows)
+        self._coeffs.append(
+            np.broadcast_to(np.asarray(coeffs, dtype=float), rows.shape)
+        )
+        self._variables.extend(variables)
+
+    def add_to_model(self, model: gp.Model, sense: str) -> gp.tupledict:
+        """Add the constraints to the model.
+
+        Args:
+            model (gp.Model): The optimization model
+            sense (str): The sense of all constraints, i.e., "<", ">", or "=".
+
+        Returns:
+            gp.tupledict: The constraints by their keys
+        """
+        if not self.keys:
+            return gp.tupledict()
+        num_terms = len(self._variables)
+        rows = np.concatenate(self._rows) if self._rows else np.empty(0, np.intp)
+        coeffs = np.concatenate(self._coeffs) if self._coeffs else np.empty(0)
+        # Each term has its own column. Repeated variables are summed by Gurobi.
+        A = sp.csr_matrix(
+            (coeffs, (rows, np.arange(num_terms))),
+            shape=(len(self.keys), num_terms),
+        )
+        constrs = model.addMConstr(
+            A,
+            gp.MVar.fromlist(self._variables),
+            sense,
+            self.rhs,
+            name=np.array(self.names, dtype=object),
+        )
+        return gp.tupledict(zip(self.keys, constrs.tolist()))
+
+
+def _get_names(name: str, keys: list) -> list[str]:
+    """Return the names that addConstrs gives to constraints with these keys."""
+    return [
+        (
+            f"{name}[{','.join(map(str, key))}]"
+            if isinstance(key, tuple)
+            else f"{name}[{key}]"
+        )
+        for key in keys
+    ]
+
+
+def _get_unit_time_matrix(
+    name: str, units: list, timesteps: range, use_names_as_keys: bool = False
+) -> tuple[ConstraintMatrix, list[tuple]]:
+    """Return an empty matrix with one row per (unit, t) ordered by unit, then time."""
+    keys = [(unit, t) for unit in units for t in timesteps]
+    names = _get_names(name, keys)
+    return ConstraintMatrix(names if use_names_as_keys else keys, names), keys
+
+
+def _repeat_per_unit(values: dict, units: list, num_timesteps: int) -> np.ndarray:
+    """Repeat the value of each unit for all its timesteps."""
+    return np.repeat(
+        np.array([values[unit] for unit in units], dtype=float), num_timesteps
+    )
+
+
+def _select(variables: gp.tupledict, keys: list) -> list[gp.Var]:
+    return [variables[key] for key in keys]
+
+
+def _shift_keys(keys: list[tuple], offset: int) -> list[tuple]:
+    """Shift the timestep of (unit, t) keys by offset."""
+    return [(unit, t + offset) for unit, t in keys]
+
+
+def _check_hourly(timesteps: Timesteps) -> None:
+    """Raise an error for aggregated timesteps, which only the expression backend supports."""
+    if timesteps is not None and not timesteps.is_hourly:
+        raise ValueError(
+            "PowNet: The matrix backend does not support aggregated timesteps."
+        )
+
+
+def add_c_link_uvw_init(
+    model: gp.Model,
+    u: gp.tupledict,
+    v: gp.tupledict,
+    w: gp.tupledict,
+    thermal_units: list,
+    initial_u: dict,
+) -> gp.tupledict:
+    """Matrix version of thermal_unit_constr.add_c_link_uvw_init."""
+    matrix = ConstraintMatrix(
+        list(thermal_units), _get_names("link_uvw_init", thermal_units)
+    )
+    rows = np.arange(len(thermal_units))
+    keys = [(unit, 1) for unit in thermal_units]
+    # u[unit, 1] - v[unit, 1] + w[unit, 1] == initial_u[unit]
+    matrix.add_terms(rows, _select(u, keys), 1.0)
+    matrix.add_terms(rows, _select(v, keys), -1.0)
+    matrix.add_terms(rows, _select(w, keys), 1.0)
+    matrix.rhs[:] = [initial_u[unit] for unit in thermal_units]
+    return matrix.add_to_model(model, gp.GRB.EQUAL)
+
+
+def add_c_link_uvw(
+    model: gp.Model,
+    u: gp.tupledict,
+    v: gp.tupledict,
+    w: gp.tupledict,
+    sim_horizon: int,
+    thermal_units: list,
+    timesteps: Timesteps = None,
+) -> gp.tupledict:
+    """Matrix version of thermal_unit_constr.add_c_link_uvw."""
+    _check_hourly(timesteps)
+    matrix, keys = _get_unit_time_matrix(
+        "link_uvw", thermal_units, range(2, sim_horizon + 1)
+    )
+    rows = np.arange(len(keys))
+    # u[unit, t] - u[unit, t - 1] - v[unit, t] + w[unit, t] == 0
+    matrix.add_terms(rows, _select(u, keys), 1.0)
+    matrix.add_terms(rows, _select(u, _shift_keys(keys, -1)), -1.0)
+    matrix.add_terms(rows, _select(v, keys), -1.0)
+    matrix.add_terms(rows, _select(w, keys), 1.0)
+    return matrix.add_to_model(model, gp.GRB.EQUAL)
+
+
+def add_c_link_pthermal(
+    model: gp.Model,
+    pthermal: gp.tupledict,
+    p: gp.tupledict,
+    u: gp.tupledict,
+    timesteps: range,
+    thermal_units: list,
+    thermal_min_capacity: dict,
+) -> gp.tupledict:
+    """Matrix version of thermal_unit_constr.add_c_link_pthermal."""
+    matrix, keys = _get_unit_time_matrix("link_pthermal", thermal_units, timesteps)
+    rows = np.arange(len(keys))
+    # pthermal[unit, t] - p[unit, t] - min_capacity[unit] * u[unit, t] == 0
+    matrix.add_terms(rows, _select(pthermal, keys), 1.0)
+    matrix.add_terms(rows, _select(p, keys), -1.0)
+    matrix.add_terms(
+        rows,
+        _select(u, keys),
+        -_repeat_per_unit(thermal_min_capacity, thermal_units, len(timesteps)),
+    )
+    return matrix.add_to_model(model, gp.GRB.EQUAL)
+
+
+def add_c_link_spin(
+    model: gp.Model,
+    p: gp.tupledict,
+    pbar: gp.tupledict,
+    spin: gp.tupledict,
+    timesteps: range,
+    thermal_units,
+) -> gp.tupledict:
+    """Matrix version of thermal_unit_constr.add_c_link_spin."""
+    matrix, keys = _get_unit_time_matrix("link_spin", thermal_units, timesteps)
+    rows = np.arange(len(keys))
+    # pbar[unit, t] - p[unit, t] - spin[unit, t] == 0
+    matrix.add_terms(rows, _select(pbar, keys), 1.0)
+    matrix.add_terms(rows, _select(p, keys), -1.0)
+    matrix.add_terms(rows, _select(spin, keys), -1.0)
+    return matrix.add_to_model(model, gp.GRB.EQUAL)
+
+
+def add_c_link_ppbar(
+    model: gp.Model,
+    p: gp.tupledict,
+    pbar: gp.tupledict,
+    timesteps: range,
+    thermal_units: list,
+) -> gp.tupledict:
+    """Matrix version of thermal_unit_constr.add_c_link_ppbar."""
+    matrix, keys = _get_unit_time_matrix("link_ppbar", thermal_units, timesteps)
+    rows = np.arange(len(keys))
+    # pbar[unit, t] - p[unit, t] >= 0
+    matrix.add_terms(rows, _select(pbar, keys), 1.0)
+    matrix.add_terms(rows, _select(p, keys), -1.0)
+    return matrix.add_to_model(model, gp.GRB.GREATER_EQUAL)
+
+
+def add_c_link_pu_upper(
+    model: gp.Model,
+    pbar: gp.tupledict,
+    u: gp.tupledict,
+    timesteps: range,
+    step_k: int,
+    thermal_units: list,
+    thermal_min_capacity: dict,
+    thermal_derated_capacity: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
+) -> gp.tupledict:
+    """Matrix version of thermal_unit_constr.add_c_link_pu_upper."""
+    matrix, keys = _get_unit_time_matrix("pthermal_ub", thermal_units, timesteps)
+    rows = np.arange(len(keys))
+    # Ordered by unit, then time
+    derated_capacity = get_step_window(
+        thermal_derated_capacity,
+        timesteps,
+        step_k,
+        thermal_units,
+        step_hours=step_hours,
+    ).T.ravel()
+    # pbar[unit, t] + (min_capacity[unit] - derated_capacity[unit, t]) * u[unit, t] <= 0
+    matrix.add_terms(rows, _select(pbar, keys), 1.0)
+    matrix.add_terms(
+        rows,
+        _select(u, keys),
+        _repeat_per_unit(thermal_min_capacity, thermal_units, len(timesteps))
+        - derated_capacity,
+    )
+    return matrix.add_to_model(model, gp.GRB.LESS_EQUAL)
+
+
+def _add_c_min_duration_init(
+    model: gp.Model,
+    u: gp.tupledict,
+    name: str,
+    sim_horizon: int,
+    thermal_units: list,
+    initial_min_duration: dict,
+    is_online: bool,
+) -> gp.tupledict:
+    """Fix the status of each unit during its remaining minimum up- or downtime."""
+    names = _get_names(name, thermal_units)
+    matrix = ConstraintMatrix(names, names)
+    for row, unit in enumerate(thermal_units):
+        # Find the min between the required duration and the simulation horizon
+        min_duration = min(initial_min_duration[unit], sim_horizon)
+        matrix.add_terms(
+            np.full(min_duration, row),
+            [u[unit, t] for t in range(1, min_duration + 1)],
+            1.0,
+        )
+        if is_online:
+            matrix.rhs[row] = min_duration
+    return matrix.add_to_model(model, gp.GRB.EQUAL)
+
+
+def add_c_min_down_init(
+    model: gp.Model,
+    u: gp.tupledict,
+    sim_horizon: int,
+    thermal_units: list,
+    initial_min_off: dict,
+    timesteps: Timesteps = None,
+) -> gp.tupledict:
+    """Matrix version of thermal_unit_constr.add_c_min_down_init."""
+    _check_hourly(timesteps)
+    return _add_c_min_duration_init(
+        model=model,
+        u=u,
+        name="minDownInit",
+        sim_horizon=sim_horizon,
+        thermal_units=thermal_units,
+        initial_min_duration=initial_min_off,
+        is_online=False,
+    )
+
+
+def add_c_min_up_init(
+    model: gp.Model,
+    u: gp.tupledict,
+    sim_horizon: int,
+    thermal_units: list,
+    initial_min_on: dict,
+    timesteps: Timesteps = None,
+) -> gp.tupledict:
+    """Matrix version of thermal_unit_constr.add_c_min_up_init."""
+    _check_hourly(timesteps)
+    return _add_c_min_duration_init(
+        model=model,
+        u=u,
+        name="minUpInit",
+        sim_horizon=sim_horizon,
+        thermal_units=thermal_units,
+        initial_min_duration=initial_min_on,
+        is_online=True,
+    )
+
+
+def _add_c_min_duration(
+    model: gp.Model,
+    u: gp.tupledict,
+    transition: gp.tupledict,
+    name: str,
+    sim_horizon: int,
+    thermal_units: list,
+    min_duration: dict,
+    u_coeff: float,
+    unit_count: dict = None,
+) -> gp.tupledict:
+    """Sum of the startups (shutdowns) in the last min_duration timesteps
+    + u_coeff * u[unit, t] <= rhs, where rhs is 0 for startups and the number of
+    units (1 without clusters) for shutdowns."""
+    keys = [
+        (unit, t)
+        for unit in thermal_units
+        for t in range(min_duration[unit], sim_horizon + 1)
+    ]
+    names = _get_names(name, keys)
+    matrix = ConstraintMatrix(names, names)
+    rows = np.arange(len(keys))
+    row_duration = np.array([min_duration[unit] for unit, _ in keys], dtype=np.intp)
+    # Term i of a row is the transition at timestep t - i
+    for i in range(int(row_duration.max(initial=0))):
+        has_term = row_duration > i
+        matrix.add_terms(
+            rows[has_term],
+            [
+                transition[unit, t - i]
+                for (unit, t), has in zip(keys, has_term.tolist())
+                if has
+            ],
+            1.0,
+        )
+    matrix.add_terms(rows, _select(u, keys), u_coeff)
+    if u_coeff > 0:
+        if unit_count is None:
+            unit_count = {}
+        matrix.rhs[:] = [unit_count.get(unit, 1) for unit, _ in keys]
+    return matrix.add_to_model(model, gp.GRB.LESS_EQUAL)
+
+
+def add_c_min_down(
+    model: gp.Model,
+    u: gp.tupledict,
+    w: gp.tupledict,
+    sim_horizon: int,
+    thermal_units: list,
+    TD: dict,
+    timesteps: Timesteps = None,
+    unit_count: dict = None,
+) -> gp.tupledict:
+    """Matrix version of thermal_unit_constr.add_c_min_down."""
+    _check_hourly(timesteps)
+    # Sum of w over the last TD timesteps + u[unit, t] <= 1
+    return _add_c_min_duration(
+        model=model,
+        u=u,
+        transition=w,
+        name="minDown",
+        sim_horizon=sim_horizon,
+        thermal_units=thermal_units,
+        min_duration=TD,
+        u_coeff=1.0,
+        unit_count=unit_count,
+    )
+
+
+def add_c_min_up(
+    model: gp.Model,
+    u: gp.tupledict,
+    v: gp.tupledict,
+    sim_horizon: int,
+    thermal_units: list,
+    TU: dict,
+    timesteps: Timesteps = None,
+) -> gp.tupledict:
+    """Matrix version of thermal_unit_constr.add_c_min_up."""
+    _check_hourly(timesteps)
+    # Sum of v over the last TU timesteps - u[unit, t] <= 0
+    return _add_c_min_duration(
+        model=model,
+        u=u,
+        transition=v,
+        name="minUp",
+        sim_horizon=sim_horizon,
+        thermal_units=thermal_units,
+        min_duration=TU,
+        u_coeff=-1.0,
+    )
+
+
+def _get_ramp_coeff(
+    thermal_units: list, thermal_min_capacity: dict, ramp_rate: dict, start_rate: dict
+) -> dict:
+    """Return start_rate - min_capacity - ramp_rate of each unit."""
+    return {
+        unit: start_rate[unit] - thermal_min_capacity[unit] - ramp_rate[unit]
+        for unit in thermal_units
+    }
+
+
+def add_c_ramp_down_init(
+    model: gp.Model,
+    p: gp.tupledict,
+    w: gp.tupledict,
+    thermal_units: list,
+    initial_p: dict,
+    initial_u: dict,
+    thermal_min_capacity: dict,
+    RD: dict,
+    SD: dict,
+) -> gp.tupledict:
+    """Matrix version of thermal_unit_constr.add_c_ramp_down_init."""
+    matrix = ConstraintMatrix(
+        list(thermal_units), _get_names("rampDownInit", thermal_units)
+    )
+    rows = np.arange(len(thermal_units))
+    keys = [(unit, 1) for unit in thermal_units]
+    coeff = _get_ramp_coeff(thermal_units, thermal_min_capacity, RD, SD)
+    # - p[unit, 1] - (SD - min_capacity - RD) * w[unit, 1] <= RD * initial_u - initial_p
+    matrix.add_terms(rows, _select(p, keys), -1.0)
+    matrix.add_terms(rows, _select(w, keys), -_repeat_per_unit(coeff, thermal_units, 1))
+    matrix.rhs[:] = [
+        -(initial_p[unit] - RD[unit] * initial_u[unit]) for unit in thermal_units
+    ]
+    return matrix.add_to_model(model, gp.GRB.LESS_EQUAL)
+
+
+def add_c_ramp_down(
+    model: gp.Model,
+    p: gp.tupledict,
+    u: gp.tupledict,
+    w: gp.tupledict,
+    sim_horizon: int,
+    thermal_units: list,
+    thermal_min_capacity: dict,
+    RD: dict,
+    SD: dict,
+    timesteps: Timesteps = None,
+) -> gp.tupledict:
+    """Matrix version of thermal_unit_constr.add_c_ramp_down."""
+    _check_hourly(timesteps)
+    timesteps = range(2, sim_horizon + 1)
+    matrix, keys = _get_unit_time_matrix("rampDown", thermal_units, timesteps)
+    rows = np.arange(len(keys))
+    coeff = _get_ramp_coeff(thermal_units, thermal_min_capacity, RD, SD)
+    # p[unit, t - 1] - p[unit, t] - (SD - min_capacity - RD) * w[unit, t]
+    # - RD * u[unit, t - 1] <= 0
+    previous_keys = _shift_keys(keys, -1)
+    matrix.add_terms(rows, _select(p, previous_keys), 1.0)
+    matrix.add_terms(rows, _select(p, keys), -1.0)
+    matrix.add_terms(
+        rows, _select(w, keys), -_repeat_per_unit(coeff, thermal_units, len(timesteps))
+    )
+    matrix.add_terms(
+        rows,
+        _select(u, previous_keys),
+        -_repeat_per_unit(RD, thermal_units, len(timesteps)),
+    )
+    return matrix.add_to_model(model, gp.GRB.LESS_EQUAL)
+
+
+def add_c_ramp_up_init(
+    model: gp.Model,
+    pbar: gp.tupledict,
+    u: gp.tupledict,
+    v: gp.tupledict,
+    thermal_units: list,
+    initial_p: dict,
+    thermal_min_capacity: dict,
+    RU: dict,
+    SU: dict,
+) -> gp.tupledict:
+    """Matrix version of thermal_unit_constr.add_c_ramp_up_init."""
+    matrix = ConstraintMatrix(
+        list(thermal_units), _get_names("rampUpInit", thermal_units)
+    )
+    rows = np.arange(len(thermal_units))
+    keys = [(unit, 1) for unit in thermal_units]
+    coeff = _get_ramp_coeff(thermal_units, thermal_min_capacity, RU, SU)
+    # pbar[unit, 1] - (SU - min_capacity - RU) * v[unit, 1] - RU * u[unit, 1] <= initial_p
+    matrix.add_terms(rows, _select(pbar, keys), 1.0)
+    matrix.add_terms(rows, _select(v, keys), -_repeat_per_unit(coeff, thermal_units, 1))
+    matrix.add_terms(rows, _select(u, keys), -_repeat_per_unit(RU, thermal_units, 1))
+    matrix.rhs[:] = [initial_p[unit] for unit in thermal_units]
+    return matrix.add_to_model(model, gp.GRB.LESS_EQUAL)
+
+
+def add_c_ramp_up(
+    model: gp.Model,
+    p: gp.tupledict,
+    pbar: gp.tupledict,
+    u: gp.tupledict,
+    v: gp.tupledict,
+    sim_horizon: int,
+    thermal_units: list,
+    thermal_min_capacity: dict,
+    RU: dict,
+    SU: dict,
+    timesteps: Timesteps = None,
+) -> gp.tupledict:
+    """Matrix version of thermal_unit_constr.add_c_ramp_up."""
+    _check_hourly(timesteps)
+    timesteps = range(2, sim_horizon + 1)
+    matrix, keys = _get_unit_time_matrix("rampUp", thermal_units, timesteps)
+    rows = np.arange(len(keys))
+    coeff = _get_ramp_coeff(thermal_units, thermal_min_capacity, RU, SU)
+    # pbar[unit, t] - p[unit, t - 1] - (SU - min_capacity - RU) * v[unit, t]
+    # - RU * u[unit, t] <= 0
+    matrix.add_terms(rows, _select(pbar, keys), 1.0)
+    matrix.add_terms(rows, _select(p, _shift_keys(keys, -1)), -1.0)
+    matrix.add_terms(
+        rows, _select(v, keys), -_repeat_per_unit(coeff, thermal_units, len(timesteps))
+    )
+    matrix.add_terms(
+        rows, _select(u, keys), -_repeat_per_unit(RU, thermal_units, len(timesteps))
+    )
+    return matrix.add_to_model(model, gp.GRB.LESS_EQUAL)
+
+
+def _add_reserve_terms(
+    matrix: ConstraintMatrix,
+    variables: gp.tupledict,
+    units: list,
+    timesteps: range,
+    coeffs: dict = None,
+) -> None:
+    """Add the variables of all units to the row of each timestep."""
+    rows = np.tile(np.arange(len(timesteps)), len(units))
+    keys = [(unit, t) for unit in units for t in timesteps]
+    if coeffs is None:
+        matrix.add_terms(rows, _select(variables, keys), 1.0)
+    else:
+        matrix.add_terms(
+            rows,
+            _select(variables, keys),
+            _repeat_per_unit(coeffs, units, len(timesteps)),
+        )
+
+
+def add_c_reserve_req_1(
+    model: gp.Model,
+    spin: gp.tupledict,
+    charge_state: gp.tupledict,
+    spin_shortfall: gp.tupledict,
+    timesteps: range,
+    step_k: int,
+    thermal_units: list,
+    storage_units: list,
+    spin_requirement: pd.Series | TimeseriesArray,
+    step_hours: int = 24,
+) -> gp.tupledict:
+    """Matrix version of system_constr.add_c_reserve_req_1."""
+    matrix = ConstraintMatrix(list(timesteps), _get_names("reserveReq1", timesteps))
+    _add_reserve_terms(matrix, spin, thermal_units, timesteps)
+    _add_reserve_terms(matrix, charge_state, storage_units, timesteps)
+    matrix.add_terms(
+        np.arange(len(timesteps)), [spin_shortfall[t] for t in timesteps], 1.0
+    )
+    matrix.rhs[:] = get_step_window(
+        spin_requirement, timesteps, step_k, step_hours=step_hours
+    )
+    return matrix.add_to_model(model, gp.GRB.GREATER_EQUAL)
+
+
+def add_c_reserve_req_2(
+    model: gp.Model,
+    pbar: gp.tupledict,
+    u: gp.tupledict,
+    charge_state: gp.tupledict,
+    spin_shortfall: gp.tupledict,
+    timesteps: range,
+    step_k: int,
+    thermal_units: list,
+    thermal_min_capacity: dict,
+    storage_units: list,
+    total_demand: pd.Series | TimeseriesArray,
+    spin_requirement: pd.Series | TimeseriesArray,
+    step_hours: int = 24,
+) -> gp.tupledict:
+    """Matrix version of system_constr.add_c_reserve_req_2."""
+    matrix = ConstraintMatrix(list(timesteps), _get_names("reserveReq2", timesteps))
+    _add_reserve_terms(matrix, pbar, thermal_units, timesteps)
+    _add_reserve_terms(matrix, u, thermal_units, timesteps, thermal_min_capacity)
+    _add_reserve_terms(matrix, charge_state, storage_units, timesteps)
+    matrix.add_terms(
+        np.arange(len(timesteps)), [spin_shortfall[t] for t in timesteps], 1.0
+    )
+    matrix.rhs[:] = get_step_window(
+        total_demand, timesteps, step_k, step_hours=step_hours
+    ) + get_step_window(spin_requirement, timesteps, step_k, step_hours=step_hours)
+    return matrix.add_to_model(model, gp.GRB.GREATER_EQUAL)
+
+
+def add_c_flow_balance(
+    model: gp.Model,
+    pthermal: gp.tupledict,
+    phydro: gp.tupledict,
+    psolar: gp.tupledict,
+    pwind: gp.tupledict,
+    pimp: gp.tupledict,
+    pcharge: gp.tupledict,
+    pdis: gp.tupledict,
+    pos_pmismatch: gp.tupledict,
+    neg_pmismatch: gp.tupledict,
+    flow_fwd: gp.tupledict,
+    flow_bwd: gp.tupledict,
+    timesteps: range,
+    step_k: int,
+    thermal_units: list,
+    hydro_units: list,
+    solar_units: list,
+    wind_units: list,
+    import_units: list,
+    nodes: list,
+    node_edge: dict,
+    node_generator: dict,
+    ess_charge_units: dict,
+    ess_discharge_units: dict,
+    demand_nodes: list,
+    demand: pd.DataFrame | TimeseriesArray,
+    gen_loss_factor: float,
+    line_loss_factor: float,
+    step_hours: int = 24,
+    pinj: gp.tupledict = None,
+) -> gp.tupledict:
+    """Matrix version of system_constr.add_c_flow_balance."""
+
+    def get_unit_generation_vars(unit: str) -> gp.tupledict:
+        if unit in thermal_units:
+            return pthermal
+        elif unit in hydro_units:
+            return phydro
+        elif unit in solar_units:
+            return psolar
+        elif unit in wind_units:
+            return pwind
+        elif unit in import_units:
+            return pimp
+        else:
+            raise ValueError(
+                f"PowNet: Unit {unit} not found in any of the generation types but is connected to the node."
+            )
+
+    # Generation efficiency after considering system-wide losses at the source
+    gen_efficiency = 1 - gen_loss_factor
+    # Line efficiency (power received / power sent)
+    line_efficiency = 1 - line_loss_factor
+
+    # Rows are ordered by time, then node
+    keys = [(node, t) for t in timesteps for node in nodes]
+    names = _get_names("flowBal", keys)
+    matrix = ConstraintMatrix(names, names)
+    num_nodes = len(nodes)
+
+    for n, node in enumerate(nodes):
+        rows = np.arange(len(timesteps)) * num_nodes + n
+        # Terms of the node as (variables, key of the variables without time, coefficient)
+        terms = []
+        for unit_g in node_generator[node]:
+            terms.append((get_unit_generation_vars(unit_g), (unit_g,), gen_efficiency))
+        if pinj:
+            terms.append((pinj, (node,), -1.0))
+        else:
+            for x, y in node_edge.get(node, []):
+                if x == node:
+                    terms.append((flow_fwd, (x, y), -1.0))
+                    terms.append((flow_bwd, (node, y), line_efficiency))
+                elif y == node:
+                    terms.append((flow_fwd, (x, node), line_efficiency))
+                    terms.append((flow_bwd, (x, node), -1.0))
+        terms.append((pos_pmismatch, (node,), 1.0))
+        terms.append((neg_pmismatch, (node,), -1.0))
+        # Discharge is already factored in the discharge efficiency in the ESS balance
+        for storage_system in ess_discharge_units.get(node, []):
+            terms.append((pdis, (storage_system,), 1.0))
+        # Charging is moved from the right-hand side
+        for storage_system in ess_charge_units.get(node, []):
+            terms.append((pcharge, (storage_system,), -1.0))
+
+        for variables, key, coeff in terms:
+            matrix.add_terms(rows, [variables[key + (t,)] for t in timesteps], coeff)
+
+    demand_node_idx = {node: idx for idx, node in enumerate(demand_nodes)}
+    step_demand = get_step_window(
+        demand, timesteps, step_k, demand_nodes, step_hours=step_hours
+    )
+    rhs = matrix.rhs.reshape(len(timesteps), num_nodes)
+    for n, node in enumerate(nodes):
+        if node in demand_node_idx:
+            rhs[:, n] = step_demand[:, demand_node_idx[node]]
+    return matrix.add_to_model(model, gp.GRB.EQUAL)
+
+
+def add_c_angle_diff(
+    model: gp.Model,
+    flow_fwd: gp.tupledict,
+    flow_bwd: gp.tupledict,
+    theta: gp.tupledict,
+    timesteps: range,
+    step_k: int,
+    edges: list,
+    susceptance: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
+) -> gp.tupledict:
+    """Matrix version of system_constr.add_c_angle_diff."""
+    # Rows are ordered by edge, then time
+    keys = [(a, b, t) for (a, b) in edges for t in timesteps]
+    matrix = ConstraintMatrix(keys, _get_names("angleDiff", keys))
+    rows = np.arange(len(keys))
+    step_susceptance = get_step_window(
+        susceptance, timesteps, step_k, edges, step_hours=step_hours
+    ).T.ravel()
+    # flow_fwd - flow_bwd - susceptance * theta[a, t] + susceptance * theta[b, t] == 0
+    matrix.add_terms(rows, [flow_fwd[key] for key in keys], 1.0)
+    matrix.add_terms(rows, [flow_bwd[key] for key in keys], -1.0)
+    matrix.add_terms(rows, [theta[a, t] for a, _, t in keys], -step_susceptance)
+    matrix.add_terms(rows, [theta[b, t] for _, b, t in keys], step_susceptance)
+    return matrix.add_to_model(model, gp.GRB.EQUAL)
+
+
+def add_c_kirchhoff(
+    model: gp.Model,
+    flow_fwd: gp.tupledict,
+    flow_bwd: gp.tupledict,
+    timesteps: range,
+    step_k: int,
+    edges: list,
+    cycle_map: dict,
+    susceptance: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
+) -> gp.tupledict:
+    """Matrix version of system_constr.add_c_kirchhoff."""
+    kvl_edges = _get_kvl_edges(cycle_map, edges)
+    reactance = _get_kvl_reactance(
+        susceptance, timesteps, step_k, kvl_edges, step_hours=step_hours
+    )
+
+    # Rows are ordered by cycle, then time
+    names = [f"kirchhoff[{cycle_id},{t}]" for cycle_id in kvl_edges for t in timesteps]
+    matrix = ConstraintMatrix(names, names)
+    num_timesteps = len(timesteps)
+    for c, edges_for_kvl_sum_in_this_cycle in enumerate(kvl_edges.values()):
+        rows = np.arange(num_timesteps) + c * num_timesteps
+        for (a, b), sign in edges_for_kvl_sum_in_this_cycle:
+            # sign * reactance * (flow_fwd - flow_bwd)
+            coeff = sign * np.array(reactance[a, b])
+            matrix.add_terms(rows, [flow_fwd[a, b, t] for t in timesteps], coeff)
+            matrix.add_terms(rows, [flow_bwd[a, b, t] for t in timesteps], -coeff)
+    return matrix.add_to_model(model, gp.GRB.EQUAL)
+
+
+def add_c_ptdf_flow(
+    model: gp.Model,
+    pinj: gp.tupledict,
+    timesteps: range,
+    lines: list,
+    ptdf: pd.DataFrame,
+    line_limits: dict[tuple[str, str, int], float],
+    direction: str,
+) -> gp.tupledict:
+    """Matrix version of system_constr.add_c_ptdf_flow."""
+    if direction not in ["fwd", "bwd"]:
+        raise ValueError("PowNet: The direction must be either 'fwd' or 'bwd'.")
+    sign = 1.0 if direction == "fwd" else -1.0
+    ptdf_factors = _get_ptdf_factors(ptdf, lines)
+
+    # Rows are ordered by line, then time
+    keys = [(a, b, t) for (a, b) in lines for t in timesteps]
+    matrix = ConstraintMatrix(keys, _get_names(f"ptdf{direction.capitalize()}", keys))
+    num_timesteps = len(timesteps)
+    for i, line in enumerate(lines):
+        rows = np.arange(num_timesteps) + i * num_timesteps
+        for node, factor in zip(*ptdf_factors[line]):
+            matrix.add_terms(rows, [pinj[node, t] for t in timesteps], sign * factor)
+    matrix.rhs[:] = [line_limits[key] for key in keys]
+    return matrix.add_to_model(model, gp.GRB.LESS_EQUAL)
+
+
+def add_c_thermal_curtail_ess(
+    model: gp.Model,
+    pthermal: gp.tupledict,
+    pthermal_curtail: gp.tupledict,
+    pcharge: gp.tupledict,
+    timesteps: range,
+    step_k: int,
+    thermal_must_take_units: list,
+    thermal_derated_capacity: pd.DataFrame | TimeseriesArray,
+    ess_attached: dict,
+    step_hours: int = 24,
+) -> gp.tupledict:
+    """Matrix version of system_constr.add_c_thermal_curtail_ess."""
+    return _add_c_curtail_ess(
+        model=model,
+        pdispatch=pthermal,
+        pcurtail=pthermal_curtail,
+        pcharge=pcharge,
+        name="thermal_curtail",
+        timesteps=timesteps,
+        step_k=step_k,
+        units=thermal_must_take_units,
+        capacity_df=thermal_derated_capacity,
+        ess_attached=ess_attached,
+        step_hours=step_hours,
+    )
+
+
+def add_c_unit_curtail_ess(
+    model: gp.Model,
+    pdispatch: gp.tupledict,
+    pcurtail: gp.tupledict,
+    pcharge: gp.tupledict,
+    unit_type: str,
+    timesteps: range,
+    step_k: int,
+    units: list,
+    capacity_df: pd.DataFrame | TimeseriesArray,
+    ess_attached: dict[str, list[str]],
+    step_hours: int = 24,
+) -> gp.tupledict:
+    """Matrix version of system_constr.add_c_unit_curtail_ess."""
+    return _add_c_curtail_ess(
+        model=model,
+        pdispatch=pdispatch,
+        pcurtail=pcurtail,
+        pcharge=pcharge,
+        name=f"{unit_type}_curtail_ess",
+        timesteps=timesteps,
+        step_k=step_k,
+        units=units,
+        capacity_df=capacity_df,
+        ess_attached=ess_attached,
+        step_hours=step_hours,
+    )
+
+
+def _add_c_curtail_ess(
+    model: gp.Model,
+    pdispatch: gp.tupledict,
+    pcurtail: gp.tupledict,
+    pcharge: gp.tupledict,
+    name: str,
+    timesteps: range,
+    step_k: int,
+    units: list,
+    capacity_df: pd.DataFrame | TimeseriesArray,
+    ess_attached: dict[str, list[str]],
+    step_hours: int = 24,
+) -> gp.tupledict:
+    """Dispatch + curtailment + charging of the attached ESS == capacity of each unit."""
+    matrix, keys = _get_unit_time_matrix(name, units, timesteps, use_names_as_keys=True)
+    rows = np.arange(len(keys))
+    matrix.add_terms(rows, _select(pdispatch, keys), 1.0)
+    matrix.add_terms(rows, _select(pcurtail, keys), 1.0)
+    num_timesteps = len(timesteps)
+    for j, unit in enumerate(units):
+        # A unit may have multiple storage systems
+        for storage_unit in ess_attached.get(unit, []):
+            matrix.add_terms(
+                rows[j * num_timesteps : (j + 1) * num_timesteps],
+                [pcharge[storage_unit, t] for t in timesteps],
+                1.0,
+            )
+    matrix.rhs[:] = get_step_window(
+        capacity_df, timesteps, step_k, units, step_hours=step_hours
+    ).T.ravel()
+    return matrix.add_to_model(model, gp.GRB.EQUAL)
@@ -3,6 +3,9 @@
 import gurobipy as gp
 import pandas as pd
 
+from pownet.data_model import Timesteps, TimeseriesArray, as_timeseries_array
+from pownet.data_utils import get_first_day
+
 
 def add_c_hourly_unit_ub(
     model: gp.Model,
@@ -79,7 +82,9 @@ def add_c_hydro_limit_daily(
     step_k: int,
     sim_horizon: int,
     hydro_units: list,
-    hydro_capacity: pd.DataFrame,
+    hydro_capacity: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
+    timesteps: Timesteps = None,
 ) -> gp.tupledict:
     """
     Add constraints to limit hydropower by the daily amount. The sum of dispatch variables
@@ -89,9 +94,11 @@ def add_c_hydro_limit_daily(
         model (gp.Model): The optimization model
         phydro (gp.tupledict): The power output of hydro units
         step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
         sim_horizon (int): The simulation horizon
         hydro_units (list): The list of hydro units
-        hydro_capacity (pd.DataFrame): The daily capacity of the hydro unit
+        hydro_capacity (pd.DataFrame | TimeseriesArray): The daily capacity of the hydro unit
+        timesteps (Timesteps): The timesteps of the horizon. Default is one per hour.
 
     Returns:
         gp.tupledict: The constraints for the daily hydro limit
@@ -106,18 +113,29 @@ def add_c_hydro_limit_daily(
         raise ValueError(
             "The simulation horizon must be divisible by 24 when using daily hydropower capacity."
         )
+    if timesteps is None:
+        timesteps = Timesteps(sim_horizon)
     constraints = gp.tupledict()
     max_day = sim_horizon // 24
-    for day in range(step_k, step_k + max_day):
-        for hydro_unit in hydro_units:
-            current_day = day - step_k + 1
+    first_day = get_first_day(step_k, step_hours)
+    hydro_units = list(hydro_units)
+    daily_capacity = (
+        as_timeseries_array(hydro_capacity)
+        .get_window(first_day, max_day, hydro_units)
+        .tolist()
+    )
+    for day in range(first_day, first_day + max_day):
+        for j, hydro_unit in enumerate(hydro_units):
+            current_day = day - first_day + 1
             cname = f"hydro_limit_daily[{hydro_unit},{current_day}]"
             constraints[cname] = model.addConstr(
                 gp.quicksum(
-                    phydro[hydro_unit, t]
-                    for t in range(1 + (current_day - 1) * 24, current_day * 24 + 1)
+                    timesteps.get_duration(t) * phydro[hydro_unit, t]
+                    for t in timesteps.get_timesteps_between(
+                        1 + (current_day - 1) * 24, current_day * 24
+                    )
                 )
-                <= hydro_capacity.loc[day, hydro_unit],
+                <= daily_capacity[current_day - 1][j],
                 name=cname,
             )
     return constraints
@@ -130,6 +148,8 @@ def add_c_hydro_limit_daily_dict(
     sim_horizon: int,
     hydro_units: list,
     hydro_capacity_dict: dict[tuple[str, int], float],
+    step_hours: int = 24,
+    timesteps: Timesteps = None,
 ) -> gp.tupledict:
     """
     Add constraints to limit hydropower by the daily amount. The sum of dispatch variables
@@ -139,9 +159,11 @@ def add_c_hydro_limit_daily_dict(
         model (gp.Model): The optimization model
         phydro (gp.tupledict): The power output of hydro units
         step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
         sim_horizon (int): The simulation horizon
         hydro_units (list): The list of hydro units
         hydro_capacity_dict: The daily capacity of the hydro unit
+        timesteps (Timesteps): The timesteps of the horizon. Default is one per hour.
 
     Returns:
         gp.tupledict: The constraints for the daily hydro limit
@@ -159,16 +181,21 @@ def add_c_hydro_limit_daily_dict(
         raise ValueError(
             "The simulation horizon must be divisible by 24 when using daily hydropower capacity."
         )
+    if timesteps is None:
+        timesteps = Timesteps(sim_horizon)
     constraints = gp.tupledict()
     max_day = sim_horizon // 24
-    for day in range(step_k, step_k + max_day):
+    first_day = get_first_day(step_k, step_hours)
+    for day in range(first_day, first_day + max_day):
         for hydro_unit in hydro_units:
-            current_day = day - step_k + 1
+            current_day = day - first_day + 1
             cname = f"hydro_limit_daily[{hydro_unit},{current_day}]"
             constraints[cname] = model.addConstr(
                 gp.quicksum(
-                    phydro[hydro_unit, t]
-                    for t in range(1 + (current_day - 1) * 24, current_day * 24 + 1)
+                    timesteps.get_duration(t) * phydro[hydro_unit, t]
+                    for t in timesteps.get_timesteps_between(
+                        1 + (current_day - 1) * 24, current_day * 24
+                    )
                 )
                 <= hydro_capacity_dict[hydro_unit, day],
                 name=cname,
@@ -184,6 +211,7 @@ def add_c_hydro_limit_weekly(
     hydro_units: list,
     hydro_capacity: pd.DataFrame,
     hydro_capacity_min: pd.DataFrame,
+    timesteps: Timesteps = None,
 ) -> gp.tupledict:
     """
     Defines the weekly limit (lower and upper bounds) of hydro generation.
@@ -196,6 +224,8 @@ def add_c_hydro_limit_weekly(
         sim_horizon (int): The simulation horizon
         hydro_units (list): The list of hydro units
         hydro_capacity (pd.DataFrame): The capacity of the hydro unit
+        hydro_capacity_min (pd.DataFrame): The minimum capacity of the hydro unit
+        timesteps (Timesteps): The timesteps of the horizon. Default is one per hour.
 
     Returns:
         gp.tupledict: The constraints for the weekly hydro limit
@@ -213,6 +243,8 @@ def add_c_hydro_limit_weekly(
         raise ValueError(
             "The simulation horizon must be divisible by 168 when using weekly hydropower capacity."
         )
+    if timesteps is None:
+        timesteps = Timesteps(sim_horizon)
     constraints = gp.tupledict()
     max_week = sim_horizon // 168
     for week in range(step_k, step_k + max_week):
@@ -220,12 +252,15 @@ def add_c_hydro_limit_weekly(
             cname = f"hydro_limit_weekly_ub[{hydro_unit},{week}]"
             cname_min = f"hydro_limit_weekly_lb[{hydro_unit},{week}]"
             current_week = week - step_k + 1
+            timesteps_in_week = timesteps.get_timesteps_between(
+                1 + (current_week - 1) * 168, current_week * 168
+            )
 
             # Upper bound constraint
             constraints[cname] = model.addConstr(
                 gp.quicksum(
-                    phydro[hydro_unit, t]
-                    for t in range(1 + (current_week - 1) * 168, current_week * 168 + 1)
+                    timesteps.get_duration(t) * phydro[hydro_unit, t]
+                    for t in timesteps_in_week
                 )
                 <= hydro_capacity.loc[week, hydro_unit],
                 name=cname,
@@ -234,10 +269,118 @@ def add_c_hydro_limit_weekly(
             # Lower bound constraint
             constraints[cname_min] = model.addConstr(
                 gp.quicksum(
-                    phydro[hydro_unit, t]
-                    for t in range(1 + (current_week - 1) * 168, current_week * 168 + 1)
+                    timesteps.get_duration(t) * phydro[hydro_unit, t]
+                    for t in timesteps_in_week
                 )
                 >= hydro_capacity_min.loc[week, hydro_unit],
                 name=cname_min,
             )
     return constraints
+
+
+def update_c_hydro_limit_daily(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    step_k: int,
+    sim_horizon: int,
+    hydro_units: list,
+    hydro_capacity: pd.DataFrame | TimeseriesArray | dict[tuple[str, int], float],
+    step_hours: int = 24,
+) -> None:
+    """Update the RHS of the constraints from add_c_hydro_limit_daily with the
+    daily capacity of the current step.
+
+    Args:
+        model (gp.Model): The optimization model
+        constraints (gp.tupledict): The constraints from add_c_hydro_limit_daily
+        step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
+        sim_horizon (int): The simulation horizon
+        hydro_units (list): The list of hydro units
+        hydro_capacity (pd.DataFrame | TimeseriesArray | dict[tuple[str, int], float]): The daily
+            capacity of the hydro unit as a timeseries indexed by day or a dictionary keyed by (unit, day)
+
+    Returns:
+        None
+    """
+    max_day = sim_horizon // 24
+    first_day = get_first_day(step_k, step_hours)
+    hydro_units = list(hydro_units)
+    unit_days = [
+        (hydro_unit, day)
+        for day in range(first_day, first_day + max_day)
+        for hydro_unit in hydro_units
+    ]
+    if isinstance(hydro_capacity, (pd.DataFrame, TimeseriesArray)):
+        # The rows of the window are days and the columns are units
+        rhs_values = (
+            as_timeseries_array(hydro_capacity)
+            .get_window(first_day, max_day, hydro_units)
+            .ravel()
+            .tolist()
+        )
+    else:
+        rhs_values = [hydro_capacity[unit, day] for unit, day in unit_days]
+
+    model.setAttr(
+        "RHS",
+        [
+            constraints[f"hydro_limit_daily[{hydro_unit},{day - first_day + 1}]"]
+            for hydro_unit, day in unit_days
+        ],
+        rhs_values,
+    )
+
+
+def update_c_hydro_limit_weekly(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    step_k: int,
+    sim_horizon: int,
+    hydro_units: list,
+    hydro_capacity: pd.DataFrame,
+    hydro_capacity_min: pd.DataFrame,
+) -> gp.tupledict:
+    """Update the RHS of the constraints from add_c_hydro_limit_weekly with the
+    weekly capacity of the current step. The constraints are named after the week
+    of the simulation, so they are renamed as well.
+
+    Args:
+        model (gp.Model): The optimization model
+        constraints (gp.tupledict): The constraints from add_c_hydro_limit_weekly
+        step_k (int): The current iteration
+        sim_horizon (int): The simulation horizon
+        hydro_units (list): The list of hydro units
+        hydro_capacity (pd.DataFrame): The capacity of the hydro unit
+        hydro_capacity_min (pd.DataFrame): The minimum capacity of the hydro unit
+
+    Returns:
+        gp.tupledict: The constraints indexed by their new names.
+    """
+    if len(hydro_units) == 0:
+        return gp.tupledict()
+
+    # The constraints were added as (upper bound, lower bound) pairs of each week and unit
+    old_constraints = list(constraints.values())
+    updated_constraints = gp.tupledict()
+    rhs_values = []
+    max_week = sim_horizon // 168
+    for week in range(step_k, step_k + max_week):
+        for hydro_unit in hydro_units:
+            for cname, rhs in [
+                (
+                    f"hydro_limit_weekly_ub[{hydro_unit},{week}]",
+                    hydro_capacity.loc[week, hydro_unit],
+                ),
+                (
+                    f"hydro_limit_weekly_lb[{hydro_unit},{week}]",
+                    hydro_capacity_min.loc[week, hydro_unit],
+                ),
+            ]:
+                constraint = old_constraints[len(updated_constraints)]
+                constraint.ConstrName = cname
+                updated_constraints[cname] = constraint
+                rhs_values.append(rhs)
+
+    model.setAttr("RHS", list(updated_constraints.values()), rhs_values)
+    return updated_constraints
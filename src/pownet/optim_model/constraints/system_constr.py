@@ -3,7 +3,8 @@
 import gurobipy as gp
 import pandas as pd
 
-from pownet.data_utils import get_capacity_value
+from pownet.data_model import Timesteps, TimeseriesArray, as_timeseries_array
+from pownet.data_utils import get_first_day, get_step_window
 
 
 def add_c_reserve_req_1(
@@ -15,7 +16,8 @@ def add_c_reserve_req_1(
     step_k: int,
     thermal_units: list,
     storage_units: list,
-    spin_requirement: pd.Series,
+    spin_requirement: pd.Series | TimeseriesArray,
+    step_hours: int = 24,
 ) -> gp.tupledict:
     """Equation 68 of Kneuven et al (2019) based on Morales-España et al. (2013).
     System-wide spinning reserve requirement. The spinning reserve is the sum of
@@ -31,20 +33,29 @@ def add_c_reserve_req_1(
         spin_shortfall (gp.tupledict): The spinning reserve shortfall
         timesteps (range): The range of timesteps
         step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
         thermal_units (list): The list of thermal units
         storage_units (list): The list of storage units
-        spin_requirement (pd.Series): The spinning reserve requirement at each hour (MW)
+        spin_requirement (pd.Series | TimeseriesArray): The spinning reserve requirement at each hour (MW)
 
     Returns:
         gp.tupledict: The constraints for the spinning reserve requirement
     """
-    hours_per_step = 24  # len(timesteps)
+    # addConstrs takes the keys of the constraints from the loop variables
+    spin_req = dict(
+        zip(
+            timesteps,
+            get_step_window(
+                spin_requirement, timesteps, step_k, step_hours=step_hours
+            ).tolist(),
+        )
+    )
     return model.addConstrs(
         (
             gp.quicksum(spin[unit, t] for unit in thermal_units)
             + gp.quicksum(charge_state[unit, t] for unit in storage_units)
             + spin_shortfall[t]
-            >= spin_requirement.loc[t + (step_k - 1) * hours_per_step]
+            >= spin_req[t]
             for t in timesteps
         ),
         name="reserveReq1",
@@ -62,8 +73,9 @@ def add_c_reserve_req_2(
     thermal_units: list,
     thermal_min_capacity: dict,
     storage_units: list,
-    total_demand: pd.Series,
-    spin_requirement: pd.Series,
+    total_demand: pd.Series | TimeseriesArray,
+    spin_requirement: pd.Series | TimeseriesArray,
+    step_hours: int = 24,
 ) -> gp.tupledict:
     """Equation 67 of Kneuven et al (2019) based on Carrion and Arroyo (2006)
     and Ostrowski et al. (2012). The spinning reserve is expressed in terms of the
@@ -80,17 +92,34 @@ def add_c_reserve_req_2(
         spin_shortfall (gp.tupledict): The spinning reserve shortfall
         timesteps (range): The range of timesteps
         step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
         thermal_units (list): The list of thermal units
         storage_units (list): The list of storage units
         thermal_min_capacity (dict): The minimum capacity of the thermal unit
         demand_nodes (list): The list of demand nodes
-        total_demand (pd.Series): The total system demand at each hour (MW)
-        spin_requirement (pd.Series): The spinning reserve requirement at each hour (MW)
+        total_demand (pd.Series | TimeseriesArray): The total system demand at each hour (MW)
+        spin_requirement (pd.Series | TimeseriesArray): The spinning reserve requirement at each hour (MW)
 
     Returns:
         gp.tupledict: The constraints for the spinning reserve requirement
     """
-    hours_per_step = 24  # For rolling horizon
+    # addConstrs takes the keys of the constraints from the loop variables
+    step_demand = dict(
+        zip(
+            timesteps,
+            get_step_window(
+                total_demand, timesteps, step_k, step_hours=step_hours
+            ).tolist(),
+        )
+    )
+    spin_req = dict(
+        zip(
+            timesteps,
+            get_step_window(
+                spin_requirement, timesteps, step_k, step_hours=step_hours
+            ).tolist(),
+        )
+    )
     return model.addConstrs(
         (
             gp.quicksum(
@@ -99,8 +128,7 @@ def add_c_reserve_req_2(
             )
             + gp.quicksum(charge_state[unit, t] for unit in storage_units)
             + spin_shortfall[t]
-            >= total_demand.loc[t + (step_k - 1) * hours_per_step]
-            + spin_requirement[t + (step_k - 1) * hours_per_step]
+            >= step_demand[t] + spin_req[t]
             for t in timesteps
         ),
         name="reserveReq2",
@@ -164,9 +192,11 @@ def add_c_flow_balance(
     ess_charge_units: dict,
     ess_discharge_units: dict,
     demand_nodes: list,
-    demand: pd.DataFrame,
+    demand: pd.DataFrame | TimeseriesArray,
     gen_loss_factor: float,
     line_loss_factor: float,
+    step_hours: int = 24,
+    pinj: gp.tupledict = None,
 ) -> gp.tupledict:
     """Adds power flow balance constraints to the optimization model.
 
@@ -183,6 +213,9 @@ def add_c_flow_balance(
     - Power demand at the node.
     - Power mismatch variables (positive and negative slack).
 
+    With the PTDF formulation, the line flows are replaced by the net injection of
+    the node into the network, and line losses are not modeled.
+
     Args:
         model (gp.Model): The optimization model
         pthermal (gp.tupledict): The power output of thermal units
@@ -198,6 +231,7 @@ def add_c_flow_balance(
         flow_bwd (gp.tupledict): The power flow from backward s <- k
         timesteps (range): The range of timesteps
         step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
         thermal_units (list): The list of thermal units
         hydro_units (list): The list of hydro units
         solar_units (list): The list of solar units
@@ -209,10 +243,12 @@ def add_c_flow_balance(
         ess_charge_units (dict): Storage units to charge from this node
         ess_discharge_units (dict): Storage units to discharge to this node
         demand_nodes (list): The list of demand nodes
-        demand (pd.DataFrame): The demand data
+        demand (pd.DataFrame | TimeseriesArray): The demand data
         gen_loss_factor (float): The system-wide generation loss factor
             (applied at generation source)
         line_loss_factor (float): The system-wide line loss factor
+        pinj (gp.tupledict): The net injection of each node with the PTDF
+            formulation. Default is None, which uses the flow variables instead.
 
     Returns:
         gp.tupledict: The constraints for the power flow balance
@@ -242,9 +278,12 @@ def add_c_flow_balance(
     # Line efficiency (power received / power sent)
     line_efficiency = 1 - line_loss_factor
 
-    hours_per_step = 24  # For rolling horizon
+    step_demand = get_step_window(
+        demand, timesteps, step_k, demand_nodes, step_hours=step_hours
+    ).tolist()
+    demand_node_idx = {node: idx for idx, node in enumerate(demand_nodes)}
 
-    for t in timesteps:
+    for i, t in enumerate(timesteps):
         for node in nodes:
             generation = 0
             # Loops through generators located *in* the node (aggregated generation)
@@ -267,12 +306,14 @@ def add_c_flow_balance(
 
             # Get the demand of node n at time t
             demand_n_t = 0
-            if node in demand_nodes:
-                demand_n_t = demand.loc[t + (step_k - 1) * hours_per_step, node]
+            if node in demand_node_idx:
+                demand_n_t = step_demand[i][demand_node_idx[node]]
 
             # The net line flow into the node is the sum of the power flow
             net_line_flow_into_node = 0
-            if node in node_edge:
+            if pinj:
+                net_line_flow_into_node = -pinj[node, t]
+            elif node in node_edge:
                 for x, y in node_edge[node]:
                     if x == node:
                         net_line_flow_into_node -= flow_fwd[x, y, t]
@@ -336,7 +377,8 @@ def add_c_angle_diff(
     timesteps: range,
     step_k: int,
     edges: list,
-    susceptance: pd.DataFrame,
+    susceptance: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
 ) -> gp.tupledict:
     """Equation 64a of Kneuven et al (2019) expresses the power flow in a transmission line
     as a function of the voltage angle difference between the two buses it connects.
@@ -352,18 +394,29 @@ def add_c_angle_diff(
         theta (gp.tupledict): The voltage angle
         timesteps (range): The range of timesteps
         step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
         edges (list): The list of edges
-        susceptance (pd.DataFrame): The susceptance matrix
+        susceptance (pd.DataFrame | TimeseriesArray): The susceptance matrix
 
     Returns:
         gp.tupledict: The constraints for the angle difference
 
     """
+    # addConstrs takes the keys of the constraints from the loop variables
+    step_susceptance = {
+        (a, b, t): b_ab
+        for t, row in zip(
+            timesteps,
+            get_step_window(
+                susceptance, timesteps, step_k, edges, step_hours=step_hours
+            ).tolist(),
+        )
+        for (a, b), b_ab in zip(edges, row)
+    }
     return model.addConstrs(
         (
             flow_fwd[a, b, t] - flow_bwd[a, b, t]
-            == susceptance.loc[t + (step_k - 1) * 24, (a, b)]
-            * (theta[a, t] - theta[b, t])
+            == step_susceptance[a, b, t] * (theta[a, t] - theta[b, t])
             for (a, b) in edges
             for t in timesteps
         ),
@@ -379,7 +432,8 @@ def add_c_kirchhoff(
     step_k: int,
     edges: list,
     cycle_map: dict,
-    susceptance: pd.DataFrame,
+    susceptance: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
 ) -> gp.tupledict:
     """Equation 23b in Horsch et al (2018). This constraint implements
     the Kirchhoff circuit laws (KCL) directly on the flow variables.
@@ -392,19 +446,57 @@ def add_c_kirchhoff(
         flow_bwd (gp.tupledict): The power flow variable
         timesteps (range): The range of timesteps
         step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
         edges (list): The list of edges
         cycle_map (dict): The cycle map (created by DataProcessor class)
-        susceptance (pd.DataFrame): The susceptance matrix
+        susceptance (pd.DataFrame | TimeseriesArray): The susceptance matrix
 
     Returns:
         gp.tupledict: The constraints for the Kirchhoff circuit laws
 
     """
-
-    hours_per_step = 24  # For rolling horizon
     kvl_constraints = gp.tupledict()
+    kvl_edges = _get_kvl_edges(cycle_map, edges)
+    reactance = _get_kvl_reactance(
+        susceptance, timesteps, step_k, kvl_edges, step_hours=step_hours
+    )
+
+    for cycle_id, edges_for_kvl_sum_in_this_cycle in kvl_edges.items():
+        # Add constraints for each timestep for this cycle
+        for i, t in enumerate(timesteps):
+            kirchhoff_sum_expr = gp.LinExpr()
 
-    # Build the cycle_incidence matrix once if it's static based on 'edges' and 'cycle_map'
+            for original_edge_ab, sign in edges_for_kvl_sum_in_this_cycle:
+                a, b = original_edge_ab
+                reactance_x_ab = reactance[original_edge_ab][i]
+                net_flow_p_ab = flow_fwd[a, b, t] - flow_bwd[a, b, t]
+                kirchhoff_sum_expr.add(sign * reactance_x_ab * net_flow_p_ab)
+
+            cname = f"kirchhoff[{cycle_id},{t}]"
+            kvl_constraints[cname] = model.addConstr(
+                kirchhoff_sum_expr == 0, name=cname
+            )
+    return kvl_constraints
+
+
+def _get_kvl_edges(
+    cycle_map: dict, edges: list
+) -> dict[int, list[tuple[tuple[str, str], int]]]:
+    """Find the edges in each cycle and their direction in the KVL sum.
+
+    Args:
+        cycle_map (dict): The cycle map (created by DataProcessor class)
+        edges (list): The list of edges
+
+    Returns:
+        dict[int, list[tuple[tuple[str, str], int]]]: Map of each cycle to a list of
+            ((original_a, original_b), sign_in_sum) where (original_a, original_b) is an edge
+            from the input 'edges' list.
+
+    Raises:
+        ValueError: If an edge segment in a cycle is not a defined edge.
+    """
+    kvl_edges = {}
     for cycle_id, cycle_nodes in cycle_map.items():
         # 1. Determine the directed edges for this cycle based on cycle_nodes
         if not cycle_nodes or len(cycle_nodes) < 3:  # Basic check for a valid cycle
@@ -422,10 +514,6 @@ def add_c_kirchhoff(
 
         # 2. For each edge in this cycle's traversal, find its properties
         #    (original edge name, sign, and its susceptance)
-
-        # edges_in_current_kvl_sum will be a list of tuples:
-        # ( (original_a, original_b), sign_in_sum )
-        # where (original_a, original_b) is an edge from your input 'edges' list.
         edges_for_kvl_sum_in_this_cycle = []
 
         # (u,v) is the edge traversed in cycle
@@ -443,38 +531,129 @@ def add_c_kirchhoff(
                 raise ValueError(
                     f"Edge segment ({u},{v}) in cycle {cycle_id} not found in defined edges."
                 )
+        kvl_edges[cycle_id] = edges_for_kvl_sum_in_this_cycle
+    return kvl_edges
 
-        # 3. Add constraints for each timestep for this cycle
-        for t in timesteps:
-            kirchhoff_sum_expr = gp.LinExpr()
-            time_index_for_susceptance = t + (step_k - 1) * hours_per_step
-
-            for original_edge_ab, sign in edges_for_kvl_sum_in_this_cycle:
-                a, b = original_edge_ab
-
-                # Ensure the edge exists in the susceptance DataFrame for safety
-                if (a, b) not in susceptance.columns:
-                    raise ValueError(
-                        f"Warning: Edge ({a},{b}) not in susceptance data for cycle {cycle_id}, time {t}"
-                    )
 
-                # Get susceptance, B_ab
-                b_ab = susceptance.loc[time_index_for_susceptance, (a, b)]
-                if b_ab == 0:
+def _get_kvl_reactance(
+    susceptance: pd.DataFrame | TimeseriesArray,
+    timesteps: range,
+    step_k: int,
+    kvl_edges: dict[int, list[tuple[tuple[str, str], int]]],
+    step_hours: int = 24,
+) -> dict[tuple[str, str], list[float]]:
+    """Return the reactance (1 / susceptance) of each edge in the cycles at the
+    timesteps of the current step."""
+    susceptance = as_timeseries_array(susceptance)
+    reactance = {}
+    for cycle_id, edges_for_kvl_sum_in_this_cycle in kvl_edges.items():
+        for (a, b), _ in edges_for_kvl_sum_in_this_cycle:
+            if (a, b) in reactance:
+                continue
+            # Ensure the edge exists in the susceptance data for safety
+            if (a, b) not in susceptance.col_idx:
+                raise ValueError(
+                    f"Warning: Edge ({a},{b}) not in susceptance data for cycle {cycle_id}"
+                )
+            # Get susceptance, B_ab
+            b_ab = [
+                row[0]
+                for row in get_step_window(
+                    susceptance, timesteps, step_k, [(a, b)], step_hours=step_hours
+                ).tolist()
+            ]
+            for t, b_ab_t in zip(timesteps, b_ab):
+                if b_ab_t == 0:
                     # TODO: Decide how to handle: skip term, raise error, or use a very small number if it implies infinite reactance
                     # For KVL, a zero susceptance line (infinite reactance) would mean zero flow unless it's the only path.
                     raise ValueError(
                         f"Susceptance for edge ({a},{b}) is zero at time {t}."
                     )
-                reactance_x_ab = 1.0 / b_ab
-                net_flow_p_ab = flow_fwd[a, b, t] - flow_bwd[a, b, t]
-                kirchhoff_sum_expr.add(sign * reactance_x_ab * net_flow_p_ab)
+            reactance[a, b] = [1.0 / b_ab_t for b_ab_t in b_ab]
+    return reactance
 
-            cname = f"kirchhoff[{cycle_id},{t}]"
-            kvl_constraints[cname] = model.addConstr(
-                kirchhoff_sum_expr == 0, name=cname
+
+def _get_ptdf_factors(
+    ptdf: pd.DataFrame, lines: list
+) -> dict[tuple[str, str], tuple[list[str], list[float]]]:
+    """Return the nodes with a non-zero PTDF of each line and their PTDF values."""
+    ptdf_factors = {}
+    for line in lines:
+        factors = ptdf.loc[line]
+        factors = factors[factors != 0]
+        ptdf_factors[line] = (factors.index.tolist(), factors.tolist())
+    return ptdf_factors
+
+
+def add_c_ptdf_balance(
+    model: gp.Model,
+    pinj: gp.tupledict,
+    timesteps: range,
+    nodes: list,
+) -> gp.tupledict:
+    """The net injections of all nodes sum to zero because the PTDF formulation
+    does not model line losses.
+
+    Args:
+        model (gp.Model): The optimization model
+        pinj (gp.tupledict): The net injection of each node
+        timesteps (range): The range of timesteps
+        nodes (list): The list of nodes
+
+    Returns:
+        gp.tupledict: The constraints for the balance of the net injections
+    """
+    return model.addConstrs(
+        (gp.quicksum(pinj[node, t] for node in nodes) == 0 for t in timesteps),
+        name="ptdfBalance",
+    )
+
+
+def add_c_ptdf_flow(
+    model: gp.Model,
+    pinj: gp.tupledict,
+    timesteps: range,
+    lines: list,
+    ptdf: pd.DataFrame,
+    line_limits: dict[tuple[str, str, int], float],
+    direction: str,
+) -> gp.tupledict:
+    """Limit the flow on the lines, which is the sum of the PTDF of each node times
+    its net injection. With direction "fwd", the flow from source to sink is limited.
+    With direction "bwd", the flow from sink to source is limited.
+
+    Args:
+        model (gp.Model): The optimization model
+        pinj (gp.tupledict): The net injection of each node
+        timesteps (range): The range of timesteps
+        lines (list): The lines whose flows are limited
+        ptdf (pd.DataFrame): The PTDF with lines as rows and nodes as columns
+        line_limits (dict[tuple[str, str, int], float]): The flow limit of each
+            line at each timestep keyed by (source, sink, t)
+        direction (str): The direction of the limited flow, either "fwd" or "bwd"
+
+    Returns:
+        gp.tupledict: The constraints for the flow limits
+
+    Raises:
+        ValueError: If the direction is not "fwd" or "bwd".
+    """
+    if direction not in ["fwd", "bwd"]:
+        raise ValueError("PowNet: The direction must be either 'fwd' or 'bwd'.")
+    sign = 1 if direction == "fwd" else -1
+    ptdf_factors = _get_ptdf_factors(ptdf, lines)
+    return model.addConstrs(
+        (
+            gp.LinExpr(
+                [sign * factor for factor in ptdf_factors[a, b][1]],
+                [pinj[node, t] for node in ptdf_factors[a, b][0]],
             )
-    return kvl_constraints
+            <= line_limits[a, b, t]
+            for (a, b) in lines
+            for t in timesteps
+        ),
+        name=f"ptdf{direction.capitalize()}",
+    )
 
 
 def add_c_thermal_curtail_ess(
@@ -485,8 +664,9 @@ def add_c_thermal_curtail_ess(
     timesteps: range,
     step_k: int,
     thermal_must_take_units: list,
-    thermal_derated_capacity: pd.DataFrame,
+    thermal_derated_capacity: pd.DataFrame | TimeseriesArray,
     ess_attached: dict,
+    step_hours: int = 24,
 ) -> gp.tupledict:
     """Adds curtailment constraints for must-take thermal units, considering ESS charging.
 
@@ -504,18 +684,25 @@ def add_c_thermal_curtail_ess(
         pcharge (gp.tupledict): Power used to charge energy storage systems [ess_unit, t].
         timesteps (range): The range of timesteps for the constraints.
         step_k (int): The current optimization step (for indexing time-series data).
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
         thermal_must_take_units (list): List of thermal units designated as must-take.
-        thermal_derated_capacity (pd.DataFrame): DataFrame of derated capacity for thermal units (index=time, columns=unit).
+        thermal_derated_capacity (pd.DataFrame | TimeseriesArray): Derated capacity for thermal units (index=time, columns=unit).
         ess_attached (dict): Dictionary mapping generation units to lists of attached ESS units {gen_unit: [ess_unit1, ess_unit2, ...]}.
 
     Returns:
         gp.tupledict: Dictionary of added curtailment constraints.
     """
-    hours_per_step = 24  # For rolling horizon
+    derated_capacity = get_step_window(
+        thermal_derated_capacity,
+        timesteps,
+        step_k,
+        thermal_must_take_units,
+        step_hours=step_hours,
+    ).tolist()
     constraints = gp.tupledict()
-    for unit in thermal_must_take_units:
+    for j, unit in enumerate(thermal_must_take_units):
         has_storage = unit in ess_attached
-        for t in timesteps:
+        for i, t in enumerate(timesteps):
             pcharge_unit_t = 0
             if has_storage:
                 # A unit may have multiple storage systems
@@ -526,9 +713,7 @@ def add_c_thermal_curtail_ess(
             constraints[cname] = model.addConstr(
                 (
                     pthermal[unit, t] + pthermal_curtail[unit, t] + pcharge_unit_t
-                    == thermal_derated_capacity.loc[
-                        t + (step_k - 1) * hours_per_step, unit
-                    ]
+                    == derated_capacity[i][j]
                 ),
                 name=cname,
             )
@@ -544,8 +729,9 @@ def add_c_unit_curtail_ess(
     timesteps: range,
     step_k: int,
     units: list,
-    capacity_df: pd.DataFrame,
+    capacity_df: pd.DataFrame | TimeseriesArray,
     ess_attached: dict[str, list[str]],
+    step_hours: int = 24,
 ) -> gp.tupledict:
     """Adds generic curtailment constraints for a specified unit type, considering ESS charging.
 
@@ -568,8 +754,9 @@ def add_c_unit_curtail_ess(
                          used for naming constraints.
         timesteps (range): The range of timesteps to add constraints for.
         step_k (int): The current optimization step (used for indexing time-series data like capacity).
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
         units (list): A list of unit identifiers (strings) of the specified type.
-        capacity_df (pd.DataFrame): DataFrame containing the available capacity of each unit
+        capacity_df (pd.DataFrame | TimeseriesArray): The available capacity of each unit
                                    over time (index=time, columns=unit).
         ess_attached (Dict[str, List[str]]): A dictionary mapping generation unit IDs
                                             to a list of attached ESS unit IDs.
@@ -578,10 +765,13 @@ def add_c_unit_curtail_ess(
     Returns:
         gp.tupledict: A Gurobi tupledict containing the added constraints, indexed by constraint name.
     """
+    capacity = get_step_window(
+        capacity_df, timesteps, step_k, units, step_hours=step_hours
+    ).tolist()
     constraints = gp.tupledict()
-    for unit in units:
+    for j, unit in enumerate(units):
         has_storage = unit in ess_attached
-        for t in timesteps:
+        for i, t in enumerate(timesteps):
             pcharge_unit_t = 0
             if has_storage:
                 # A unit may have multiple storage systems
@@ -592,7 +782,7 @@ def add_c_unit_curtail_ess(
             constraints[cname] = model.addConstr(
                 (
                     pdispatch[unit, t] + pcurtail[unit, t] + pcharge_unit_t
-                    == get_capacity_value(t, unit, step_k, capacity_df)
+                    == capacity[i][j]
                 ),
                 name=cname,
             )
@@ -608,8 +798,10 @@ def add_c_unit_curtail_ess_daily(
     sim_horizon: int,
     step_k: int,
     units: list,
-    capacity_df: pd.DataFrame,
+    capacity_df: pd.DataFrame | TimeseriesArray,
     ess_attached: dict[str, list[str]],
+    step_hours: int = 24,
+    timesteps: Timesteps = None,
 ) -> gp.tupledict:
     """Adds daily energy balance constraints for specified units, considering ESS charging.
 
@@ -634,45 +826,410 @@ def add_c_unit_curtail_ess_daily(
         sim_horizon (int): Total simulation horizon in hours. Used to determine the number of full days.
         step_k (int): The starting day index for adding constraints. Assumes days are numbered
                       sequentially (e.g., 1, 2, 3...).
+        step_hours (int): Hours between the starts of consecutive steps. Must be a multiple
+                      of 24. Default is 24.
         units (list): List of unit identifiers (strings) of the specified type.
-        capacity_df (pd.DataFrame): DataFrame containing the total *daily* available energy capacity
+        capacity_df (pd.DataFrame | TimeseriesArray): The total *daily* available energy capacity
                                    for each unit. **Crucially, this DataFrame must be indexed by
                                    day number (matching the `day` loop variable) and have units as columns.**
                                    Example index: [1, 2, 3...], columns: ['unit1', 'unit2', ...].
         ess_attached (Dict[str, List[str]]): Dictionary mapping generation unit IDs to lists
                                             of attached ESS unit IDs.
                                             Example: {'solar_farm_1': ['battery_1']}
+        timesteps (Timesteps): The timesteps of the horizon. The power of an aggregated
+                               timestep is multiplied by its hours. Default is one per hour.
 
     Returns:
         gp.tupledict: A Gurobi tupledict containing the added daily constraints, indexed by constraint name.
 
     """
+    if timesteps is None:
+        timesteps = Timesteps(sim_horizon)
     constraints = gp.tupledict()
     max_day = sim_horizon // 24
-    for unit in units:
+    first_day = get_first_day(step_k, step_hours)
+    daily_capacity = (
+        as_timeseries_array(capacity_df).get_window(first_day, max_day, units).tolist()
+    )
+    for j, unit in enumerate(units):
         has_storage = unit in ess_attached
-        for day in range(step_k, step_k + max_day):
+        for day in range(first_day, first_day + max_day):
 
-            current_day = day - step_k + 1
-            timesteps_in_day = range(1 + (current_day - 1) * 24, current_day * 24 + 1)
+            current_day = day - first_day + 1
+            timesteps_in_day = timesteps.get_timesteps_between(
+                1 + (current_day - 1) * 24, current_day * 24
+            )
 
             pcharge_unit_day = 0
             if has_storage:
                 # A unit may have multiple storage systems
                 for storage_unit in ess_attached[unit]:
                     pcharge_unit_day += gp.quicksum(
-                        pcharge[storage_unit, t] for t in timesteps_in_day
+                        timesteps.get_duration(t) * pcharge[storage_unit, t]
+                        for t in timesteps_in_day
                     )
 
             cname = f"{unit_type}_curtail_ess[{unit},{day}]"
             constraints[cname] = model.addConstr(
                 (
                     gp.quicksum(
-                        pdispatch[unit, t] + pcurtail[unit, t] for t in timesteps_in_day
+                        timesteps.get_duration(t)
+                        * (pdispatch[unit, t] + pcurtail[unit, t])
+                        for t in timesteps_in_day
                     )
                     + pcharge_unit_day
-                    == capacity_df.loc[day, unit]
+                    == daily_capacity[day - first_day][j]
                 ),
                 name=cname,
             )
     return constraints
+
+
+def update_c_reserve_req_1(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    timesteps: range,
+    step_k: int,
+    spin_requirement: pd.Series | TimeseriesArray,
+    step_hours: int = 24,
+) -> None:
+    """Update the RHS of the constraints from add_c_reserve_req_1 with the spinning
+    reserve requirement of the current step.
+
+    Args:
+        model (gp.Model): The optimization model
+        constraints (gp.tupledict): The constraints from add_c_reserve_req_1
+        timesteps (range): The range of timesteps
+        step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
+        spin_requirement (pd.Series | TimeseriesArray): The spinning reserve requirement at each hour (MW)
+
+    Returns:
+        None
+    """
+    model.setAttr(
+        "RHS",
+        [constraints[t] for t in timesteps],
+        get_step_window(
+            spin_requirement, timesteps, step_k, step_hours=step_hours
+        ).tolist(),
+    )
+
+
+def update_c_reserve_req_2(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    timesteps: range,
+    step_k: int,
+    total_demand: pd.Series | TimeseriesArray,
+    spin_requirement: pd.Series | TimeseriesArray,
+    step_hours: int = 24,
+) -> None:
+    """Update the RHS of the constraints from add_c_reserve_req_2 with the demand and
+    spinning reserve requirement of the current step.
+
+    Args:
+        model (gp.Model): The optimization model
+        constraints (gp.tupledict): The constraints from add_c_reserve_req_2
+        timesteps (range): The range of timesteps
+        step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
+        total_demand (pd.Series | TimeseriesArray): The total system demand at each hour (MW)
+        spin_requirement (pd.Series | TimeseriesArray): The spinning reserve requirement at each hour (MW)
+
+    Returns:
+        None
+    """
+    step_demand = get_step_window(
+        total_demand, timesteps, step_k, step_hours=step_hours
+    ).tolist()
+    spin_req = get_step_window(
+        spin_requirement, timesteps, step_k, step_hours=step_hours
+    ).tolist()
+    model.setAttr(
+        "RHS",
+        [constraints[t] for t in timesteps],
+        [demand_t + spin_t for demand_t, spin_t in zip(step_demand, spin_req)],
+    )
+
+
+def update_c_flow_balance(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    timesteps: range,
+    step_k: int,
+    demand_nodes: list,
+    demand: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
+) -> None:
+    """Update the RHS of the constraints from add_c_flow_balance with the demand of
+    the current step. Only the constraints of the demand nodes are changed.
+
+    Args:
+        model (gp.Model): The optimization model
+        constraints (gp.tupledict): The constraints from add_c_flow_balance
+        timesteps (range): The range of timesteps
+        step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
+        demand_nodes (list): The list of demand nodes
+        demand (pd.DataFrame | TimeseriesArray): The demand data
+
+    Returns:
+        None
+    """
+    step_demand = get_step_window(
+        demand, timesteps, step_k, demand_nodes, step_hours=step_hours
+    ).tolist()
+    model.setAttr(
+        "RHS",
+        [
+            constraints[f"flowBal[{node},{t}]"]
+            for t in timesteps
+            for node in demand_nodes
+        ],
+        [demand_n_t for demand_t in step_demand for demand_n_t in demand_t],
+    )
+
+
+def update_c_angle_diff(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    theta: gp.tupledict,
+    timesteps: range,
+    step_k: int,
+    edges: list,
+    susceptance: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
+) -> None:
+    """Update the coefficients of the voltage angles in the constraints from
+    add_c_angle_diff with the susceptance of the current step.
+
+    Args:
+        model (gp.Model): The optimization model
+        constraints (gp.tupledict): The constraints from add_c_angle_diff
+        theta (gp.tupledict): The voltage angle
+        timesteps (range): The range of timesteps
+        step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
+        edges (list): The list of edges
+        susceptance (pd.DataFrame | TimeseriesArray): The susceptance matrix
+
+    Returns:
+        None
+    """
+    step_susceptance = get_step_window(
+        susceptance, timesteps, step_k, edges, step_hours=step_hours
+    ).tolist()
+    for j, (a, b) in enumerate(edges):
+        for i, t in enumerate(timesteps):
+            b_ab = step_susceptance[i][j]
+            # flow_fwd - flow_bwd - b_ab * theta_a + b_ab * theta_b == 0
+            model.chgCoeff(constraints[a, b, t], theta[a, t], -b_ab)
+            model.chgCoeff(constraints[a, b, t], theta[b, t], b_ab)
+
+
+def update_c_kirchhoff(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    flow_fwd: gp.tupledict,
+    flow_bwd: gp.tupledict,
+    timesteps: range,
+    step_k: int,
+    edges: list,
+    cycle_map: dict,
+    susceptance: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
+) -> None:
+    """Update the coefficients of the flow variables in the constraints from
+    add_c_kirchhoff with the reactance of the current step.
+
+    Args:
+        model (gp.Model): The optimization model
+        constraints (gp.tupledict): The constraints from add_c_kirchhoff
+        flow_fwd (gp.tupledict): The power flow variable
+        flow_bwd (gp.tupledict): The power flow variable
+        timesteps (range): The range of timesteps
+        step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
+        edges (list): The list of edges
+        cycle_map (dict): The cycle map (created by DataProcessor class)
+        susceptance (pd.DataFrame | TimeseriesArray): The susceptance matrix
+
+    Returns:
+        None
+    """
+    kvl_edges = _get_kvl_edges(cycle_map, edges)
+    reactance = _get_kvl_reactance(
+        susceptance, timesteps, step_k, kvl_edges, step_hours=step_hours
+    )
+    for cycle_id, edges_for_kvl_sum_in_this_cycle in kvl_edges.items():
+        for i, t in enumerate(timesteps):
+            constraint = constraints[f"kirchhoff[{cycle_id},{t}]"]
+            for (a, b), sign in edges_for_kvl_sum_in_this_cycle:
+                reactance_x_ab = reactance[a, b][i]
+                model.chgCoeff(constraint, flow_fwd[a, b, t], sign * reactance_x_ab)
+                model.chgCoeff(constraint, flow_bwd[a, b, t], -sign * reactance_x_ab)
+
+
+def update_c_ptdf_flow(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    line_limits: dict[tuple[str, str, int], float],
+) -> None:
+    """Update the RHS of the constraints from add_c_ptdf_flow with the flow limits
+    of the current step.
+
+    Args:
+        model (gp.Model): The optimization model
+        constraints (gp.tupledict): The constraints from add_c_ptdf_flow
+        line_limits (dict[tuple[str, str, int], float]): The flow limit of each
+            line at each timestep keyed by (source, sink, t)
+
+    Returns:
+        None
+    """
+    model.setAttr(
+        "RHS",
+        list(constraints.values()),
+        [line_limits[key] for key in constraints.keys()],
+    )
+
+
+def update_c_thermal_curtail_ess(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    timesteps: range,
+    step_k: int,
+    thermal_must_take_units: list,
+    thermal_derated_capacity: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
+) -> None:
+    """Update the RHS of the constraints from add_c_thermal_curtail_ess with the
+    derated capacity of the current step.
+
+    Args:
+        model (gp.Model): The optimization model.
+        constraints (gp.tupledict): The constraints from add_c_thermal_curtail_ess.
+        timesteps (range): The range of timesteps for the constraints.
+        step_k (int): The current optimization step (for indexing time-series data).
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
+        thermal_must_take_units (list): List of thermal units designated as must-take.
+        thermal_derated_capacity (pd.DataFrame | TimeseriesArray): Derated capacity for thermal units (index=time, columns=unit).
+
+    Returns:
+        None
+    """
+    derated_capacity = get_step_window(
+        thermal_derated_capacity,
+        timesteps,
+        step_k,
+        thermal_must_take_units,
+        step_hours=step_hours,
+    ).tolist()
+    model.setAttr(
+        "RHS",
+        [
+            constraints[f"thermal_curtail[{unit},{t}]"]
+            for unit in thermal_must_take_units
+            for t in timesteps
+        ],
+        [
+            derated_capacity[i][j]
+            for j in range(len(thermal_must_take_units))
+            for i in range(len(timesteps))
+        ],
+    )
+
+
+def update_c_unit_curtail_ess(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    unit_type: str,
+    timesteps: range,
+    step_k: int,
+    units: list,
+    capacity_df: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
+) -> None:
+    """Update the RHS of the constraints from add_c_unit_curtail_ess with the
+    available capacity of the current step.
+
+    Args:
+        model (gp.Model): The Gurobi optimization model.
+        constraints (gp.tupledict): The constraints from add_c_unit_curtail_ess.
+        unit_type (str): A string identifier for the type of unit (e.g., 'solar', 'wind').
+        timesteps (range): The range of timesteps.
+        step_k (int): The current optimization step.
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
+        units (list): A list of unit identifiers (strings) of the specified type.
+        capacity_df (pd.DataFrame | TimeseriesArray): The available capacity of each unit
+                                   over time (index=time, columns=unit).
+
+    Returns:
+        None
+    """
+    capacity = get_step_window(
+        capacity_df, timesteps, step_k, units, step_hours=step_hours
+    ).tolist()
+    model.setAttr(
+        "RHS",
+        [
+            constraints[f"{unit_type}_curtail_ess[{unit},{t}]"]
+            for unit in units
+            for t in timesteps
+        ],
+        [capacity[i][j] for j in range(len(units)) for i in range(len(timesteps))],
+    )
+
+
+def update_c_unit_curtail_ess_daily(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    unit_type: str,
+    sim_horizon: int,
+    step_k: int,
+    units: list,
+    capacity_df: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
+) -> gp.tupledict:
+    """Update the RHS of the constraints from add_c_unit_curtail_ess_daily with the
+    daily capacity of the current step. The constraints are named after the day of
+    the simulation, so they are renamed as well.
+
+    Args:
+        model (gp.Model): The Gurobi optimization model.
+        constraints (gp.tupledict): The constraints from add_c_unit_curtail_ess_daily.
+        unit_type (str): String identifier for the unit type (e.g., 'solar', 'wind').
+        sim_horizon (int): Total simulation horizon in hours.
+        step_k (int): The current optimization step.
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
+        units (list): List of unit identifiers (strings) of the specified type.
+        capacity_df (pd.DataFrame | TimeseriesArray): The total *daily* available energy capacity
+                                   for each unit indexed by day number.
+
+    Returns:
+        gp.tupledict: The constraints indexed by their new names.
+    """
+    max_day = sim_horizon // 24
+    first_day = get_first_day(step_k, step_hours)
+    unit_days = [
+        (unit, day) for unit in units for day in range(first_day, first_day + max_day)
+    ]
+    # The constraints were added in the same order of units and days
+    updated_constraints = gp.tupledict()
+    for constraint, (unit, day) in zip(constraints.values(), unit_days):
+        cname = f"{unit_type}_curtail_ess[{unit},{day}]"
+        constraint.ConstrName = cname
+        updated_constraints[cname] = constraint
+
+    model.setAttr(
+        "RHS",
+        list(updated_constraints.values()),
+        (
+            as_timeseries_array(capacity_df)
+            .get_window(first_day, max_day, units)
+            .T.ravel()
+            .tolist()
+        ),
+    )
+    return updated_constraints
@@ -3,6 +3,9 @@
 import gurobipy as gp
 import pandas as pd
 
+from pownet.data_model import Timesteps, TimeseriesArray
+from pownet.data_utils import get_step_window
+
 
 def add_c_link_uvw_init(
     model: gp.Model,
@@ -45,6 +48,7 @@ def add_c_link_uvw(
     w: gp.tupledict,
     sim_horizon: int,
     thermal_units: list,
+    timesteps: Timesteps = None,
 ) -> gp.tupledict:
     """Equation 2 of Kneuven et al (2019) based on Garver (1962).
     Three binary variables u (status), v (startup), and w (shutdown) are used to model the status of a thermal unit.
@@ -57,16 +61,19 @@ def add_c_link_uvw(
         w (gp.tupledict): The shutdown of the thermal unit
         sim_horizon (int): The simulation horizon
         thermal_units (list): The list of thermal units
+        timesteps (Timesteps): The timesteps of the horizon. Default is one per hour.
 
     Returns:
         gp.tupledict: The constraints for the subsequent time
     """
+    if timesteps is None:
+        timesteps = Timesteps(sim_horizon)
     # Only consider the second timestep onwards
     return model.addConstrs(
         (
             u[unit, t] - u[unit, t - 1] == v[unit, t] - w[unit, t]
             for unit in thermal_units
-            for t in range(2, sim_horizon + 1)
+            for t in timesteps[1:]
         ),
         name="link_uvw",
     )
@@ -207,7 +214,8 @@ def add_c_link_pu_upper(
     step_k: int,
     thermal_units: list,
     thermal_min_capacity: dict,
-    thermal_derated_capacity: pd.DataFrame,
+    thermal_derated_capacity: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
 ) -> gp.tupledict:
     """Equation 18 of Knueven et al (2019) based on Carrion and Arroyo (2006).
     Set the upper bound of the dispatched power.
@@ -218,17 +226,33 @@ def add_c_link_pu_upper(
         u (gp.tupledict): The status of the thermal unit
         timesteps (range): The range of timesteps
         step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
         thermal_units (list): The list of thermal units
         thermal_min_capacity (dict): The minimum capacity of the thermal unit
-        thermal_derated_capacity (pd.DataFrame): The derated capacity of the thermal unit
+        thermal_derated_capacity (pd.DataFrame | TimeseriesArray): The derated capacity of the thermal unit
 
     Returns:
         gp.tupledict: The constraints for the upper bound of the dispatched power
     """
+    # addConstrs takes the keys of the constraints from the loop variables
+    derated_capacity = {
+        (unit, t): capacity
+        for t, row in zip(
+            timesteps,
+            get_step_window(
+                thermal_derated_capacity,
+                timesteps,
+                step_k,
+                thermal_units,
+                step_hours=step_hours,
+            ).tolist(),
+        )
+        for unit, capacity in zip(thermal_units, row)
+    }
     return model.addConstrs(
         (
             pbar[unit, t] + thermal_min_capacity[unit] * u[unit, t]
-            <= thermal_derated_capacity.loc[t + (step_k - 1) * 24, unit] * u[unit, t]
+            <= derated_capacity[unit, t] * u[unit, t]
             for unit in thermal_units
             for t in timesteps
         ),
@@ -242,6 +266,7 @@ def add_c_min_down_init(
     sim_horizon: int,
     thermal_units: list,
     initial_min_off: dict,
+    timesteps: Timesteps = None,
 ) -> gp.tupledict:
     """Equation 3b of Kneuven et al (2019). Minimum downtime of thermal units at t=1.
 
@@ -251,15 +276,18 @@ def add_c_min_down_init(
         sim_horizon (int): The simulation horizon
         thermal_units (list): The list of thermal units
         initial_min_off (dict): The remaining minimum downtime of the thermal unit from the previous iteration
+        timesteps (Timesteps): The timesteps of the horizon. Default is one per hour.
 
     Returns:
         gp.tupledict: The constraints for the minimum downtime of thermal units at t=1
     """
+    if timesteps is None:
+        timesteps = Timesteps(sim_horizon)
     constraints = gp.tupledict()
     for unit in thermal_units:
         cname = f"minDownInit[{unit}]"
-        # Find the min between the required downtime and the simulation horizon
-        min_DT = min(initial_min_off[unit], sim_horizon)
+        # Find the timesteps that start within the required downtime
+        min_DT = timesteps.count_timesteps_before(initial_min_off[unit])
         constraints[cname] = model.addConstr(
             u.sum(unit, range(1, min_DT + 1)) == 0,
             name=cname,
@@ -273,6 +301,7 @@ def add_c_min_up_init(
     sim_horizon: int,
     thermal_units: list,
     initial_min_on: dict,
+    timesteps: Timesteps = None,
 ) -> gp.tupledict:
     """Equation 3a of Kneuven et al (2019). Minimum uptime of thermal units at t=1.
 
@@ -282,15 +311,18 @@ def add_c_min_up_init(
         sim_horizon (int): The simulation horizon
         thermal_units (list): The list of thermal units
         initial_min_on (dict): The remaining minimum uptime of the thermal unit from the previous iteration
+        timesteps (Timesteps): The timesteps of the horizon. Default is one per hour.
 
     Returns:
         gp.tupledict: The constraints for the minimum uptime of thermal units at t=1
     """
+    if timesteps is None:
+        timesteps = Timesteps(sim_horizon)
     constraints = gp.tupledict()
     for unit in thermal_units:
         cname = f"minUpInit[{unit}]"
-        # Find the min between the required uptime and the simulation horizon
-        min_UT = min(initial_min_on[unit], sim_horizon)
+        # Find the timesteps that start within the required uptime
+        min_UT = timesteps.count_timesteps_before(initial_min_on[unit])
         constraints[cname] = model.addConstr(
             u.sum(unit, range(1, min_UT + 1)) == min_UT,
             name=cname,
@@ -305,9 +337,12 @@ def add_c_min_down(
     sim_horizon: int,
     thermal_units: list,
     TD: dict,
+    timesteps: Timesteps = None,
+    unit_count: dict = None,
 ) -> gp.tupledict:
     """Equation 5 of Kneuven et al (2019) based on Malkin (2003) and Rajan and Takriti (2005).
-    Minimum downtime of thermal units at t>1.
+    Minimum downtime of thermal units at t>1. With aggregated timesteps, the shutdowns
+    of the timesteps that start less than TD hours before t are summed.
 
     Args:
         model (gp.Model): The optimization model
@@ -316,17 +351,28 @@ def add_c_min_down(
         sim_horizon (int): The simulation horizon
         thermal_units (list): The list of thermal units
         TD (dict): The minimum downtime of thermal units
+        timesteps (Timesteps): The timesteps of the horizon. Default is one per hour.
+        unit_count (dict): The number of units of each cluster of identical units,
+            which replaces 1 on the right-hand side. Default is one unit.
 
     Returns:
         gp.tupledict: The constraints for the minimum downtime of thermal units at t>1
     """
+    if timesteps is None:
+        timesteps = Timesteps(sim_horizon)
+    if unit_count is None:
+        unit_count = {}
     constraints = gp.tupledict()
     for unit in thermal_units:
         TD_g = TD[unit]
-        for t in range(TD_g, sim_horizon + 1):
+        for t in timesteps[timesteps.count_timesteps_before(TD_g - 1) :]:
             cname = f"minDown[{unit},{t}]"
-            LHS = gp.quicksum([w[unit, i] for i in range(t - TD_g + 1, t + 1)])
-            constraints[cname] = model.addConstr(LHS <= 1 - u[unit, t], name=cname)
+            LHS = gp.quicksum(
+                [w[unit, i] for i in range(timesteps.get_window_start(t, TD_g), t + 1)]
+            )
+            constraints[cname] = model.addConstr(
+                LHS <= unit_count.get(unit, 1) - u[unit, t], name=cname
+            )
     return constraints
 
 
@@ -337,9 +383,11 @@ def add_c_min_up(
     sim_horizon: int,
     thermal_units: list,
     TU: dict,
+    timesteps: Timesteps = None,
 ) -> gp.tupledict:
     """Equation 4 of Kneuven et al (2019) based on Malkin (2003) and Rajan and Takriti (2005).
-    Minimum uptime of thermal units at t>1.
+    Minimum uptime of thermal units at t>1. With aggregated timesteps, the startups
+    of the timesteps that start less than TU hours before t are summed.
 
     Args:
         model (gp.Model): The optimization model
@@ -348,16 +396,21 @@ def add_c_min_up(
         sim_horizon (int): The simulation horizon
         thermal_units (list): The list of thermal units
         TU (dict): The minimum uptime of thermal units
+        timesteps (Timesteps): The timesteps of the horizon. Default is one per hour.
 
     Returns:
         gp.tupledict: The constraints for the minimum uptime of thermal units at t>1
     """
+    if timesteps is None:
+        timesteps = Timesteps(sim_horizon)
     constraints = gp.tupledict()
     for unit in thermal_units:
         TU_g = TU[unit]
-        for t in range(TU_g, sim_horizon + 1):
+        for t in timesteps[timesteps.count_timesteps_before(TU_g - 1) :]:
             cname = f"minUp[{unit},{t}]"
-            LHS = gp.quicksum([v[unit, i] for i in range(t - TU_g + 1, t + 1)])
+            LHS = gp.quicksum(
+                [v[unit, i] for i in range(timesteps.get_window_start(t, TU_g), t + 1)]
+            )
             constraints[cname] = model.addConstr(LHS <= u[unit, t], name=cname)
     return constraints
 
@@ -372,10 +425,11 @@ def add_c_peak_down_bound(
     step_k: int,
     thermal_units: list,
     thermal_min_capacity: dict,
-    thermal_derated_capacity: pd.DataFrame,
+    thermal_derated_capacity: pd.DataFrame | TimeseriesArray,
     SD: dict,
     SU: dict,
     TU: dict,
+    step_hours: int = 24,
 ) -> gp.tupledict:
     """Shutdown capability based on Gentile et al. (2017) for TU=1 units.
     Implements Eq. (1) for t=1 and Eq. (4) for t in [2, T-1].
@@ -388,9 +442,10 @@ def add_c_peak_down_bound(
         w (gp.tupledict): The shutdown of the thermal unit
         sim_horizon (int): The simulation horizon
         step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
         thermal_units (list): The list of thermal units
         thermal_min_capacity (dict): The minimum capacity of the thermal unit
-        thermal_derated_capacity (pd.DataFrame): The derated capacity of the thermal unit
+        thermal_derated_capacity (pd.DataFrame | TimeseriesArray): The derated capacity of the thermal unit
         SD (dict): The shutdown rate of the thermal unit
         SU (dict): The startup rate of the thermal unit
         TU (dict): The minimum uptime of thermal units
@@ -399,14 +454,22 @@ def add_c_peak_down_bound(
         gp.tupledict: The constraints for the peak down bound
     """
     constraints = gp.tupledict()
-    for unit_g in thermal_units:
+    # Row t - 1 is the derated capacity at timestep t
+    derated_capacity = get_step_window(
+        thermal_derated_capacity,
+        range(1, sim_horizon + 1),
+        step_k,
+        thermal_units,
+        step_hours=step_hours,
+    ).tolist()
+    for j, unit_g in enumerate(thermal_units):
         if TU.get(unit_g) == 1:  # Check if TU entry exists and is 1
             # For t = 1 (Gentile Eq. 1)
             # p_1 <= (P_bar_1 - P_underline)u_1 - (P_bar_1 - SD)w_2
             if sim_horizon >= 1:
                 t = 1
                 # Current P_bar for period t
-                p_bar_t = thermal_derated_capacity.loc[t + (step_k - 1) * 24, unit_g]
+                p_bar_t = derated_capacity[t - 1][j]
                 p_underline = thermal_min_capacity[unit_g]
 
                 if sim_horizon >= 2:  # w[unit_g, 2] must be valid for Eq. (1)
@@ -423,7 +486,7 @@ def add_c_peak_down_bound(
             # p_t <= (P_bar_t - P_underline)u_t - (P_bar_t - SD)w_{t+1} - max(0, SD-SU)v_t
             # Loop range(2, sim_horizon) covers t from 2 to sim_horizon - 1
             for t in range(2, sim_horizon):
-                p_bar_t = thermal_derated_capacity.loc[t + (step_k - 1) * 24, unit_g]
+                p_bar_t = derated_capacity[t - 1][j]
                 p_underline = thermal_min_capacity[unit_g]
 
                 constraints[unit_g, t, "GentilePeakDown_intermediate"] = (
@@ -448,10 +511,11 @@ def add_c_peak_up_bound(
     step_k: int,
     thermal_units: list,
     thermal_min_capacity: dict,
-    thermal_derated_capacity: pd.DataFrame,
+    thermal_derated_capacity: pd.DataFrame | TimeseriesArray,
     SD: dict,
     SU: dict,
     TU: dict,
+    step_hours: int = 24,
 ) -> gp.tupledict:
     """Startup capability based on Gentile et al. (2017) for TU=1 units.
     Implements Eq. (5) for t in [2, T-1] and Eq. (3) for t=T.
@@ -465,9 +529,10 @@ def add_c_peak_up_bound(
         w (gp.tupledict): The shutdown of the thermal unit
         sim_horizon (int): The simulation horizon
         step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
         thermal_units (list): The list of thermal units
         thermal_min_capacity (dict): The minimum capacity of the thermal unit
-        thermal_derated_capacity (pd.DataFrame): The derated capacity of the thermal unit
+        thermal_derated_capacity (pd.DataFrame | TimeseriesArray): The derated capacity of the thermal unit
         SD (dict): The shutdown rate of the thermal unit
         SU (dict): The startup rate of the thermal unit
         TU (dict): The minimum uptime of thermal units
@@ -476,13 +541,21 @@ def add_c_peak_up_bound(
         gp.tupledict: The constraints for the peak up bound
     """
     constraints = gp.tupledict()
-    for unit_g in thermal_units:
+    # Row t - 1 is the derated capacity at timestep t
+    derated_capacity = get_step_window(
+        thermal_derated_capacity,
+        range(1, sim_horizon + 1),
+        step_k,
+        thermal_units,
+        step_hours=step_hours,
+    ).tolist()
+    for j, unit_g in enumerate(thermal_units):
         if TU.get(unit_g) == 1:  # Check if TU entry exists and is 1
             # For t in [2, T-1] (Gentile Eq. 5)
             # p_t <= (P_bar_t - P_underline)u_t - (P_bar_t - SU)v_t - max(0, SU-SD)w_{t+1}
             # Loop range(2, sim_horizon) covers t from 2 to sim_horizon - 1
             for t in range(2, sim_horizon):
-                p_bar_t = thermal_derated_capacity.loc[t + (step_k - 1) * 24, unit_g]
+                p_bar_t = derated_capacity[t - 1][j]
                 p_underline = thermal_min_capacity[unit_g]
 
                 constraints[unit_g, t, "GentilePeakUp_intermediate"] = model.addConstr(
@@ -499,7 +572,7 @@ def add_c_peak_up_bound(
                 sim_horizon >= 1
             ):  # This constraint applies if there's at least one period
                 t = sim_horizon
-                p_bar_t = thermal_derated_capacity.loc[t + (step_k - 1) * 24, unit_g]
+                p_bar_t = derated_capacity[t - 1][j]
                 p_underline = thermal_min_capacity[unit_g]
 
                 constraints[unit_g, t, "GentilePeakUp_finalT"] = model.addConstr(
@@ -563,10 +636,12 @@ def add_c_ramp_down(
     thermal_min_capacity: dict,
     RD: dict,
     SD: dict,
+    timesteps: Timesteps = None,
 ) -> gp.tupledict:
     """Equation 36 of Kneuven et al (2019) based on Damci-Kurt et al. (2016).
     Ramp-down constraint at t>1. The equation was modified to be expressed
-    in terms of power output above the minimum capacity.
+    in terms of power output above the minimum capacity. Between aggregated
+    timesteps, the ramp-down rate is multiplied by the hours between their middles.
 
     Args:
         model (gp.Model): The optimization model
@@ -578,17 +653,25 @@ def add_c_ramp_down(
         thermal_min_capacity (dict): The minimum capacity of the thermal unit
         RD (dict): The ramp-down rate of the thermal unit
         SD (dict): The shutdown rate of the thermal unit
+        timesteps (Timesteps): The timesteps of the horizon. Default is one per hour.
 
     Returns:
         gp.tupledict: The constraints for the ramp-down at t>1
     """
+    if timesteps is None:
+        timesteps = Timesteps(sim_horizon)
     return model.addConstrs(
         (
             p[unit, t - 1] - p[unit, t]
-            <= (SD[unit] - thermal_min_capacity[unit] - RD[unit]) * w[unit, t]
-            + RD[unit] * u[unit, t - 1]
+            <= (
+                SD[unit]
+                - thermal_min_capacity[unit]
+                - RD[unit] * timesteps.get_ramp_hours(t)
+            )
+            * w[unit, t]
+            + RD[unit] * timesteps.get_ramp_hours(t) * u[unit, t - 1]
             for unit in thermal_units
-            for t in range(2, sim_horizon + 1)
+            for t in timesteps[1:]
         ),
         name="rampDown",
     )
@@ -646,10 +729,12 @@ def add_c_ramp_up(
     thermal_min_capacity: dict,
     RU: dict,
     SU: dict,
+    timesteps: Timesteps = None,
 ) -> gp.tupledict:
     """Equation 35 of Kneuven et al (2019) based on Damci-Kurt et al. (2016).
     Ramp-up constraint at t>1. The equation was modified to be expressed
-    in terms of power output above the minimum capacity.
+    in terms of power output above the minimum capacity. Between aggregated
+    timesteps, the ramp-up rate is multiplied by the hours between their middles.
 
     Args:
         model (gp.Model): The optimization model
@@ -662,18 +747,285 @@ def add_c_ramp_up(
         thermal_min_capacity (dict): The minimum capacity of the thermal unit
         RU (dict): The ramp-up rate of the thermal unit
         SU (dict): The startup rate of the thermal unit
+        timesteps (Timesteps): The timesteps of the horizon. Default is one per hour.
 
     Returns:
         gp.tupledict: The constraints for the ramp-up at t>1
 
     """
+    if timesteps is None:
+        timesteps = Timesteps(sim_horizon)
     return model.addConstrs(
         (
             pbar[unit, t] - p[unit, t - 1]
-            <= (SU[unit] - thermal_min_capacity[unit] - RU[unit]) * v[unit, t]
-            + RU[unit] * u[unit, t]
+            <= (
+                SU[unit]
+                - thermal_min_capacity[unit]
+                - RU[unit] * timesteps.get_ramp_hours(t)
+            )
+            * v[unit, t]
+            + RU[unit] * timesteps.get_ramp_hours(t) * u[unit, t]
             for unit in thermal_units
-            for t in range(2, sim_horizon + 1)
+            for t in timesteps[1:]
         ),
         name="rampUp",
     )
+
+
+def add_c_status_order(
+    model: gp.Model,
+    u: gp.tupledict,
+    unit_pairs: list[tuple[str, str]],
+    timesteps: Timesteps,
+    num_order_timesteps: int,
+) -> gp.tupledict:
+    """Order the status of interchangeable thermal units to break their symmetry.
+    The status of the first unit of each pair is lexicographically greater than or
+    equal to that of the second unit over the first num_order_timesteps timesteps.
+    For binary status, this is the weighted sum
+
+        sum_i 2^(K-1-i) * (u[first, t_i] - u[second, t_i]) >= 0
+
+    where K is num_order_timesteps. Sorting the units by the weighted sum of
+    their status satisfies the constraints of all pairs, so the optimal solution
+    is not cut off.
+
+    Args:
+        model (gp.Model): The optimization model
+        u (gp.tupledict): The status of the thermal unit
+        unit_pairs (list[tuple[str, str]]): Pairs of interchangeable units
+        timesteps (Timesteps): The timesteps of the horizon
+        num_order_timesteps (int): The number of timesteps at the start of the
+            horizon whose status is ordered
+
+    Returns:
+        gp.tupledict: The constraints keyed by the pair of units
+    """
+    order_timesteps = list(timesteps)[:num_order_timesteps]
+    weights = [
+        2.0 ** (len(order_timesteps) - 1 - i) for i in range(len(order_timesteps))
+    ]
+    return model.addConstrs(
+        (
+            gp.quicksum(
+                weight * (u[first, t] - u[second, t])
+                for weight, t in zip(weights, order_timesteps)
+            )
+            >= 0
+            for first, second in unit_pairs
+        ),
+        name="status_order",
+    )
+
+
+def update_c_link_uvw_init(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    thermal_units: list,
+    initial_u: dict,
+) -> None:
+    """Update the RHS of the constraints from add_c_link_uvw_init with the initial status.
+
+    Args:
+        model (gp.Model): The optimization model
+        constraints (gp.tupledict): The constraints from add_c_link_uvw_init
+        thermal_units (list): The list of thermal units
+        initial_u (dict): The initial status of the thermal unit
+
+    Returns:
+        None
+    """
+    model.setAttr(
+        "RHS",
+        [constraints[unit] for unit in thermal_units],
+        [initial_u[unit] for unit in thermal_units],
+    )
+
+
+def update_c_link_pu_upper(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    u: gp.tupledict,
+    timesteps: range,
+    step_k: int,
+    thermal_units: list,
+    thermal_min_capacity: dict,
+    thermal_derated_capacity: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
+) -> None:
+    """Update the coefficients of u in the constraints from add_c_link_pu_upper
+    with the derated capacity of the current step.
+
+    Args:
+        model (gp.Model): The optimization model
+        constraints (gp.tupledict): The constraints from add_c_link_pu_upper
+        u (gp.tupledict): The status of the thermal unit
+        timesteps (range): The range of timesteps
+        step_k (int): The current iteration
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
+        thermal_units (list): The list of thermal units
+        thermal_min_capacity (dict): The minimum capacity of the thermal unit
+        thermal_derated_capacity (pd.DataFrame | TimeseriesArray): The derated capacity of the thermal unit
+
+    Returns:
+        None
+    """
+    derated_capacity = get_step_window(
+        thermal_derated_capacity,
+        timesteps,
+        step_k,
+        thermal_units,
+        step_hours=step_hours,
+    ).tolist()
+    for j, unit in enumerate(thermal_units):
+        for i, t in enumerate(timesteps):
+            model.chgCoeff(
+                constraints[unit, t],
+                u[unit, t],
+                thermal_min_capacity[unit] - derated_capacity[i][j],
+            )
+
+
+def _update_c_min_duration_init(
+    model: gp.Model,
+    constraint: gp.Constr,
+    u: gp.tupledict,
+    unit: str,
+    num_timesteps: int,
+    min_duration: int,
+) -> None:
+    """Set the coefficients of u[unit, t] to one for t <= min_duration and zero otherwise."""
+    for t in range(1, num_timesteps + 1):
+        model.chgCoeff(constraint, u[unit, t], 1 if t <= min_duration else 0)
+
+
+def update_c_min_down_init(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    u: gp.tupledict,
+    sim_horizon: int,
+    thermal_units: list,
+    initial_min_off: dict,
+    timesteps: Timesteps = None,
+) -> None:
+    """Update the constraints from add_c_min_down_init with the remaining minimum downtime.
+
+    Args:
+        model (gp.Model): The optimization model
+        constraints (gp.tupledict): The constraints from add_c_min_down_init
+        u (gp.tupledict): The status of the thermal unit
+        sim_horizon (int): The simulation horizon
+        thermal_units (list): The list of thermal units
+        initial_min_off (dict): The remaining minimum downtime of the thermal unit from the previous iteration
+        timesteps (Timesteps): The timesteps of the horizon. Default is one per hour.
+
+    Returns:
+        None
+    """
+    if timesteps is None:
+        timesteps = Timesteps(sim_horizon)
+    for unit in thermal_units:
+        _update_c_min_duration_init(
+            model=model,
+            constraint=constraints[f"minDownInit[{unit}]"],
+            u=u,
+            unit=unit,
+            num_timesteps=len(timesteps),
+            min_duration=timesteps.count_timesteps_before(initial_min_off[unit]),
+        )
+
+
+def update_c_min_up_init(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    u: gp.tupledict,
+    sim_horizon: int,
+    thermal_units: list,
+    initial_min_on: dict,
+    timesteps: Timesteps = None,
+) -> None:
+    """Update the constraints from add_c_min_up_init with the remaining minimum uptime.
+
+    Args:
+        model (gp.Model): The optimization model
+        constraints (gp.tupledict): The constraints from add_c_min_up_init
+        u (gp.tupledict): The status of the thermal unit
+        sim_horizon (int): The simulation horizon
+        thermal_units (list): The list of thermal units
+        initial_min_on (dict): The remaining minimum uptime of the thermal unit from the previous iteration
+        timesteps (Timesteps): The timesteps of the horizon. Default is one per hour.
+
+    Returns:
+        None
+    """
+    if timesteps is None:
+        timesteps = Timesteps(sim_horizon)
+    min_uptimes = {}
+    for unit in thermal_units:
+        min_uptimes[unit] = timesteps.count_timesteps_before(initial_min_on[unit])
+        _update_c_min_duration_init(
+            model=model,
+            constraint=constraints[f"minUpInit[{unit}]"],
+            u=u,
+            unit=unit,
+            num_timesteps=len(timesteps),
+            min_duration=min_uptimes[unit],
+        )
+    model.setAttr(
+        "RHS",
+        [constraints[f"minUpInit[{unit}]"] for unit in thermal_units],
+        [min_uptimes[unit] for unit in thermal_units],
+    )
+
+
+def update_c_ramp_down_init(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    thermal_units: list,
+    initial_p: dict,
+    initial_u: dict,
+    RD: dict,
+) -> None:
+    """Update the RHS of the constraints from add_c_ramp_down_init with the initial conditions.
+
+    Args:
+        model (gp.Model): The optimization model
+        constraints (gp.tupledict): The constraints from add_c_ramp_down_init
+        thermal_units (list): The list of thermal units
+        initial_p (dict): The initial power output above the minimum capacity
+        initial_u (dict): The initial status of the thermal unit
+        RD (dict): The ramp-down rate of the thermal unit
+
+    Returns:
+        None
+    """
+    # - p[unit, 1] - (SD - min_capacity - RD) * w[unit, 1] <= RD * initial_u - initial_p
+    model.setAttr(
+        "RHS",
+        [constraints[unit] for unit in thermal_units],
+        [RD[unit] * initial_u[unit] - initial_p[unit] for unit in thermal_units],
+    )
+
+
+def update_c_ramp_up_init(
+    model: gp.Model,
+    constraints: gp.tupledict,
+    thermal_units: list,
+    initial_p: dict,
+) -> None:
+    """Update the RHS of the constraints from add_c_ramp_up_init with the initial power output.
+
+    Args:
+        model (gp.Model): The optimization model
+        constraints (gp.tupledict): The constraints from add_c_ramp_up_init
+        thermal_units (list): The list of thermal units
+        initial_p (dict): The initial power output above the minimum capacity
+
+    Returns:
+        None
+    """
+    model.setAttr(
+        "RHS",
+        [constraints[unit] for unit in thermal_units],
+        [initial_p[unit] for unit in thermal_units],
+    )
@@ -0,0 +1,182 @@
+"""highs_model.py: Pass a PowNet model to HiGHS in memory.
+
+The Gurobi model is converted to arrays with the constraint matrix in CSR form
+and passed to HiGHS without writing an MPS file. HighsInstance keeps the HiGHS
+model between steps of the rolling horizon. Since the structure of a PowNet model
+does not change between steps, only the bounds, costs, right-hand sides, and
+coefficients that differ from the previous step are changed in HiGHS.
+"""
+
+import gurobipy as gp
+import highspy
+import numpy as np
+import scipy.sparse as sp
+
+# Values at or above this are infinite in HiGHS
+HIGHS_INF_BOUND = 1e20
+
+
+def _to_highs_bound(values: np.ndarray) -> np.ndarray:
+    """Replace Gurobi's infinite bounds (1e100) by np.inf."""
+    values = np.asarray(values, dtype=float)
+    values[values >= HIGHS_INF_BOUND] = np.inf
+    values[values <= -HIGHS_INF_BOUND] = -np.inf
+    return values
+
+
+def get_model_arrays(model: gp.Model) -> dict:
+    """Return the objective, bounds, and constraint matrix of a linear Gurobi model
+    as arrays ordered by column and row index.
+
+    Args:
+        model (gp.Model): The Gurobi model.
+
+    Returns:
+        dict: Arrays of the model. The constraint matrix is a scipy CSR matrix.
+    """
+    model.update()
+    variables = model.getVars()
+    constrs = model.getConstrs()
+
+    rhs = np.asarray(model.getAttr("RHS", constrs), dtype=float)
+    senses = np.asarray(model.getAttr("Sense", constrs), dtype=object)
+    row_lower = np.where(senses == gp.GRB.LESS_EQUAL, -np.inf, rhs)
+    row_upper = np.where(senses == gp.GRB.GREATER_EQUAL, np.inf, rhs)
+
+    vtypes = np.asarray(model.getAttr("VType", variables), dtype=object)
+    integrality = np.where(
+        vtypes == gp.GRB.CONTINUOUS,
+        int(highspy.HighsVarType.kContinuous),
+        int(highspy.HighsVarType.kInteger),
+    ).astype(np.uint8)
+
+    matrix = model.getA().tocsr() if constrs else sp.csr_matrix((0, len(variables)))
+    matrix.sort_indices()
+
+    return {
+        "sense": model.ModelSense,
+        "offset": model.ObjCon,
+        "col_cost": np.asarray(model.getAttr("Obj", variables), dtype=float),
+        "col_lower": _to_highs_bound(model.getAttr("LB", variables)),
+        "col_upper": _to_highs_bound(model.getAttr("UB", variables)),
+        "integrality": integrality,
+        "row_lower": _to_highs_bound(row_lower),
+        "row_upper": _to_highs_bound(row_upper),
+        "matrix": matrix,
+    }
+
+
+class HighsInstance:
+    """A HiGHS model that mirrors a Gurobi model between steps."""
+
+    def __init__(self) -> None:
+        self.highs: highspy.Highs = None
+        # Arrays of the model last passed to HiGHS
+        self.arrays: dict = None
+
+    def load(self, model: gp.Model) -> highspy.Highs:
+        """Pass the Gurobi model to HiGHS. The full model is passed on the first call
+        or when the number of variables or constraints changed. Otherwise, only the
+        differences to the previous call are passed.
+
+        Args:
+            model (gp.Model): The Gurobi model.
+
+        Returns:
+            highspy.Highs: The HiGHS model.
+        """
+        arrays = get_model_arrays(model)
+        if self.highs is None or arrays["matrix"].shape != self.arrays["matrix"].shape:
+            self._pass_model(model, arrays)
+        else:
+            self._change_model(arrays)
+        self.arrays = arrays
+        return self.highs
+
+    def _pass_model(self, model: gp.Model, arrays: dict) -> None:
+        matrix = arrays["matrix"]
+        lp = highspy.HighsLp()
+        lp.num_col_ = matrix.shape[1]
+        lp.num_row_ = matrix.shape[0]
+        lp.sense_ = (
+            highspy.ObjSense.kMaximize
+            if arrays["sense"] == gp.GRB.MAXIMIZE
+            else highspy.ObjSense.kMinimize
+        )
+        lp.offset_ = arrays["offset"]
+        lp.col_cost_ = arrays["col_cost"]
+        lp.col_lower_ = arrays["col_lower"]
+        lp.col_upper_ = arrays["col_upper"]
+        lp.row_lower_ = arrays["row_lower"]
+        lp.row_upper_ = arrays["row_upper"]
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+        lp.a_matrix_.num_col_ = matrix.shape[1]
+        lp.a_matrix_.num_row_ = matrix.shape[0]
+        lp.a_matrix_.start_ = matrix.indptr.astype(np.int32)
+        lp.a_matrix_.index_ = matrix.indices.astype(np.int32)
+        lp.a_matrix_.value_ = matrix.data
+        lp.integrality_ = [highspy.HighsVarType(i) for i in arrays["integrality"]]
+        # Names are only needed to look up variables by name, e.g., get_solution
+        lp.col_names_ = model.getAttr("VarName", model.getVars())
+
+        if self.highs is None:
+            self.highs = highspy.Highs()
+        self.highs.passModel(lp)
+
+    def _change_model(self, arrays: dict) -> None:
+        old = self.arrays
+
+        if arrays["sense"] != old["sense"]:
+            self.highs.changeObjectiveSense(
+                highspy.ObjSense.kMaximize
+                if arrays["sense"] == gp.GRB.MAXIMIZE
+                else highspy.ObjSense.kMinimize
+            )
+        if arrays["offset"] != old["offset"]:
+            self.highs.changeObjectiveOffset(arrays["offset"])
+
+        idx = np.flatnonzero(arrays["col_cost"] != old["col_cost"])
+        if len(idx) > 0:
+            self.highs.changeColsCost(
+                len(idx), idx.astype(np.int32), arrays["col_cost"][idx]
+            )
+
+        idx = np.flatnonzero(arrays["integrality"] != old["integrality"])
+        if len(idx) > 0:
+            self.highs.changeColsIntegrality(
+                len(idx),
+                idx.astype(np.int32),
+                arrays["integrality"][idx],
+            )
+
+        idx = np.flatnonzero(
+            (arrays["col_lower"] != old["col_lower"])
+            | (arrays["col_upper"] != old["col_upper"])
+        )
+        if len(idx) > 0:
+            self.highs.changeColsBounds(
+                len(idx),
+                idx.astype(np.int32),
+                arrays["col_lower"][idx],
+                arrays["col_upper"][idx],
+            )
+
+        idx = np.flatnonzero(
+            (arrays["row_lower"] != old["row_lower"])
+            | (arrays["row_upper"] != old["row_upper"])
+        )
+        if len(idx) > 0:
+            self.highs.changeRowsBounds(
+                len(idx),
+                idx.astype(np.int32),
+                arrays["row_lower"][idx],
+                arrays["row_upper"][idx],
+            )
+
+        # Coefficients that were changed, added, or removed
+        diff = (arrays["matrix"] - old["matrix"]).tocoo()
+        diff.eliminate_zeros()
+        if diff.nnz > 0:
+            new_values = np.asarray(arrays["matrix"][diff.row, diff.col]).ravel()
+            for row, col, value in zip(diff.row, diff.col, new_values):
+                self.highs.changeCoeff(int(row), int(col), float(value))
@@ -0,0 +1,454 @@
+"""lagrangian.py: Lagrangian decomposition of a PowNet model into unit subproblems.
+
+The flow balance and the reserve requirement constraints are the only constraints
+that couple the thermal units of a PowNet model. They are moved to the objective with
+Lagrange multipliers, after which the model separates into one small MIP per thermal
+unit and one linear program with the remaining variables, e.g., hydropower, storage,
+and the transmission network. The blocks are found from the constraint matrix, so the
+subproblems have the constraints of thermal_unit_constr that ModelBuilder added.
+
+The subproblems are solved in parallel with HiGHS. A subgradient method with the
+Polyak step size updates the multipliers, starting from the duals of the LP relaxation.
+Each new commitment of the subproblems is fixed in an economic dispatch (ED) linear
+program of the full model. The ED is always feasible because the coupling constraints
+have shortfall variables. The best ED is the solution, and the best value of the
+Lagrangian dual function is a lower bound of the optimal objective value. Their
+relative difference is the duality gap.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import gurobipy as gp
+import highspy
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from .highs_model import get_model_arrays
+
+logger = logging.getLogger(__name__)
+
+
+def get_blocks(
+    matrix: sp.csr_matrix, coupling_rows: np.ndarray, int_cols: np.ndarray
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Return the blocks of the constraint matrix without the coupling rows. Each
+    block with integer columns is a separate block. The other columns and rows are
+    collected in the last block.
+
+    Args:
+        matrix (sp.csr_matrix): The constraint matrix.
+        coupling_rows (np.ndarray): Indices of the coupling rows.
+        int_cols (np.ndarray): Indices of the integer columns.
+
+    Returns:
+        list[tuple[np.ndarray, np.ndarray]]: The columns and rows of each block.
+    """
+    num_rows, num_cols = matrix.shape
+    block_rows = np.setdiff1d(np.arange(num_rows), coupling_rows)
+    submatrix = matrix[block_rows]
+    # Columns and rows are the nodes of a bipartite graph
+    graph = sp.bmat([[None, submatrix.T], [submatrix, None]], format="csr")
+    _, labels = connected_components(graph, directed=False)
+    col_labels, row_labels = labels[:num_cols], labels[num_cols:]
+
+    blocks = []
+    int_labels = np.unique(col_labels[int_cols])
+    for label in int_labels:
+        blocks.append(
+            (
+                np.flatnonzero(col_labels == label),
+                block_rows[row_labels == label],
+            )
+        )
+    blocks.append(
+        (
+            np.flatnonzero(~np.isin(col_labels, int_labels)),
+            block_rows[~np.isin(row_labels, int_labels)],
+        )
+    )
+    return blocks
+
+
+def get_multiplier_bounds(
+    arrays: dict, coupling_rows: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the bounds of the multipliers of the coupling rows. The multiplier of a
+    greater-than (less-than) row is non-negative (non-positive). The multipliers are
+    also bounded by the costs of unbounded columns that only appear in one coupling
+    row, e.g., the load shortfall, because the Lagrangian dual function is unbounded
+    beyond these costs.
+
+    Args:
+        arrays (dict): Arrays of the model from get_model_arrays.
+        coupling_rows (np.ndarray): Indices of the coupling rows.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The lower and upper bounds of the multipliers.
+    """
+    row_lower = arrays["row_lower"][coupling_rows]
+    row_upper = arrays["row_upper"][coupling_rows]
+    lower = np.where(np.isinf(row_lower), -np.inf, 0.0)
+    upper = np.where(np.isinf(row_upper), np.inf, 0.0)
+    lower[np.isfinite(row_lower) & np.isfinite(row_upper)] = -np.inf
+    upper[np.isfinite(row_lower) & np.isfinite(row_upper)] = np.inf
+
+    matrix = arrays["matrix"]
+    is_coupling = np.zeros(matrix.shape[0], dtype=bool)
+    is_coupling[coupling_rows] = True
+    coupling_matrix = matrix[coupling_rows].tocsc()
+    other_count = np.diff(matrix[~is_coupling].tocsc().indptr)
+    is_slack = (np.diff(coupling_matrix.indptr) == 1) & (other_count == 0)
+
+    coo = coupling_matrix.tocoo()
+    coo_slack = is_slack[coo.col]
+    rows, cols, coeffs = coo.row[coo_slack], coo.col[coo_slack], coo.data[coo_slack]
+    ratio = arrays["col_cost"][cols] / coeffs
+    # An unbounded column needs a non-negative (non-positive) reduced cost
+    has_upper = np.isinf(arrays["col_upper"][cols])
+    has_lower = np.isinf(arrays["col_lower"][cols])
+    np.minimum.at(
+        upper, rows[has_upper & (coeffs > 0)], ratio[has_upper & (coeffs > 0)]
+    )
+    np.maximum.at(
+        lower, rows[has_upper & (coeffs < 0)], ratio[has_upper & (coeffs < 0)]
+    )
+    np.maximum.at(
+        lower, rows[has_lower & (coeffs > 0)], ratio[has_lower & (coeffs > 0)]
+    )
+    np.minimum.at(
+        upper, rows[has_lower & (coeffs < 0)], ratio[has_lower & (coeffs < 0)]
+    )
+    return lower, upper
+
+
+def _create_highs(
+    arrays: dict,
+    cols: np.ndarray,
+    rows: np.ndarray,
+    relax: bool = False,
+    num_threads: int = 1,
+    col_names: list[str] = None,
+) -> highspy.Highs:
+    """Return a HiGHS model with the given columns and rows of the model."""
+    matrix = arrays["matrix"][rows][:, cols].tocsr()
+    matrix.sort_indices()
+    lp = highspy.HighsLp()
+    lp.num_col_ = len(cols)
+    lp.num_row_ = len(rows)
+    lp.col_cost_ = arrays["col_cost"][cols]
+    lp.col_lower_ = arrays["col_lower"][cols]
+    lp.col_upper_ = arrays["col_upper"][cols]
+    lp.row_lower_ = arrays["row_lower"][rows]
+    lp.row_upper_ = arrays["row_upper"][rows]
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+    lp.a_matrix_.num_col_ = len(cols)
+    lp.a_matrix_.num_row_ = len(rows)
+    lp.a_matrix_.start_ = matrix.indptr.astype(np.int32)
+    lp.a_matrix_.index_ = matrix.indices.astype(np.int32)
+    lp.a_matrix_.value_ = matrix.data
+    if not relax:
+        lp.integrality_ = [highspy.HighsVarType(i) for i in arrays["integrality"][cols]]
+
+    if col_names is not None:
+        lp.col_names_ = col_names
+
+    highs = highspy.Highs()
+    highs.setOptionValue("output_flag", False)
+    highs.setOptionValue("threads", num_threads)
+    highs.passModel(lp)
+    return highs
+
+
+def _is_optimal(highs: highspy.Highs) -> bool:
+    # A block without variables is empty, e.g., a model without hydropower or storage
+    return highs.getModelStatus() in (
+        highspy.HighsModelStatus.kOptimal,
+        highspy.HighsModelStatus.kModelEmpty,
+    )
+
+
+class LagrangianDecomposition:
+    """Lagrangian relaxation of the flow balance and reserve requirement constraints
+    with one subproblem per thermal unit.
+
+    Attributes:
+        lower_bound (float): The best value of the Lagrangian dual function.
+        upper_bound (float): The objective value of the best economic dispatch.
+        iterations (int): The number of subgradient iterations of the last solve.
+        runtime (float): The wall time of the last solve in seconds.
+    """
+
+    def __init__(
+        self,
+        max_iter: int = 50,
+        step_scale: float = 1.0,
+        patience: int = 3,
+        subproblem_gap: float = 1e-6,
+    ) -> None:
+        """Initialize the decomposition.
+
+        Args:
+            max_iter (int): The maximum number of subgradient iterations. Default is 50.
+            step_scale (float): The initial scale of the Polyak step size. It is
+                halved when the lower bound does not improve for patience iterations.
+                Default is 1.0.
+            patience (int): Iterations without improvement before the step size is
+                halved. Default is 3.
+            subproblem_gap (float): The relative MIP gap of the unit subproblems.
+                Default is 1e-6.
+        """
+        self.max_iter: int = max_iter
+        self.step_scale: float = step_scale
+        self.patience: int = patience
+        self.subproblem_gap: float = subproblem_gap
+
+        self.lower_bound: float = -np.inf
+        self.upper_bound: float = np.inf
+        self.iterations: int = 0
+        self.runtime: float = 0.0
+
+    def get_gap(self) -> float:
+        """Return the relative duality gap of the last solve."""
+        if not np.isfinite(self.upper_bound):
+            return np.inf
+        return (self.upper_bound - self.lower_bound) / max(abs(self.upper_bound), 1e-10)
+
+    def solve(
+        self,
+        model: gp.Model,
+        coupling_constrs: list[gp.Constr],
+        commitment_cols: np.ndarray = None,
+        mipgap: float = 1e-3,
+        timelimit: float = 600,
+        num_threads: int = 0,
+        log_to_console: bool = False,
+    ) -> highspy.Highs:
+        """Solve the model by Lagrangian decomposition.
+
+        Args:
+            model (gp.Model): The Gurobi model built by ModelBuilder.
+            coupling_constrs (list[gp.Constr]): The constraints that are relaxed.
+            commitment_cols (np.ndarray): Indices of the integer variables that are
+                fixed in the economic dispatch, i.e., the status of the thermal units.
+                The other integer variables, e.g., the charging mode of storage units,
+                stay integer in the dispatch. Default is None, which fixes all of them.
+            mipgap (float): Stop at this relative duality gap. Default is 1e-3.
+            timelimit (float): Stop after this many seconds. Default is 600.
+            num_threads (int): The number of subproblems that are solved at once.
+                Default is 0, which uses all CPUs.
+            log_to_console (bool): Whether to log the bounds of each iteration.
+
+        Returns:
+            highspy.Highs: The solved economic dispatch of the best commitment.
+
+        Raises:
+            ValueError: If the dispatch or a subproblem cannot be solved.
+        """
+        start = time.perf_counter()
+        arrays = get_model_arrays(model)
+        coupling_rows = np.array(sorted(c.index for c in coupling_constrs), dtype=int)
+        int_cols = np.flatnonzero(
+            arrays["integrality"] != int(highspy.HighsVarType.kContinuous)
+        )
+        if commitment_cols is None:
+            commitment_cols = int_cols
+        commitment_cols = np.intersect1d(commitment_cols, int_cols)
+        coupling_matrix = arrays["matrix"][coupling_rows]
+        row_lower = arrays["row_lower"][coupling_rows]
+        coupling_rhs = np.where(
+            np.isfinite(row_lower), row_lower, arrays["row_upper"][coupling_rows]
+        )
+        multiplier_lower, multiplier_upper = get_multiplier_bounds(
+            arrays, coupling_rows
+        )
+
+        # The economic dispatch is the model with a fixed commitment. Its LP
+        # relaxation gives the initial multipliers.
+        num_cols, num_rows = len(arrays["col_cost"]), len(arrays["row_lower"])
+        dispatch = _create_highs(
+            arrays,
+            np.arange(num_cols),
+            np.arange(num_rows),
+            relax=True,
+            num_threads=num_threads,
+            col_names=model.getAttr("VarName", model.getVars()),
+        )
+        dispatch.changeObjectiveOffset(arrays["offset"])
+        dispatch.run()
+        if not _is_optimal(dispatch):
+            raise ValueError("PowNet: The LP relaxation of the model is not optimal.")
+        self.lower_bound = dispatch.getInfo().objective_function_value
+        relaxed_commitment = np.array(dispatch.getSolution().col_value)[commitment_cols]
+        multipliers = np.clip(
+            np.array(dispatch.getSolution().row_dual)[coupling_rows],
+            multiplier_lower,
+            multiplier_upper,
+        )
+
+        blocks = get_blocks(arrays["matrix"], coupling_rows, int_cols)
+        subproblems = [_create_highs(arrays, cols, rows) for cols, rows in blocks]
+        for subproblem, (cols, _) in zip(subproblems, blocks):
+            if np.isin(cols, int_cols).any():
+                subproblem.setOptionValue("mip_rel_gap", self.subproblem_gap)
+
+        # Solution of the subproblems, which is written by solve_subproblem
+        values = np.zeros(num_cols)
+
+        def solve_subproblem(idx: int, reduced_cost: np.ndarray) -> float:
+            subproblem, cols = subproblems[idx], blocks[idx][0]
+            subproblem.changeColsCost(
+                len(cols), np.arange(len(cols), dtype=np.int32), reduced_cost[cols]
+            )
+            subproblem.run()
+            if not _is_optimal(subproblem):
+                raise ValueError(
+                    "PowNet: A subproblem of the Lagrangian decomposition is "
+                    f"{subproblem.modelStatusToString(subproblem.getModelStatus())}."
+                )
+            values[cols] = subproblem.getSolution().col_value
+            info = subproblem.getInfo()
+            # The dual bound of a MIP keeps the Lagrangian dual value a lower bound
+            if idx < len(subproblems) - 1:
+                return info.mip_dual_bound
+            return info.objective_function_value
+
+        self.upper_bound = np.inf
+        best_commitment, dispatched = None, None
+        tried_commitments = set()
+
+        def try_commitment(commitment: np.ndarray) -> None:
+            nonlocal best_commitment, dispatched
+            if commitment.tobytes() in tried_commitments:
+                return
+            tried_commitments.add(commitment.tobytes())
+            objval = self._solve_dispatch(dispatch, arrays, commitment_cols, commitment)
+            dispatched = commitment
+            if objval < self.upper_bound:
+                self.upper_bound, best_commitment = objval, commitment
+
+        # The LP relaxation rounded to the nearest and to the next integer are the
+        # first commitments. The subproblems often have ties at the optimal
+        # multipliers, so these can be better than theirs.
+        try_commitment(np.round(relaxed_commitment))
+        try_commitment(np.ceil(relaxed_commitment - 1e-6))
+        step_scale, stall = self.step_scale, 0
+        best_multipliers = multipliers
+        self.iterations = 0
+        with ThreadPoolExecutor(max_workers=num_threads or None) as executor:
+            while self.iterations < self.max_iter:
+                self.iterations += 1
+                reduced_cost = arrays["col_cost"] - coupling_matrix.T @ multipliers
+                dual_value = (
+                    arrays["offset"]
+                    + multipliers @ coupling_rhs
+                    + sum(
+                        executor.map(
+                            solve_subproblem,
+                            range(len(subproblems)),
+                            [reduced_cost] * len(subproblems),
+                        )
+                    )
+                )
+                restart = False
+                if dual_value > self.lower_bound + 1e-9 * abs(self.lower_bound):
+                    self.lower_bound, best_multipliers, stall = (
+                        dual_value,
+                        multipliers,
+                        0,
+                    )
+                else:
+                    stall += 1
+                    # Continue from the best multipliers with a smaller step size
+                    if stall >= self.patience:
+                        step_scale, stall, restart = step_scale / 2, 0, True
+
+                # Fix the commitment of the subproblems in the economic dispatch
+                try_commitment(np.round(values[commitment_cols]))
+
+                if log_to_console:
+                    logger.info(
+                        f"PowNet: Lagrangian iteration {self.iterations}: "
+                        f"lower bound {self.lower_bound:.6g}, "
+                        f"upper bound {self.upper_bound:.6g}, gap {self.get_gap():.3%}"
+                    )
+                if self.get_gap() <= mipgap or time.perf_counter() - start >= timelimit:
+                    break
+
+                if restart:
+                    # The multipliers hardly change with a negligible step size
+                    if step_scale < 1e-4 * self.step_scale:
+                        break
+                    multipliers = best_multipliers
+                    continue
+                subgradient = coupling_rhs - coupling_matrix @ values
+                norm = subgradient @ subgradient
+                if norm == 0 or not np.isfinite(self.upper_bound):
+                    break
+                step = step_scale * (self.upper_bound - dual_value) / norm
+                multipliers = np.clip(
+                    multipliers + step * subgradient, multiplier_lower, multiplier_upper
+                )
+
+        if best_commitment is None:
+            raise ValueError("PowNet: No commitment gives a feasible dispatch.")
+        if dispatched is not best_commitment:
+            self._solve_dispatch(dispatch, arrays, commitment_cols, best_commitment)
+        self.runtime = time.perf_counter() - start
+        return dispatch
+
+    def _solve_dispatch(
+        self,
+        dispatch: highspy.Highs,
+        arrays: dict,
+        commitment_cols: np.ndarray,
+        commitment: np.ndarray,
+    ) -> float:
+        """Solve the economic dispatch with the commitment variables fixed. The other
+        integer variables are solved as a MIP and then fixed as well, so the solved
+        dispatch is a linear program with duals. Returns infinity if the dispatch is
+        not feasible."""
+        dispatch.changeColsBounds(
+            len(commitment_cols),
+            commitment_cols.astype(np.int32),
+            commitment,
+            commitment,
+        )
+        other_cols = np.setdiff1d(
+            np.flatnonzero(
+                arrays["integrality"] != int(highspy.HighsVarType.kContinuous)
+            ),
+            commitment_cols,
+        ).astype(np.int32)
+        if len(other_cols) > 0:
+            dispatch.changeColsBounds(
+                len(other_cols),
+                other_cols,
+                arrays["col_lower"][other_cols],
+                arrays["col_upper"][other_cols],
+            )
+            dispatch.changeColsIntegrality(
+                len(other_cols), other_cols, arrays["integrality"][other_cols]
+            )
+            dispatch.run()
+            if not _is_optimal(dispatch):
+                return np.inf
+            other_values = np.round(
+                np.array(dispatch.getSolution().col_value)[other_cols]
+            )
+            dispatch.changeColsBounds(
+                len(other_cols), other_cols, other_values, other_values
+            )
+            dispatch.changeColsIntegrality(
+                len(other_cols),
+                other_cols,
+                np.full(
+                    len(other_cols), int(highspy.HighsVarType.kContinuous), np.uint8
+                ),
+            )
+        dispatch.run()
+        if not _is_optimal(dispatch):
+            return np.inf
+        return dispatch.getInfo().objective_function_value
@@ -4,18 +4,20 @@ to provide a more user-friendly interface while compatible with HiGHs solver.
 """
 
 import os
+from typing import Callable
 
 import gurobipy as gp
-import highspy
+import numpy as np
 import pandas as pd
 
-from pownet.data_utils import (
-    get_node_hour_from_flow_constraint,
-    parse_lmp,
-    parse_node_variables,
-)
+from pownet.data_utils import parse_lmp
 
-from .rounding_algo import optimize_with_rounding
+from .highs_model import HighsInstance
+from .lagrangian import LagrangianDecomposition
+from .portfolio import PortfolioSolver
+from .pricing import PricingModel
+from .rounding_algo import optimize_with_rounding, optimize_with_rounding_highs
+from .solution import SolutionLayout
 
 import logging
 
@@ -26,43 +28,97 @@ class PowerSystemModel:
     def __init__(self, model: gp.Model):
         self.model = model
         self.solver: str = "gurobi"
+        # The Gurobi model is kept because self.model becomes a HiGHs instance after solving with HiGHs
+        self.gurobi_model: gp.Model = model
+
+        # MIP start as (column indices, values)
+        self.mip_start: tuple[np.ndarray, np.ndarray] = None
 
         # Rounding related variables
         self.status_vars: gp.tupledict = None
 
+        # Layout of the variables for parsing the solution without variable names
+        self.solution_layout: SolutionLayout = None
+
+        # Flow balance constraints keyed by their names for reading the LMP
+        self.flow_balance_constrs: gp.tupledict = None
+        # Reserve requirement constraints, which are relaxed with the flow balance
+        # constraints by the Lagrangian decomposition
+        self.reserve_constrs: gp.tupledict = None
+
+        # Adds the constraints that a solution violates and returns their number, e.g.,
+        # SystemBuilder.add_violated_transmission_constrs. The model is solved again
+        # until no constraint is added.
+        self.add_violated_constrs: Callable[[np.ndarray], int] = None
+        self.constr_generation_iterations: int = 0
+        # Replaces the variables of the clusters of identical thermal units in the
+        # node table of get_structured_solution with those of their units, e.g.,
+        # ThermalClusters.disaggregate_node_variables
+        self.disaggregate_node_variables: Callable[[pd.DataFrame], pd.DataFrame] = None
+        # Restores the bounds of the status variables that were fixed before solving
+        # and returns their number, e.g., ThermalUnitBuilder.release_status
+        self.release_fixed_commitment: Callable[[], int] = None
+        # Number of status variables fixed by each test of the pre-solve pass
+        self.fixed_commitment: dict[str, int] = None
+        # Whether the last call of optimize solved again without the fixed status
+        self.commitment_released: bool = False
+        # Runtime of the solves before the last one
+        self._previous_runtime: float = 0.0
+
         # Define dictionaries of functions for Gurobi and HiGHs
         self.optimize_functions = {
             "gurobi": self._optimize_gurobi,
             "highs": self._optimize_highs,
+            "lagrangian": self._optimize_lagrangian,
         }
         self.check_feasible_functions = {
             "gurobi": self._check_feasible_gurobi,
             "highs": self._check_feasible_highs,
+            "lagrangian": self._check_feasible_highs,
         }
         self.get_objval_functions = {
             "gurobi": self._get_objval_gurobi,
             "highs": self._get_objval_highs,
+            "lagrangian": self._get_objval_highs,
         }
         self.get_status_functions = {
             "gurobi": self._get_status_gurobi,
             "highs": self._get_status_highs,
+            "lagrangian": self._get_status_highs,
         }
         self.get_solution_functions = {
             "gurobi": self.get_solution_gurobi,
             "highs": self.get_solution_highs,
+            "lagrangian": self.get_solution_highs,
+        }
+        self.get_values_functions = {
+            "gurobi": self.get_values_gurobi,
+            "highs": self.get_values_highs,
+            "lagrangian": self.get_values_highs,
         }
         self.get_runtime_functions = {
             "gurobi": self.get_runtime_gurobi,
             "highs": self.get_runtime_highs,
+            "lagrangian": self.get_runtime_lagrangian,
         }
         self.solve_for_lmp_functions = {
             "gurobi": self.solve_for_lmp_gurobi,
             "highs": self.solve_for_lmp_highs,
+            "lagrangian": self.solve_for_lmp_lagrangian,
         }
 
         self.rounding_optimization_time: float = None
         self.rounding_iterations: int = None
 
+        # Bounds of the last solve with the Lagrangian decomposition
+        self.lagrangian_bound: float = None
+        self.duality_gap: float = None
+        self.lagrangian_iterations: int = None
+
+        # Strategies of the last solve with the portfolio
+        self.portfolio_winner: str = None
+        self.portfolio_results: dict[str, dict] = None
+
     def write_mps(self, output_folder: str, filename: str):
         if not isinstance(self.model, gp.Model):
             raise ValueError("The model must be a Gurobi model")
@@ -83,16 +139,21 @@ class PowerSystemModel:
         self.model.Params.TimeLimit = timelimit
         self.model.Params.Threads = num_threads
 
+        self._set_start_gurobi()
         self.model.optimize()
 
     def _optimize_highs(
         self, log_to_console: bool, mipgap: float, timelimit: int, num_threads: int
     ):
-        # Export the instance to MPS and solve with HiGHs
-        mps_file = "temp_instance_for_HiGHs.mps"
-        self.model.write(mps_file)
-        self.model = highspy.Highs()
-        self.model.readModel(mps_file)
+        # Pass the instance to HiGHs in memory. The HiGHs instance is kept with the
+        # Gurobi model so later steps only pass the changes.
+        if not hasattr(self.gurobi_model, "_highs_instance"):
+            self.gurobi_model._highs_instance = HighsInstance()
+        self.model = self.gurobi_model._highs_instance.load(self.gurobi_model)
+
+        if self.mip_start is not None:
+            col_idx, values = self.mip_start
+            self.model.setSolution(len(col_idx), col_idx.astype(np.int32), values)
 
         self.model.setOptionValue("log_to_console", log_to_console)
         self.model.setOptionValue("mip_rel_gap", mipgap)
@@ -103,8 +164,63 @@ class PowerSystemModel:
         self.model.setOptionValue("solver", "simplex")
 
         self.model.run()
-        # Delete the MPS file
-        os.remove(mps_file)
+
+    def _optimize_lagrangian(
+        self, log_to_console: bool, mipgap: float, timelimit: int, num_threads: int
+    ):
+        # The decomposition is kept with the Gurobi model like the HiGHS instance
+        if not hasattr(self.gurobi_model, "_lagrangian"):
+            self.gurobi_model._lagrangian = LagrangianDecomposition()
+        decomposition = self.gurobi_model._lagrangian
+        # Only the status of the thermal units is fixed in the economic dispatch
+        commitment_cols = None
+        if self.solution_layout is not None:
+            col_idx, vartypes, _, _ = self.solution_layout.node_columns
+            commitment_cols = col_idx[vartypes == "status"]
+        # The solution is the economic dispatch of the best commitment in HiGHS
+        self.model = decomposition.solve(
+            self.gurobi_model,
+            coupling_constrs=self._get_coupling_constrs(),
+            commitment_cols=commitment_cols,
+            mipgap=mipgap,
+            timelimit=timelimit,
+            num_threads=num_threads,
+            log_to_console=log_to_console,
+        )
+        self.lagrangian_bound = decomposition.lower_bound
+        self.duality_gap = decomposition.get_gap()
+        self.lagrangian_iterations = decomposition.iterations
+
+    def set_mip_start(self, col_idx: np.ndarray, values: np.ndarray) -> None:
+        """Set a (partial) MIP start that is passed to the solver by the next call
+        of optimize. Variables that are not in col_idx have no start value.
+
+        Args:
+            col_idx (np.ndarray): Column indices of the variables.
+            values (np.ndarray): Start values of the variables.
+        """
+        self.mip_start = (np.asarray(col_idx, dtype=np.int64), np.asarray(values))
+
+    def _set_start_gurobi(self) -> None:
+        """Set the Start attribute of all variables. The Start attributes of the
+        previous step are cleared because the Gurobi model is reused between steps.
+        """
+        if self.mip_start is None and not getattr(self.model, "_has_mip_start", False):
+            return
+        starts = np.full(self.model.NumVars, gp.GRB.UNDEFINED)
+        if self.mip_start is not None:
+            col_idx, values = self.mip_start
+            starts[col_idx] = values
+        self.model.setAttr("Start", self.model.getVars(), starts.tolist())
+        # User data on the Gurobi model must start with an underscore
+        self.model._has_mip_start = self.mip_start is not None
+
+    def discard_solution(self) -> None:
+        """Discard the solution so the next call of optimize starts from scratch."""
+        if self.solver == "gurobi":
+            self.model.reset()
+        else:
+            self.model.clearSolver()
 
     def optimize(
         self,
@@ -114,31 +230,110 @@ class PowerSystemModel:
         timelimit: int = 600,
         num_threads: int = 0,
     ):
-        if solver not in ["gurobi", "highs"]:
-            raise ValueError("The solver must be either 'gurobi' or 'highs'")
+        if solver not in ["gurobi", "highs", "lagrangian"]:
+            raise ValueError(
+                "The solver must be either 'gurobi', 'highs', or 'lagrangian'"
+            )
 
         # Update the solver attribute for referencing in other methods
         self.solver = solver
+        self._previous_runtime = 0.0
+        self.constr_generation_iterations = 0
+        self.commitment_released = False
         self.optimize_functions[self.solver](
             log_to_console=log_to_console,
             mipgap=mipgap,
             timelimit=timelimit,
             num_threads=num_threads,
         )
+        # Constraint generation: add the violated constraints and solve again
+        while (
+            self.add_violated_constrs is not None
+            and self.check_feasible()
+            and self.add_violated_constrs(self.get_values())
+        ):
+            self._previous_runtime += self.get_runtime_functions[self.solver]()
+            self.constr_generation_iterations += 1
+            self.optimize_functions[self.solver](
+                log_to_console=log_to_console,
+                mipgap=mipgap,
+                timelimit=timelimit,
+                num_threads=num_threads,
+            )
+
+        # Solve again without the status fixed before solving if it is infeasible
+        if (
+            self.release_fixed_commitment is not None
+            and not self.check_feasible()
+            and self.release_fixed_commitment() > 0
+        ):
+            logger.warning(
+                "PowNet: The model with the fixed commitment is infeasible. "
+                "Solve it again without fixing the commitment."
+            )
+            previous_runtime = self.get_runtime()
+            self.optimize(
+                solver=solver,
+                log_to_console=log_to_console,
+                mipgap=mipgap,
+                timelimit=timelimit,
+                num_threads=num_threads,
+            )
+            self._previous_runtime += previous_runtime
+            self.commitment_released = True
 
     def optimize_with_rounding(
         self,
         rounding_strategy: str,
-        max_rounding_iter: int,
+        max_rounding_iter: int = 100,
         threshold: float = 0,
         mipgap: float = 1e-3,
         timelimit: int = 600,
         num_threads: int = 0,
         log_to_console: bool = False,
+        solver: str = "gurobi",
     ) -> None:
-        self.model, self.rounding_optimization_time, self.rounding_iterations = (
-            optimize_with_rounding(
-                model=self.model,
+        """Solve the model with the iterative rounding heuristic instead of as a MIP.
+        The status of the thermal units and the charging mode of the storage units
+        are rounded. The MIP is solved if rounding does not give a feasible integer
+        solution. With lazy transmission constraints, the violated constraints are
+        added and the model is rounded again until none is violated.
+
+        Args:
+            rounding_strategy (str): Either 'fast' or 'slow'. The 'fast' strategy
+                rounds all fractional values at once, while the 'slow' strategy only
+                rounds the largest values in each iteration.
+            max_rounding_iter (int): The maximum number of rounding iterations.
+            threshold (float): Fractional parts from this threshold are rounded up.
+            mipgap (float): The MIP gap if the MIP is solved.
+            timelimit (int): The time limit for the optimization in seconds.
+            num_threads (int): The number of threads to use for optimization.
+            log_to_console (bool): Whether to log the optimization output.
+            solver (str): Either 'gurobi' or 'highs'.
+        """
+        if solver not in ["gurobi", "highs"]:
+            raise ValueError("The solver must be either 'gurobi' or 'highs'")
+        if rounding_strategy not in ["fast", "slow"]:
+            raise ValueError(
+                "PowNet: The rounding strategy must be either 'fast' or 'slow'."
+            )
+        rounding_cols = self._get_rounding_cols()
+
+        self.solver = solver
+        self._previous_runtime = 0.0
+        self.constr_generation_iterations = 0
+        rounding_functions = {
+            "gurobi": optimize_with_rounding,
+            "highs": optimize_with_rounding_highs,
+        }
+        rounding_time = 0.0
+        while True:
+            (
+                self.model,
+                self.rounding_optimization_time,
+                self.rounding_iterations,
+            ) = rounding_functions[solver](
+                model=self.gurobi_model,
                 rounding_strategy=rounding_strategy,
                 threshold=threshold,
                 max_rounding_iter=max_rounding_iter,
@@ -146,9 +341,88 @@ class PowerSystemModel:
                 mipgap=mipgap,
                 timelimit=timelimit,
                 num_threads=num_threads,
+                rounding_cols=rounding_cols,
             )
+            # The runtime includes all linear programs of the rounding, or the MIP
+            # if rounding did not give a feasible integer solution
+            if self.rounding_optimization_time is None:
+                rounding_time += self.get_runtime_functions[solver]()
+            else:
+                rounding_time += self.rounding_optimization_time
+            # Constraint generation: add the violated constraints and round again
+            if not (
+                self.add_violated_constrs is not None
+                and self.check_feasible()
+                and self.add_violated_constrs(self.get_values())
+            ):
+                break
+            self.constr_generation_iterations += 1
+        self._previous_runtime = rounding_time - self.get_runtime_functions[solver]()
+
+    def _get_rounding_cols(self) -> np.ndarray:
+        # The status of the thermal units and the charging mode of the storage units
+        if self.solution_layout is None:
+            return None
+        col_idx, vartypes, _, _ = self.solution_layout.node_columns
+        return col_idx[np.isin(vartypes, ["status", "ucharge", "udischarge"])]
+
+    def optimize_portfolio(
+        self,
+        solver: str = "gurobi",
+        max_rounding_iter: int = 100,
+        threshold: float = 0,
+        mipgap: float = 1e-3,
+        timelimit: int = 600,
+        num_threads: int = 0,
+    ) -> None:
+        """Solve the MIP and the 'fast' and 'slow' rounding strategies concurrently
+        on copies of the model and keep the first solution that meets the MIP gap.
+        The other strategies are cancelled. The winning strategy is kept in
+        portfolio_winner and the result of each strategy in portfolio_results. The
+        runtime is the wall time of the race.
+
+        Args:
+            solver (str): Either 'gurobi' or 'highs'.
+            max_rounding_iter (int): The maximum number of rounding iterations.
+            threshold (float): Fractional parts from this threshold are rounded up.
+            mipgap (float): The MIP gap, which is also the gap target of rounding.
+            timelimit (int): The time limit for the optimization in seconds.
+            num_threads (int): The number of threads of the MIP. Each rounding
+                strategy uses one thread.
+        """
+        if solver not in ["gurobi", "highs"]:
+            raise ValueError("The solver must be either 'gurobi' or 'highs'")
+        portfolio = PortfolioSolver(
+            threshold=threshold, max_rounding_iter=max_rounding_iter
         )
 
+        self.solver = solver
+        self.constr_generation_iterations = 0
+        race_time = 0.0
+        while True:
+            self.model = portfolio.solve(
+                self.gurobi_model,
+                solver=solver,
+                mipgap=mipgap,
+                timelimit=timelimit,
+                num_threads=num_threads,
+                rounding_cols=self._get_rounding_cols(),
+                mip_start=self.mip_start,
+            )
+            race_time += portfolio.runtime
+            # Constraint generation: add the violated constraints and race again
+            if not (
+                self.add_violated_constrs is not None
+                and self.check_feasible()
+                and self.add_violated_constrs(self.get_values())
+            ):
+                break
+            self.constr_generation_iterations += 1
+
+        self.portfolio_winner = portfolio.winner
+        self.portfolio_results = portfolio.results
+        self._previous_runtime = race_time - self.get_runtime_functions[solver]()
+
     def _check_feasible_gurobi(self) -> bool:
         not_allowed_statuses = [
             gp.GRB.Status.INFEASIBLE,
@@ -215,37 +489,106 @@ class PowerSystemModel:
     def get_solution(self) -> pd.DataFrame:
         return pd.DataFrame(self.get_solution_functions[self.solver]())
 
+    def get_values_gurobi(self) -> np.ndarray:
+        return np.array(self.model.getAttr("X"))
+
+    def get_values_highs(self) -> np.ndarray:
+        return np.array(self.model.getSolution().col_value)
+
+    def get_values(self) -> np.ndarray:
+        """Return the values of all variables ordered by their column index."""
+        return self.get_values_functions[self.solver]()
+
+    def get_structured_solution(self) -> dict[str, pd.DataFrame]:
+        """Return the solution as node, flow, and system-wide variables. Unlike
+        get_solution, the variable names are not parsed. The values are read in bulk
+        and mapped to the variables using the layout created by the ModelBuilder.
+
+        Returns:
+            dict[str, pd.DataFrame]: Tables keyed by 'node', 'flow', and 'syswide'.
+
+        Raises:
+            ValueError: If the model has no solution layout.
+        """
+        if self.solution_layout is None:
+            raise ValueError("PowNet: The model does not have a solution layout.")
+        tables = self.solution_layout.get_tables(self.get_values())
+        if self.disaggregate_node_variables is not None:
+            tables["node"] = self.disaggregate_node_variables(tables["node"])
+        return tables
+
     def get_runtime_gurobi(self) -> float:
         return self.model.Runtime
 
     def get_runtime_highs(self) -> float:
         return self.model.getRunTime()
 
+    def get_runtime_lagrangian(self) -> float:
+        return self.gurobi_model._lagrangian.runtime
+
     def get_runtime(self) -> float:
-        return self.get_runtime_functions[self.solver]()
+        """Return the runtime of the last call of optimize, including all solves of
+        the constraint generation."""
+        return self.get_runtime_functions[self.solver]() + self._previous_runtime
+
+    def _get_pricing_model(self) -> PricingModel:
+        # Kept with the Gurobi model so later steps only pass the changes
+        if not hasattr(self.gurobi_model, "_pricing_model"):
+            self.gurobi_model._pricing_model = PricingModel()
+        return self.gurobi_model._pricing_model
+
+    def _get_flow_balance_constrs(self) -> gp.tupledict:
+        # Models that are not built by ModelBuilder are searched by constraint name once
+        if self.flow_balance_constrs is None:
+            self.flow_balance_constrs = gp.tupledict(
+                {
+                    constr.ConstrName: constr
+                    for constr in self.gurobi_model.getConstrs()
+                    if "flowBal" in constr.ConstrName
+                }
+            )
+        return self.flow_balance_constrs
+
+    def _get_coupling_constrs(self) -> list[gp.Constr]:
+        # Models that are not built by ModelBuilder are searched by constraint name once
+        if self.reserve_constrs is None:
+            self.reserve_constrs = gp.tupledict(
+                {
+                    constr.ConstrName: constr
+                    for constr in self.gurobi_model.getConstrs()
+                    if "reserveReq" in constr.ConstrName
+                }
+            )
+        return [
+            *self._get_flow_balance_constrs().values(),
+            *self.reserve_constrs.values(),
+        ]
 
     def solve_for_lmp_gurobi(self) -> dict:
-        """Return the locational marginal price (LMP).
+        """Return the locational marginal price (LMP). The binary variables are fixed
+        to their values in the MIP solution and the duals of the flow balance constraints
+        are found from a linear program that is kept between steps.
 
-        Args:
-            model: The Gurobi model.
+        Returns:
+            The LMP at each node keyed by the name of the flow balance constraint.
+        """
+        pricing_model = self._get_pricing_model()
+        pricing_model.solve(self.model)
+        flow_balance_constrs = self._get_flow_balance_constrs()
+        nodal_price = pricing_model.get_duals(list(flow_balance_constrs.values()))
+        return dict(zip(flow_balance_constrs.keys(), nodal_price.tolist()))
+
+    def solve_for_lmp_lagrangian(self) -> dict:
+        """Return the LMP as the duals of the flow balance constraints in the economic
+        dispatch of the best commitment, which has the binary variables fixed.
 
         Returns:
-            The LMP at each node.
+            The LMP at each node keyed by the name of the flow balance constraint.
         """
-        # Fix the binary variables
-        model_fixed = self.model.fixed()
-        # Reoptimize as linear program, which is already obtained by fixing the binary variables
-        model_fixed.optimize()
-        # Get the dual variables
-        pi = model_fixed.getAttr("Pi", model_fixed.getConstrs())
-        # Filter to only constraints that are nodal balance, which has 'flowBal' in the name
-        nodal_price = {
-            constr.ConstrName: pi[i]
-            for i, constr in enumerate(model_fixed.getConstrs())
-            if "flowBal" in constr.ConstrName
-        }
-        return nodal_price
+        flow_balance_constrs = self._get_flow_balance_constrs()
+        row_dual = np.array(self.model.getSolution().row_dual)
+        nodal_price = row_dual[[c.index for c in flow_balance_constrs.values()]]
+        return dict(zip(flow_balance_constrs.keys(), nodal_price.tolist()))
 
     def solve_for_lmp_highs(self) -> dict:
         raise NotImplementedError("This method is not implemented for HiGHs solver")
@@ -254,54 +597,45 @@ class PowerSystemModel:
         return self.solve_for_lmp_functions[self.solver]()
 
     def solve_for_export_capacity(
-        self, shared_nodes: list, sim_horizon: int, step_k: int
+        self, shared_nodes: list, sim_horizon: int, step_k: int, step_hours: int = 24
     ) -> tuple:
-        """Return the export capacity and hourly prices at the shared nodes"""
-        # Fix binary variables to simulate fixing unit commitments
-        model_fixed = self.model.fixed()
-
-        # Add export variables to the model with a negative coefficient (minimization problem)
-        # The value should be high enough to incentivize export but not high enough to create shortfall
-        export_vars = model_fixed.addVars(
-            shared_nodes,
-            range(1, sim_horizon + 1),
-            vtype=gp.GRB.CONTINUOUS,
-            obj=-1,  # A small negative value should urge the model to export
-            name="export",
+        """Return the export capacity and hourly prices at the shared nodes. Only the
+        hours before the next step, which starts step_hours later, are kept."""
+        flow_balance_constrs = self._get_flow_balance_constrs()
+        # Export variables are added to the flow balance at the shared nodes with a
+        # negative cost. The binary variables are fixed to simulate fixing unit commitments.
+        export = self._get_pricing_model().solve_with_export(
+            self.model,
+            {
+                (node, t): flow_balance_constrs[f"flowBal[{node},{t}]"]
+                for node in shared_nodes
+                for t in range(1, sim_horizon + 1)
+            },
         )
 
-        # Add export variables to the flow balance at the shared nodes
-        for constr in model_fixed.getConstrs():
-            node, t = get_node_hour_from_flow_constraint(constr.ConstrName)
-            if (node is not None) and (node in shared_nodes):
-                model_fixed.chgCoeff(
-                    constr,
-                    export_vars[(node, t)],
-                    -1,  # This will add the export variable to the demand on the RHS
-                )
-        model_fixed.optimize()
-
-        # Extract the export capacity
         export_capacity = pd.DataFrame(
             {
-                "varname": [v.varname for v in export_vars.values()],
-                "value": [v.x for v in export_vars.values()],
+                "node": [node for node, _ in export.keys()],
+                "timestep": [t for _, t in export.keys()],
+                "value": list(export.values()),
             }
         )
-
-        # Format the dataframe with additional columns
-        export_capacity = parse_node_variables(export_capacity, sim_horizon, step_k)
-
+        export_capacity = export_capacity[export_capacity["timestep"] <= step_hours]
+        export_capacity["hour"] = export_capacity["timestep"] + step_hours * (
+            step_k - 1
+        )
         return export_capacity.pivot(index="hour", columns="node", values="value")
 
     def solve_for_export_prices(
-        self, shared_nodes: list, sim_horizon: int, step_k: int
+        self, shared_nodes: list, sim_horizon: int, step_k: int, step_hours: int = 24
     ) -> pd.DataFrame:
-        """The export prices are locational marginal prices at the shared nodes."""
+        """The export prices are locational marginal prices at the shared nodes. Only
+        the hours before the next step, which starts step_hours later, are kept."""
         export_prices = parse_lmp(
             lmp=self.solve_for_lmp(),
             sim_horizon=sim_horizon,
             step_k=step_k,
+            step_hours=step_hours,
         )
         export_prices = export_prices[export_prices["node"].isin(shared_nodes)]
         return export_prices.pivot(index="hour", columns="node", values="value")
@@ -1,15 +1,39 @@
 """objfunc.py: Functions for constructing the objective function."""
 
+import gurobipy as gp
+import numpy as np
+import pandas as pd
+
+from pownet.data_model import Timesteps, TimeseriesArray
+from pownet.data_utils import get_step_window
+
+
+def _get_hours(timesteps: range | Timesteps, t: int) -> range:
+    """Return the hours of timestep t. Each timestep of a range is one hour."""
+    if isinstance(timesteps, Timesteps):
+        return timesteps.get_hours(t)
+    return range(t, t + 1)
+
+
+def _get_durations(timesteps: range | Timesteps) -> np.ndarray:
+    """Return the number of hours of each timestep as a column vector."""
+    if isinstance(timesteps, Timesteps):
+        return timesteps.durations[:, np.newaxis]
+    return np.ones((len(timesteps), 1), dtype=np.int64)
+
 
 def get_thermal_fixed_coeff(
-    timesteps: range,
+    timesteps: range | Timesteps,
     thermal_units: list,
     thermal_fixed_cost: dict,
     thermal_rated_capacity: dict,
 ) -> dict:
-    """Fixed cost is a function of rated capacity and fixed cost per unit."""
+    """Fixed cost is a function of rated capacity and fixed cost per unit.
+    It is paid for each hour of a timestep."""
     return {
-        (unit, t): thermal_rated_capacity[unit] * thermal_fixed_cost[unit]
+        (unit, t): thermal_rated_capacity[unit]
+        * thermal_fixed_cost[unit]
+        * len(_get_hours(timesteps, t))
         for t in timesteps
         for unit in thermal_units
     }
@@ -17,27 +41,32 @@ def get_thermal_fixed_coeff(
 
 def get_thermal_opex_coeff(
     step_k: int,
-    timesteps: range,
+    timesteps: range | Timesteps,
     thermal_units: list,
     thermal_opex: dict,
     fuel_contracts: dict,
     contract_costs: dict,
     thermal_heat_rate: dict,
+    step_hours: int = 24,
 ) -> dict:
-    """Variable cost is a function of fuel cost, heat rate, and opex."""
+    """Variable cost is a function of fuel cost, heat rate, and opex.
+    The cost of a timestep is the sum over its hours."""
     return {
-        (unit, t): (
-            contract_costs[(fuel_contracts[unit], t + (step_k - 1) * 24)]
-            * thermal_heat_rate[unit]
+        (unit, t): sum(
+            (
+                contract_costs[(fuel_contracts[unit], hour + (step_k - 1) * step_hours)]
+                * thermal_heat_rate[unit]
+            )
+            + thermal_opex[unit]
+            for hour in _get_hours(timesteps, t)
         )
-        + thermal_opex[unit]
         for t in timesteps
         for unit in thermal_units
     }
 
 
 def get_thermal_startup_coeff(
-    timesteps: range,
+    timesteps: range | Timesteps,
     thermal_units: list,
     thermal_startup_cost: dict,
     thermal_rated_capacity: dict,
@@ -52,17 +81,20 @@ def get_thermal_startup_coeff(
 
 def get_marginal_cost_coeff(
     step_k: int,
-    timesteps: range,
+    timesteps: range | Timesteps,
     units: list,
     nondispatch_contracts: dict,
     contract_costs: dict,
+    step_hours: int = 24,
 ) -> dict:
     """
     Generic helper function to calculate coefficients based on marginal cost or a similar attribute for a list of units.
 
     Args:
         step_k: Current step in the simulation
-        timesteps: Range of timesteps for the simulation
+        step_hours: Hours between the starts of consecutive steps. Default is 24.
+        timesteps: Range of timesteps for the simulation. The cost of an aggregated
+            timestep is the sum over its hours.
         units: List of units to calculate coefficients for
         nondispatch_contracts: Dictionary mapping units to their respective contracts
         contract_costs: Dictionary mapping contracts to their respective costs
@@ -71,7 +103,84 @@ def get_marginal_cost_coeff(
         A dictionary mapping (unit, t) tuples to the calculated coefficients
     """
     return {
-        (unit, t): contract_costs[(nondispatch_contracts[unit], t + (step_k - 1) * 24)]
+        (unit, t): sum(
+            contract_costs[
+                (nondispatch_contracts[unit], hour + (step_k - 1) * step_hours)
+            ]
+            for hour in _get_hours(timesteps, t)
+        )
         for t in timesteps
         for unit in units
     }
+
+
+def get_thermal_opex_array(
+    step_k: int,
+    timesteps: range | Timesteps,
+    thermal_units: list,
+    thermal_opex: dict,
+    fuel_contracts: dict,
+    contract_costs: pd.DataFrame | TimeseriesArray,
+    thermal_heat_rate: dict,
+    step_hours: int = 24,
+) -> np.ndarray:
+    """Array version of get_thermal_opex_coeff. The contract costs are the timeseries
+    with one column per contract, e.g., SystemInput.contract_cost_timeseries.
+
+    Returns:
+        np.ndarray: Array of shape (len(timesteps), len(thermal_units))
+    """
+    fuel_costs = get_step_window(
+        contract_costs,
+        timesteps,
+        step_k,
+        [fuel_contracts[unit] for unit in thermal_units],
+        step_hours=step_hours,
+    )
+    heat_rate = np.array([thermal_heat_rate[unit] for unit in thermal_units], float)
+    opex = np.array([thermal_opex[unit] for unit in thermal_units], float)
+    return (fuel_costs * heat_rate + opex) * _get_durations(timesteps)
+
+
+def get_marginal_cost_array(
+    step_k: int,
+    timesteps: range | Timesteps,
+    units: list,
+    nondispatch_contracts: dict,
+    contract_costs: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
+) -> np.ndarray:
+    """Array version of get_marginal_cost_coeff. The contract costs are the timeseries
+    with one column per contract, e.g., SystemInput.contract_cost_timeseries.
+
+    Returns:
+        np.ndarray: Array of shape (len(timesteps), len(units))
+    """
+    return get_step_window(
+        contract_costs,
+        timesteps,
+        step_k,
+        [nondispatch_contracts[unit] for unit in units],
+        step_hours=step_hours,
+    ) * _get_durations(timesteps)
+
+
+def get_objective_terms(
+    variables: gp.tupledict,
+    timesteps: range | Timesteps,
+    units: list,
+    coeffs: np.ndarray,
+) -> tuple[list[gp.Var], np.ndarray]:
+    """Pair the variables of the units with their coefficients from an array of
+    shape (len(timesteps), len(units)). Like tupledict.prod, coefficients of
+    (unit, t) without a variable are skipped.
+
+    Returns:
+        tuple[list[gp.Var], np.ndarray]: The variables and their coefficients
+    """
+    keys = [(unit, t) for t in timesteps for unit in units]
+    coeffs = np.asarray(coeffs, dtype=float).ravel()
+    has_var = [key in variables for key in keys]
+    if all(has_var):
+        return [variables[key] for key in keys], coeffs
+    return [variables[key] for key, has in zip(keys, has_var) if has], coeffs[has_var]
@@ -0,0 +1,303 @@
+"""portfolio.py: Race the MIP and the rounding heuristics on copies of a model.
+
+The MIP and the 'fast' and 'slow' rounding strategies are solved concurrently in
+threads. Gurobi and HiGHS release the GIL while solving, so the threads run in
+parallel. Each strategy solves its own copy of the model in its own Gurobi
+environment because a Gurobi environment must not be shared between threads. The
+first solution that meets the gap target wins and the other strategies are
+cancelled. The MIP meets the gap target when it is solved to optimality within its
+MIP gap. A rounding strategy meets the gap target when its objective value is within
+the MIP gap of the LP relaxation, which is a lower bound of the MIP. If no strategy
+meets the gap target, the best feasible solution is taken.
+"""
+
+import concurrent.futures
+import threading
+import time
+
+import gurobipy as gp
+import highspy
+import numpy as np
+
+from .highs_model import HighsInstance
+from .rounding_algo import optimize_with_rounding, optimize_with_rounding_highs
+
+PORTFOLIO_STRATEGIES = ("mip", "fast", "slow")
+
+
+def _create_env() -> gp.Env:
+    """Return a Gurobi environment without console output."""
+    env = gp.Env(empty=True)
+    env.setParam("OutputFlag", 0)
+    env.start()
+    return env
+
+
+class PortfolioSolver:
+    """Solve the MIP and the rounding heuristics concurrently and keep the first
+    solution that meets the gap target.
+
+    Attributes:
+        winner (str): The strategy whose solution is kept.
+        runtime (float): The wall time of the race in seconds.
+        results (dict[str, dict]): The objective value, runtime, and whether the gap
+            target is met for each strategy. Cancelled strategies have no objective
+            value.
+    """
+
+    def __init__(
+        self,
+        strategies: tuple[str] = PORTFOLIO_STRATEGIES,
+        threshold: float = 0,
+        max_rounding_iter: int = 100,
+        poll_interval: float = 0.1,
+    ) -> None:
+        """
+        Args:
+            strategies (tuple[str]): The strategies to race. Each is 'mip', 'fast',
+                or 'slow'. Default is all three.
+            threshold (float): The threshold for rounding up. Default is 0.
+            max_rounding_iter (int): The maximum number of rounding iterations.
+            poll_interval (float): Seconds between cancellation requests while the
+                cancelled strategies are still running.
+        """
+        for strategy in strategies:
+            if strategy not in PORTFOLIO_STRATEGIES:
+                raise ValueError(
+                    f"PowNet: Unknown portfolio strategy '{strategy}'. "
+                    f"Choose from {PORTFOLIO_STRATEGIES}."
+                )
+        self.strategies = tuple(strategies)
+        self.threshold = threshold
+        self.max_rounding_iter = max_rounding_iter
+        self.poll_interval = poll_interval
+
+        self.winner: str = None
+        self.runtime: float = None
+        self.results: dict[str, dict] = {}
+
+    def _solve_mip_gurobi(self, model: gp.Model, stop_event: threading.Event):
+        if not stop_event.is_set():
+            model.optimize()
+        if model.SolCount == 0:
+            return None, False
+        return model.ObjVal, model.Status == gp.GRB.OPTIMAL
+
+    def _solve_mip_highs(self, model: highspy.Highs, stop_event: threading.Event):
+        if not stop_event.is_set():
+            model.run()
+        model_status = model.getModelStatus()
+        feasible = int(highspy.SolutionStatus.kSolutionStatusFeasible)
+        if model.getInfo().primal_solution_status != feasible:
+            return None, False
+        objval = model.getInfo().objective_function_value
+        return objval, model_status == highspy.HighsModelStatus.kOptimal
+
+    def _solve_rounding(
+        self,
+        rounding_function,
+        model: gp.Model,
+        rounding_strategy: str,
+        mipgap: float,
+        timelimit: int,
+        rounding_cols: np.ndarray,
+        stop_event: threading.Event,
+        rounding_models: dict,
+    ):
+        bounds = []
+        rounding_model, runtime, _ = rounding_function(
+            model=model,
+            rounding_strategy=rounding_strategy,
+            threshold=self.threshold,
+            max_rounding_iter=self.max_rounding_iter,
+            mipgap=mipgap,
+            timelimit=timelimit,
+            num_threads=1,
+            log_to_console=False,
+            rounding_cols=rounding_cols,
+            stop_event=stop_event,
+            solve_mip=False,
+            on_relaxed=bounds.append,
+        )
+        rounding_models[rounding_strategy] = rounding_model
+        # The runtime is None if rounding did not find an integer solution
+        if runtime is None:
+            return None, False
+        if isinstance(rounding_model, gp.Model):
+            objval = rounding_model.ObjVal
+        else:
+            objval = rounding_model.getInfo().objective_function_value
+        gap = (objval - bounds[0]) / max(abs(objval), 1e-10)
+        return objval, gap <= mipgap
+
+    def solve(
+        self,
+        model: gp.Model,
+        solver: str = "gurobi",
+        mipgap: float = 1e-3,
+        timelimit: int = 600,
+        num_threads: int = 0,
+        rounding_cols: np.ndarray = None,
+        mip_start: tuple[np.ndarray, np.ndarray] = None,
+    ) -> gp.Model | highspy.Highs:
+        """Race the strategies on copies of the model.
+
+        Args:
+            model (gp.Model): The Gurobi model, which is not changed.
+            solver (str): Either 'gurobi' or 'highs'.
+            mipgap (float): The relative MIP gap, which is also the gap target.
+            timelimit (int): The time limit of each strategy in seconds.
+            num_threads (int): The number of threads of the MIP. Each rounding
+                strategy uses one thread.
+            rounding_cols (np.ndarray, optional): Column indices of the variables to
+                round. Defaults to None, which rounds the status variables.
+            mip_start (tuple[np.ndarray, np.ndarray], optional): Column indices and
+                start values of the MIP.
+
+        Returns:
+            gp.Model | highspy.Highs: The solved model of the winning strategy. A
+                rounding strategy returns its linear program with the rounded
+                variables fixed.
+        """
+        if solver not in ["gurobi", "highs"]:
+            raise ValueError("PowNet: The solver must be either 'gurobi' or 'highs'.")
+        start_time = time.perf_counter()
+        model.update()
+
+        # Copy the model in the main thread, so the threads only use their own copy
+        envs = {strategy: _create_env() for strategy in self.strategies}
+        copies = {strategy: model.copy(env=envs[strategy]) for strategy in envs}
+        stop_event = threading.Event()
+        rounding_models = {}
+        mip_model = None
+        if "mip" in copies:
+            mip_model = self._create_mip(
+                copies["mip"], solver, mipgap, timelimit, num_threads, mip_start
+            )
+
+        def cancel():
+            stop_event.set()
+            if isinstance(mip_model, gp.Model):
+                mip_model.terminate()
+            elif mip_model is not None:
+                mip_model.cancelSolve()
+
+        tasks = {}
+        with concurrent.futures.ThreadPoolExecutor(len(copies)) as executor:
+            for strategy, model_copy in copies.items():
+                if strategy == "mip":
+                    mip_function = (
+                        self._solve_mip_gurobi
+                        if solver == "gurobi"
+                        else self._solve_mip_highs
+                    )
+                    future = executor.submit(mip_function, mip_model, stop_event)
+                else:
+                    future = executor.submit(
+                        self._solve_rounding,
+                        (
+                            optimize_with_rounding
+                            if solver == "gurobi"
+                            else optimize_with_rounding_highs
+                        ),
+                        model_copy,
+                        strategy,
+                        mipgap,
+                        timelimit,
+                        rounding_cols,
+                        stop_event,
+                        rounding_models,
+                    )
+                tasks[future] = strategy
+
+            self.winner = None
+            self.results = {}
+            pending = set(tasks)
+            while pending:
+                done, pending = concurrent.futures.wait(
+                    pending,
+                    timeout=self.poll_interval if self.winner else None,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                for future in done:
+                    strategy = tasks[future]
+                    try:
+                        objval, meets_gap = future.result()
+                    except Exception:
+                        cancel()
+                        raise
+                    self.results[strategy] = {
+                        "objval": objval,
+                        "runtime": time.perf_counter() - start_time,
+                        "meets_gap": meets_gap,
+                        "cancelled": self.winner is not None and objval is None,
+                    }
+                    if meets_gap and self.winner is None:
+                        self.winner = strategy
+                # Cancel again because a solver that has not started yet may miss it
+                if self.winner is not None:
+                    cancel()
+        self.runtime = time.perf_counter() - start_time
+
+        if self.winner is None:
+            # Take the best feasible solution
+            feasible = {
+                strategy: result["objval"]
+                for strategy, result in self.results.items()
+                if result["objval"] is not None
+            }
+            if not feasible:
+                raise ValueError("PowNet: No strategy of the portfolio is feasible.")
+            self.winner = min(feasible, key=feasible.get)
+
+        # Keep the environment of the winning model alive and free the others
+        solved_models = {**rounding_models, "mip": mip_model}
+        winner_model = solved_models[self.winner]
+        for strategy, env in envs.items():
+            solved_model = solved_models.get(strategy)
+            if solved_model is winner_model and isinstance(winner_model, gp.Model):
+                winner_model._portfolio_env = env
+                continue
+            if (
+                isinstance(solved_model, gp.Model)
+                and solved_model is not copies[strategy]
+            ):
+                solved_model.dispose()
+            copies[strategy].dispose()
+            env.dispose()
+        return winner_model
+
+    def _create_mip(
+        self,
+        model: gp.Model,
+        solver: str,
+        mipgap: float,
+        timelimit: int,
+        num_threads: int,
+        mip_start: tuple[np.ndarray, np.ndarray],
+    ) -> gp.Model | highspy.Highs:
+        """Set the parameters and the MIP start of the copy of the MIP."""
+        if solver == "gurobi":
+            model.Params.MIPGap = mipgap
+            model.Params.TimeLimit = timelimit
+            model.Params.Threads = num_threads
+            if mip_start is not None:
+                col_idx, values = mip_start
+                variables = model.getVars()
+                model.setAttr(
+                    "Start", [variables[i] for i in col_idx.tolist()], values.tolist()
+                )
+            return model
+
+        highs_model = HighsInstance().load(model)
+        highs_model.setOptionValue("log_to_console", False)
+        highs_model.setOptionValue("mip_rel_gap", mipgap)
+        highs_model.setOptionValue("time_limit", float(timelimit))
+        highs_model.setOptionValue("threads", num_threads)
+        highs_model.setOptionValue("solver", "simplex")
+        # Allow cancelSolve from another thread
+        highs_model.HandleUserInterrupt = True
+        if mip_start is not None:
+            col_idx, values = mip_start
+            highs_model.setSolution(len(col_idx), col_idx.astype(np.int32), values)
+        return highs_model
@@ -0,0 +1,209 @@
+"""pricing.py: Find the duals of a PowNet model with a persistent linear program.
+
+PricingModel keeps a linear copy of a Gurobi model between steps of the rolling
+horizon. After the MIP is solved, the integer variables of the copy are fixed to
+their values in the MIP solution by their bounds, and the copy is solved as a linear
+program. Only the bounds, costs, right-hand sides, and coefficients that differ from
+the previous step are changed in the copy, so Gurobi starts the simplex from the basis
+of the previous step instead of copying and solving a new model as model.fixed() does.
+"""
+
+import gurobipy as gp
+import numpy as np
+import scipy.sparse as sp
+
+
+def get_fixed_lp_arrays(model: gp.Model, int_idx: np.ndarray) -> dict:
+    """Return the objective, bounds, and constraint matrix of a solved Gurobi model
+    as arrays ordered by column and row index. The bounds of the integer variables
+    are fixed to their values in the solution.
+
+    Args:
+        model (gp.Model): The solved Gurobi model.
+        int_idx (np.ndarray): Column indices of the integer variables.
+
+    Returns:
+        dict: Arrays of the model. The constraint matrix is a scipy CSR matrix.
+    """
+    variables = model.getVars()
+    constrs = model.getConstrs()
+
+    col_lower = np.asarray(model.getAttr("LB", variables), dtype=float)
+    col_upper = np.asarray(model.getAttr("UB", variables), dtype=float)
+    if len(int_idx) > 0:
+        int_values = np.round(
+            model.getAttr("X", [variables[i] for i in int_idx.tolist()])
+        )
+        col_lower[int_idx] = int_values
+        col_upper[int_idx] = int_values
+
+    matrix = model.getA().tocsr() if constrs else sp.csr_matrix((0, len(variables)))
+    matrix.sort_indices()
+
+    return {
+        "sense": model.ModelSense,
+        "offset": model.ObjCon,
+        "col_cost": np.asarray(model.getAttr("Obj", variables), dtype=float),
+        "col_lower": col_lower,
+        "col_upper": col_upper,
+        "rhs": np.asarray(model.getAttr("RHS", constrs), dtype=float),
+        "row_sense": np.asarray(model.getAttr("Sense", constrs), dtype=object),
+        "matrix": matrix,
+    }
+
+
+class PricingModel:
+    """A linear program that mirrors a solved Gurobi MIP with fixed integer variables."""
+
+    def __init__(self) -> None:
+        self.lp: gp.Model = None
+        # Arrays of the model last passed to the linear program
+        self.arrays: dict = None
+        self.lp_vars: list[gp.Var] = []
+        self.lp_constrs: list[gp.Constr] = []
+        # Column indices of the integer variables in the MIP
+        self.int_idx: np.ndarray = np.array([], dtype=np.int64)
+
+        # Export variables that are only added for solve_for_export_capacity.
+        # They are fixed to zero otherwise, so they do not change the duals.
+        self.export_vars: gp.tupledict = None
+        self.export_rows: list[int] = None
+
+    def solve(self, model: gp.Model) -> None:
+        """Fix the integer variables of the solved MIP and solve the linear program.
+
+        Args:
+            model (gp.Model): The solved Gurobi MIP.
+        """
+        self._load(model)
+        self.lp.optimize()
+
+    def _load(self, model: gp.Model) -> None:
+        """Pass the solved MIP to the linear program. The MIP is copied on the first
+        call or when the number of variables or constraints changed. Otherwise, only
+        the differences to the previous call are passed and the previous basis is kept.
+        """
+        if (
+            self.lp is None
+            or (model.NumVars, model.NumConstrs) != self.arrays["matrix"].shape[::-1]
+        ):
+            self._copy_model(model)
+        else:
+            self._change_model(get_fixed_lp_arrays(model, self.int_idx))
+
+        self.lp.Params.LogToConsole = model.Params.LogToConsole
+        self.lp.Params.Threads = model.Params.Threads
+
+    def _copy_model(self, model: gp.Model) -> None:
+        vtypes = np.asarray(model.getAttr("VType", model.getVars()), dtype=object)
+        self.int_idx = np.flatnonzero(vtypes != gp.GRB.CONTINUOUS)
+        self.arrays = get_fixed_lp_arrays(model, self.int_idx)
+
+        if self.lp is not None:
+            self.lp.dispose()
+        self.lp = model.relax()
+        self.lp_vars = self.lp.getVars()
+        self.lp_constrs = self.lp.getConstrs()
+        self.lp.setAttr("LB", self.lp_vars, self.arrays["col_lower"].tolist())
+        self.lp.setAttr("UB", self.lp_vars, self.arrays["col_upper"].tolist())
+        # The MIP solution is optimal for the fixed integer variables up to the MIP gap
+        self.lp.setAttr("PStart", self.lp_vars, model.getAttr("X", model.getVars()))
+        self.export_vars = None
+        self.export_rows = None
+
+    def _change_model(self, arrays: dict) -> None:
+        old = self.arrays
+
+        if arrays["sense"] != old["sense"]:
+            self.lp.ModelSense = arrays["sense"]
+        if arrays["offset"] != old["offset"]:
+            self.lp.ObjCon = arrays["offset"]
+
+        for attr, name in [
+            ("Obj", "col_cost"),
+            ("LB", "col_lower"),
+            ("UB", "col_upper"),
+        ]:
+            idx = np.flatnonzero(arrays[name] != old[name])
+            if len(idx) > 0:
+                self.lp.setAttr(
+                    attr, [self.lp_vars[i] for i in idx], arrays[name][idx].tolist()
+                )
+
+        for attr, name in [("RHS", "rhs"), ("Sense", "row_sense")]:
+            idx = np.flatnonzero(arrays[name] != old[name])
+            if len(idx) > 0:
+                self.lp.setAttr(
+                    attr, [self.lp_constrs[i] for i in idx], arrays[name][idx].tolist()
+                )
+
+        # Coefficients that were changed, added, or removed
+        diff = (arrays["matrix"] - old["matrix"]).tocoo()
+        diff.eliminate_zeros()
+        if diff.nnz > 0:
+            new_values = np.asarray(arrays["matrix"][diff.row, diff.col]).ravel()
+            for row, col, value in zip(diff.row, diff.col, new_values):
+                self.lp.chgCoeff(self.lp_constrs[row], self.lp_vars[col], float(value))
+        self.arrays = arrays
+
+    def get_duals(self, constrs: list[gp.Constr]) -> np.ndarray:
+        """Return the duals of the given constraints of the MIP from the linear program.
+
+        Args:
+            constrs (list[gp.Constr]): Constraints of the MIP.
+
+        Returns:
+            np.ndarray: The duals ordered as the constraints.
+        """
+        return np.array(
+            self.lp.getAttr("Pi", [self.lp_constrs[c.index] for c in constrs])
+        )
+
+    def solve_with_export(
+        self, model: gp.Model, export_constrs: dict[tuple[str, int], gp.Constr]
+    ) -> dict[tuple[str, int], float]:
+        """Solve the linear program with export variables that withdraw power from
+        the given constraints of the MIP, e.g., the flow balance at shared nodes.
+        Each unit of export decreases the objective by one.
+
+        Args:
+            model (gp.Model): The solved Gurobi MIP.
+            export_constrs (dict[tuple[str, int], gp.Constr]): Constraints of the
+                MIP keyed by (node, t).
+
+        Returns:
+            dict[tuple[str, int], float]: The export keyed by (node, t).
+        """
+        self._load(model)
+        rows = [c.index for c in export_constrs.values()]
+        if self.export_vars is None or (
+            list(self.export_vars.keys()) != list(export_constrs.keys())
+            or self.export_rows != rows
+        ):
+            if self.export_vars is not None:
+                self.lp.remove(self.export_vars)
+            self.export_vars = gp.tupledict(
+                {
+                    key: self.lp.addVar(
+                        lb=0,
+                        ub=0,
+                        obj=0,
+                        column=gp.Column([-1], [self.lp_constrs[row]]),
+                        name=f"export[{key[0]},{key[1]}]",
+                    )
+                    for key, row in zip(export_constrs.keys(), rows)
+                }
+            )
+            self.export_rows = rows
+            self.lp.update()
+
+        export_vars = list(self.export_vars.values())
+        self.lp.setAttr("UB", export_vars, [gp.GRB.INFINITY] * len(export_vars))
+        self.lp.setAttr("Obj", export_vars, [-1] * len(export_vars))
+        self.lp.optimize()
+        export = dict(zip(self.export_vars.keys(), self.lp.getAttr("X", export_vars)))
+
+        # Fix the export to zero again for finding the duals
+        self.lp.setAttr("UB", export_vars, [0] * len(export_vars))
+        self.lp.setAttr("Obj", export_vars, [0] * len(export_vars))
+        return export
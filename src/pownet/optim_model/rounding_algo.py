@@ -1,15 +1,28 @@
-"""rounding_algo.py: Functions to perform iterative rounding."""
+"""rounding_algo.py: Functions to perform iterative rounding.
+
+The integer variables of the model are relaxed and the linear program is solved. The
+fractional values of the target variables are rounded and fixed with their bounds,
+and the linear program is solved again until all target variables are integers. The
+values are read and the bounds are set in bulk. The linear program is changed in
+place, so each re-solve starts from the optimal basis of the previous iteration and
+only takes a few dual simplex pivots.
+"""
+
+import logging
+import threading
+from typing import Callable
 
 import gurobipy as gp
+import highspy
 import numpy as np
 
-import logging
+from .highs_model import HighsInstance
 
 logger = logging.getLogger(__name__)
 
 
-def get_variables(model: gp.Model, target_varnames: list[str] = None) -> dict:
-    """Extract non-binary variables from a Gurobi model.
+def get_rounding_cols(model: gp.Model, target_varnames: list[str] = None) -> np.ndarray:
+    """Return the column indices of the variables with the given name prefixes.
 
     Args:
         model (gp.Model): The Gurobi model to extract variables from.
@@ -18,31 +31,84 @@ def get_variables(model: gp.Model, target_varnames: list[str] = None) -> dict:
             If None, defaults to ["status"].
 
     Returns:
-        dict: A dictionary mapping variable names to their corresponding
-              non-binary values (v.X).
+        np.ndarray: The column indices of the variables, e.g., 'status[pGas,1]'
+            has the prefix 'status'.
+    """
+    if target_varnames is None:
+        target_varnames = ["status"]
+    varnames = model.getAttr("VarName", model.getVars())
+    prefixes = np.array([varname.split("[")[0] for varname in varnames], dtype=object)
+    return np.flatnonzero(np.isin(prefixes, target_varnames))
+
+
+def find_fraction_cols(values: np.ndarray, atol: float = 1e-5) -> np.ndarray:
+    """Return a boolean mask of the values that are not integers."""
+    return ~np.isclose(values, np.round(values), atol=atol)
+
+
+def get_rounded_values(
+    values: np.ndarray,
+    fractional: np.ndarray,
+    rounding_strategy: str,
+    threshold: float = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Round the fractional values. A value is rounded up when its fractional part is
+    at least the threshold and rounded down otherwise. The 'fast' strategy rounds all
+    fractional values at once. The 'slow' strategy only rounds the largest ones.
+
+    Args:
+        values (np.ndarray): The values of the target variables.
+        fractional (np.ndarray): Boolean mask of the fractional values.
+        rounding_strategy (str): Either 'fast' or 'slow'.
+        threshold (float): The threshold for rounding up. Default is 0.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The positions of the rounded values in values
+            and the rounded values.
+    """
+    if rounding_strategy == "slow":
+        fractional = fractional & (values == values[fractional].max())
+    idx = np.flatnonzero(fractional)
+    rounded = np.where(
+        values[idx] - np.floor(values[idx]) >= threshold,
+        np.ceil(values[idx]),
+        np.floor(values[idx]),
+    )
+    return idx, rounded
+
+
+def get_variables(model: gp.Model, target_varnames: list[str] = None) -> dict:
+    """Extract the variables with the given name prefixes from a Gurobi model.
+    Kept for backward compatibility. See get_rounding_cols for the column indices.
+
+    Args:
+        model (gp.Model): The Gurobi model to extract variables from.
+        target_varnames (list[str], optional):
+            A list of variable name prefixes to include.
+            If None, defaults to ["status"].
 
+    Returns:
+        dict: A dictionary mapping variable names to their variables.
     """
     if target_varnames is None:
         target_varnames = ["status"]
-    filtered_vars = {}
-    for v in model.getVars():
-        # Extract the prefix of the variable name (e.g., 'status' from 'status[1,2]')
-        if v.varName.split("[")[0] in target_varnames:
-            filtered_vars[v.varName] = v
-    return filtered_vars
-
-
-def find_fraction_vars(
-    binary_vars: dict,
-    atol: float = 1e-5,
-) -> dict:
-    """Return a list of variable names when their values are fractional."""
-    fractional_vars = {}
-    for varname in binary_vars:
-        x_value = binary_vars[varname].X
-        if not (np.isclose(x_value, 0, atol=atol) or np.isclose(x_value, 1, atol=atol)):
-            fractional_vars[varname] = binary_vars[varname]
-    return fractional_vars
+    return {
+        v.varName: v
+        for v in model.getVars()
+        if v.varName.split("[")[0] in target_varnames
+    }
+
+
+def find_fraction_vars(binary_vars: dict, atol: float = 1e-5) -> dict:
+    """Return the variables whose values are fractional. Kept for backward
+    compatibility. See find_fraction_cols for an array of values."""
+    values = np.array([v.X for v in binary_vars.values()], dtype=float)
+    fractional = find_fraction_cols(values, atol=atol)
+    return {
+        varname: var
+        for (varname, var), is_fractional in zip(binary_vars.items(), fractional)
+        if is_fractional
+    }
 
 
 def round_up(variable: gp.Var) -> None:
@@ -55,28 +121,32 @@ def round_down(variable: gp.Var) -> None:
     variable.ub = 0
 
 
-def slow_rounding(
-    fraction_vars: dict,
-    threshold: float = 0,
-) -> None:
-    """Iteratively rounding variables with the largest value at each iteration.
-    Values above the threshold are rounded up. Values below the threshold are rounded down.
+def _round_vars(fraction_vars: dict, rounding_strategy: str, threshold: float) -> None:
+    """Fix the fractional binary variables to their values from get_rounded_values."""
+    variables = list(fraction_vars.values())
+    values = np.array([v.X for v in variables], dtype=float)
+    idx, rounded = get_rounded_values(
+        values, np.ones(len(values), dtype=bool), rounding_strategy, threshold
+    )
+    for i, value in zip(idx, rounded):
+        if value >= 1:
+            round_up(variables[i])
+        else:
+            round_down(variables[i])
+
+
+def slow_rounding(fraction_vars: dict, threshold: float = 0) -> None:
+    """Round the variables with the largest value. Values above the threshold are
+    rounded up. Values below the threshold are rounded down. Kept for backward
+    compatibility. See get_rounded_values for an array of values.
     """
-    max_value = max([v.X for v in fraction_vars.values()])
-    for var in fraction_vars.values():
-        if var.X == max_value:
-            if max_value >= threshold:
-                round_up(var)
-            else:
-                round_down(var)
+    _round_vars(fraction_vars, "slow", threshold)
 
 
 def fast_rounding(fraction_vars: dict, threshold: float = 0) -> None:
-    for bin_var in fraction_vars.values():
-        if bin_var.X >= threshold:
-            round_up(bin_var)
-        else:
-            round_down(bin_var)
+    """Round all variables with the threshold. Kept for backward compatibility.
+    See get_rounded_values for an array of values."""
+    _round_vars(fraction_vars, "fast", threshold)
 
 
 def check_binary_values(var_dict: dict) -> bool:
@@ -90,11 +160,12 @@ def check_binary_values(var_dict: dict) -> bool:
     Returns:
         bool: True if all variables have binary values, False otherwise.
     """
-    for var_name, var in var_dict.items():
-        var_value = var.X
-        if not (var_value == 0 or var_value == 1):
-            logger.info(f"Variable {var_name} has non-binary value: {var_value}")
-            return False
+    values = np.array([var.X for var in var_dict.values()], dtype=float)
+    non_binary = np.flatnonzero(~np.isin(values, [0, 1]))
+    if len(non_binary) > 0:
+        var_name = list(var_dict)[non_binary[0]]
+        logger.info(f"Variable {var_name} has non-binary value: {var_dict[var_name].X}")
+        return False
     return True
 
 
@@ -107,6 +178,10 @@ def optimize_with_rounding(
     timelimit: int,
     num_threads: int,
     log_to_console: bool,
+    rounding_cols: np.ndarray = None,
+    stop_event: threading.Event = None,
+    solve_mip: bool = True,
+    on_relaxed: Callable[[float], None] = None,
 ) -> tuple[gp.Model, float, int]:
     """
     Optimize a Gurobi model using iterative rounding with a given threshold.
@@ -117,15 +192,26 @@ def optimize_with_rounding(
 
     Args:
         model (gp.Model): The Gurobi model to optimize.
+        rounding_strategy (str): Either 'fast' or 'slow'. See get_rounded_values.
         threshold (float): The threshold for rounding fractional variables.
         max_rounding_iter (int): The maximum number of rounding iterations.
         log_to_console (bool): Whether to log optimization output to the console.
         mipgap (float): The relative MIP optimality gap.
         timelimit (int): The time limit for the optimization in seconds.
         num_threads (int): The number of threads to use for optimization.
+        rounding_cols (np.ndarray, optional): Column indices of the variables to
+            round. Defaults to None, which rounds the status variables.
+        stop_event (threading.Event, optional): Rounding stops before the next
+            linear program when the event is set, e.g., by PortfolioSolver.
+        solve_mip (bool): Whether to solve the MIP when rounding does not find an
+            integer solution. Default is True.
+        on_relaxed (Callable[[float], None], optional): Called with the objective
+            value of the LP relaxation, which is a lower bound of the MIP.
 
     Returns:
-        gp.Model: The optimized Gurobi model.
+        tuple[gp.Model, float, int]: The optimized Gurobi model, the total runtime
+            of the linear programs, and the number of rounding iterations. The
+            runtime and iterations are None if the MIP was solved instead.
     """
 
     # First specify the model parameters
@@ -136,42 +222,160 @@ def optimize_with_rounding(
 
     rounding_model = model.relax()
     rounding_model.Params.LogToConsole = False
-    binary_vars = get_variables(rounding_model)
+    if rounding_cols is None:
+        rounding_cols = get_rounding_cols(rounding_model)
+    variables = rounding_model.getVars()
+    rounding_vars = [variables[i] for i in rounding_cols]
 
     rounding_optimization_time = 0
     for current_iter in range(max_rounding_iter):
+        if stop_event is not None and stop_event.is_set():
+            return model, None, None
         rounding_model.optimize()
 
         # Keep track of the optimization time
         rounding_optimization_time += rounding_model.runtime
 
         # Fixing variables can cause infeasibility
-        if rounding_model.status == 3:
+        if rounding_model.status == gp.GRB.INFEASIBLE:
             logger.warning("\nPowNet: Rounding is infeasible. Use the MIP method.")
-            model.optimize()
+            if solve_mip:
+                model.optimize()
             return model, None, None
         # The model should be feasible, but raise an error if not.
-        elif rounding_model.status != 2:
+        elif rounding_model.status != gp.GRB.OPTIMAL:
             raise ValueError(f"Unrecognized model status: {rounding_model.status}")
 
-        # Round variables and update the model
-        fraction_vars = find_fraction_vars(binary_vars)
+        if current_iter == 0 and on_relaxed is not None:
+            on_relaxed(rounding_model.ObjVal)
+
+        values = np.array(rounding_model.getAttr("X", rounding_vars))
+        fractional = find_fraction_cols(values)
 
-        # An empty dict means we have an integer solution.
-        if len(fraction_vars) == 0:
+        # No fractional values means we have an integer solution.
+        if not fractional.any():
             return rounding_model, rounding_optimization_time, current_iter
 
-        if rounding_strategy == "slow":
-            slow_rounding(fraction_vars=fraction_vars, threshold=threshold)
-        else:
-            fast_rounding(fraction_vars=fraction_vars, threshold=threshold)
+        # Fix the rounded variables with their bounds
+        idx, rounded = get_rounded_values(
+            values, fractional, rounding_strategy, threshold
+        )
+        fixed_vars = [rounding_vars[i] for i in idx]
+        rounding_model.setAttr("LB", fixed_vars, rounded)
+        rounding_model.setAttr("UB", fixed_vars, rounded)
 
-        # Remove the rounded variables
-        rounding_model.update()
+        # Gurobi keeps the basis when the bounds change. The basis stays dual
+        # feasible, so the dual simplex only needs a few pivots.
+        rounding_model.Params.Method = 1
 
     # If no integer solution is found after max_rounding_iter
     logger.warning(
-        "\nPowNet: The rounding heuristic has terminated before finding an integer solution."
+        "\nPowNet: The rounding heuristic has terminated before finding an "
+        "integer solution."
     )
-    model.optimize()
+    if solve_mip:
+        model.optimize()
     return model, None, None
+
+
+def optimize_with_rounding_highs(
+    model: gp.Model,
+    rounding_strategy: str,
+    threshold: float,
+    max_rounding_iter: int,
+    mipgap: float,
+    timelimit: int,
+    num_threads: int,
+    log_to_console: bool,
+    rounding_cols: np.ndarray = None,
+    stop_event: threading.Event = None,
+    solve_mip: bool = True,
+    on_relaxed: Callable[[float], None] = None,
+) -> tuple[highspy.Highs, float, int]:
+    """Optimize a Gurobi model with HiGHS using iterative rounding. See
+    optimize_with_rounding for the description of the arguments.
+
+    HiGHS keeps the basis when the bounds change, so each linear program starts from
+    the solution of the previous iteration.
+
+    Returns:
+        tuple[highspy.Highs, float, int]: The optimized HiGHS model, the total runtime
+            of the linear programs, and the number of rounding iterations. The
+            runtime and iterations are None if the MIP was solved instead.
+    """
+    if rounding_cols is None:
+        rounding_cols = get_rounding_cols(model)
+    rounding_cols = np.asarray(rounding_cols, dtype=np.int32)
+
+    highs_instance = HighsInstance()
+    rounding_model = highs_instance.load(model)
+    arrays = highs_instance.arrays
+    int_cols = np.flatnonzero(
+        arrays["integrality"] != int(highspy.HighsVarType.kContinuous)
+    ).astype(np.int32)
+    rounding_model.changeColsIntegrality(
+        len(int_cols),
+        int_cols,
+        np.full(len(int_cols), int(highspy.HighsVarType.kContinuous), np.uint8),
+    )
+    rounding_model.setOptionValue("log_to_console", False)
+    rounding_model.setOptionValue("time_limit", float(timelimit))
+    rounding_model.setOptionValue("threads", num_threads)
+    rounding_model.setOptionValue("solver", "simplex")
+
+    for current_iter in range(max_rounding_iter):
+        if stop_event is not None and stop_event.is_set():
+            return rounding_model, None, None
+        rounding_model.run()
+        model_status = rounding_model.getModelStatus()
+
+        # Fixing variables can cause infeasibility
+        if model_status == highspy.HighsModelStatus.kInfeasible:
+            logger.warning("\nPowNet: Rounding is infeasible. Use the MIP method.")
+            break
+        # The model should be feasible, but raise an error if not.
+        elif model_status != highspy.HighsModelStatus.kOptimal:
+            raise ValueError(
+                "Unrecognized model status: "
+                f"{rounding_model.modelStatusToString(model_status)}"
+            )
+
+        if current_iter == 0 and on_relaxed is not None:
+            on_relaxed(rounding_model.getInfo().objective_function_value)
+
+        values = np.array(rounding_model.getSolution().col_value)[rounding_cols]
+        fractional = find_fraction_cols(values)
+
+        # No fractional values means we have an integer solution.
+        if not fractional.any():
+            return rounding_model, rounding_model.getRunTime(), current_iter
+
+        # Fix the rounded variables with their bounds
+        idx, rounded = get_rounded_values(
+            values, fractional, rounding_strategy, threshold
+        )
+        rounding_model.changeColsBounds(len(idx), rounding_cols[idx], rounded, rounded)
+    else:
+        # If no integer solution is found after max_rounding_iter
+        logger.warning(
+            "\nPowNet: The rounding heuristic has terminated before finding an "
+            "integer solution."
+        )
+
+    if not solve_mip:
+        return rounding_model, None, None
+
+    # Solve the MIP with the original bounds
+    rounding_model.changeColsIntegrality(
+        len(int_cols), int_cols, arrays["integrality"][int_cols]
+    )
+    rounding_model.changeColsBounds(
+        len(rounding_cols),
+        rounding_cols,
+        arrays["col_lower"][rounding_cols],
+        arrays["col_upper"][rounding_cols],
+    )
+    rounding_model.setOptionValue("log_to_console", log_to_console)
+    rounding_model.setOptionValue("mip_rel_gap", mipgap)
+    rounding_model.run()
+    return rounding_model, None, None
@@ -0,0 +1,287 @@
+"""solution.py: Structured access to the solution of a PowNet model.
+
+The variables of a PowNet model are held by the builders as gp.tupledict objects
+whose keys already describe the variables:
+
+- Node variables are indexed by (unit/node, t)
+- Flow variables are indexed by (node_a, node_b, t)
+- System-wide variables are indexed by t
+
+SolutionLayout stores these keys as NumPy arrays together with the column index
+of each variable in the model. The solution tables of every step are then assembled
+from a single array of variable values without parsing variable names.
+
+When the line flows are linear expressions instead of variables, e.g., with the PTDF
+formulation, the terms of the expressions are stored in the same way and the flows
+are evaluated from the array of variable values.
+"""
+
+import gurobipy as gp
+import numpy as np
+import pandas as pd
+
+# Commitment and dispatch of thermal units carried over between steps as a MIP start
+WARM_START_VARTYPES = (
+    "status",
+    "startup",
+    "shutdown",
+    "pthermal",
+    "vpower",
+    "vpowerbar",
+)
+
+
+class SolutionLayout:
+    """Columnar layout of the variables in a PowNet model. The layout is created once
+    after the variables are added to the model because the variables are not removed
+    when the model is updated for the next step.
+    """
+
+    def __init__(
+        self,
+        variables: dict[str, gp.tupledict],
+        flow_expressions: gp.tupledict = None,
+    ) -> None:
+        """Create the layout from the variables held by the builders.
+
+        Args:
+            variables (dict[str, gp.tupledict]): Variables of the model keyed by their names.
+            flow_expressions (gp.tupledict): The net flow of each line as a linear
+                expression keyed by (node_a, node_b, t). A positive flow is in the
+                'fwd' direction. Default is None, which means no flow expressions.
+
+        Raises:
+            ValueError: If the keys of a variable are not in the (node, t),
+                (node_a, node_b, t), or (t) format.
+        """
+        node_parts, flow_parts, syswide_parts = [], [], []
+
+        for vartype, var_dict in variables.items():
+            if len(var_dict) == 0:
+                continue
+
+            keys = list(var_dict.keys())
+            col_idx = np.fromiter(
+                (v.index for v in var_dict.values()), dtype=np.int64, count=len(keys)
+            )
+            vartypes = np.full(len(keys), vartype, dtype=object)
+
+            if not isinstance(keys[0], tuple):
+                syswide_parts.append(
+                    (col_idx, vartypes, np.asarray(keys, dtype=np.int64))
+                )
+            elif len(keys[0]) == 2:
+                nodes, timesteps = zip(*keys)
+                node_parts.append(
+                    (
+                        col_idx,
+                        vartypes,
+                        np.asarray(nodes, dtype=object).astype(str),
+                        np.asarray(timesteps, dtype=np.int64),
+                    )
+                )
+            elif len(keys[0]) == 3:
+                node_a, node_b, timesteps = zip(*keys)
+                # Flow direction is either 'fwd' or 'bwd'
+                flow_types = np.full(
+                    len(keys), vartype.removeprefix("flow_"), dtype=object
+                )
+                flow_parts.append(
+                    (
+                        col_idx,
+                        flow_types,
+                        np.asarray(node_a, dtype=object).astype(str),
+                        np.asarray(node_b, dtype=object).astype(str),
+                        np.asarray(timesteps, dtype=np.int64),
+                    )
+                )
+            else:
+                raise ValueError(
+                    f"PowNet: Unrecognized index format of variable {vartype}: {keys[0]}"
+                )
+
+        self.node_columns = self._concat_sorted(node_parts, num_arrays=4)
+        self.flow_columns = self._concat_sorted(flow_parts, num_arrays=5)
+        self.syswide_columns = self._concat_sorted(syswide_parts, num_arrays=3)
+        self.flow_expr_terms = self._get_expr_terms(flow_expressions)
+
+        # Pairs of column indices for get_shifted_start keyed by (shift, vartypes)
+        self._shift_index: dict[tuple, tuple[np.ndarray, np.ndarray]] = {}
+
+    @staticmethod
+    def _concat_sorted(parts: list[tuple], num_arrays: int) -> list[np.ndarray]:
+        """Concatenate the arrays of each variable and sort them by column index,
+        which is the order the variables were added to the model.
+        """
+        if not parts:
+            return [np.array([], dtype=np.int64)] + [
+                np.array([], dtype=object) for _ in range(num_arrays - 1)
+            ]
+        columns = [np.concatenate(arrays) for arrays in zip(*parts)]
+        order = np.argsort(columns[0], kind="stable")
+        return [column[order] for column in columns]
+
+    @staticmethod
+    def _get_expr_terms(expressions: gp.tupledict) -> list[np.ndarray]:
+        """Return the row, column index, and coefficient of each term of the
+        expressions together with the keys of the expressions."""
+        if expressions is None or len(expressions) == 0:
+            return [
+                np.array([], dtype=np.int64),
+                np.array([], dtype=np.int64),
+                np.array([], dtype=float),
+                np.array([], dtype=object),
+                np.array([], dtype=object),
+                np.array([], dtype=np.int64),
+            ]
+        rows, cols, coeffs = [], [], []
+        for row, expr in enumerate(expressions.values()):
+            for i in range(expr.size()):
+                rows.append(row)
+                cols.append(expr.getVar(i).index)
+                coeffs.append(expr.getCoeff(i))
+        node_a, node_b, timesteps = zip(*expressions.keys())
+        return [
+            np.asarray(rows, dtype=np.int64),
+            np.asarray(cols, dtype=np.int64),
+            np.asarray(coeffs, dtype=float),
+            np.asarray(node_a, dtype=object).astype(str),
+            np.asarray(node_b, dtype=object).astype(str),
+            np.asarray(timesteps, dtype=np.int64),
+        ]
+
+    def get_node_variables(self, values: np.ndarray) -> pd.DataFrame:
+        """Return the node variables with columns (value, vartype, node, timestep).
+        Values close to 0 or 1 are rounded to ensure binary variables are integral.
+        """
+        col_idx, vartypes, nodes, timesteps = self.node_columns
+        node_values = values[col_idx]
+        node_values[np.isclose(node_values, 0, atol=1e-4)] = 0
+        node_values[np.isclose(node_values, 1, atol=1e-4)] = 1
+        return pd.DataFrame(
+            {
+                "value": node_values,
+                "vartype": vartypes,
+                "node": nodes,
+                "timestep": timesteps,
+            }
+        )
+
+    def get_flow_variables(self, values: np.ndarray) -> pd.DataFrame:
+        """Return the flow variables with columns (node_a, node_b, value, type, timestep).
+        The type is either 'fwd' or 'bwd'. The net flow of a flow expression is split
+        into a non-negative 'fwd' and 'bwd' flow.
+        """
+        col_idx, flow_types, node_a, node_b, timesteps = self.flow_columns
+        flow_values = values[col_idx]
+
+        rows, cols, coeffs, expr_a, expr_b, expr_t = self.flow_expr_terms
+        if len(expr_t) > 0:
+            net_flow = np.bincount(
+                rows, weights=coeffs * values[cols], minlength=len(expr_t)
+            )
+            num_exprs = len(expr_t)
+            flow_types = np.concatenate(
+                [
+                    flow_types,
+                    np.repeat(np.array(["fwd", "bwd"], dtype=object), num_exprs),
+                ]
+            )
+            node_a = np.concatenate([node_a, expr_a, expr_a])
+            node_b = np.concatenate([node_b, expr_b, expr_b])
+            timesteps = np.concatenate([timesteps, expr_t, expr_t])
+            flow_values = np.concatenate(
+                [flow_values, np.maximum(net_flow, 0), np.maximum(-net_flow, 0)]
+            )
+
+        return pd.DataFrame(
+            {
+                "node_a": node_a,
+                "node_b": node_b,
+                "value": flow_values,
+                "type": flow_types,
+                "timestep": timesteps,
+            }
+        )
+
+    def get_syswide_variables(self, values: np.ndarray) -> pd.DataFrame:
+        """Return the system-wide variables with columns (value, vartype, timestep)."""
+        col_idx, vartypes, timesteps = self.syswide_columns
+        return pd.DataFrame(
+            {
+                "value": values[col_idx],
+                "vartype": vartypes,
+                "timestep": timesteps,
+            }
+        )
+
+    def get_tables(self, values: np.ndarray) -> dict[str, pd.DataFrame]:
+        """Return the node, flow, and system-wide variables given the values
+        of all variables in the model (ordered by column index).
+
+        Args:
+            values (np.ndarray): Values of all variables in the model.
+
+        Returns:
+            dict[str, pd.DataFrame]: Tables keyed by 'node', 'flow', and 'syswide'.
+        """
+        values = np.asarray(values, dtype=float)
+        return {
+            "node": self.get_node_variables(values),
+            "flow": self.get_flow_variables(values),
+            "syswide": self.get_syswide_variables(values),
+        }
+
+    def get_shifted_start(
+        self,
+        values: np.ndarray,
+        shift: int,
+        vartypes: tuple[str, ...] = WARM_START_VARTYPES,
+        max_timestep: int = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Shift the values of node variables by a number of timesteps to create a
+        MIP start for the next step of the rolling horizon. The value of a variable at
+        timestep t + shift becomes the start of the same variable at timestep t.
+        Variables without a value at t + shift, e.g., those in the last hours of the
+        horizon, are left out of the start.
+
+        Args:
+            values (np.ndarray): Values of all variables in the model.
+            shift (int): Number of timesteps between the two steps.
+            vartypes (tuple[str, ...]): Node variables to include in the start.
+            max_timestep (int): Only timesteps up to max_timestep get a start, e.g.,
+                the hourly timesteps before aggregated ones. Default is all timesteps.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Column indices and start values.
+        """
+        key = (shift, tuple(vartypes), max_timestep)
+        if key not in self._shift_index:
+            col_idx, node_vartypes, nodes, timesteps = self.node_columns
+            df = pd.DataFrame(
+                {
+                    "col_idx": col_idx,
+                    "vartype": node_vartypes,
+                    "node": nodes,
+                    "timestep": timesteps,
+                }
+            )
+            df = df[df["vartype"].isin(vartypes)]
+            src = df[df["timestep"] > shift].assign(
+                timestep=lambda x: x["timestep"] - shift
+            )
+            if max_timestep is not None:
+                src = src[src["timestep"] <= max_timestep]
+            merged = src.merge(
+                df,
+                on=["vartype", "node", "timestep"],
+                suffixes=("_src", "_dst"),
+            )
+            self._shift_index[key] = (
+                merged["col_idx_src"].to_numpy(dtype=np.int64),
+                merged["col_idx_dst"].to_numpy(dtype=np.int64),
+            )
+
+        src_cols, dst_cols = self._shift_index[key]
+        values = np.asarray(values, dtype=float)
+        return dst_cols, values[src_cols]
@@ -2,45 +2,73 @@
 
 import gurobipy as gp
 from gurobipy import GRB
+import numpy as np
 import pandas as pd
 
-from pownet.data_utils import (
-    get_capacity_value,
-)
+from pownet.data_model import Timesteps, TimeseriesArray, as_timeseries_array
+from pownet.data_utils import get_step_window
+
+
+def _get_values_at_keys(
+    keys: list[tuple],
+    step_k: int,
+    capacity_df: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
+    timesteps: Timesteps = None,
+) -> np.ndarray:
+    """Return the capacity at each (column, t) key of a step in a single NumPy lookup.
+    With aggregated timesteps, the capacity is averaged over the hours of t."""
+    if not keys:
+        return np.empty(0)
+    capacity = as_timeseries_array(capacity_df)
+    columns, key_timesteps = zip(*keys)
+    if timesteps is not None and not timesteps.is_hourly:
+        window = get_step_window(capacity, timesteps, step_k, step_hours=step_hours)
+        return window[
+            np.asarray(key_timesteps, dtype=np.intp) - 1,
+            capacity.get_col_indices(columns),
+        ]
+    rows = capacity.get_rows([t + (step_k - 1) * step_hours for t in key_timesteps])
+    return capacity.values[rows, capacity.get_col_indices(columns)]
 
 
 def add_var_with_variable_ub(
     model: gp.Model,
     varname: str,
-    timesteps: range,
+    timesteps: range | Timesteps,
     step_k: int,
     units: list,
-    capacity_df: pd.DataFrame,
+    capacity_df: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
 ) -> gp.tupledict:
     """Add a variable with a variable upper bound in a day-ahead rolling horizon optimization.
 
     Args:
         model (gp.Model): The optimization model.
         varname (str): The name of the variable.
-        timesteps (range): The range of timesteps.
+        timesteps (range | Timesteps): The timesteps of the horizon.
         step_k (int): The step index.
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
         units (list): The list of units.
-        capacity_df (pd.DataFrame): The dataframe of capacities.
+        capacity_df (pd.DataFrame | TimeseriesArray): The timeseries of capacities.
 
     Returns:
         gp.tupledict: The variable with a variable upper bound.
 
     """
-
+    keys = [(unit, t) for t in timesteps for unit in units]
+    capacity_values = _get_values_at_keys(
+        keys,
+        step_k,
+        capacity_df,
+        step_hours=step_hours,
+        timesteps=timesteps if isinstance(timesteps, Timesteps) else None,
+    )
     return model.addVars(
         units,
         timesteps,
         lb=0,
-        ub={
-            (unit, t): get_capacity_value(t, unit, step_k, capacity_df)
-            for t in timesteps
-            for unit in units
-        },
+        ub=dict(zip(keys, capacity_values.tolist())),
         vtype=GRB.CONTINUOUS,
         name=varname,
     )
@@ -49,20 +77,31 @@ def add_var_with_variable_ub(
 def update_var_with_variable_ub(
     variables: gp.tupledict,
     step_k: int,
-    capacity_df: pd.DataFrame,
+    capacity_df: pd.DataFrame | TimeseriesArray,
+    step_hours: int = 24,
+    timesteps: Timesteps = None,
 ) -> None:
     """Update the time-dependent upper bound of the variable.
 
     Args:
         variables (gp.tupledict): The variable with a variable upper bound.
         step_k (int): The step index.
-        capacity_df (pd.DataFrame): The dataframe of capacities.
+        step_hours (int): Hours between the starts of consecutive steps. Default is 24.
+        capacity_df (pd.DataFrame | TimeseriesArray): The timeseries of capacities.
+        timesteps (Timesteps): The timesteps of the variables. Only needed when
+            hours are aggregated.
 
     Returns:
         None
     """
-    for (unit, t), v in variables.items():
-        capacity_value = get_capacity_value(t, unit, step_k, capacity_df)
+    capacity_values = _get_values_at_keys(
+        list(variables.keys()),
+        step_k,
+        capacity_df,
+        step_hours=step_hours,
+        timesteps=timesteps,
+    )
+    for v, capacity_value in zip(variables.values(), capacity_values.tolist()):
         v.ub = capacity_value
     return
 
@@ -70,12 +109,17 @@ def update_var_with_variable_ub(
 def update_flow_vars(
     flow_variables: gp.tupledict,
     step_k: int,
-    capacity_df: pd.DataFrame,
+    capacity_df: pd.DataFrame | TimeseriesArray,
     line_capacity_factor: float,
+    step_hours: int = 24,
+    timesteps: Timesteps = None,
 ) -> None:
     """Update the lower and upper bounds of the flow variables based on the capacity dataframes"""
-    hours_per_step = 24
-    for (node1, node2, t), flow_variable in flow_variables.items():
-        edge = (node1, node2)
-        line_capacity = capacity_df.loc[t + (step_k - 1) * hours_per_step, edge]
+    keys = [((node1, node2), t) for node1, node2, t in flow_variables.keys()]
+    line_capacities = _get_values_at_keys(
+        keys, step_k, capacity_df, step_hours=step_hours, timesteps=timesteps
+    )
+    for flow_variable, line_capacity in zip(
+        flow_variables.values(), line_capacities.tolist()
+    ):
         flow_variable.ub = line_capacity * line_capacity_factor
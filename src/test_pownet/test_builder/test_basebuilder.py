@@ -133,6 +133,9 @@ class TestComponentBuilder(unittest.TestCase):
         # We are testing that ComponentBuilder correctly picks up this value.
         # So, the value set here is what we expect ComponentBuilder to use.
         mock_inputs_instance.sim_horizon = 5
+        mock_inputs_instance.step_hours = 24
+        mock_inputs_instance.block_hours = 1
+        mock_inputs_instance.full_resolution_hours = 24
 
         builder = MinimalConcreteBuilder(
             model=mock_model_instance, inputs=mock_inputs_instance
@@ -145,6 +148,7 @@ class TestComponentBuilder(unittest.TestCase):
         # Test against the value that ComponentBuilder's __init__ should have used
         self.assertEqual(builder.sim_horizon, 5)
         self.assertEqual(list(builder.timesteps), list(range(1, 5 + 1)))
+        self.assertEqual(builder.step_hours, 24)
 
     def test_incomplete_subclass_cannot_be_instantiated(
         self, mock_gp_alias: MagicMock, mock_system_input_class: MagicMock
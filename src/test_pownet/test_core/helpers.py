@@ -0,0 +1,110 @@
+"""helpers.py: Fixtures shared by the tests of the model builder and the solvers."""
+
+import os
+from typing import Callable
+
+import gurobipy as gp
+import numpy as np
+
+from pownet import ModelBuilder, SystemInput
+from pownet.core.record import SystemRecord
+from pownet.data_utils import create_init_condition
+from pownet.optim_model import PowerSystemModel
+
+TEST_MODEL_LIBRARY = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "test_model_library")
+)
+
+
+def load_dummy_inputs(
+    input_folder: str = TEST_MODEL_LIBRARY, sim_horizon: int = 24, **kwargs
+) -> SystemInput:
+    """Load and check the dummy model of 2016.
+
+    Args:
+        input_folder (str): The folder of the dummy model. Default is the test model
+            library.
+        sim_horizon (int): The simulation horizon in hours. Default is 24.
+        **kwargs: Other parameters of SystemInput, e.g., step_hours.
+
+    Returns:
+        SystemInput: The loaded input data.
+    """
+    inputs = SystemInput(
+        input_folder=input_folder,
+        model_name="dummy",
+        year=2016,
+        sim_horizon=sim_horizon,
+        **kwargs,
+    )
+    inputs.load_and_check_data()
+    return inputs
+
+
+def get_model_arrays(model: gp.Model) -> dict[str, np.ndarray]:
+    """Return the objective coefficients, bounds, right-hand sides, and constraint
+    matrix of a Gurobi model to compare two models.
+    """
+    model.update()
+    variables = model.getVars()
+    constrs = model.getConstrs()
+    return {
+        "obj": np.array(model.getAttr("Obj", variables)),
+        "lb": np.array(model.getAttr("LB", variables)),
+        "ub": np.array(model.getAttr("UB", variables)),
+        "rhs": np.array(model.getAttr("RHS", constrs)),
+        "matrix": model.getA().toarray(),
+    }
+
+
+def solve_steps(
+    inputs: SystemInput,
+    num_steps: int,
+    solver: str = "gurobi",
+    mipgap: float = 1e-6,
+    update_init_conds: bool = True,
+    find_lmp: bool = False,
+    on_solved: Callable[[PowerSystemModel], None] = None,
+    **builder_params,
+) -> tuple[ModelBuilder, SystemRecord]:
+    """Build, update, and solve the first steps of a rolling horizon simulation.
+
+    Args:
+        inputs (SystemInput): The input data.
+        num_steps (int): The number of steps to solve.
+        solver (str): The solver. Default is 'gurobi'.
+        mipgap (float): The MIP gap. Default is 1e-6.
+        update_init_conds (bool): Whether each step starts from the end of the
+            previous step. Otherwise, all steps start with all units off. Default
+            is True.
+        find_lmp (bool): Whether to record the locational marginal prices. Default
+            is False.
+        on_solved (Callable): Called with the PowerSystemModel after each step is
+            solved, e.g., to collect results that SystemRecord does not keep.
+        **builder_params: Parameters of ModelBuilder, e.g., lazy_transmission.
+
+    Returns:
+        tuple[ModelBuilder, SystemRecord]: The model builder after the last step and
+            the results of all steps.
+    """
+    model_builder = ModelBuilder(inputs, **builder_params)
+    system_record = SystemRecord(inputs)
+    init_conds = create_init_condition(inputs.thermal_units, inputs.storage_units)
+    for step_k in range(1, num_steps + 1):
+        if step_k == 1:
+            power_system_model = model_builder.build(step_k, init_conds)
+        else:
+            power_system_model = model_builder.update(step_k, init_conds)
+        power_system_model.optimize(solver=solver, log_to_console=False, mipgap=mipgap)
+        if on_solved is not None:
+            on_solved(power_system_model)
+        system_record.keep(
+            runtime=power_system_model.get_runtime(),
+            objval=power_system_model.get_objval(),
+            solution=power_system_model.get_structured_solution(),
+            step_k=step_k,
+            lmp=power_system_model.solve_for_lmp() if find_lmp else None,
+        )
+        if update_init_conds:
+            init_conds = system_record.get_init_conds()
+    return model_builder, system_record
@@ -0,0 +1,149 @@
+"""test_commitment_prefix.py: Test fixing the status of the thermal units before
+each solve."""
+
+import unittest
+
+import numpy as np
+
+from pownet import ModelBuilder
+from pownet.core.record import SystemRecord
+from pownet.core.simulation import Simulator
+from pownet.data_utils import create_init_condition
+from test_pownet.test_core.helpers import (
+    TEST_MODEL_LIBRARY,
+    load_dummy_inputs,
+    solve_steps,
+)
+
+
+class TestCommitmentPrefix(unittest.TestCase):
+    def setUp(self):
+        self.inputs = load_dummy_inputs()
+        self.init_conditions = create_init_condition(
+            self.inputs.thermal_units, self.inputs.storage_units
+        )
+
+    def solve_steps(self, solver: str, **kwargs) -> tuple[list, list]:
+        fixed_commitments = []
+
+        def on_solved(power_system_model):
+            self.assertFalse(power_system_model.commitment_released)
+            fixed_commitments.append(power_system_model.fixed_commitment)
+
+        _, system_record = solve_steps(
+            self.inputs, num_steps=3, solver=solver, on_solved=on_solved, **kwargs
+        )
+        return system_record.get_objvals(), fixed_commitments
+
+    def test_same_objective(self):
+        for solver in ["gurobi", "highs"]:
+            objvals, _ = self.solve_steps(solver)
+            prefix_objvals, fixed_commitments = self.solve_steps(
+                solver, prefix_commitment=True
+            )
+            np.testing.assert_allclose(prefix_objvals, objvals, rtol=1e-6)
+            for fixed_commitment in fixed_commitments:
+                self.assertEqual(
+                    set(fixed_commitment),
+                    {"must_run", "never_economic", "reduced_cost"},
+                )
+                # The gas unit is needed at every hour
+                self.assertGreaterEqual(fixed_commitment["must_run"], 24)
+
+    def test_merit_order_status(self):
+        model_builder = ModelBuilder(self.inputs)
+        model_builder.build(1, self.init_conditions)
+        thermal_builder = model_builder.thermal_builder
+        shape = (len(thermal_builder.timesteps), len(thermal_builder.thermal_units))
+
+        must_on, must_off = thermal_builder.get_merit_order_status(
+            1, self.init_conditions, other_supply=np.zeros(shape[0])
+        )
+        self.assertEqual(must_on.shape, shape)
+        self.assertEqual(must_off.shape, shape)
+        self.assertFalse((must_on & must_off).any())
+        gas = thermal_builder.thermal_units.index("pGas")
+        self.assertTrue(must_on[:, gas].all())
+
+        # Nothing must run when the other supply meets the demand
+        must_on, _ = thermal_builder.get_merit_order_status(
+            1, self.init_conditions, other_supply=np.full(shape[0], 1e6)
+        )
+        self.assertFalse(must_on.any())
+
+    def test_release_status(self):
+        model_builder = ModelBuilder(self.inputs, prefix_commitment=True)
+        model_builder.build(1, self.init_conditions)
+        thermal_builder = model_builder.thermal_builder
+        status_list = [var for var in thermal_builder.status.values()]
+        fixed_lower = np.array([var.LB for var in status_list])
+
+        num_fixed = thermal_builder.release_status()
+        self.assertGreater(num_fixed, 0)
+        self.assertLessEqual(num_fixed, sum(model_builder.fixed_commitment.values()))
+        self.assertTrue((np.array([var.LB for var in status_list]) == 0).all())
+        self.assertTrue((np.array([var.UB for var in status_list]) == 1).all())
+        self.assertGreater(fixed_lower.sum(), 0)
+        # Nothing is left to release
+        self.assertEqual(thermal_builder.release_status(), 0)
+
+    def test_infeasible_commitment(self):
+        """Test that the model is solved again without the fixed status."""
+        model_builder = ModelBuilder(self.inputs)
+        power_system_model = model_builder.build(1, self.init_conditions)
+        power_system_model.optimize(log_to_console=False, mipgap=1e-6)
+        objval = power_system_model.get_objval()
+
+        for solver in ["gurobi", "highs"]:
+            model_builder = ModelBuilder(self.inputs, prefix_commitment=True)
+            power_system_model = model_builder.build(1, self.init_conditions)
+            thermal_builder = model_builder.thermal_builder
+            # Switching the gas unit on and off every hour breaks its minimum
+            # up and down times
+            shape = (len(thermal_builder.timesteps), len(thermal_builder.thermal_units))
+            lower = np.zeros(shape)
+            upper = np.ones(shape)
+            gas = thermal_builder.thermal_units.index("pGas")
+            lower[::2, gas] = 1
+            upper[1::2, gas] = 0
+            thermal_builder.fix_status(lower, upper)
+
+            power_system_model.optimize(
+                solver=solver, log_to_console=False, mipgap=1e-6
+            )
+            self.assertTrue(power_system_model.commitment_released)
+            self.assertAlmostEqual(
+                power_system_model.get_objval() / objval, 1, places=6
+            )
+
+    def test_fixed_commitment_record(self):
+        system_record = SystemRecord(self.inputs)
+        system_record.keep_fixed_commitment(
+            step_k=1,
+            fixed_commitment={"must_run": 24, "never_economic": 3, "reduced_cost": 0},
+            released=False,
+        )
+        fixed_commitment = system_record.get_fixed_commitment()
+        self.assertEqual(
+            list(fixed_commitment.columns),
+            ["step_k", "must_run", "never_economic", "reduced_cost", "released"],
+        )
+        self.assertEqual(fixed_commitment["must_run"].iloc[0], 24)
+
+    def test_invalid_combination(self):
+        simulator = Simulator(
+            input_folder=TEST_MODEL_LIBRARY,
+            model_name="dummy",
+            model_year=2016,
+        )
+        with self.assertRaises(ValueError):
+            simulator.simulate(
+                inputs=self.inputs,
+                steps_to_run=1,
+                prefix_commitment=True,
+                portfolio=True,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -38,6 +38,8 @@ class TestDataProcessor(unittest.TestCase):
         )
         # Timeseries should have 8760 rows
         self.assertEqual(processor.cycle_map, {})
+        # One row per line and one column per node
+        self.assertEqual(processor.ptdf.shape, (8, 9))
         self.assertEqual(processor.thermal_derate_factors.shape[0], 8760)
 
 
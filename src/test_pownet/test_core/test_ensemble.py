@@ -0,0 +1,142 @@
+"""test_ensemble.py: Unit tests for running scenarios in parallel."""
+
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from pownet import SystemInput
+from pownet.core.ensemble import (
+    EnsembleRunner,
+    Scenario,
+    apply_scenario,
+    load_scenario_timeseries,
+)
+
+
+class TestEnsemble(unittest.TestCase):
+    def setUp(self):
+        self.input_folder = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "test_model_library")
+        )
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+        # Scale the demand of the dummy model by 10%
+        demand = pd.read_csv(
+            os.path.join(self.input_folder, "dummy", "demand_export.csv")
+        )
+        for node in ["Node1", "Node2", "Buyer"]:
+            demand[node] *= 1.1
+        self.demand_csv = os.path.join(self.temp_dir.name, "high_demand.csv")
+        demand.to_csv(self.demand_csv, index=False)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_scenario_invalid_penalty_factor(self):
+        with self.assertRaises(ValueError):
+            Scenario(name="bad", penalty_factors={"line_loss_factor": 0.1})
+
+    def test_load_scenario_timeseries(self):
+        demand = load_scenario_timeseries(self.demand_csv, header_levels=0)
+        self.assertEqual(list(demand.columns), ["Node1", "Node2", "Buyer"])
+        self.assertEqual(demand.index[0], 1)
+
+    def test_apply_scenario(self):
+        inputs = SystemInput(
+            input_folder=self.input_folder,
+            model_name="dummy",
+            year=2016,
+            sim_horizon=24,
+        )
+        inputs.load_and_check_data()
+        base_demand = inputs.total_demand.copy()
+
+        scenario = Scenario(
+            name="high_demand",
+            demand_csv=self.demand_csv,
+            penalty_factors={"load_shortfall_penalty_factor": 5000},
+        )
+        scenario_inputs = apply_scenario(inputs, scenario)
+
+        pd.testing.assert_series_equal(
+            scenario_inputs.total_demand, base_demand * 1.1, check_names=False
+        )
+        pd.testing.assert_series_equal(
+            scenario_inputs.spin_requirement,
+            base_demand * 1.1 * inputs.spin_reserve_factor,
+            check_names=False,
+        )
+        self.assertEqual(scenario_inputs.load_shortfall_penalty_factor, 5000)
+        # The base inputs are not changed
+        pd.testing.assert_series_equal(inputs.total_demand, base_demand)
+        self.assertEqual(inputs.load_shortfall_penalty_factor, 1000)
+        # Data that is not overridden is shared
+        self.assertIs(
+            scenario_inputs.thermal_derated_capacity, inputs.thermal_derated_capacity
+        )
+
+    def test_get_threads_per_worker(self):
+        runner = EnsembleRunner(
+            input_folder=self.input_folder,
+            model_name="dummy",
+            model_year=2016,
+            max_workers=4,
+            total_threads=8,
+        )
+        self.assertEqual(runner.get_threads_per_worker(num_scenarios=10), 2)
+        self.assertEqual(runner.get_threads_per_worker(num_scenarios=2), 4)
+        self.assertEqual(runner.get_threads_per_worker(num_scenarios=16), 2)
+
+    def test_load_base_inputs(self):
+        runner = EnsembleRunner(
+            input_folder=self.input_folder, model_name="dummy", model_year=2016
+        )
+        base_inputs = runner._load_base_inputs(
+            {self.input_folder},
+            sim_horizon=48,
+            num_sim_days=365,
+            to_process_inputs=False,
+            step_hours=12,
+            block_hours=4,
+            full_resolution_hours=24,
+        )
+        self.assertEqual(base_inputs[self.input_folder].step_hours, 12)
+        self.assertEqual(base_inputs[self.input_folder].block_hours, 4)
+        self.assertEqual(base_inputs[self.input_folder].full_resolution_hours, 24)
+
+    def test_run(self):
+        runner = EnsembleRunner(
+            input_folder=self.input_folder,
+            model_name="dummy",
+            model_year=2016,
+            max_workers=2,
+            total_threads=2,
+        )
+        results = runner.run(
+            scenarios=[
+                Scenario(name="base"),
+                Scenario(name="high_demand", demand_csv=self.demand_csv),
+            ],
+            sim_horizon=24,
+            steps_to_run=1,
+            to_process_inputs=False,
+        )
+        self.assertEqual(results.errors, {})
+
+        model_stats = results.get_model_stats().set_index("scenario")
+        self.assertEqual(sorted(model_stats.index), ["base", "high_demand"])
+        self.assertGreater(
+            model_stats.loc["high_demand", "objval"], model_stats.loc["base", "objval"]
+        )
+
+        node_variables = results.get_node_variables()
+        self.assertEqual(
+            len(node_variables),
+            2 * len(results.get_scenario("base")["node_variables"]),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
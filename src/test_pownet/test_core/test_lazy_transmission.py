@@ -0,0 +1,110 @@
+"""test_lazy_transmission.py: Test adding the transmission constraints only after a
+solution violates them."""
+
+import unittest
+
+import gurobipy as gp
+import numpy as np
+
+from pownet import ModelBuilder
+from pownet.data_utils import create_init_condition
+from pownet.optim_model import PowerSystemModel
+from test_pownet.test_core.helpers import load_dummy_inputs, solve_steps
+
+
+class TestLazyTransmission(unittest.TestCase):
+    def setUp(self):
+        self.inputs = load_dummy_inputs()
+        # Reduce the line capacity so some lines are congested
+        self.inputs.line_capacity = self.inputs.line_capacity * 0.3
+        self.init_conditions = create_init_condition(
+            self.inputs.thermal_units, self.inputs.storage_units
+        )
+
+    def solve_steps(self, solver: str, **kwargs) -> tuple[ModelBuilder, list]:
+        """Solve three steps from the same initial conditions and return the
+        objective value and the number of constraint generation iterations of each.
+        """
+        results = []
+        model_builder, _ = solve_steps(
+            self.inputs,
+            num_steps=3,
+            solver=solver,
+            update_init_conds=False,
+            on_solved=lambda model: results.append(
+                (model.get_objval(), model.constr_generation_iterations)
+            ),
+            **kwargs,
+        )
+        return model_builder, results
+
+    def test_same_objective(self):
+        for solver in ["gurobi", "highs"]:
+            _, full_results = self.solve_steps(solver)
+            model_builder, lazy_results = self.solve_steps(
+                solver, lazy_transmission=True
+            )
+            np.testing.assert_allclose(
+                [objval for objval, _ in lazy_results],
+                [objval for objval, _ in full_results],
+                rtol=1e-6,
+            )
+            system_builder = model_builder.system_builder
+            # Only the congested lines have flow limits
+            self.assertGreater(len(system_builder.binding_lines), 0)
+            self.assertLess(len(system_builder.binding_lines), len(self.inputs.edges))
+            self.assertGreater(lazy_results[0][1], 0)
+            for (source, sink, t), var in system_builder.flow_fwd.items():
+                if (source, sink) in system_builder.binding_lines:
+                    self.assertEqual(
+                        var.UB, system_builder.line_limits[source, sink, t]
+                    )
+                else:
+                    self.assertGreaterEqual(var.UB, gp.GRB.INFINITY)
+
+    def test_binding_lines_are_kept(self):
+        model_builder, _ = self.solve_steps("gurobi", lazy_transmission=True)
+        binding_lines = model_builder.system_builder.binding_lines.copy()
+        power_system_model = model_builder.update(4, self.init_conditions)
+        power_system_model.optimize(log_to_console=False)
+        self.assertTrue(binding_lines <= model_builder.system_builder.binding_lines)
+
+    def test_constraint_generation_loop(self):
+        model = gp.Model()
+        model.Params.LogToConsole = 0
+        x = model.addVars(2, name="x")
+        model.addConstr(x.sum() >= 10)
+        model.setObjective(x[0] + 2 * x[1])
+
+        def add_limit(values: np.ndarray) -> int:
+            # x[0] is limited to 4 once it is above
+            if values[x[0].index] > 4 + 1e-6:
+                model.addConstr(x[0] <= 4)
+                return 1
+            return 0
+
+        power_system_model = PowerSystemModel(model)
+        power_system_model.add_violated_constrs = add_limit
+        power_system_model.optimize(log_to_console=False)
+        self.assertEqual(power_system_model.constr_generation_iterations, 1)
+        self.assertAlmostEqual(power_system_model.get_objval(), 16)
+
+    def test_rounding(self):
+        """Test that rounding adds the violated constraints and rounds again."""
+        for solver in ["gurobi", "highs"]:
+            model_builder = ModelBuilder(self.inputs, lazy_transmission=True)
+            power_system_model = model_builder.build(1, self.init_conditions)
+            power_system_model.optimize_with_rounding(
+                rounding_strategy="fast", solver=solver
+            )
+            self.assertGreater(power_system_model.constr_generation_iterations, 0)
+            # The solution satisfies all flow limits and Kirchhoff constraints
+            self.assertFalse(
+                model_builder.system_builder.add_violated_transmission_constrs(
+                    power_system_model.get_values()
+                )
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
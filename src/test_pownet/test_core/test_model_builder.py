@@ -89,6 +89,9 @@ class TestModelBuilder(unittest.TestCase):
         mock_builder_instance.pcharge = MagicMock(name=f"{name}_pcharge_var")
         mock_builder_instance.pdischarge = MagicMock(name=f"{name}_pdischarge_var")
         mock_builder_instance.charge_state = MagicMock(name=f"{name}_charge_state_var")
+        # Flow balance and reserve constraints that are attached to the PowerSystemModel
+        mock_builder_instance.c_flow_balance = MagicMock(name=f"{name}_c_flow_balance")
+        mock_builder_instance.c_reserve_req = MagicMock(name=f"{name}_c_reserve_req")
         return mock_builder_instance
 
     # Arguments are in reverse order of decorators (SystemInput is MockSystemInput etc.)
@@ -266,7 +269,9 @@ class TestModelBuilder(unittest.TestCase):
 
         # MockGPLinExpr.side_effect = lambda name_suffix="": MockLinExpr(0.0, f"update_LinExpr_{name_suffix}")
 
-        model_builder = ModelBuilder(inputs=mock_inputs)
+        model_builder = ModelBuilder(
+            inputs=mock_inputs, update_objective_in_place=False
+        )
         mock_gurobi_model_instance = MockGPModel.return_value
 
         mock_thermal_inst = self._configure_mock_builder(
@@ -416,6 +421,8 @@ class TestModelBuilder(unittest.TestCase):
         model_builder = ModelBuilder(inputs=mock_inputs)
         mock_gurobi_model_instance = MockGPModel.return_value
         mock_hydro_inst = MockHydroBuilder.return_value
+        MockSystemBuilder.return_value.c_flow_balance = MagicMock()
+        MockSystemBuilder.return_value.c_reserve_req = MagicMock()
 
         step_k = 5
         new_capacity = {("H1", 0): 100.0, ("H2", 0): 50.0}
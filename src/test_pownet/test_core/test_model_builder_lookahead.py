@@ -0,0 +1,87 @@
+"""test_model_builder_lookahead.py: Test relaxing the binary variables in the
+look-ahead hours of the horizon."""
+
+import os
+import unittest
+
+import gurobipy as gp
+import numpy as np
+
+from pownet import ModelBuilder, Simulator, SystemInput
+from pownet.data_utils import create_init_condition
+
+
+class TestModelBuilderLookahead(unittest.TestCase):
+    def setUp(self):
+        self.test_model_library_path = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "test_model_library")
+        )
+        self.inputs = SystemInput(
+            input_folder=self.test_model_library_path,
+            model_name="dummy",
+            year=2016,
+            sim_horizon=24,
+        )
+        self.inputs.load_and_check_data()
+        self.init_conditions = create_init_condition(
+            self.inputs.thermal_units, self.inputs.storage_units
+        )
+
+    def test_relax_after_integer_hours(self):
+        full_builder = ModelBuilder(self.inputs)
+        full_builder.build(step_k=1, init_conds=self.init_conditions)
+        model_builder = ModelBuilder(self.inputs, integer_hours=12)
+        model_builder.build(step_k=1, init_conds=self.init_conditions)
+
+        self.assertEqual(
+            model_builder.model.NumBinVars, full_builder.model.NumBinVars / 2
+        )
+        for varname in ["status", "startup", "shutdown"]:
+            variables = getattr(model_builder.thermal_builder, varname)
+            for (_, t), var in variables.items():
+                expected = gp.GRB.BINARY if t <= 12 else gp.GRB.CONTINUOUS
+                self.assertEqual(var.VType, expected)
+                self.assertEqual((var.LB, var.UB), (0, 1))
+
+    def test_relaxed_model_is_lower_bound(self):
+        objvals = {}
+        for integer_hours in [None, 12]:
+            model_builder = ModelBuilder(self.inputs, integer_hours=integer_hours)
+            power_system_model = model_builder.build(
+                step_k=1, init_conds=self.init_conditions
+            )
+            # The relaxation stays in place when the model is updated
+            power_system_model = model_builder.update(
+                step_k=2, init_conds=self.init_conditions
+            )
+            power_system_model.optimize(log_to_console=False, mipgap=1e-6)
+            objvals[integer_hours] = power_system_model.get_objval()
+
+            # The recorded commitment is still binary
+            status = np.array(
+                [
+                    var.X
+                    for (_, t), var in model_builder.thermal_builder.status.items()
+                    if t <= 12
+                ]
+            )
+            np.testing.assert_allclose(status, np.round(status), atol=1e-6)
+        self.assertLessEqual(objvals[12], objvals[None] * (1 + 1e-6))
+
+    def test_invalid_integer_hours(self):
+        with self.assertRaises(ValueError):
+            ModelBuilder(self.inputs, integer_hours=0)
+
+    def test_integer_hours_below_step_hours(self):
+        """Test that a simulation does not record relaxed hours."""
+        simulator = Simulator(
+            input_folder=self.test_model_library_path,
+            model_name="dummy",
+            model_year=2016,
+        )
+        with self.assertRaises(ValueError):
+            simulator.simulate(inputs=self.inputs, steps_to_run=1, integer_hours=12)
+
+
+if __name__ == "__main__":
+    unittest.main()
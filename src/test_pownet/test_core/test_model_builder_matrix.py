@@ -0,0 +1,108 @@
+"""test_model_builder_matrix.py: Compare the models built with the matrix backend
+against the expression backend through their MPS files."""
+
+import os
+import tempfile
+import unittest
+
+from pownet import ModelBuilder, SystemInput
+from pownet.data_utils import create_init_condition
+
+
+def get_mps(model, folder: str, filename: str) -> str:
+    """Write the model to an MPS file and return its content."""
+    model.update()
+    mps_file = os.path.join(folder, filename)
+    model.write(mps_file)
+    with open(mps_file) as f:
+        return f.read()
+
+
+class TestModelBuilderMatrix(unittest.TestCase):
+    def setUp(self):
+        self.test_model_library_path = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "test_model_library")
+        )
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def create_inputs(self, dc_opf: str) -> SystemInput:
+        inputs = SystemInput(
+            input_folder=self.test_model_library_path,
+            model_name="dummy",
+            year=2016,
+            sim_horizon=24,
+            dc_opf=dc_opf,
+        )
+        inputs.load_and_check_data()
+        return inputs
+
+    def create_init_conditions(self, inputs: SystemInput, step_k: int) -> dict:
+        init_conditions = create_init_condition(
+            inputs.thermal_units, inputs.storage_units
+        )
+        for i, unit in enumerate(inputs.thermal_units):
+            init_conditions["initial_u"][unit] = (step_k + i) % 2
+            init_conditions["initial_p"][unit] = 10.0 * step_k
+            init_conditions["initial_min_on"][unit] = step_k + i
+            init_conditions["initial_min_off"][unit] = 2 * step_k
+        return init_conditions
+
+    def assert_same_models(self, dc_opf: str, update_in_place: bool) -> None:
+        inputs = self.create_inputs(dc_opf)
+        builders = {
+            backend: ModelBuilder(
+                inputs, update_in_place=update_in_place, build_backend=backend
+            )
+            for backend in ("expression", "matrix")
+        }
+        for step_k in range(1, 4):
+            init_conditions = self.create_init_conditions(inputs, step_k)
+            mps = {}
+            for backend, builder in builders.items():
+                if step_k == 1:
+                    builder.build(step_k=step_k, init_conds=init_conditions)
+                else:
+                    builder.update(step_k=step_k, init_conds=init_conditions)
+                mps[backend] = get_mps(
+                    builder.model, self.temp_dir.name, f"{backend}.mps"
+                )
+            self.assertEqual(mps["matrix"], mps["expression"], msg=f"Step {step_k}")
+
+    def test_voltage_angle_matches_expression(self):
+        self.assert_same_models(dc_opf="voltage_angle", update_in_place=True)
+
+    def test_kirchhoff_matches_expression(self):
+        self.assert_same_models(dc_opf="kirchhoff", update_in_place=True)
+
+    def test_rebuild_matches_expression(self):
+        self.assert_same_models(dc_opf="voltage_angle", update_in_place=False)
+
+    def test_constraint_keys_match_expression(self):
+        inputs = self.create_inputs("voltage_angle")
+        init_conditions = self.create_init_conditions(inputs, step_k=1)
+        expression_builder = ModelBuilder(inputs)
+        matrix_builder = ModelBuilder(inputs, build_backend="matrix")
+        expression_builder.build(step_k=1, init_conds=init_conditions)
+        matrix_builder.build(step_k=1, init_conds=init_conditions)
+
+        for name in ["c_link_pu_upper", "c_min_down_init", "c_ramp_down_init"]:
+            self.assertEqual(
+                list(getattr(matrix_builder.thermal_builder, name).keys()),
+                list(getattr(expression_builder.thermal_builder, name).keys()),
+            )
+        for name in ["c_reserve_req", "c_flow_balance", "c_angle_diff"]:
+            self.assertEqual(
+                list(getattr(matrix_builder.system_builder, name).keys()),
+                list(getattr(expression_builder.system_builder, name).keys()),
+            )
+
+    def test_invalid_backend(self):
+        with self.assertRaises(ValueError):
+            ModelBuilder(self.create_inputs("voltage_angle"), build_backend="sparse")
+
+
+if __name__ == "__main__":
+    unittest.main()
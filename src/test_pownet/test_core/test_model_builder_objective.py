@@ -0,0 +1,66 @@
+"""test_model_builder_objective.py: Compare the in-place update of the objective
+coefficients against setting the objective again."""
+
+import os
+import unittest
+
+from pownet import ModelBuilder, SystemInput
+from pownet.data_utils import create_init_condition
+
+
+class TestModelBuilderObjective(unittest.TestCase):
+    def setUp(self):
+        test_model_library_path = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "test_model_library")
+        )
+        self.inputs = SystemInput(
+            input_folder=test_model_library_path,
+            model_name="dummy",
+            year=2016,
+            sim_horizon=24,
+        )
+        self.inputs.load_and_check_data()
+
+        # Contract costs that change every hour
+        contract_costs = self.inputs.contract_cost_timeseries
+        contract_costs = contract_costs.mul(
+            1 + (contract_costs.index % 37) / 10, axis=0
+        )
+        self.inputs.contract_cost_timeseries = contract_costs
+        self.inputs.contract_costs = {
+            (col, idx): value
+            for col in contract_costs.columns
+            for idx, value in contract_costs[col].items()
+        }
+        self.init_conditions = create_init_condition(
+            self.inputs.thermal_units, self.inputs.storage_units
+        )
+
+    def get_objective(self, builder: ModelBuilder) -> dict:
+        builder.model.update()
+        objective = builder.model.getObjective()
+        coeffs = {}
+        for i in range(objective.size()):
+            var_name = objective.getVar(i).VarName
+            coeffs[var_name] = coeffs.get(var_name, 0.0) + objective.getCoeff(i)
+        return {name: coeff for name, coeff in coeffs.items() if coeff != 0}
+
+    def test_in_place_matches_set_objective(self):
+        in_place_builder = ModelBuilder(self.inputs, update_objective_in_place=True)
+        rebuild_builder = ModelBuilder(self.inputs, update_objective_in_place=False)
+        in_place_builder.build(step_k=1, init_conds=self.init_conditions)
+        rebuild_builder.build(step_k=1, init_conds=self.init_conditions)
+
+        previous_objective = self.get_objective(rebuild_builder)
+        for step_k in [2, 3, 100]:
+            in_place_builder.update(step_k=step_k, init_conds=self.init_conditions)
+            rebuild_builder.update(step_k=step_k, init_conds=self.init_conditions)
+
+            expected = self.get_objective(rebuild_builder)
+            self.assertNotEqual(expected, previous_objective)
+            self.assertEqual(self.get_objective(in_place_builder), expected)
+            previous_objective = expected
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""test_model_builder_update.py: Compare the in-place update of the constraints
+against removing and re-adding them."""
+
+import os
+import unittest
+
+from pownet import ModelBuilder, SystemInput
+from pownet.data_utils import create_init_condition
+
+
+def get_constraint_snapshot(model) -> dict:
+    """Return the sense, RHS, and nonzero coefficients of each constraint by name."""
+    model.update()
+    snapshot = {}
+    for constr in model.getConstrs():
+        row = model.getRow(constr)
+        coeffs = {
+            row.getVar(i).VarName: round(row.getCoeff(i), 9)
+            for i in range(row.size())
+            if row.getCoeff(i) != 0
+        }
+        snapshot[constr.ConstrName] = (constr.Sense, round(constr.RHS, 9), coeffs)
+    return snapshot
+
+
+class TestModelBuilderUpdate(unittest.TestCase):
+    def setUp(self):
+        test_model_library_path = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "test_model_library")
+        )
+        self.inputs = SystemInput(
+            input_folder=test_model_library_path,
+            model_name="dummy",
+            year=2016,
+            sim_horizon=24,
+        )
+        self.inputs.load_and_check_data()
+
+    def create_init_conditions(self, step_k: int) -> dict:
+        init_conditions = create_init_condition(
+            self.inputs.thermal_units, self.inputs.storage_units
+        )
+        for i, unit in enumerate(self.inputs.thermal_units):
+            init_conditions["initial_u"][unit] = (step_k + i) % 2
+            init_conditions["initial_p"][unit] = 10.0 * step_k
+            init_conditions["initial_min_on"][unit] = step_k + i
+            init_conditions["initial_min_off"][unit] = 2 * step_k
+        return init_conditions
+
+    def test_update_in_place_matches_rebuild(self):
+        in_place_builder = ModelBuilder(self.inputs, update_in_place=True)
+        rebuild_builder = ModelBuilder(self.inputs, update_in_place=False)
+
+        init_conditions = self.create_init_conditions(step_k=1)
+        in_place_builder.build(step_k=1, init_conds=init_conditions)
+        rebuild_builder.build(step_k=1, init_conds=init_conditions)
+
+        for step_k in range(2, 5):
+            init_conditions = self.create_init_conditions(step_k)
+            in_place_builder.update(step_k=step_k, init_conds=init_conditions)
+            rebuild_builder.update(step_k=step_k, init_conds=init_conditions)
+
+            in_place_snapshot = get_constraint_snapshot(in_place_builder.model)
+            rebuild_snapshot = get_constraint_snapshot(rebuild_builder.model)
+            self.assertEqual(in_place_snapshot.keys(), rebuild_snapshot.keys())
+            for constr_name, expected in rebuild_snapshot.items():
+                self.assertEqual(
+                    in_place_snapshot[constr_name], expected, msg=constr_name
+                )
+
+    def test_update_keeps_constraint_objects(self):
+        builder = ModelBuilder(self.inputs, update_in_place=True)
+        builder.build(step_k=1, init_conds=self.create_init_conditions(step_k=1))
+        num_constrs = builder.model.NumConstrs
+        flow_balance = builder.system_builder.c_flow_balance
+
+        builder.update(step_k=2, init_conds=self.create_init_conditions(step_k=2))
+        builder.model.update()
+        self.assertEqual(builder.model.NumConstrs, num_constrs)
+        self.assertIs(builder.system_builder.c_flow_balance, flow_balance)
+
+
+if __name__ == "__main__":
+    unittest.main()
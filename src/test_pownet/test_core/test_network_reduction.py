@@ -0,0 +1,290 @@
+"""test_network_reduction.py: Test the Kron reduction of pass-through buses."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pownet import SystemInput
+from pownet.core.data_processor import DataProcessor
+from pownet.core.network_reduction import (
+    get_pass_through_nodes,
+    map_flows_to_original_lines,
+    reduce_network,
+)
+from pownet.core.output import OutputProcessor
+
+
+def get_transmission_data(lines: list[tuple[str, str, float, float]]) -> pd.DataFrame:
+    """Lines as (source, sink, susceptance, line_capacity) at 115 kV."""
+    data = pd.DataFrame(
+        lines, columns=["source", "sink", "susceptance", "line_capacity"]
+    )
+    data["source_kv"] = 115
+    data["sink_kv"] = 115
+    data["max_kv"] = 115
+    data["reactance"] = 115 * 115 / data["susceptance"]
+    return data[
+        [
+            "source",
+            "sink",
+            "source_kv",
+            "sink_kv",
+            "line_capacity",
+            "max_kv",
+            "reactance",
+            "susceptance",
+        ]
+    ]
+
+
+def get_dc_flows(
+    transmission_data: pd.DataFrame, injections: dict[str, float]
+) -> pd.Series:
+    """Solve the DC power flow with the first node as the reference node."""
+    nodes = list(pd.unique(transmission_data[["source", "sink"]].to_numpy().ravel()))
+    node_idx = {node: idx for idx, node in enumerate(nodes)}
+    incidence = np.zeros((len(transmission_data), len(nodes)))
+    for row, (source, sink) in enumerate(
+        zip(transmission_data["source"], transmission_data["sink"])
+    ):
+        incidence[row, node_idx[source]] = 1
+        incidence[row, node_idx[sink]] = -1
+    susceptance = transmission_data["susceptance"].to_numpy()
+    bus_susceptance = incidence.T @ (susceptance[:, np.newaxis] * incidence)
+    injection = np.array([injections.get(node, 0) for node in nodes])
+    angles = np.zeros(len(nodes))
+    angles[1:] = np.linalg.solve(bus_susceptance[1:, 1:], injection[1:])
+    return pd.Series(
+        susceptance * (incidence @ angles),
+        index=pd.MultiIndex.from_frame(transmission_data[["source", "sink"]]),
+    )
+
+
+def to_flow_variables(flows: pd.Series, hour: int = 1) -> pd.DataFrame:
+    """Split net flows into the fwd and bwd flow variables of ModelBuilder."""
+    flow_variables = []
+    for flow_type, sign in [("fwd", 1), ("bwd", -1)]:
+        flow_variables.append(
+            pd.DataFrame(
+                {
+                    "node_a": flows.index.get_level_values(0),
+                    "node_b": flows.index.get_level_values(1),
+                    "value": (sign * flows.to_numpy()).clip(min=0),
+                    "type": flow_type,
+                    "hour": hour,
+                }
+            )
+        )
+    return pd.concat(flow_variables, ignore_index=True)
+
+
+def get_net_flows(flow_variables: pd.DataFrame) -> pd.Series:
+    """Net flows (fwd - bwd) indexed by (node_a, node_b)."""
+    sign = np.where(flow_variables["type"] == "fwd", 1, -1)
+    return (
+        flow_variables.assign(value=sign * flow_variables["value"])
+        .groupby(["node_a", "node_b"])["value"]
+        .sum()
+    )
+
+
+class TestNetworkReduction(unittest.TestCase):
+    def assert_same_flows(
+        self,
+        transmission_data: pd.DataFrame,
+        terminal_nodes: set[str],
+        injections: dict[str, float],
+    ) -> None:
+        """The mapped flows of the reduced network equal the flows of the full network."""
+        reduced_data, line_map = reduce_network(transmission_data, terminal_nodes)
+        mapped_flows = get_net_flows(
+            map_flows_to_original_lines(
+                to_flow_variables(get_dc_flows(reduced_data, injections)), line_map
+            )
+        )
+        full_flows = get_dc_flows(transmission_data, injections)
+        np.testing.assert_allclose(
+            mapped_flows.reindex(full_flows.index).to_numpy(),
+            full_flows.to_numpy(),
+            atol=1e-9,
+        )
+
+    def test_get_pass_through_nodes(self):
+        transmission_data = get_transmission_data(
+            [("A", "P", 100, 50), ("P", "B", 100, 50), ("B", "Q", 100, 50)]
+        )
+        self.assertEqual(
+            get_pass_through_nodes(transmission_data, {"A", "B"}), ["P", "Q"]
+        )
+
+    def test_series_lines(self):
+        transmission_data = get_transmission_data(
+            [("A", "P", 100, 50), ("P", "Q", 300, 80), ("Q", "B", 150, 70)]
+        )
+        reduced_data, line_map = reduce_network(transmission_data, {"A", "B"})
+
+        self.assertEqual(len(reduced_data), 1)
+        line = reduced_data.iloc[0]
+        self.assertEqual((line["source"], line["sink"]), ("A", "B"))
+        self.assertAlmostEqual(line["susceptance"], 1 / (1 / 100 + 1 / 300 + 1 / 150))
+        self.assertAlmostEqual(line["reactance"], 115 * 115 / line["susceptance"])
+        self.assertAlmostEqual(line["line_capacity"], 50)
+        np.testing.assert_allclose(line_map["factor"], [1, 1, 1])
+        self.assertEqual(list(reduced_data.columns), list(transmission_data.columns))
+
+    def test_parallel_path(self):
+        # The path through P is merged with the line between A and B
+        transmission_data = get_transmission_data(
+            [("A", "B", 200, 100), ("A", "P", 100, 50), ("P", "B", 100, 80)]
+        )
+        reduced_data, line_map = reduce_network(transmission_data, {"A", "B"})
+
+        self.assertEqual(len(reduced_data), 1)
+        line = reduced_data.iloc[0]
+        self.assertEqual((line["source"], line["sink"]), ("A", "B"))
+        self.assertAlmostEqual(line["susceptance"], 250)
+        # The direct line carries 80% of the flow
+        self.assertAlmostEqual(line["line_capacity"], 100 / 0.8)
+        np.testing.assert_allclose(line_map["factor"], [0.8, 0.2, 0.2])
+        self.assert_same_flows(transmission_data, {"A", "B"}, {"A": 90, "B": -90})
+
+    def test_star(self):
+        # P connects three terminal buses, so the reduced lines form a cycle
+        transmission_data = get_transmission_data(
+            [("A", "P", 100, 50), ("P", "B", 200, 50), ("C", "P", 300, 50)]
+        )
+        reduced_data, line_map = reduce_network(transmission_data, {"A", "B", "C"})
+
+        self.assertEqual(len(reduced_data), 3)
+        np.testing.assert_allclose(
+            reduced_data["susceptance"].sum(),
+            (100 * 200 + 200 * 300 + 100 * 300) / 600,
+        )
+        # Each original line carries the flows of the reduced lines at its terminal bus
+        np.testing.assert_allclose(line_map["factor"].abs(), np.ones(6))
+        self.assert_same_flows(
+            transmission_data, {"A", "B", "C"}, {"A": 30, "B": -50, "C": 20}
+        )
+
+    def test_mesh(self):
+        transmission_data = get_transmission_data(
+            [
+                ("A", "P", 100, 50),
+                ("P", "Q", 150, 50),
+                ("Q", "B", 120, 50),
+                ("A", "Q", 80, 50),
+                ("P", "C", 90, 50),
+                ("B", "C", 60, 50),
+            ]
+        )
+        self.assert_same_flows(
+            transmission_data, {"A", "B", "C"}, {"A": 40, "B": -15, "C": -25}
+        )
+
+    def test_dead_end(self):
+        # P is only connected to A, so its line carries no flow
+        transmission_data = get_transmission_data(
+            [("A", "B", 100, 50), ("A", "P", 100, 50)]
+        )
+        reduced_data, line_map = reduce_network(transmission_data, {"A", "B"})
+
+        pd.testing.assert_frame_equal(reduced_data, transmission_data.iloc[[0]])
+        dead_end = line_map.loc[line_map["sink"] == "P"].iloc[0]
+        self.assertEqual(dead_end["factor"], 0)
+
+        mapped_flows = map_flows_to_original_lines(
+            to_flow_variables(get_dc_flows(reduced_data, {"A": 10, "B": -10})),
+            line_map,
+        )
+        np.testing.assert_allclose(
+            get_net_flows(mapped_flows).loc[[("A", "B"), ("A", "P")]], [10, 0]
+        )
+
+    def test_no_pass_through_nodes(self):
+        transmission_data = get_transmission_data(
+            [("A", "B", 100, 50), ("B", "C", 100, 50)]
+        )
+        reduced_data, line_map = reduce_network(transmission_data, {"A", "B", "C"})
+        pd.testing.assert_frame_equal(reduced_data, transmission_data)
+        np.testing.assert_allclose(line_map["factor"], [1, 1])
+
+    def test_max_line_usage(self):
+        transmission_data = get_transmission_data(
+            [("A", "B", 200, 100), ("A", "P", 100, 50), ("P", "B", 100, 80)]
+        )
+        reduced_data, line_map = reduce_network(transmission_data, {"A", "B"})
+        flow_variables = pd.concat(
+            [
+                to_flow_variables(get_dc_flows(reduced_data, {"A": 50, "B": -50}), 1),
+                to_flow_variables(get_dc_flows(reduced_data, {"A": -20, "B": 20}), 2),
+            ]
+        )
+        line_usage = OutputProcessor().get_max_line_usage(
+            flow_variables=flow_variables,
+            line_locations=pd.DataFrame(
+                {"source": ["A"], "sink": ["B"], "source_lon": [104.9]}
+            ).set_index(["source", "sink"]),
+            rated_line_capacities={("A", "B"): 125},
+            line_map=line_map,
+        )
+        self.assertEqual(sorted(line_usage.index), [("A", "B"), ("A", "P"), ("P", "B")])
+        np.testing.assert_allclose(
+            line_usage.loc[[("A", "B"), ("A", "P"), ("P", "B")], "max_value"],
+            [40, 10, 10],
+        )
+        np.testing.assert_allclose(
+            line_usage.loc[[("A", "B"), ("A", "P"), ("P", "B")], "rated_capacity"],
+            [100, 50, 80],
+        )
+
+    def test_data_processor(self):
+        test_model_library_path = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "test_model_library")
+        )
+        with tempfile.TemporaryDirectory() as input_folder:
+            shutil.copytree(
+                os.path.join(test_model_library_path, "dummy"),
+                os.path.join(input_folder, "dummy"),
+            )
+            processor = DataProcessor(
+                input_folder=input_folder,
+                model_name="dummy",
+                year=2016,
+                frequency=50,
+                reduce_network=True,
+            )
+            processor.execute_data_pipeline()
+            # Node3 only connects transmission lines
+            self.assertNotIn("Node3", processor.get_terminal_nodes())
+            self.assertTrue(
+                os.path.exists(
+                    os.path.join(input_folder, "dummy", "pownet_line_map.csv")
+                )
+            )
+
+            inputs = SystemInput(
+                input_folder=input_folder,
+                model_name="dummy",
+                year=2016,
+                sim_horizon=24,
+            )
+            inputs.load_and_check_data()
+            self.assertNotIn("Node3", inputs.nodes)
+            self.assertEqual(len(inputs.line_map), len(processor.line_map))
+
+            # Without reduction, the line map is removed
+            processor.reduce_network = False
+            processor.execute_data_pipeline()
+            self.assertFalse(
+                os.path.exists(
+                    os.path.join(input_folder, "dummy", "pownet_line_map.csv")
+                )
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
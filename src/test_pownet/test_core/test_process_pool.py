@@ -0,0 +1,31 @@
+"""test_process_pool.py: Unit tests for the process pool of the parallel runners."""
+
+import unittest
+
+from pownet.core.process_pool import (
+    create_process_pool,
+    get_threads_per_worker,
+    get_worker_data,
+)
+
+
+class TestProcessPool(unittest.TestCase):
+    def test_get_threads_per_worker(self):
+        self.assertEqual(get_threads_per_worker(8, max_workers=4, num_tasks=10), 2)
+        # Fewer tasks than workers leave more threads for each worker
+        self.assertEqual(get_threads_per_worker(8, max_workers=4, num_tasks=2), 4)
+        # Each worker has at least one thread
+        self.assertEqual(get_threads_per_worker(2, max_workers=4, num_tasks=4), 1)
+        self.assertEqual(get_threads_per_worker(4, max_workers=4, num_tasks=0), 4)
+
+    def test_worker_data(self):
+        worker_data = {"inputs": [1, 2, 3]}
+        with create_process_pool(2, num_tasks=2, worker_data=worker_data) as executor:
+            futures = [executor.submit(get_worker_data) for _ in range(2)]
+            self.assertEqual([future.result() for future in futures], [worker_data] * 2)
+        # The data is only set in the workers
+        self.assertIsNone(get_worker_data())
+
+
+if __name__ == "__main__":
+    unittest.main()
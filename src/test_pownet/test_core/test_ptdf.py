@@ -0,0 +1,169 @@
+"""test_ptdf.py: Test the DC-OPF formulation with power transfer distribution factors."""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pownet import ModelBuilder, SystemInput
+from pownet.core.data_processor import DataProcessor
+from pownet.data_utils import create_init_condition
+from test_pownet.test_core.helpers import (
+    TEST_MODEL_LIBRARY,
+    load_dummy_inputs,
+    solve_steps,
+)
+
+
+class TestPTDF(unittest.TestCase):
+    def get_inputs(self, dc_opf: str) -> SystemInput:
+        inputs = load_dummy_inputs(dc_opf=dc_opf, line_loss_factor=0)
+        # Reduce the line capacity so some lines are congested
+        inputs.line_capacity = inputs.line_capacity * 0.3
+        return inputs
+
+    def get_processor(self, lines: list[tuple[str, str, float]]) -> DataProcessor:
+        processor = DataProcessor(
+            input_folder=TEST_MODEL_LIBRARY,
+            model_name="dummy",
+            year=2016,
+            frequency=50,
+        )
+        processor.transmission_data = pd.DataFrame(
+            lines, columns=["source", "sink", "susceptance"]
+        )
+        return processor
+
+    def solve_steps(self, inputs: SystemInput, **kwargs) -> list[float]:
+        """Solve two steps from the same initial conditions."""
+        _, system_record = solve_steps(
+            inputs, num_steps=2, update_init_conds=False, **kwargs
+        )
+        return system_record.get_objvals()
+
+    def test_create_ptdf(self):
+        # Three nodes in a cycle with equal susceptances
+        processor = self.get_processor(
+            [("A", "B", 100), ("B", "C", 100), ("A", "C", 100)]
+        )
+        processor.create_ptdf()
+        # A is the reference node, so its PTDF is zero
+        expected = np.array(
+            [[0, -2 / 3, -1 / 3], [0, 1 / 3, -1 / 3], [0, -1 / 3, -2 / 3]]
+        )
+        np.testing.assert_allclose(processor.ptdf.to_numpy(), expected, atol=1e-12)
+        self.assertEqual(list(processor.ptdf.columns), ["A", "B", "C"])
+
+        # Small factors are set to zero
+        processor = self.get_processor([("A", "B", 1000), ("B", "C", 1), ("A", "C", 1)])
+        processor.ptdf_threshold = 0.01
+        processor.create_ptdf()
+        self.assertEqual(processor.ptdf.loc[("B", "C"), "B"], 0)
+
+    def test_disconnected_network(self):
+        processor = self.get_processor([("A", "B", 100), ("C", "D", 100)])
+        processor.create_ptdf()
+        self.assertTrue(processor.ptdf.empty)
+
+    def test_no_flow_variables(self):
+        inputs = self.get_inputs("ptdf")
+        self.assertEqual(list(inputs.ptdf.index), list(inputs.edges))
+        model_builder = ModelBuilder(inputs)
+        model_builder.build(
+            step_k=1,
+            init_conds=create_init_condition(
+                inputs.thermal_units, inputs.storage_units
+            ),
+        )
+        system_builder = model_builder.system_builder
+        self.assertEqual(len(system_builder.flow_fwd), 0)
+        self.assertEqual(len(system_builder.flow_bwd), 0)
+        self.assertEqual(len(system_builder.c_kirchhoff), 0)
+        self.assertEqual(len(system_builder.pinj), len(inputs.nodes) * 24)
+        self.assertEqual(len(system_builder.c_ptdf_fwd), len(inputs.edges) * 24)
+
+    def test_same_objective_as_kirchhoff(self):
+        kirchhoff_objvals = self.solve_steps(self.get_inputs("kirchhoff"))
+        inputs = self.get_inputs("ptdf")
+        for kwargs in [
+            {},
+            {"build_backend": "matrix"},
+            {"update_in_place": False},
+            {"lazy_transmission": True},
+        ]:
+            np.testing.assert_allclose(
+                self.solve_steps(inputs, **kwargs), kirchhoff_objvals, rtol=1e-6
+            )
+
+    def test_update_same_as_build(self):
+        inputs = self.get_inputs("ptdf")
+        init_conditions = create_init_condition(
+            inputs.thermal_units, inputs.storage_units
+        )
+        updated_builder = ModelBuilder(inputs)
+        updated_builder.build(step_k=1, init_conds=init_conditions)
+        updated_builder.update(step_k=2, init_conds=init_conditions)
+        new_builder = ModelBuilder(inputs)
+        new_builder.build(step_k=2, init_conds=init_conditions)
+        for model_builder in [updated_builder, new_builder]:
+            model_builder.model.update()
+        np.testing.assert_array_equal(
+            updated_builder.model.getAttr("RHS", updated_builder.model.getConstrs()),
+            new_builder.model.getAttr("RHS", new_builder.model.getConstrs()),
+        )
+
+    def test_flows_match_net_injections(self):
+        inputs = self.get_inputs("ptdf")
+        model_builder = ModelBuilder(inputs)
+        power_system_model = model_builder.build(
+            step_k=1,
+            init_conds=create_init_condition(
+                inputs.thermal_units, inputs.storage_units
+            ),
+        )
+        power_system_model.optimize(log_to_console=False, mipgap=1e-6)
+        solution = power_system_model.get_structured_solution()
+
+        flow_vars = solution["flow"]
+        self.assertEqual(len(flow_vars), len(inputs.edges) * 24 * 2)
+        net_flow = flow_vars["value"].where(
+            flow_vars["type"] == "fwd", -flow_vars["value"]
+        )
+        # The net injection of a node is its outflow minus its inflow
+        flow_vars = flow_vars.assign(net_flow=net_flow)
+        outflow = flow_vars.groupby(["node_a", "timestep"])["net_flow"].sum()
+        inflow = flow_vars.groupby(["node_b", "timestep"])["net_flow"].sum()
+        outflow.index.names = inflow.index.names = ["node", "timestep"]
+        net_outflow = outflow.sub(inflow, fill_value=0)
+
+        node_vars = solution["node"]
+        pinj = node_vars[node_vars["vartype"] == "pinj"].set_index(
+            ["node", "timestep"]
+        )["value"]
+        net_outflow = net_outflow.reindex(pinj.index, fill_value=0)
+        np.testing.assert_allclose(net_outflow.to_numpy(), pinj.to_numpy(), atol=1e-4)
+
+    def test_ptdf_with_line_losses(self):
+        with self.assertRaises(ValueError):
+            SystemInput(
+                input_folder=TEST_MODEL_LIBRARY,
+                model_name="dummy",
+                year=2016,
+                sim_horizon=24,
+                dc_opf="ptdf",
+                line_loss_factor=0.0001,
+            )
+
+    def test_invalid_dc_opf(self):
+        with self.assertRaises(ValueError):
+            SystemInput(
+                input_folder=TEST_MODEL_LIBRARY,
+                model_name="dummy",
+                year=2016,
+                sim_horizon=24,
+                dc_opf="ac",
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""test_record_store.py: Unit tests for the ColumnarTable class."""
+
+import unittest
+
+import pandas as pd
+
+from pownet.core.record_store import ColumnarTable
+
+
+class TestColumnarTable(unittest.TestCase):
+    def setUp(self):
+        self.steps = [
+            pd.DataFrame(
+                {
+                    "value": [1.0, 2.0, 3.0],
+                    "vartype": ["status", "status", "vpower"],
+                    "node": ["pGas", "pCoal", "pGas"],
+                    "hour": [1, 1, 1],
+                }
+            ),
+            pd.DataFrame(
+                {
+                    "value": [4.0, 5.0, 6.0],
+                    "vartype": ["status", "status", "vpower"],
+                    "node": ["pGas", "pCoal", "pGas"],
+                    "hour": [25, 25, 25],
+                }
+            ),
+            pd.DataFrame(
+                {
+                    "value": [7.0, 8.0, 9.0],
+                    "vartype": ["status", "status", "vpower"],
+                    "node": ["pGas", "pCoal", "pGas"],
+                    "hour": [49, 49, 49],
+                }
+            ),
+        ]
+
+    def test_to_dataframe_matches_concat(self):
+        # Start with a smaller capacity to check that the table grows
+        table = ColumnarTable(num_steps=2)
+        for df in self.steps:
+            table.append(df)
+
+        self.assertEqual(table.num_steps, 3)
+        self.assertGreaterEqual(table.capacity, 3)
+        expected = pd.concat(self.steps, axis=0).reset_index(drop=True)
+        pd.testing.assert_frame_equal(table.to_dataframe(), expected, check_dtype=False)
+
+    def test_empty_table(self):
+        table = ColumnarTable(num_steps=2)
+        self.assertTrue(table.to_dataframe().empty)
+
+        table.append(pd.DataFrame(columns=["node_a", "node_b", "value", "hour"]))
+        table.append(pd.DataFrame(columns=["node_a", "node_b", "value", "hour"]))
+        df = table.to_dataframe()
+        self.assertTrue(df.empty)
+        self.assertEqual(list(df.columns), ["node_a", "node_b", "value", "hour"])
+
+    def test_append_invalid_table(self):
+        table = ColumnarTable(num_steps=2)
+        with self.assertRaises(ValueError):
+            table.append(self.steps[0].drop("hour", axis=1))
+
+        table.append(self.steps[0])
+        with self.assertRaises(ValueError):
+            table.append(self.steps[1].iloc[:2])
+
+        # The labels of the rows must match the first step
+        with self.assertRaises(ValueError):
+            table.append(self.steps[1].assign(node=["pGas", "pOil", "pGas"]))
+        with self.assertRaises(ValueError):
+            table.append(self.steps[1].rename(columns={"node": "unit"}))
+
+    def test_append_reordered_table(self):
+        """Test that rows in a different order are put in the order of the first step."""
+        table = ColumnarTable(num_steps=3)
+        table.append(self.steps[0])
+        table.append(self.steps[1].iloc[[2, 0, 1]])
+        table.append(self.steps[2])
+
+        expected = pd.concat(self.steps, axis=0).reset_index(drop=True)
+        pd.testing.assert_frame_equal(table.to_dataframe(), expected, check_dtype=False)
+
+        # Rows with the same labels are told apart by their hour within the step
+        table = ColumnarTable(num_steps=2)
+        first_step = pd.DataFrame(
+            {"value": [1.0, 2.0], "node": ["pGas", "pGas"], "hour": [1, 2]}
+        )
+        second_step = pd.DataFrame(
+            {"value": [4.0, 3.0], "node": ["pGas", "pGas"], "hour": [26, 25]}
+        )
+        table.append(first_step)
+        table.append(second_step)
+        self.assertEqual(list(table.to_dataframe()["value"]), [1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(list(table.to_dataframe()["hour"]), [1, 2, 25, 26])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+"""test_results_sink.py: Unit tests for the results sinks."""
+
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from pownet import Simulator
+from pownet.core.results_sink import (
+    CSVResultsSink,
+    ParquetResultsSink,
+    create_results_sink,
+)
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def create_step_tables(step_k: int) -> dict[str, pd.DataFrame]:
+    hour = 1 + 24 * (step_k - 1)
+    return {
+        "node_variables": pd.DataFrame(
+            {
+                "value": [1.0, 0.0],
+                "vartype": ["status", "status"],
+                "node": ["pGas", "pCoal"],
+                "hour": [hour, hour],
+            }
+        ),
+        "model_stats": pd.DataFrame({"objval": [100.0 * step_k], "runtime": [0.1]}),
+    }
+
+
+class TestResultsSink(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_folder = os.path.join(self.temp_dir.name, "dummy_outputs")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_csv_sink(self):
+        sink = CSVResultsSink(self.output_folder, model_id="dummy")
+        for step_k in [1, 2]:
+            sink.write_step(step_k, create_step_tables(step_k))
+        sink.close()
+
+        self.assertEqual(
+            sorted(os.listdir(self.output_folder)),
+            [
+                "dummy_model_stats_1.csv",
+                "dummy_model_stats_2.csv",
+                "dummy_node_variables_1.csv",
+                "dummy_node_variables_2.csv",
+            ],
+        )
+        df = pd.read_csv(os.path.join(self.output_folder, "dummy_node_variables_2.csv"))
+        pd.testing.assert_frame_equal(
+            df, create_step_tables(2)["node_variables"], check_dtype=False
+        )
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed.")
+    def test_parquet_sink(self):
+        sink = ParquetResultsSink(self.output_folder, model_id="dummy")
+        for step_k in [1, 2, 3]:
+            sink.write_step(step_k, create_step_tables(step_k))
+        sink.close()
+
+        self.assertEqual(
+            sorted(os.listdir(self.output_folder)),
+            ["dummy_model_stats.parquet", "dummy_node_variables.parquet"],
+        )
+        df = pd.read_parquet(
+            os.path.join(self.output_folder, "dummy_node_variables.parquet")
+        )
+        expected = pd.concat(
+            [create_step_tables(step_k)["node_variables"] for step_k in [1, 2, 3]],
+            ignore_index=True,
+        )
+        pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+
+        model_stats = pd.read_parquet(
+            os.path.join(self.output_folder, "dummy_model_stats.parquet")
+        )
+        self.assertEqual(model_stats["objval"].tolist(), [100.0, 200.0, 300.0])
+
+    def test_create_results_sink(self):
+        sink = create_results_sink("csv", self.output_folder, model_id="dummy")
+        self.assertIsInstance(sink, CSVResultsSink)
+        with self.assertRaises(ValueError):
+            create_results_sink("xlsx", self.output_folder, model_id="dummy")
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed.")
+    def test_simulator_parquet_output(self):
+        input_folder = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "test_model_library")
+        )
+        # SystemRecord writes to {model_id}_outputs in the working directory
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        try:
+            for num_chunks in [1, 2]:
+                simulator = Simulator(
+                    input_folder=input_folder, model_name="dummy", model_year=2016
+                )
+                inputs = simulator.load_inputs(sim_horizon=24, to_process_inputs=False)
+                inputs.model_id = f"dummy_{num_chunks}"
+                simulator.simulate(
+                    inputs=inputs,
+                    steps_to_run=2,
+                    log_to_console=False,
+                    num_chunks=num_chunks,
+                    overlap_steps=0,
+                    keep_record_each_step=True,
+                    output_format="parquet",
+                )
+                # The files can only be read after the writers are closed
+                model_stats = pd.read_parquet(
+                    os.path.join(
+                        f"{inputs.model_id}_outputs",
+                        f"{inputs.model_id}_model_stats.parquet",
+                    )
+                )
+                self.assertEqual(
+                    model_stats["objval"].tolist(),
+                    simulator.system_record.get_objvals(),
+                )
+        finally:
+            os.chdir(cwd)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed.")
+    def test_simulator_parquet_without_batch_mode(self):
+        input_folder = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "test_model_library")
+        )
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        try:
+            simulator = Simulator(
+                input_folder=input_folder, model_name="dummy", model_year=2016
+            )
+            inputs = simulator.load_inputs(sim_horizon=24, to_process_inputs=False)
+            record = simulator.simulate(
+                inputs=inputs,
+                steps_to_run=2,
+                log_to_console=False,
+                find_lmp=True,
+                batch_mode=False,
+                keep_record_each_step=True,
+                output_format="parquet",
+            )
+            # No step is kept in memory
+            self.assertEqual(record.node_table.num_steps, 0)
+            self.assertTrue(record.lmp_df.empty)
+
+            output_folder = f"{inputs.model_id}_outputs"
+            node_vars = pd.read_parquet(
+                os.path.join(output_folder, f"{inputs.model_id}_node_variables.parquet")
+            )
+            self.assertEqual(node_vars["hour"].min(), 1)
+            self.assertEqual(node_vars["hour"].max(), 48)
+            lmp = pd.read_parquet(
+                os.path.join(output_folder, f"{inputs.model_id}_lmp.parquet")
+            )
+            self.assertFalse(lmp.empty)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""test_step_hours.py: Test rolling horizon steps that are not 24 hours apart."""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pownet import ModelBuilder, Simulator, SystemInput
+from pownet.data_utils import create_init_condition, get_first_day, get_step_window
+from test_pownet.test_core.helpers import (
+    TEST_MODEL_LIBRARY,
+    get_model_arrays,
+    load_dummy_inputs,
+    solve_steps,
+)
+
+
+class TestStepHours(unittest.TestCase):
+    def test_step_window(self):
+        timeseries = pd.Series(np.arange(1, 101), index=range(1, 101))
+        np.testing.assert_array_equal(
+            get_step_window(timeseries, range(1, 4), step_k=3, step_hours=12),
+            [25, 26, 27],
+        )
+        self.assertEqual(get_first_day(step_k=3, step_hours=12), 2)
+        self.assertEqual(get_first_day(step_k=3, step_hours=24), 3)
+
+    def test_invalid_step_hours(self):
+        with self.assertRaises(ValueError):
+            SystemInput(
+                input_folder=TEST_MODEL_LIBRARY,
+                model_name="dummy",
+                year=2016,
+                sim_horizon=24,
+                step_hours=0,
+            )
+        with self.assertRaises(ValueError):
+            load_dummy_inputs(step_hours=48)
+
+    def test_same_start_hour(self):
+        """Steps that start at the same hour give the same model."""
+        init_conditions = {}
+        builders = {}
+        for step_hours in [12, 24]:
+            inputs = load_dummy_inputs(step_hours=step_hours)
+            init_conditions = create_init_condition(
+                inputs.thermal_units, inputs.storage_units
+            )
+            builders[step_hours] = ModelBuilder(inputs)
+            builders[step_hours].build(step_k=1, init_conds=init_conditions)
+
+        # Both steps start at hour 25
+        builders[12].update(step_k=3, init_conds=init_conditions)
+        builders[24].update(step_k=2, init_conds=init_conditions)
+        arrays_12 = get_model_arrays(builders[12].model)
+        arrays_24 = get_model_arrays(builders[24].model)
+        for name in arrays_24:
+            np.testing.assert_array_equal(arrays_12[name], arrays_24[name])
+
+    def test_record_hours(self):
+        inputs = load_dummy_inputs(step_hours=12)
+        _, system_record = solve_steps(inputs, num_steps=3, find_lmp=True)
+        init_conditions = system_record.get_init_conds()
+
+        # The first 12 hours of each step are kept without gaps or overlaps
+        node_vars = system_record.get_node_variables()
+        for vartype in ["status", "vpower"]:
+            hours = node_vars.loc[node_vars["vartype"] == vartype, "hour"]
+            for unit_hours in hours.groupby(node_vars["node"]):
+                self.assertEqual(sorted(unit_hours[1]), list(range(1, 37)))
+        self.assertEqual(list(system_record.get_lmp().index), list(range(1, 37)))
+        # The initial conditions are taken at the last recorded hour
+        status = node_vars[
+            (node_vars["vartype"] == "status") & (node_vars["hour"] == 36)
+        ].set_index("node")["value"]
+        self.assertEqual(init_conditions["initial_u"], status.to_dict())
+
+    def test_default_steps_to_run(self):
+        inputs = load_dummy_inputs(step_hours=12)
+        # Shorten the simulation so the last step ends at hour 48
+        inputs.num_sim_hours = 48
+        simulator = Simulator(
+            input_folder=TEST_MODEL_LIBRARY,
+            model_name="dummy",
+            model_year=2016,
+        )
+        system_record = simulator.simulate(inputs=inputs, log_to_console=False)
+        self.assertEqual(len(system_record.get_objvals()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
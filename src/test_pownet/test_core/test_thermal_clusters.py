@@ -0,0 +1,200 @@
+"""test_thermal_clusters.py: Test the clusters of identical thermal units."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pownet import ModelBuilder
+from pownet.builder.thermal import NUM_ORDER_TIMESTEPS
+from pownet.core.data_processor import DataProcessor
+from pownet.core.thermal_clusters import ThermalClusters
+from pownet.data_model import Timesteps
+from pownet.data_utils import create_init_condition
+from test_pownet.test_core.helpers import (
+    TEST_MODEL_LIBRARY,
+    load_dummy_inputs,
+    solve_steps,
+)
+
+
+class TestThermalClusters(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Replace pGas of the dummy model with three identical units at its node
+        cls.input_folder = tempfile.mkdtemp()
+        shutil.copytree(
+            os.path.join(TEST_MODEL_LIBRARY, "dummy"),
+            os.path.join(cls.input_folder, "dummy"),
+        )
+        thermal_unit_file = os.path.join(cls.input_folder, "dummy", "thermal_unit.csv")
+        thermal_units = pd.read_csv(thermal_unit_file)
+        gas_units = pd.concat(
+            [thermal_units.loc[thermal_units["name"] == "pGas"]] * 3,
+            ignore_index=True,
+        )
+        gas_units["name"] = ["pGas", "pGas1", "pGas2"]
+        gas_units["max_capacity"] = 400
+        gas_units["min_capacity"] = 100
+        gas_units["ramp_rate"] = 200
+        gas_units["min_uptime"] = 3
+        gas_units["min_downtime"] = 5
+        pd.concat(
+            [gas_units, thermal_units.loc[thermal_units["name"] != "pGas"]]
+        ).to_csv(thermal_unit_file, index=False)
+        DataProcessor(
+            input_folder=cls.input_folder, model_name="dummy", year=2016, frequency=50
+        ).execute_data_pipeline()
+
+        cls.inputs = load_dummy_inputs(input_folder=cls.input_folder)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.input_folder)
+
+    def solve_steps(self, **kwargs) -> tuple[list[float], pd.DataFrame]:
+        _, system_record = solve_steps(self.inputs, num_steps=2, mipgap=1e-8, **kwargs)
+        return system_record.get_objvals(), system_record.get_node_variables()
+
+    def test_clusters(self):
+        thermal_clusters = ThermalClusters(self.inputs)
+        # pOil has no identical unit and pBiomass is a must-take unit
+        self.assertEqual(
+            thermal_clusters.clusters, {"pGas": ["pGas", "pGas1", "pGas2"]}
+        )
+        self.assertEqual(thermal_clusters.unit_count, {"pGas": 3})
+
+        clustered_inputs = thermal_clusters.get_clustered_inputs()
+        self.assertEqual(clustered_inputs.thermal_units, ["pGas", "pOil", "pBiomass"])
+        self.assertEqual(clustered_inputs.node_generator["pGas"], ["pGas"])
+        self.assertEqual(
+            list(clustered_inputs.thermal_derated_capacity.columns),
+            ["pGas", "pOil", "pBiomass"],
+        )
+        # The inputs of the units are not changed
+        self.assertEqual(len(self.inputs.thermal_units), 5)
+        self.assertIn("pGas1", self.inputs.thermal_rated_capacity)
+
+    def test_aggregate_init_conds(self):
+        thermal_clusters = ThermalClusters(self.inputs)
+        init_conds = create_init_condition(
+            self.inputs.thermal_units, self.inputs.storage_units
+        )
+        init_conds["initial_u"].update({"pGas": 1, "pGas1": 1})
+        init_conds["initial_p"].update({"pGas": 50, "pGas1": 20})
+        init_conds["initial_min_on"].update({"pGas": 2})
+        init_conds["initial_min_off"].update({"pGas2": 4})
+
+        clustered_init_conds = thermal_clusters.aggregate_init_conds(init_conds)
+        self.assertEqual(clustered_init_conds["initial_u"]["pGas"], 2)
+        self.assertEqual(clustered_init_conds["initial_p"]["pGas"], 70)
+        self.assertEqual(clustered_init_conds["initial_min_on"]["pGas"], 0)
+        self.assertNotIn("pGas1", clustered_init_conds["initial_u"])
+        self.assertEqual(clustered_init_conds["cluster_min_on"]["pGas"], [2, 0, 0])
+        self.assertEqual(clustered_init_conds["cluster_min_off"]["pGas"], [0, 0, 4])
+        # The initial conditions of the units are not changed
+        self.assertEqual(init_conds["initial_u"]["pGas1"], 1)
+
+    def test_assign_commitment(self):
+        thermal_clusters = ThermalClusters(self.inputs)
+        units = ["pGas", "pGas1", "pGas2"]
+        init_conds = create_init_condition(
+            self.inputs.thermal_units, self.inputs.storage_units
+        )
+        # pGas1 has just started, so pGas is shut down first
+        init_conds["initial_u"].update({"pGas": 1, "pGas1": 1})
+        init_conds["initial_min_on"].update({"pGas1": 2})
+        commitment = {
+            "status": np.array([1, 1, 2, 3]),
+            "startup": np.array([0, 0, 1, 1]),
+            "shutdown": np.array([1, 0, 0, 0]),
+        }
+        status = thermal_clusters._assign_commitment(
+            units, commitment, init_conds, Timesteps(4)
+        )
+        np.testing.assert_array_equal(
+            status, [[0, 0, 0, 1], [1, 1, 1, 1], [0, 0, 1, 1]]
+        )
+
+        # A relaxed cluster status is shared equally
+        commitment["status"] = np.array([1, 1, 1.5, 3])
+        commitment["startup"] = np.array([0, 0, 0.5, 1.5])
+        status = thermal_clusters._assign_commitment(
+            units, commitment, init_conds, Timesteps(4)
+        )
+        np.testing.assert_allclose(status[:, 2:], [[0.5, 1], [0.5, 1], [0.5, 1]])
+
+    def test_same_objective_as_units(self):
+        unit_objvals, unit_node_variables = self.solve_steps()
+        unit_status = unit_node_variables.loc[
+            unit_node_variables["vartype"] == "status"
+        ].pivot_table(index="hour", columns="node", values="value")
+        gas_units = ["pGas", "pGas1", "pGas2"]
+        for kwargs in [{}, {"build_backend": "matrix"}, {"update_in_place": False}]:
+            objvals, node_variables = self.solve_steps(
+                cluster_thermal_units=True, **kwargs
+            )
+            np.testing.assert_allclose(objvals, unit_objvals, rtol=1e-6)
+
+            # Each unit has a binary status and the number of online units matches
+            status = node_variables.loc[node_variables["vartype"] == "status"]
+            status = status.pivot_table(index="hour", columns="node", values="value")
+            self.assertEqual(sorted(status.columns), sorted(self.inputs.thermal_units))
+            np.testing.assert_allclose(status, np.round(status), atol=1e-6)
+            np.testing.assert_allclose(
+                status[gas_units].sum(axis=1),
+                unit_status[gas_units].sum(axis=1),
+                atol=1e-6,
+            )
+
+            # The dispatch of the units adds up to the dispatch of the cluster
+            pthermal = node_variables.loc[node_variables["vartype"] == "pthermal"]
+            pthermal = pthermal.pivot_table(
+                index="hour", columns="node", values="value"
+            )
+            self.assertTrue((pthermal[gas_units] <= 400 + 1e-6).all(axis=None))
+            self.assertTrue(
+                (pthermal[gas_units] >= 100 * status[gas_units] - 1e-6).all(axis=None)
+            )
+
+    def test_status_order_pairs(self):
+        model_builder = ModelBuilder(self.inputs, break_symmetry=True)
+        thermal_builder = model_builder.thermal_builder
+        self.assertEqual(thermal_builder.symmetric_units, [["pGas", "pGas1", "pGas2"]])
+        init_conds = create_init_condition(
+            self.inputs.thermal_units, self.inputs.storage_units
+        )
+        self.assertEqual(
+            thermal_builder.get_status_order_pairs(init_conds),
+            [("pGas", "pGas1"), ("pGas1", "pGas2")],
+        )
+        # pGas1 is online, so it is not interchangeable with the others
+        init_conds["initial_u"].update({"pGas1": 1})
+        init_conds["initial_p"].update({"pGas1": 20})
+        self.assertEqual(
+            thermal_builder.get_status_order_pairs(init_conds), [("pGas", "pGas2")]
+        )
+
+        with self.assertRaises(ValueError):
+            ModelBuilder(self.inputs, break_symmetry=True, cluster_thermal_units=True)
+
+    def test_break_symmetry(self):
+        unit_objvals, _ = self.solve_steps()
+        gas_units = ["pGas", "pGas1", "pGas2"]
+        for kwargs in [{}, {"update_in_place": False}]:
+            objvals, node_variables = self.solve_steps(break_symmetry=True, **kwargs)
+            np.testing.assert_allclose(objvals, unit_objvals, rtol=1e-6)
+
+            # The status of the first step is ordered over its first hours
+            status = node_variables.loc[node_variables["vartype"] == "status"]
+            status = status.pivot_table(index="hour", columns="node", values="value")
+            weights = 2.0 ** np.arange(NUM_ORDER_TIMESTEPS - 1, -1, -1)
+            order = weights @ status[gas_units].iloc[:NUM_ORDER_TIMESTEPS]
+            self.assertTrue((np.diff(order) <= 1e-6).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
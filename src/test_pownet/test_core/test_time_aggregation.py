@@ -0,0 +1,125 @@
+"""test_time_aggregation.py: Test merging the look-ahead hours of the horizon into
+blocks of several hours."""
+
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from pownet import ModelBuilder, Simulator, SystemInput
+from pownet.data_utils import create_init_condition
+from test_pownet.test_core.helpers import (
+    TEST_MODEL_LIBRARY,
+    get_model_arrays,
+    load_dummy_inputs,
+    solve_steps,
+)
+
+
+class TestTimeAggregation(unittest.TestCase):
+    def get_inputs(self, block_hours: int) -> SystemInput:
+        return load_dummy_inputs(sim_horizon=48, block_hours=block_hours)
+
+    def test_fewer_variables(self):
+        num_vars = {}
+        for block_hours in [1, 4]:
+            inputs = self.get_inputs(block_hours)
+            init_conditions = create_init_condition(
+                inputs.thermal_units, inputs.storage_units
+            )
+            model_builder = ModelBuilder(inputs)
+            model_builder.build(step_k=1, init_conds=init_conditions)
+            model_builder.model.update()
+            num_vars[block_hours] = model_builder.model.NumVars
+            # 24 hourly timesteps and 6 blocks of 4 hours
+            self.assertEqual(
+                len(model_builder.thermal_builder.timesteps), 24 + 24 // block_hours
+            )
+        self.assertEqual(num_vars[4], num_vars[1] * 30 / 48)
+
+    def test_update_matches_build(self):
+        inputs = self.get_inputs(block_hours=4)
+        init_conditions = create_init_condition(
+            inputs.thermal_units, inputs.storage_units
+        )
+        updated_builder = ModelBuilder(inputs)
+        updated_builder.build(step_k=1, init_conds=init_conditions)
+        updated_builder.update(step_k=3, init_conds=init_conditions)
+        built_builder = ModelBuilder(inputs)
+        built_builder.build(step_k=3, init_conds=init_conditions)
+
+        updated_arrays = get_model_arrays(updated_builder.model)
+        built_arrays = get_model_arrays(built_builder.model)
+        for name in built_arrays:
+            np.testing.assert_allclose(updated_arrays[name], built_arrays[name])
+
+    def test_record_hours(self):
+        inputs = self.get_inputs(block_hours=4)
+        _, system_record = solve_steps(
+            inputs,
+            num_steps=2,
+            mipgap=1e-3,
+            find_lmp=True,
+            on_solved=lambda model: self.assertTrue(model.check_feasible()),
+        )
+
+        # Only the hourly timesteps of each step are recorded
+        node_vars = system_record.get_node_variables()
+        hours = node_vars.loc[node_vars["vartype"] == "status", "hour"]
+        self.assertEqual(sorted(hours.unique()), list(range(1, 49)))
+        self.assertEqual(list(system_record.get_lmp().index), list(range(1, 49)))
+
+    def test_simulator(self):
+        """Test that Simulator.run passes the blocks to the input data."""
+        simulator = Simulator(
+            input_folder=TEST_MODEL_LIBRARY,
+            model_name="dummy",
+            model_year=2016,
+        )
+        system_record = simulator.run(
+            sim_horizon=48,
+            steps_to_run=2,
+            to_process_inputs=False,
+            log_to_console=False,
+            block_hours=4,
+            full_resolution_hours=24,
+        )
+        self.assertEqual(simulator.inputs.block_hours, 4)
+        self.assertEqual(simulator.inputs.full_resolution_hours, 24)
+        node_vars = system_record.get_node_variables()
+        hours = node_vars.loc[node_vars["vartype"] == "status", "hour"]
+        self.assertEqual(sorted(hours.unique()), list(range(1, 49)))
+
+    def test_invalid_block_hours(self):
+        with self.assertRaises(ValueError):
+            self.get_inputs(block_hours=5)
+        with self.assertRaises(ValueError):
+            SystemInput(
+                input_folder=TEST_MODEL_LIBRARY,
+                model_name="dummy",
+                year=2016,
+                sim_horizon=48,
+                block_hours=4,
+                full_resolution_hours=6,
+            )
+
+    def test_matrix_backend(self):
+        inputs = self.get_inputs(block_hours=4)
+        init_conditions = create_init_condition(
+            inputs.thermal_units, inputs.storage_units
+        )
+        model_builder = ModelBuilder(inputs, build_backend="matrix")
+        with self.assertRaises(ValueError):
+            model_builder.build(step_k=1, init_conds=init_conditions)
+
+    def test_summary(self):
+        for block_hours in [1, 4]:
+            inputs = self.get_inputs(block_hours)
+            with patch("pownet.input.logger") as mock_logger:
+                inputs.print_summary()
+            summary = mock_logger.warning.call_args.args[0]
+            self.assertEqual("Look-ahead blocks" in summary, block_hours > 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+"""test_time_parallel.py: Unit tests for running the steps of a simulation in parallel chunks."""
+
+import os
+import unittest
+
+import numpy as np
+
+from pownet import Simulator
+from pownet.core.time_parallel import (
+    TimeChunk,
+    TimeParallelRunner,
+    get_cost_error,
+    init_conds_match,
+    split_into_chunks,
+)
+
+
+class TestTimeParallel(unittest.TestCase):
+    def setUp(self):
+        self.input_folder = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "test_model_library")
+        )
+
+    def get_simulator(self) -> Simulator:
+        return Simulator(
+            input_folder=self.input_folder, model_name="dummy", model_year=2016
+        )
+
+    def test_split_into_chunks(self):
+        chunks = split_into_chunks(steps_to_run=10, num_chunks=3, overlap_steps=2)
+        self.assertEqual(
+            chunks,
+            [
+                TimeChunk(index=0, first_step=1, last_step=4, warmup_steps=0),
+                TimeChunk(index=1, first_step=5, last_step=7, warmup_steps=2),
+                TimeChunk(index=2, first_step=8, last_step=10, warmup_steps=2),
+            ],
+        )
+        self.assertEqual(chunks[2].start_step, 6)
+        # The warm-up does not start before the first step
+        chunks = split_into_chunks(steps_to_run=4, num_chunks=8, overlap_steps=3)
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual([chunk.start_step for chunk in chunks], [1, 1, 1, 1])
+        with self.assertRaises(ValueError):
+            split_into_chunks(steps_to_run=4, num_chunks=0, overlap_steps=1)
+        with self.assertRaises(ValueError):
+            split_into_chunks(steps_to_run=4, num_chunks=2, overlap_steps=-1)
+
+    def test_init_conds_match(self):
+        init_conds = {
+            "initial_u": {"u1": 1.0, "u2": 0.0},
+            "initial_p": {"u1": 50.0, "u2": 0.0},
+        }
+        self.assertTrue(
+            init_conds_match(
+                init_conds,
+                {
+                    "initial_u": {"u2": 0.0, "u1": 1.0},
+                    "initial_p": {"u1": 50.00001, "u2": 0.0},
+                },
+            )
+        )
+        self.assertFalse(
+            init_conds_match(
+                init_conds,
+                {"initial_u": {"u1": 0.0, "u2": 0.0}, "initial_p": {"u1": 50.0}},
+            )
+        )
+        self.assertFalse(
+            init_conds_match(
+                init_conds,
+                {
+                    "initial_u": {"u1": 1.0, "u2": 0.0},
+                    "initial_p": {"u1": 51.0, "u2": 0.0},
+                },
+            )
+        )
+
+    def test_run_matches_sequential(self):
+        simulator = self.get_simulator()
+        inputs = simulator.load_inputs(sim_horizon=24, to_process_inputs=False)
+        sequential_record = simulator.simulate(
+            inputs=inputs, steps_to_run=6, log_to_console=False
+        )
+
+        parallel_simulator = self.get_simulator()
+        parallel_record = parallel_simulator.simulate(
+            inputs=inputs,
+            steps_to_run=6,
+            log_to_console=False,
+            num_chunks=3,
+            overlap_steps=1,
+        )
+        self.assertAlmostEqual(
+            get_cost_error(parallel_record, sequential_record), 0, places=3
+        )
+
+        report = parallel_simulator.time_parallel_report
+        self.assertEqual(list(report["first_step"]), [1, 3, 5])
+        self.assertEqual(list(report["warmup_steps"]), [0, 1, 1])
+        # The repairs do not solve more steps than the chunk has
+        self.assertTrue((report["repaired_steps"] <= 2).all())
+
+        node_vars = parallel_record.get_node_variables()
+        hours = node_vars.loc[node_vars["vartype"] == "status", "hour"]
+        self.assertEqual(sorted(hours.unique()), list(range(1, 145)))
+        np.testing.assert_allclose(
+            parallel_record.get_objvals(), sequential_record.get_objvals(), rtol=1e-3
+        )
+
+    def test_run_without_overlap(self):
+        """Test that chunks without warm-up steps are repaired from the all-off start."""
+        simulator = self.get_simulator()
+        inputs = simulator.load_inputs(sim_horizon=24, to_process_inputs=False)
+        sequential_record = simulator.simulate(
+            inputs=inputs, steps_to_run=4, log_to_console=False
+        )
+
+        parallel_simulator = self.get_simulator()
+        parallel_record = parallel_simulator.simulate(
+            inputs=inputs,
+            steps_to_run=4,
+            log_to_console=False,
+            num_chunks=2,
+            overlap_steps=0,
+        )
+        report = parallel_simulator.time_parallel_report
+        self.assertEqual(list(report["warmup_steps"]), [0, 0])
+        self.assertGreater(report["repaired_steps"].iloc[1], 0)
+        np.testing.assert_allclose(
+            parallel_record.get_objvals(), sequential_record.get_objvals(), rtol=1e-3
+        )
+
+    def test_invalid_parameters(self):
+        simulator = self.get_simulator()
+        inputs = simulator.load_inputs(sim_horizon=24, to_process_inputs=False)
+        with self.assertRaises(ValueError):
+            TimeParallelRunner(inputs, num_chunks=0)
+        with self.assertRaises(ValueError):
+            simulator.simulate(
+                inputs=inputs, steps_to_run=2, num_chunks=2, warm_start=True
+            )
+        # The recorded hours of each step must not be relaxed
+        with self.assertRaises(ValueError):
+            TimeParallelRunner(inputs, num_chunks=2).run(
+                steps_to_run=2, integer_hours=12
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
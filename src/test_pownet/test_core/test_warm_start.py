@@ -0,0 +1,77 @@
+"""test_warm_start.py: Unit tests for starting each step from the solution of the
+previous step."""
+
+import os
+import unittest
+from unittest.mock import patch
+
+from pownet import Simulator
+from pownet.optim_model import PowerSystemModel
+
+
+class TestWarmStart(unittest.TestCase):
+    def setUp(self):
+        input_folder = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "test_model_library")
+        )
+        self.simulator = Simulator(
+            input_folder=input_folder, model_name="dummy", model_year=2016
+        )
+        self.inputs = self.simulator.load_inputs(
+            sim_horizon=48, to_process_inputs=False
+        )
+
+    def test_warm_start(self):
+        record = self.simulator.simulate(
+            inputs=self.inputs,
+            steps_to_run=2,
+            solver="highs",
+            log_to_console=False,
+            warm_start=True,
+            measure_warm_start=True,
+        )
+        # The first step has no previous solution
+        warm_start_stats = record.get_warm_start_stats()
+        self.assertEqual(list(warm_start_stats["step_k"]), [2])
+        self.assertGreater(warm_start_stats["num_start_vars"].iloc[0], 0)
+        self.assertFalse(warm_start_stats["cold_runtime"].isna().any())
+
+    def test_measure_with_portfolio(self):
+        # The step without the MIP start is also solved with the portfolio
+        has_start = []
+        optimize_portfolio_func = PowerSystemModel.optimize_portfolio
+
+        def optimize_portfolio(power_system_model, **kwargs):
+            has_start.append(power_system_model.mip_start is not None)
+            optimize_portfolio_func(power_system_model, **kwargs)
+
+        with (
+            patch.object(PowerSystemModel, "optimize_portfolio", optimize_portfolio),
+            patch.object(PowerSystemModel, "optimize", autospec=True) as mock_optimize,
+        ):
+            self.simulator.simulate(
+                inputs=self.inputs,
+                steps_to_run=2,
+                solver="highs",
+                log_to_console=False,
+                warm_start=True,
+                measure_warm_start=True,
+                portfolio=True,
+            )
+        mock_optimize.assert_not_called()
+        # Only the last solve has the MIP start
+        self.assertEqual(has_start, [False, False, True])
+
+    def test_rounding_not_supported(self):
+        for params in [{"warm_start": True}, {"measure_warm_start": True}]:
+            with self.assertRaises(ValueError):
+                self.simulator.simulate(
+                    inputs=self.inputs,
+                    steps_to_run=2,
+                    rounding_strategy="fast",
+                    **params,
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -25,6 +25,8 @@ class TestPowerWaterCoupler(unittest.TestCase):
         # --- Configure ModelBuilder Mock ---
         mock_mb_inputs = MagicMock()
         mock_mb_inputs.sim_horizon = 48  # Allows num_days_in_step = 2
+        mock_mb_inputs.step_hours = 24
+        mock_mb_inputs.block_hours = 1
         type(self.mock_model_builder).inputs = PropertyMock(return_value=mock_mb_inputs)
 
         self.mock_power_system_model = MagicMock()
@@ -130,6 +132,8 @@ class TestPowerWaterCoupler(unittest.TestCase):
         # Temporarily override sim_horizon for this test to focus on single day num_days_in_step = 1
         mock_mb_inputs_24h = MagicMock()
         mock_mb_inputs_24h.sim_horizon = 24
+        mock_mb_inputs_24h.step_hours = 24
+        mock_mb_inputs_24h.block_hours = 1
         type(self.mock_model_builder).inputs = PropertyMock(
             return_value=mock_mb_inputs_24h
         )
@@ -0,0 +1,106 @@
+"""test_timeseries.py: Unit tests for the NumPy view of timeseries."""
+
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pownet import SystemInput
+from pownet.data_model import TimeseriesArray, as_timeseries_array
+
+
+class TestTimeseriesArray(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame(
+            {"u1": [1.0, 2.0, 3.0, 4.0], "u2": [10.0, 20.0, 30.0, 40.0]},
+            index=range(1, 5),
+        )
+
+    def test_get_window(self):
+        timeseries = TimeseriesArray(self.df)
+        np.testing.assert_array_equal(
+            timeseries.get_window(2, 2, ["u2", "u1"]), [[20.0, 2.0], [30.0, 3.0]]
+        )
+        self.assertEqual(timeseries.get_window(1, 4).shape, (4, 2))
+        self.assertEqual(timeseries.get_window(1, 3, []).shape, (3, 0))
+        self.assertEqual(timeseries.get(4, "u1"), 4.0)
+
+    def test_window_outside_timeseries(self):
+        timeseries = TimeseriesArray(self.df)
+        with self.assertRaises(ValueError):
+            timeseries.get_window(3, 3)
+        with self.assertRaises(ValueError):
+            timeseries.get_window(0, 1)
+        with self.assertRaises(ValueError):
+            timeseries.get_window(1, 1, ["u3"])
+
+    def test_series(self):
+        timeseries = TimeseriesArray(self.df["u1"])
+        np.testing.assert_array_equal(timeseries.get_window(3, 2), [3.0, 4.0])
+        self.assertEqual(timeseries.get(1), 1.0)
+
+    def test_non_consecutive_index(self):
+        df = self.df.set_index(pd.Index([1, 2, 25, 26]))
+        timeseries = TimeseriesArray(df)
+        np.testing.assert_array_equal(
+            timeseries.get_window(25, 2, ["u1"]), [[3.0], [4.0]]
+        )
+        with self.assertRaises(ValueError):
+            timeseries.get_window(2, 2)
+
+    def test_duplicated_columns_use_first(self):
+        df = pd.DataFrame([[1.0, 2.0]], columns=["u1", "u1"], index=[1])
+        self.assertEqual(TimeseriesArray(df).get(1, "u1"), 1.0)
+
+    def test_values_are_read_only(self):
+        timeseries = as_timeseries_array(self.df)
+        self.assertIs(as_timeseries_array(timeseries), timeseries)
+        with self.assertRaises(ValueError):
+            timeseries.values[0, 0] = 5.0
+        # The DataFrame itself stays writeable
+        self.df.loc[1, "u1"] = 5.0
+
+
+class TestSystemInputTimeseriesArray(unittest.TestCase):
+    def setUp(self):
+        self.inputs = SystemInput(
+            input_folder=os.path.join(
+                os.path.dirname(__file__), "..", "test_model_library"
+            ),
+            model_name="dummy",
+            year=2016,
+            sim_horizon=24,
+        )
+        self.inputs.load_and_check_data()
+
+    def test_matches_dataframe(self):
+        edge = self.inputs.edges[0]
+        susceptance = self.inputs.get_timeseries_array("susceptance")
+        self.assertEqual(
+            susceptance.get(30, edge), self.inputs.susceptance.loc[30, edge]
+        )
+
+        demand = self.inputs.get_timeseries_array("demand")
+        window = demand.get_window(25, 24, self.inputs.demand_nodes)
+        np.testing.assert_array_equal(
+            window, self.inputs.demand.loc[25:48, self.inputs.demand_nodes].to_numpy()
+        )
+
+    def test_view_is_reused_until_replaced(self):
+        demand = self.inputs.get_timeseries_array("demand")
+        self.assertIs(self.inputs.get_timeseries_array("demand"), demand)
+
+        self.inputs.update_demand(self.inputs.demand * 2)
+        new_demand = self.inputs.get_timeseries_array("demand")
+        self.assertIsNot(new_demand, demand)
+        node = self.inputs.demand_nodes[0]
+        self.assertEqual(new_demand.get(1, node), 2 * demand.get(1, node))
+
+    def test_not_a_timeseries(self):
+        with self.assertRaises(ValueError):
+            self.inputs.get_timeseries_array("edges")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""test_timesteps.py: Unit tests for the timesteps of a simulation horizon."""
+
+import unittest
+
+import numpy as np
+
+from pownet.data_model import Timesteps, as_timesteps
+
+
+class TestTimesteps(unittest.TestCase):
+    def setUp(self):
+        # 6 hourly timesteps followed by blocks of 4, 4, and 2 hours
+        self.timesteps = Timesteps(16, full_resolution_hours=6, block_hours=4)
+
+    def test_hourly(self):
+        timesteps = Timesteps(24)
+        self.assertTrue(timesteps.is_hourly)
+        self.assertEqual(list(timesteps), list(range(1, 25)))
+        self.assertEqual(timesteps[1:3], range(2, 4))
+        values = np.arange(24)
+        self.assertIs(timesteps.aggregate(values), values)
+
+    def test_durations(self):
+        self.assertFalse(self.timesteps.is_hourly)
+        self.assertEqual(len(self.timesteps), 9)
+        np.testing.assert_array_equal(
+            self.timesteps.durations, [1, 1, 1, 1, 1, 1, 4, 4, 2]
+        )
+        np.testing.assert_array_equal(
+            self.timesteps.starts, [0, 1, 2, 3, 4, 5, 6, 10, 14]
+        )
+        self.assertEqual(self.timesteps.get_hours(8), range(11, 15))
+        self.assertEqual(self.timesteps.get_ramp_hours(7), 2.5)
+        self.assertIn(9, self.timesteps)
+        self.assertNotIn(10, self.timesteps)
+
+    def test_aggregate(self):
+        values = np.arange(1, 17, dtype=float)
+        np.testing.assert_array_equal(
+            self.timesteps.aggregate(values), [1, 2, 3, 4, 5, 6, 8.5, 12.5, 15.5]
+        )
+        matrix = np.column_stack([values, 2 * values])
+        aggregated = self.timesteps.aggregate(matrix)
+        self.assertEqual(aggregated.shape, (9, 2))
+        np.testing.assert_array_equal(aggregated[:, 1], 2 * aggregated[:, 0])
+
+    def test_windows(self):
+        self.assertEqual(self.timesteps.count_timesteps_before(3), 3)
+        self.assertEqual(self.timesteps.count_timesteps_before(8), 7)
+        # A window of 5 hours ending at the block of hours 11 to 14
+        self.assertEqual(self.timesteps.get_window_start(8, 5), 7)
+        self.assertEqual(self.timesteps.get_window_start(3, 5), 1)
+        self.assertEqual(self.timesteps.get_timesteps_between(7, 14), range(7, 9))
+
+    def test_as_timesteps(self):
+        self.assertIs(as_timesteps(self.timesteps), self.timesteps)
+        self.assertTrue(as_timesteps(range(1, 5)).is_hourly)
+        with self.assertRaises(ValueError):
+            as_timesteps(range(0, 5))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            Timesteps(0)
+        with self.assertRaises(ValueError):
+            Timesteps(24, block_hours=0)
+        with self.assertRaises(ValueError):
+            Timesteps(24, full_resolution_hours=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
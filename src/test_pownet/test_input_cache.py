@@ -0,0 +1,122 @@
+"""test_input_cache.py: Unit tests for the on-disk cache of SystemInput."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import gurobipy as gp
+import numpy as np
+import pandas as pd
+
+from pownet import SystemInput
+from pownet.input_cache import get_input_hash
+
+
+class TestInputCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        # Copy the model to be able to change its files
+        self.input_folder = self.temp_dir.name
+        shutil.copytree(
+            os.path.join(os.path.dirname(__file__), "test_model_library", "dummy"),
+            os.path.join(self.input_folder, "dummy"),
+        )
+        self.cache_folder = os.path.join(self.temp_dir.name, "cache")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def create_inputs(self, **kwargs) -> SystemInput:
+        return SystemInput(
+            input_folder=self.input_folder,
+            model_name="dummy",
+            year=2016,
+            sim_horizon=24,
+            **kwargs,
+        )
+
+    def test_cache_restores_inputs(self):
+        expected = self.create_inputs()
+        expected.load_and_check_data(use_cache=True, cache_folder=self.cache_folder)
+        self.assertEqual(len(os.listdir(self.cache_folder)), 1)
+
+        inputs = self.create_inputs()
+        inputs.model_id = "current_run"
+        with patch.object(SystemInput, "load_data") as mock_load_data:
+            inputs.load_and_check_data(use_cache=True, cache_folder=self.cache_folder)
+            mock_load_data.assert_not_called()
+
+        pd.testing.assert_frame_equal(inputs.demand, expected.demand)
+        pd.testing.assert_frame_equal(
+            inputs.thermal_derated_capacity, expected.thermal_derated_capacity
+        )
+        pd.testing.assert_frame_equal(inputs.susceptance, expected.susceptance)
+        pd.testing.assert_series_equal(
+            inputs.spin_requirement, expected.spin_requirement
+        )
+        self.assertEqual(inputs.contract_costs, expected.contract_costs)
+        self.assertEqual(inputs.nodes, expected.nodes)
+        self.assertIsInstance(inputs.edges, gp.tuplelist)
+        self.assertEqual(list(inputs.edges), list(expected.edges))
+        # The identifiers of the current run are kept
+        self.assertEqual(inputs.model_id, "current_run")
+        self.assertEqual(inputs.model_dir, os.path.join(self.input_folder, "dummy"))
+
+    def test_hash_changes_with_inputs(self):
+        input_hash = get_input_hash(self.create_inputs())
+        self.assertEqual(input_hash, get_input_hash(self.create_inputs()))
+        self.assertNotEqual(
+            input_hash, get_input_hash(self.create_inputs(spin_reserve_factor=0.2))
+        )
+
+        demand_file = os.path.join(self.input_folder, "dummy", "demand_export.csv")
+        demand = pd.read_csv(demand_file)
+        demand["Node1"] *= 1.1
+        demand.to_csv(demand_file, index=False)
+        self.assertNotEqual(input_hash, get_input_hash(self.create_inputs()))
+
+    def test_changed_inputs_are_reloaded(self):
+        self.create_inputs().load_and_check_data(
+            use_cache=True, cache_folder=self.cache_folder
+        )
+
+        demand_file = os.path.join(self.input_folder, "dummy", "demand_export.csv")
+        demand = pd.read_csv(demand_file)
+        demand["Node1"] *= 2
+        demand.to_csv(demand_file, index=False)
+
+        inputs = self.create_inputs()
+        inputs.load_and_check_data(use_cache=True, cache_folder=self.cache_folder)
+        self.assertAlmostEqual(inputs.demand.loc[1, "Node1"], demand.loc[0, "Node1"])
+        self.assertEqual(len(os.listdir(self.cache_folder)), 2)
+
+    def test_snapshot_has_no_pickle(self):
+        self.create_inputs().load_and_check_data(
+            use_cache=True, cache_folder=self.cache_folder
+        )
+        (snapshot_folder,) = os.listdir(self.cache_folder)
+        snapshot_folder = os.path.join(self.cache_folder, snapshot_folder)
+        self.assertEqual(
+            set(os.listdir(snapshot_folder)),
+            {"arrays.npz", "state.json", "metadata.json"},
+        )
+
+        # An array that needs a pickle to be read is refused
+        arrays_file = os.path.join(snapshot_folder, "arrays.npz")
+        with np.load(arrays_file) as arrays:
+            tampered = dict(arrays)
+        tampered["array_0"] = np.array([object()], dtype=object)
+        np.savez(arrays_file, **tampered)
+
+        inputs = self.create_inputs()
+        with patch.object(
+            SystemInput, "load_data", autospec=True, side_effect=SystemInput.load_data
+        ) as mock_load_data:
+            inputs.load_and_check_data(use_cache=True, cache_folder=self.cache_folder)
+            mock_load_data.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
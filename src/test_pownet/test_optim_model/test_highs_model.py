@@ -0,0 +1,91 @@
+"""test_highs_model.py: Unit tests for passing a Gurobi model to HiGHS in memory."""
+
+import unittest
+
+import gurobipy as gp
+import numpy as np
+
+from pownet.optim_model.highs_model import HighsInstance, get_model_arrays
+
+
+class TestHighsInstance(unittest.TestCase):
+    def setUp(self):
+        self.model = gp.Model()
+        self.model.Params.LogToConsole = 0
+        self.x = self.model.addVars(3, ub=10, name="x")
+        self.u = self.model.addVars(3, vtype=gp.GRB.BINARY, name="u")
+        self.c_demand = self.model.addConstr(self.x.sum() >= 12, name="demand")
+        self.c_link = self.model.addConstrs(
+            (self.x[i] <= 8 * self.u[i] for i in range(3)), name="link"
+        )
+        self.c_fixed = self.model.addConstr(self.x[0] == 2, name="fixed")
+        self.model.setObjective(
+            gp.quicksum((i + 1) * self.x[i] + 5 * self.u[i] for i in range(3)) + 3
+        )
+        self.model.update()
+
+    def solve_highs(self, instance: HighsInstance) -> tuple[float, np.ndarray]:
+        highs = instance.load(self.model)
+        highs.setOptionValue("output_flag", False)
+        highs.run()
+        return (
+            highs.getInfo().objective_function_value,
+            np.array(highs.getSolution().col_value),
+        )
+
+    def solve_gurobi(self) -> tuple[float, np.ndarray]:
+        self.model.optimize()
+        return self.model.ObjVal, np.array(self.model.getAttr("X"))
+
+    def test_get_model_arrays(self):
+        arrays = get_model_arrays(self.model)
+        self.assertEqual(arrays["matrix"].shape, (5, 6))
+        np.testing.assert_array_equal(
+            arrays["row_lower"], [12, -np.inf, -np.inf, -np.inf, 2]
+        )
+        np.testing.assert_array_equal(arrays["row_upper"], [np.inf, 0, 0, 0, 2])
+        np.testing.assert_array_equal(arrays["integrality"], [0, 0, 0, 1, 1, 1])
+        self.assertEqual(arrays["offset"], 3)
+
+    def test_load_matches_gurobi(self):
+        instance = HighsInstance()
+        objval, values = self.solve_highs(instance)
+        expected_objval, expected_values = self.solve_gurobi()
+        self.assertAlmostEqual(objval, expected_objval)
+        np.testing.assert_allclose(values, expected_values, atol=1e-6)
+        self.assertEqual(instance.highs.getColName(0)[1], "x[0]")
+
+    def test_load_changes(self):
+        instance = HighsInstance()
+        highs = instance.load(self.model)
+
+        # Change the RHS, bounds, costs, and coefficients as between steps
+        self.c_demand.RHS = 15
+        self.x[2].UB = 5
+        self.x[1].Obj = 0.5
+        self.model.chgCoeff(self.c_link[1], self.u[1], -9)
+        self.model.chgCoeff(self.c_fixed, self.x[0], 0)
+        self.model.chgCoeff(self.c_fixed, self.x[1], 1)
+        self.model.update()
+
+        objval, values = self.solve_highs(instance)
+        # The changes are passed to the same HiGHS model
+        self.assertIs(instance.highs, highs)
+
+        expected_objval, expected_values = self.solve_gurobi()
+        self.assertAlmostEqual(objval, expected_objval)
+        np.testing.assert_allclose(values, expected_values, atol=1e-6)
+
+    def test_load_new_constraint(self):
+        instance = HighsInstance()
+        self.solve_highs(instance)
+
+        self.model.addConstr(self.x[2] >= 6, name="min_x2")
+        self.model.update()
+        objval, _ = self.solve_highs(instance)
+        expected_objval, _ = self.solve_gurobi()
+        self.assertAlmostEqual(objval, expected_objval)
+
+
+if __name__ == "__main__":
+    unittest.main()
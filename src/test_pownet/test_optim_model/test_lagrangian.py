@@ -0,0 +1,163 @@
+"""test_lagrangian.py: Unit tests for the Lagrangian decomposition."""
+
+import os
+import unittest
+from unittest.mock import patch
+
+import gurobipy as gp
+import highspy
+import numpy as np
+
+from pownet import ModelBuilder, SystemInput
+from pownet.core.record import SystemRecord
+from pownet.data_utils import create_init_condition
+from pownet.optim_model.highs_model import get_model_arrays
+from pownet.optim_model.lagrangian import (
+    LagrangianDecomposition,
+    get_blocks,
+    get_multiplier_bounds,
+)
+
+
+class TestLagrangianDecomposition(unittest.TestCase):
+    def setUp(self):
+        # Three units with a minimum output that meet a demand with a shortfall
+        self.model = gp.Model()
+        self.model.Params.LogToConsole = 0
+        self.x = self.model.addVars(3, ub=10, name="x")
+        self.u = self.model.addVars(3, vtype=gp.GRB.BINARY, name="u")
+        self.shortfall = self.model.addVar(obj=100, name="shortfall")
+        self.c_demand = self.model.addConstr(
+            self.x.sum() + self.shortfall >= 14, name="demand"
+        )
+        self.model.addConstrs(
+            (self.x[i] <= 8 * self.u[i] for i in range(3)), name="max"
+        )
+        self.model.addConstrs(
+            (self.x[i] >= 3 * self.u[i] for i in range(3)), name="min"
+        )
+        self.model.setObjective(
+            gp.quicksum((i + 1) * self.x[i] + 10 * self.u[i] for i in range(3))
+            + 100 * self.shortfall
+        )
+        self.model.update()
+
+    def test_get_blocks(self):
+        arrays = get_model_arrays(self.model)
+        int_cols = np.array([3, 4, 5])
+        blocks = get_blocks(arrays["matrix"], np.array([0]), int_cols)
+        # One block per unit and the shortfall in the last block
+        self.assertEqual(len(blocks), 4)
+        for i, (cols, rows) in enumerate(blocks[:3]):
+            np.testing.assert_array_equal(cols, [i, i + 3])
+            np.testing.assert_array_equal(rows, [i + 1, i + 4])
+        np.testing.assert_array_equal(blocks[3][0], [6])
+        self.assertEqual(len(blocks[3][1]), 0)
+
+    def test_get_multiplier_bounds(self):
+        arrays = get_model_arrays(self.model)
+        lower, upper = get_multiplier_bounds(arrays, np.array([0]))
+        # The multiplier of the demand is at most the cost of the shortfall
+        np.testing.assert_array_equal(lower, [0])
+        np.testing.assert_array_equal(upper, [100])
+
+    def test_solve(self):
+        decomposition = LagrangianDecomposition()
+        dispatch = decomposition.solve(
+            self.model, coupling_constrs=[self.c_demand], mipgap=1e-6
+        )
+        self.model.optimize()
+        objval = dispatch.getInfo().objective_function_value
+        self.assertAlmostEqual(objval, self.model.ObjVal)
+        self.assertAlmostEqual(decomposition.upper_bound, objval)
+        self.assertLessEqual(decomposition.lower_bound, self.model.ObjVal + 1e-6)
+        self.assertGreaterEqual(decomposition.get_gap(), 0)
+        self.assertGreater(decomposition.iterations, 0)
+
+        # The dispatch is a linear program with the duals of the fixed commitment
+        self.assertEqual(dispatch.getModelStatus(), highspy.HighsModelStatus.kOptimal)
+        self.assertAlmostEqual(dispatch.getSolution().row_dual[0], 2)
+
+    def test_log_to_console(self):
+        for log_to_console in [False, True]:
+            with patch("pownet.optim_model.lagrangian.logger") as mock_logger:
+                decomposition = LagrangianDecomposition()
+                decomposition.solve(
+                    self.model,
+                    coupling_constrs=[self.c_demand],
+                    mipgap=1e-6,
+                    log_to_console=log_to_console,
+                )
+            # One message per iteration
+            self.assertEqual(
+                mock_logger.info.call_count,
+                decomposition.iterations if log_to_console else 0,
+            )
+
+
+class TestPowerSystemModelLagrangian(unittest.TestCase):
+    def setUp(self):
+        test_model_library_path = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "test_model_library")
+        )
+        self.inputs = SystemInput(
+            input_folder=test_model_library_path,
+            model_name="dummy",
+            year=2016,
+            sim_horizon=24,
+        )
+        self.inputs.load_and_check_data()
+
+    def test_lagrangian_matches_gurobi(self):
+        model_builder = ModelBuilder(self.inputs)
+        system_record = SystemRecord(self.inputs)
+        init_conditions = create_init_condition(
+            self.inputs.thermal_units, self.inputs.storage_units
+        )
+        for step_k in range(1, 3):
+            if step_k == 1:
+                power_system_model = model_builder.build(step_k, init_conditions)
+            else:
+                power_system_model = model_builder.update(step_k, init_conditions)
+            power_system_model.optimize(log_to_console=False, mipgap=1e-8)
+            objval = power_system_model.get_objval()
+            lmp = power_system_model.solve_for_lmp()
+
+            power_system_model.optimize(
+                solver="lagrangian", log_to_console=False, mipgap=1e-4
+            )
+            self.assertAlmostEqual(
+                power_system_model.get_objval() / objval, 1, places=4
+            )
+            self.assertLessEqual(power_system_model.lagrangian_bound, objval + 1e-3)
+            self.assertGreaterEqual(power_system_model.duality_gap, 0)
+            np.testing.assert_allclose(
+                list(power_system_model.solve_for_lmp().values()),
+                list(lmp.values()),
+                atol=1e-4,
+            )
+
+            system_record.keep(
+                runtime=power_system_model.get_runtime(),
+                objval=power_system_model.get_objval(),
+                solution=power_system_model.get_structured_solution(),
+                step_k=step_k,
+            )
+            system_record.keep_duality_gap(
+                step_k=step_k,
+                objval=power_system_model.get_objval(),
+                lower_bound=power_system_model.lagrangian_bound,
+                duality_gap=power_system_model.duality_gap,
+                iterations=power_system_model.lagrangian_iterations,
+            )
+            init_conditions = system_record.get_init_conds()
+
+        duality_gaps = system_record.get_duality_gaps()
+        self.assertEqual(list(duality_gaps["step_k"]), [1, 2])
+        self.assertTrue(
+            (duality_gaps["lower_bound"] <= duality_gaps["objval"] + 1e-3).all()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+"""test_portfolio.py: Unit tests for racing the MIP and the rounding heuristics."""
+
+import os
+import threading
+import unittest
+
+import gurobipy as gp
+import numpy as np
+
+from pownet import ModelBuilder, SystemInput
+from pownet.core.record import SystemRecord
+from pownet.data_utils import create_init_condition
+from pownet.optim_model import rounding_algo
+from pownet.optim_model.portfolio import PORTFOLIO_STRATEGIES, PortfolioSolver
+
+
+class TestPortfolioSolver(unittest.TestCase):
+    def setUp(self):
+        # A small unit commitment problem whose LP relaxation is fractional
+        self.model = gp.Model()
+        self.model.Params.LogToConsole = 0
+        self.x = self.model.addVars(3, ub=10, name="pthermal")
+        self.u = self.model.addVars(3, vtype=gp.GRB.BINARY, name="status")
+        self.model.addConstr(self.x.sum() >= 14, name="demand")
+        self.model.addConstrs(
+            (self.x[i] <= 8 * self.u[i] for i in range(3)), name="max"
+        )
+        self.model.addConstrs(
+            (self.x[i] >= 3 * self.u[i] for i in range(3)), name="min"
+        )
+        self.model.setObjective(
+            gp.quicksum((i + 1) * self.x[i] + 10 * self.u[i] for i in range(3))
+        )
+        self.model.update()
+
+    def test_solve(self):
+        mip = self.model.copy()
+        mip.optimize()
+        for solver in ["gurobi", "highs"]:
+            portfolio = PortfolioSolver()
+            winner_model = portfolio.solve(self.model, solver=solver, mipgap=1e-6)
+            self.assertIn(portfolio.winner, PORTFOLIO_STRATEGIES)
+            self.assertEqual(set(portfolio.results), set(PORTFOLIO_STRATEGIES))
+            self.assertGreater(portfolio.runtime, 0)
+
+            winner = portfolio.results[portfolio.winner]
+            self.assertTrue(winner["meets_gap"])
+            self.assertFalse(winner["cancelled"])
+            if solver == "gurobi":
+                objval = winner_model.ObjVal
+            else:
+                objval = winner_model.getInfo().objective_function_value
+            self.assertAlmostEqual(objval, winner["objval"])
+            self.assertAlmostEqual(objval, mip.ObjVal, places=4)
+        # The model that is passed is not solved
+        self.assertEqual(self.model.Status, gp.GRB.LOADED)
+
+    def test_best_feasible(self):
+        # Rounding is a feasible solution above the LP relaxation, so it does not
+        # meet the gap target, but it is kept because it is the only solution
+        portfolio = PortfolioSolver(strategies=("fast",))
+        winner_model = portfolio.solve(self.model, mipgap=1e-6)
+        self.assertEqual(portfolio.winner, "fast")
+        self.assertFalse(portfolio.results["fast"]["meets_gap"])
+        self.assertEqual(winner_model.NumIntVars, 0)
+
+        # Rounding down is infeasible and there is no MIP to fall back on
+        portfolio = PortfolioSolver(strategies=("fast", "slow"), threshold=1)
+        with self.assertRaises(ValueError):
+            portfolio.solve(self.model)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            PortfolioSolver(strategies=("mip", "lagrangian"))
+        with self.assertRaises(ValueError):
+            PortfolioSolver().solve(self.model, solver="lagrangian")
+
+    def test_stop_rounding(self):
+        """Test that rounding stops without solving when the event is set."""
+        stop_event = threading.Event()
+        stop_event.set()
+        params = {
+            "rounding_strategy": "fast",
+            "threshold": 0,
+            "max_rounding_iter": 10,
+            "mipgap": 1e-6,
+            "timelimit": 100,
+            "num_threads": 1,
+            "log_to_console": False,
+            "stop_event": stop_event,
+        }
+        result_model, runtime, iterations = rounding_algo.optimize_with_rounding(
+            self.model, **params
+        )
+        self.assertIs(result_model, self.model)
+        self.assertEqual(self.model.Status, gp.GRB.LOADED)
+        self.assertIsNone(runtime)
+        self.assertIsNone(iterations)
+
+        result_model, runtime, iterations = rounding_algo.optimize_with_rounding_highs(
+            self.model, **params
+        )
+        self.assertEqual(result_model.getInfo().primal_solution_status, 0)
+        self.assertIsNone(runtime)
+
+
+class TestPowerSystemModelPortfolio(unittest.TestCase):
+    def setUp(self):
+        test_model_library_path = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "test_model_library")
+        )
+        self.inputs = SystemInput(
+            input_folder=test_model_library_path,
+            model_name="dummy",
+            year=2016,
+            sim_horizon=24,
+        )
+        self.inputs.load_and_check_data()
+
+    def test_optimize_portfolio(self):
+        model_builder = ModelBuilder(self.inputs)
+        system_record = SystemRecord(self.inputs)
+        init_conditions = create_init_condition(
+            self.inputs.thermal_units, self.inputs.storage_units
+        )
+        power_system_model = model_builder.build(1, init_conditions)
+        power_system_model.optimize(log_to_console=False, mipgap=1e-6)
+        mip_objval = power_system_model.get_objval()
+
+        for solver in ["gurobi", "highs"]:
+            power_system_model.optimize_portfolio(solver=solver, mipgap=1e-3)
+            self.assertIn(power_system_model.portfolio_winner, PORTFOLIO_STRATEGIES)
+            self.assertAlmostEqual(
+                power_system_model.get_objval() / mip_objval, 1, places=3
+            )
+            self.assertGreater(power_system_model.get_runtime(), 0)
+            node_variables = power_system_model.get_structured_solution()["node"]
+            status = node_variables.loc[node_variables["vartype"] == "status", "value"]
+            np.testing.assert_allclose(status, np.round(status), atol=1e-6)
+
+        system_record.keep_portfolio(
+            step_k=1,
+            winner=power_system_model.portfolio_winner,
+            results=power_system_model.portfolio_results,
+        )
+        portfolio_stats = system_record.get_portfolio_stats()
+        self.assertEqual(len(portfolio_stats), len(PORTFOLIO_STRATEGIES))
+        self.assertEqual(portfolio_stats["winner"].sum(), 1)
+
+        with self.assertRaises(ValueError):
+            power_system_model.optimize_portfolio(solver="lagrangian")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,222 @@
+"""test_pricing.py: Unit tests for finding the duals with a persistent linear program."""
+
+import os
+import unittest
+
+import gurobipy as gp
+import numpy as np
+
+from pownet import ModelBuilder, SystemInput
+from pownet.core.record import SystemRecord
+from pownet.data_utils import create_init_condition
+from pownet.optim_model.pricing import PricingModel, get_fixed_lp_arrays
+
+
+def get_fixed_duals(model: gp.Model, constrs: list[gp.Constr]) -> np.ndarray:
+    """Return the duals of the given constraints from model.fixed()."""
+    model_fixed = model.fixed()
+    model_fixed.optimize()
+    fixed_constrs = model_fixed.getConstrs()
+    return np.array(
+        model_fixed.getAttr("Pi", [fixed_constrs[c.index] for c in constrs])
+    )
+
+
+class TestPricingModel(unittest.TestCase):
+    def setUp(self):
+        self.model = gp.Model()
+        self.model.Params.LogToConsole = 0
+        self.x = self.model.addVars(3, ub=10, name="x")
+        self.u = self.model.addVars(3, vtype=gp.GRB.BINARY, name="u")
+        self.c_demand = self.model.addConstr(self.x.sum() >= 12, name="demand")
+        self.c_link = self.model.addConstrs(
+            (self.x[i] <= 8 * self.u[i] for i in range(3)), name="link"
+        )
+        self.model.setObjective(
+            gp.quicksum((i + 1) * self.x[i] + 5 * self.u[i] for i in range(3))
+        )
+        self.model.optimize()
+
+    def get_constrs(self) -> list[gp.Constr]:
+        return [self.c_demand] + list(self.c_link.values())
+
+    def test_get_fixed_lp_arrays(self):
+        arrays = get_fixed_lp_arrays(self.model, np.array([3, 4, 5]))
+        self.assertEqual(arrays["matrix"].shape, (4, 6))
+        # The binary variables are fixed to their values in the solution
+        np.testing.assert_array_equal(arrays["col_lower"][3:], [1, 1, 0])
+        np.testing.assert_array_equal(arrays["col_upper"][3:], [1, 1, 0])
+        np.testing.assert_array_equal(arrays["col_upper"][:3], [10, 10, 10])
+        np.testing.assert_array_equal(arrays["rhs"], [12, 0, 0, 0])
+
+    def test_duals_match_fixed(self):
+        pricing_model = PricingModel()
+        pricing_model.solve(self.model)
+        np.testing.assert_allclose(
+            pricing_model.get_duals(self.get_constrs()),
+            get_fixed_duals(self.model, self.get_constrs()),
+        )
+        # The demand is met by the second unit at the margin
+        self.assertAlmostEqual(pricing_model.get_duals([self.c_demand])[0], 2)
+
+    def test_solve_changes(self):
+        pricing_model = PricingModel()
+        pricing_model.solve(self.model)
+        lp = pricing_model.lp
+
+        # Change the RHS, bounds, costs, and coefficients as between steps
+        self.c_demand.RHS = 20
+        self.x[0].UB = 5
+        self.x[1].Obj = 0.5
+        self.model.chgCoeff(self.c_link[2], self.u[2], -10)
+        self.model.optimize()
+
+        pricing_model.solve(self.model)
+        # The changes are passed to the same linear program
+        self.assertIs(pricing_model.lp, lp)
+        self.assertAlmostEqual(pricing_model.lp.ObjVal, self.model.ObjVal)
+        np.testing.assert_allclose(
+            pricing_model.get_duals(self.get_constrs()),
+            get_fixed_duals(self.model, self.get_constrs()),
+        )
+
+    def test_solve_new_constraint(self):
+        pricing_model = PricingModel()
+        pricing_model.solve(self.model)
+        lp = pricing_model.lp
+
+        c_limit = self.model.addConstr(self.x[0] <= 3, name="limit")
+        self.model.optimize()
+
+        pricing_model.solve(self.model)
+        # The model is copied again because its size changed
+        self.assertIsNot(pricing_model.lp, lp)
+        constrs = self.get_constrs() + [c_limit]
+        np.testing.assert_allclose(
+            pricing_model.get_duals(constrs), get_fixed_duals(self.model, constrs)
+        )
+
+    def test_solve_with_export(self):
+        # Generation is cheaper than the value of the export
+        self.model.setAttr("Obj", list(self.x.values()), [0.1, 0.2, 0.3])
+        self.model.optimize()
+
+        pricing_model = PricingModel()
+        export = pricing_model.solve_with_export(self.model, {("a", 1): self.c_demand})
+        # The committed units export their remaining capacity of 16 - 12
+        self.assertAlmostEqual(export[("a", 1)], 4)
+
+        # The export does not change the duals
+        pricing_model.solve(self.model)
+        np.testing.assert_allclose(
+            pricing_model.get_duals(self.get_constrs()),
+            get_fixed_duals(self.model, self.get_constrs()),
+        )
+
+
+class TestPowerSystemModelLMP(unittest.TestCase):
+    def setUp(self):
+        test_model_library_path = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "test_model_library")
+        )
+        self.inputs = SystemInput(
+            input_folder=test_model_library_path,
+            model_name="dummy",
+            year=2016,
+            sim_horizon=24,
+        )
+        self.inputs.load_and_check_data()
+
+    def test_lmp_matches_fixed(self):
+        model_builder = ModelBuilder(self.inputs)
+        system_record = SystemRecord(self.inputs)
+        init_conditions = create_init_condition(
+            self.inputs.thermal_units, self.inputs.storage_units
+        )
+        for step_k in range(1, 4):
+            if step_k == 1:
+                power_system_model = model_builder.build(step_k, init_conditions)
+            else:
+                power_system_model = model_builder.update(step_k, init_conditions)
+            power_system_model.optimize(log_to_console=False)
+
+            lmp = power_system_model.solve_for_lmp()
+            flow_balance = model_builder.system_builder.c_flow_balance
+            self.assertEqual(list(lmp.keys()), list(flow_balance.keys()))
+            np.testing.assert_allclose(
+                list(lmp.values()),
+                get_fixed_duals(power_system_model.model, flow_balance.values()),
+                atol=1e-6,
+            )
+
+            system_record.keep(
+                runtime=power_system_model.get_runtime(),
+                objval=power_system_model.get_objval(),
+                solution=power_system_model.get_structured_solution(),
+                step_k=step_k,
+                lmp=lmp,
+            )
+            init_conditions = system_record.get_init_conds()
+        self.assertEqual(system_record.get_lmp().shape, (72, len(self.inputs.nodes)))
+
+    def test_export_capacity(self):
+        model_builder = ModelBuilder(self.inputs)
+        init_conditions = create_init_condition(
+            self.inputs.thermal_units, self.inputs.storage_units
+        )
+        power_system_model = model_builder.build(1, init_conditions)
+        power_system_model.optimize(log_to_console=False)
+
+        shared_nodes = sorted(self.inputs.nodes)[:2]
+        export_capacity = power_system_model.solve_for_export_capacity(
+            shared_nodes=shared_nodes, sim_horizon=24, step_k=1
+        )
+        self.assertEqual(export_capacity.shape, (24, 2))
+        self.assertEqual(sorted(export_capacity.columns), shared_nodes)
+        self.assertTrue((export_capacity.to_numpy() >= 0).all())
+
+        # Same objective as adding the export variables to model.fixed()
+        model_fixed = power_system_model.model.fixed()
+        flow_balance = model_builder.system_builder.c_flow_balance
+        for node in shared_nodes:
+            for t in range(1, 25):
+                constr = flow_balance[f"flowBal[{node},{t}]"]
+                model_fixed.addVar(
+                    obj=-1,
+                    column=gp.Column([-1], [model_fixed.getConstrs()[constr.index]]),
+                )
+        model_fixed.optimize()
+        self.assertAlmostEqual(
+            power_system_model.gurobi_model._pricing_model.lp.ObjVal,
+            model_fixed.ObjVal,
+            places=4,
+        )
+
+        export_prices = power_system_model.solve_for_export_prices(
+            shared_nodes=shared_nodes, sim_horizon=24, step_k=1
+        )
+        self.assertEqual(export_prices.shape, (24, 2))
+
+    def test_export_hours_with_step_hours(self):
+        model_builder = ModelBuilder(self.inputs)
+        init_conditions = create_init_condition(
+            self.inputs.thermal_units, self.inputs.storage_units
+        )
+        power_system_model = model_builder.build(3, init_conditions)
+        power_system_model.optimize(log_to_console=False)
+
+        shared_nodes = sorted(self.inputs.nodes)[:2]
+        # The third step starts at hour 25 when each step advances 12 hours
+        for export_table in [
+            power_system_model.solve_for_export_capacity(
+                shared_nodes=shared_nodes, sim_horizon=24, step_k=3, step_hours=12
+            ),
+            power_system_model.solve_for_export_prices(
+                shared_nodes=shared_nodes, sim_horizon=24, step_k=3, step_hours=12
+            ),
+        ]:
+            self.assertEqual(list(export_table.index), list(range(25, 37)))
+
+
+if __name__ == "__main__":
+    unittest.main()
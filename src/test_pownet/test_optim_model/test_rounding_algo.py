@@ -1,7 +1,14 @@
+import os
 import unittest
 from unittest.mock import MagicMock, patch, call
+
+import gurobipy as gp
+import highspy
 import numpy as np
 
+from pownet import ModelBuilder, SystemInput
+from pownet.data_utils import create_init_condition
+
 # Import the module to be tested
 from pownet.optim_model import rounding_algo
 
@@ -243,16 +250,14 @@ class TestRoundingAlgorithm(unittest.TestCase):
         mock_logger.info.assert_not_called()
 
     @patch("pownet.optim_model.rounding_algo.logger")
-    @patch("pownet.optim_model.rounding_algo.fast_rounding")
-    @patch("pownet.optim_model.rounding_algo.slow_rounding")
-    @patch("pownet.optim_model.rounding_algo.find_fraction_vars")
-    @patch("pownet.optim_model.rounding_algo.get_variables")
+    @patch("pownet.optim_model.rounding_algo.get_rounded_values")
+    @patch("pownet.optim_model.rounding_algo.find_fraction_cols")
+    @patch("pownet.optim_model.rounding_algo.get_rounding_cols")
     def test_optimize_with_rounding(
         self,
-        mock_get_variables,
-        mock_find_fraction_vars,
-        mock_slow_rounding,
-        mock_fast_rounding,
+        mock_get_rounding_cols,
+        mock_find_fraction_cols,
+        mock_get_rounded_values,
         mock_logger,
     ):
         """Test the main optimize_with_rounding function."""
@@ -273,10 +278,25 @@ class TestRoundingAlgorithm(unittest.TestCase):
             "log_to_console": False,
         }
 
+        def reset_mocks():
+            initial_model.reset_mock()
+            initial_model.Params = MagicMock()  # Re-mock Params after parent reset
+            mock_relaxed_model.reset_mock()
+            mock_relaxed_model.Params = MagicMock()  # Re-mock Params
+            initial_model.relax.return_value = mock_relaxed_model  # Re-establish
+            mock_relaxed_model.getVars.return_value = [self.var1, self.var4]
+            mock_relaxed_model.getAttr.return_value = [0.5, 0.2]
+            mock_get_rounding_cols.reset_mock()
+            mock_get_rounding_cols.return_value = np.array([0, 1])
+            mock_find_fraction_cols.reset_mock()
+            mock_get_rounded_values.reset_mock()
+            mock_get_rounded_values.return_value = (np.array([0]), np.array([1.0]))
+            mock_logger.reset_mock()
+
+        reset_mocks()
+
         # --- Scenario 1: Solves in first iteration ---
-        mock_get_variables.return_value = {"status[0]": self.var1}
-        mock_find_fraction_vars.side_effect = [{}]
-        mock_relaxed_model.optimize = MagicMock()  # Fresh mock for optimize
+        mock_find_fraction_cols.side_effect = [np.array([False, False])]
         mock_relaxed_model.status = 2
         mock_relaxed_model.runtime = 10.0
 
@@ -285,10 +305,13 @@ class TestRoundingAlgorithm(unittest.TestCase):
         )
 
         initial_model.relax.assert_called_once()
-        mock_get_variables.assert_called_once_with(mock_relaxed_model)
+        mock_get_rounding_cols.assert_called_once_with(mock_relaxed_model)
         mock_relaxed_model.optimize.assert_called_once()
-        mock_find_fraction_vars.assert_called_once_with({"status[0]": self.var1})
-        mock_fast_rounding.assert_not_called()
+        mock_find_fraction_cols.assert_called_once()
+        np.testing.assert_array_equal(
+            mock_find_fraction_cols.call_args.args[0], [0.5, 0.2]
+        )
+        mock_get_rounded_values.assert_not_called()
         self.assertEqual(result_model, mock_relaxed_model)
         self.assertEqual(time, 10.0)
         self.assertEqual(iters, 0)
@@ -296,24 +319,16 @@ class TestRoundingAlgorithm(unittest.TestCase):
         self.assertEqual(initial_model.Params.MIPGap, 0.01)
         self.assertEqual(mock_relaxed_model.Params.LogToConsole, False)
 
-        # Reset mocks for next scenario
-        initial_model.reset_mock()
-        initial_model.Params = MagicMock()  # Re-mock Params after parent reset
-        mock_relaxed_model.reset_mock()
-        mock_relaxed_model.Params = MagicMock()  # Re-mock Params
-        initial_model.relax.return_value = mock_relaxed_model  # Re-establish
-        mock_get_variables.reset_mock()
-        mock_find_fraction_vars.reset_mock()
-        mock_slow_rounding.reset_mock()
-        mock_fast_rounding.reset_mock()
-        mock_logger.reset_mock()
+        reset_mocks()
 
         # --- Scenario 2: Solves in 3 iterations with "slow" strategy ---
-        mock_get_variables.return_value = {"s[0]": self.var1, "s[1]": self.var4}
-        frac_vars_iter1 = {"s[0]": self.var1}
-        frac_vars_iter2 = {"s[1]": self.var4}
-        mock_find_fraction_vars.side_effect = [frac_vars_iter1, frac_vars_iter2, {}]
-        mock_relaxed_model.optimize = MagicMock()  # Fresh mock
+        frac_iter1 = np.array([True, False])
+        frac_iter2 = np.array([False, True])
+        mock_find_fraction_cols.side_effect = [
+            frac_iter1,
+            frac_iter2,
+            np.array([False, False]),
+        ]
         mock_relaxed_model.status = 2
         mock_relaxed_model.runtime = 5.0
 
@@ -327,34 +342,28 @@ class TestRoundingAlgorithm(unittest.TestCase):
         )
 
         self.assertEqual(mock_relaxed_model.optimize.call_count, 3)
-        self.assertEqual(mock_find_fraction_vars.call_count, 3)
-        self.assertEqual(mock_slow_rounding.call_count, 2)
-        mock_slow_rounding.assert_any_call(fraction_vars=frac_vars_iter1, threshold=0.5)
-        mock_slow_rounding.assert_any_call(fraction_vars=frac_vars_iter2, threshold=0.5)
-        mock_fast_rounding.assert_not_called()
-        self.assertEqual(mock_relaxed_model.update.call_count, 2)
+        self.assertEqual(mock_find_fraction_cols.call_count, 3)
+        self.assertEqual(mock_get_rounded_values.call_count, 2)
+        for call_args, fractional in zip(
+            mock_get_rounded_values.call_args_list, [frac_iter1, frac_iter2]
+        ):
+            np.testing.assert_array_equal(call_args.args[1], fractional)
+            self.assertEqual(call_args.args[2:], ("slow", 0.5))
+        # The rounded variables are fixed with their lower and upper bounds
+        mock_relaxed_model.setAttr.assert_any_call("LB", [self.var1], np.array([1.0]))
+        self.assertEqual(mock_relaxed_model.setAttr.call_count, 4)
+        # The re-solves start from the basis with the dual simplex
+        self.assertEqual(mock_relaxed_model.Params.Method, 1)
         self.assertEqual(result_model, mock_relaxed_model)
         self.assertEqual(time, 15.0)
         self.assertEqual(iters, 2)
 
-        initial_model.reset_mock()
-        initial_model.Params = MagicMock()
-        mock_relaxed_model.reset_mock()
-        mock_relaxed_model.Params = MagicMock()
-        initial_model.relax.return_value = mock_relaxed_model
-        mock_get_variables.reset_mock()
-        mock_find_fraction_vars.reset_mock()
-        mock_slow_rounding.reset_mock()
-        mock_fast_rounding.reset_mock()
-        mock_logger.reset_mock()
+        reset_mocks()
 
         # --- Scenario 3: Reaches max_rounding_iter ---
-        mock_get_variables.return_value = {"s[0]": self.var1}
-        mock_find_fraction_vars.side_effect = lambda _: {"s[0]": self.var1}
-        mock_relaxed_model.optimize = MagicMock()  # Fresh mock
+        mock_find_fraction_cols.side_effect = lambda _: np.array([True, False])
         mock_relaxed_model.status = 2
         mock_relaxed_model.runtime = 1.0
-        initial_model.optimize = MagicMock()
 
         params_max_iter = {**default_params, "max_rounding_iter": 3}
         result_model, time, iters = rounding_algo.optimize_with_rounding(
@@ -362,58 +371,29 @@ class TestRoundingAlgorithm(unittest.TestCase):
         )
 
         self.assertEqual(mock_relaxed_model.optimize.call_count, 3)
-        self.assertEqual(mock_find_fraction_vars.call_count, 3)
-        self.assertEqual(mock_fast_rounding.call_count, 3)
+        self.assertEqual(mock_find_fraction_cols.call_count, 3)
+        self.assertEqual(mock_get_rounded_values.call_count, 3)
         mock_logger.warning.assert_called_once_with(
-            "\nPowNet: The rounding heuristic has terminated before finding an integer solution."
+            "\nPowNet: The rounding heuristic has terminated before finding an "
+            "integer solution."
         )
         initial_model.optimize.assert_called_once()
         self.assertEqual(result_model, initial_model)
         self.assertIsNone(time)
         self.assertIsNone(iters)
 
-        initial_model.reset_mock()
-        initial_model.Params = MagicMock()
-        mock_relaxed_model.reset_mock()
-        mock_relaxed_model.Params = MagicMock()
-        initial_model.relax.return_value = mock_relaxed_model
-        mock_get_variables.reset_mock()
-        mock_find_fraction_vars.reset_mock()
-        mock_slow_rounding.reset_mock()
-        mock_fast_rounding.reset_mock()
-        mock_logger.reset_mock()
+        reset_mocks()
 
         # --- Scenario 4: Rounding becomes infeasible (status 3) ---
-        mock_get_variables.return_value = {"s[0]": self.var1}
-        # Ensure find_fraction_vars returns a value that keeps the loop going once
-        mock_find_fraction_vars.side_effect = [
-            {"s[0]": create_mock_gurobi_var(0.5, "s[0]")}
-        ]
-
-        # Explicitly manage the optimize mock for this scenario to control its side_effect precisely
-        # This optimize mock belongs to mock_relaxed_model
-        mock_relaxed_model.optimize = MagicMock()
-        mock_relaxed_model.optimize.side_effect = (
-            None  # Clear any prior side_effect from reset
-        )
-
-        mock_relaxed_model.status_sequence = [2, 3]  # Status for 1st call, 2nd call
-        mock_relaxed_model.current_call_idx_for_status = (
-            0  # Use a unique attribute name
-        )
+        # Ensure find_fraction_cols returns a value that keeps the loop going once
+        mock_find_fraction_cols.side_effect = [np.array([True, False])]
+        status_sequence = iter([2, 3])  # Status for 1st call, 2nd call
 
         def optimize_side_effect_scen4():
-            # Set status based on the call sequence
-            idx = mock_relaxed_model.current_call_idx_for_status
-            if idx < len(mock_relaxed_model.status_sequence):
-                mock_relaxed_model.status = mock_relaxed_model.status_sequence[idx]
-            # If called more times, status remains as last set (or could define error)
-            mock_relaxed_model.current_call_idx_for_status += 1
+            mock_relaxed_model.status = next(status_sequence)
             mock_relaxed_model.runtime = 2.0  # Set runtime for each call
-            # model.optimize() typically returns None
 
         mock_relaxed_model.optimize.side_effect = optimize_side_effect_scen4
-        initial_model.optimize = MagicMock()  # Mock for the fallback
 
         result_model, time, iters = rounding_algo.optimize_with_rounding(
             initial_model, **default_params
@@ -430,20 +410,10 @@ class TestRoundingAlgorithm(unittest.TestCase):
         self.assertIsNone(time)
         self.assertIsNone(iters)
 
-        initial_model.reset_mock()
-        initial_model.Params = MagicMock()
-        mock_relaxed_model.reset_mock()
-        mock_relaxed_model.Params = MagicMock()
-        initial_model.relax.return_value = mock_relaxed_model
-        mock_get_variables.reset_mock()
-        mock_find_fraction_vars.reset_mock()
-        mock_slow_rounding.reset_mock()
-        mock_fast_rounding.reset_mock()
-        mock_logger.reset_mock()
+        reset_mocks()
+        mock_relaxed_model.optimize.side_effect = None
 
         # --- Scenario 5: Unrecognized model status ---
-        mock_get_variables.return_value = {"s[0]": self.var1}
-        mock_relaxed_model.optimize = MagicMock()  # Fresh mock
         mock_relaxed_model.status = 99
         mock_relaxed_model.runtime = 1.0
 
@@ -453,5 +423,247 @@ class TestRoundingAlgorithm(unittest.TestCase):
         mock_relaxed_model.optimize.assert_called_once()
 
 
+class TestVectorizedRounding(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a small unit commitment problem whose LP relaxation is fractional."""
+        self.model = gp.Model()
+        self.model.Params.LogToConsole = 0
+        self.x = self.model.addVars(3, ub=10, name="pthermal")
+        self.u = self.model.addVars(3, vtype=gp.GRB.BINARY, name="status")
+        self.model.addConstr(self.x.sum() >= 14, name="demand")
+        self.model.addConstrs(
+            (self.x[i] <= 8 * self.u[i] for i in range(3)), name="max"
+        )
+        self.model.addConstrs(
+            (self.x[i] >= 3 * self.u[i] for i in range(3)), name="min"
+        )
+        self.model.setObjective(
+            gp.quicksum((i + 1) * self.x[i] + 10 * self.u[i] for i in range(3))
+        )
+        self.model.update()
+
+        self.default_params = {
+            "rounding_strategy": "fast",
+            "threshold": 0,
+            "max_rounding_iter": 10,
+            "mipgap": 1e-6,
+            "timelimit": 100,
+            "num_threads": 1,
+            "log_to_console": False,
+        }
+
+    def test_get_rounding_cols(self):
+        """Test finding the columns of the variables by their name prefix."""
+        # Test with default target_varnames (should be ["status"])
+        np.testing.assert_array_equal(
+            rounding_algo.get_rounding_cols(self.model), [3, 4, 5]
+        )
+        np.testing.assert_array_equal(
+            rounding_algo.get_rounding_cols(
+                self.model, target_varnames=["status", "pthermal"]
+            ),
+            [0, 1, 2, 3, 4, 5],
+        )
+        self.assertEqual(
+            len(rounding_algo.get_rounding_cols(self.model, ["nonexistent"])), 0
+        )
+
+    def test_find_fraction_cols(self):
+        """Test finding the values that are not integers."""
+        values = np.array([0.5, 0.0, 1.0, 0.00001, 0.999999, 0.333, 2.0, 2.5])
+        np.testing.assert_array_equal(
+            rounding_algo.find_fraction_cols(values),
+            [True, False, False, False, False, True, False, True],
+        )
+        # 1e-6 is not close to 0 with atol 1e-7
+        np.testing.assert_array_equal(
+            rounding_algo.find_fraction_cols(np.array([1e-6, 1 - 1e-6]), atol=1e-7),
+            [True, False],
+        )
+        self.assertEqual(len(rounding_algo.find_fraction_cols(np.array([]))), 0)
+
+    def test_get_rounded_values(self):
+        """Test the fast and slow rounding strategies."""
+        values = np.array([0.8, 0.5, 1.0, 0.2, 2.5])
+        fractional = rounding_algo.find_fraction_cols(values)
+
+        idx, rounded = rounding_algo.get_rounded_values(
+            values, fractional, "fast", threshold=0.5
+        )
+        np.testing.assert_array_equal(idx, [0, 1, 3, 4])
+        # Integer variables with an upper bound above one are rounded as well
+        np.testing.assert_array_equal(rounded, [1, 1, 0, 3])
+
+        # The largest fractional value is rounded
+        idx, rounded = rounding_algo.get_rounded_values(
+            values, fractional, "slow", threshold=0.9
+        )
+        np.testing.assert_array_equal(idx, [4])
+        np.testing.assert_array_equal(rounded, [2])
+
+        # All values with the largest value are rounded
+        values = np.array([0.8, 0.8, 0.3])
+        idx, rounded = rounding_algo.get_rounded_values(
+            values, rounding_algo.find_fraction_cols(values), "slow", threshold=0
+        )
+        np.testing.assert_array_equal(idx, [0, 1])
+        np.testing.assert_array_equal(rounded, [1, 1])
+
+    def test_optimize_with_rounding(self):
+        """Test rounding with Gurobi until the status variables are integers."""
+        for rounding_strategy in ["fast", "slow"]:
+            rounding_model, runtime, iterations = rounding_algo.optimize_with_rounding(
+                self.model,
+                **{**self.default_params, "rounding_strategy": rounding_strategy},
+            )
+            self.assertIsNot(rounding_model, self.model)
+            self.assertEqual(rounding_model.NumIntVars, 0)
+            status = np.array(rounding_model.getAttr("X", rounding_model.getVars()[3:]))
+            np.testing.assert_allclose(status, np.round(status))
+            self.assertGreater(iterations, 0)
+            self.assertGreaterEqual(runtime, 0)
+            # Rounding up gives a feasible solution that is not better than the MIP
+            self.model.optimize()
+            self.assertGreaterEqual(rounding_model.ObjVal, self.model.ObjVal - 1e-6)
+
+    def test_rounding_starts_from_basis(self):
+        """Test that the re-solves after rounding start from the previous basis."""
+        rounding_model, _, iterations = rounding_algo.optimize_with_rounding(
+            self.model, **self.default_params
+        )
+        self.assertGreater(iterations, 0)
+        self.assertEqual(rounding_model.Params.Method, 1)
+        # Solving the last linear program from scratch takes at least as many pivots
+        cold_model = rounding_model.copy()
+        cold_model.Params.LogToConsole = 0
+        cold_model.Params.Presolve = 0
+        cold_model.optimize()
+        self.assertAlmostEqual(cold_model.ObjVal, rounding_model.ObjVal)
+        self.assertLessEqual(rounding_model.IterCount, cold_model.IterCount)
+
+    def test_optimize_with_rounding_highs(self):
+        """Test rounding with HiGHS until the status variables are integers."""
+        for rounding_strategy in ["fast", "slow"]:
+            rounding_model, runtime, iterations = (
+                rounding_algo.optimize_with_rounding_highs(
+                    self.model,
+                    **{**self.default_params, "rounding_strategy": rounding_strategy},
+                )
+            )
+            self.assertEqual(
+                rounding_model.getModelStatus(), highspy.HighsModelStatus.kOptimal
+            )
+            status = np.array(rounding_model.getSolution().col_value)[3:]
+            np.testing.assert_allclose(status, np.round(status))
+            self.assertGreater(iterations, 0)
+            self.assertGreaterEqual(runtime, 0)
+
+            gurobi_model, _, _ = rounding_algo.optimize_with_rounding(
+                self.model,
+                **{**self.default_params, "rounding_strategy": rounding_strategy},
+            )
+            self.assertAlmostEqual(
+                rounding_model.getInfo().objective_function_value,
+                gurobi_model.ObjVal,
+            )
+
+    @patch("pownet.optim_model.rounding_algo.logger")
+    def test_rounding_infeasible(self, mock_logger):
+        """Test that the MIP is solved when rounding down makes the model infeasible."""
+        params = {**self.default_params, "threshold": 1}
+        result_model, runtime, iterations = rounding_algo.optimize_with_rounding(
+            self.model, **params
+        )
+        mock_logger.warning.assert_called_once_with(
+            "\nPowNet: Rounding is infeasible. Use the MIP method."
+        )
+        self.assertIs(result_model, self.model)
+        self.assertIsNone(runtime)
+        self.assertIsNone(iterations)
+        mip_objval = self.model.ObjVal
+
+        mock_logger.reset_mock()
+        result_model, runtime, iterations = rounding_algo.optimize_with_rounding_highs(
+            self.model, **params
+        )
+        mock_logger.warning.assert_called_once_with(
+            "\nPowNet: Rounding is infeasible. Use the MIP method."
+        )
+        self.assertAlmostEqual(
+            result_model.getInfo().objective_function_value, mip_objval
+        )
+        self.assertIsNone(runtime)
+        self.assertIsNone(iterations)
+
+    @patch("pownet.optim_model.rounding_algo.logger")
+    def test_rounding_max_iter(self, mock_logger):
+        """Test that the MIP is solved when rounding reaches max_rounding_iter."""
+        params = {**self.default_params, "max_rounding_iter": 1}
+        result_model, runtime, iterations = rounding_algo.optimize_with_rounding(
+            self.model, **params
+        )
+        mock_logger.warning.assert_called_once_with(
+            "\nPowNet: The rounding heuristic has terminated before finding an "
+            "integer solution."
+        )
+        self.assertIs(result_model, self.model)
+        self.assertIsNone(runtime)
+        self.assertIsNone(iterations)
+
+        mock_logger.reset_mock()
+        result_model, runtime, iterations = rounding_algo.optimize_with_rounding_highs(
+            self.model, **params
+        )
+        mock_logger.warning.assert_called_once_with(
+            "\nPowNet: The rounding heuristic has terminated before finding an "
+            "integer solution."
+        )
+        self.assertAlmostEqual(
+            result_model.getInfo().objective_function_value, self.model.ObjVal
+        )
+        self.assertIsNone(iterations)
+
+
+class TestPowerSystemModelRounding(unittest.TestCase):
+    def setUp(self):
+        test_model_library_path = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "test_model_library")
+        )
+        self.inputs = SystemInput(
+            input_folder=test_model_library_path,
+            model_name="dummy",
+            year=2016,
+            sim_horizon=24,
+        )
+        self.inputs.load_and_check_data()
+
+    def test_optimize_with_rounding(self):
+        model_builder = ModelBuilder(self.inputs)
+        init_conditions = create_init_condition(
+            self.inputs.thermal_units, self.inputs.storage_units
+        )
+        power_system_model = model_builder.build(1, init_conditions)
+        power_system_model.optimize(log_to_console=False, mipgap=1e-6)
+        mip_objval = power_system_model.get_objval()
+
+        for solver in ["gurobi", "highs"]:
+            power_system_model.optimize_with_rounding("fast", solver=solver)
+            self.assertIsNotNone(power_system_model.rounding_iterations)
+            self.assertGreaterEqual(
+                power_system_model.get_objval(), mip_objval * (1 - 1e-6)
+            )
+            self.assertAlmostEqual(
+                power_system_model.get_runtime(),
+                power_system_model.rounding_optimization_time,
+            )
+            node_variables = power_system_model.get_structured_solution()["node"]
+            status = node_variables.loc[node_variables["vartype"] == "status", "value"]
+            np.testing.assert_allclose(status, np.round(status), atol=1e-6)
+
+        with self.assertRaises(ValueError):
+            power_system_model.optimize_with_rounding("fast", solver="lagrangian")
+
+
 if __name__ == "__main__":
     unittest.main()
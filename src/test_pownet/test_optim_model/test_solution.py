@@ -0,0 +1,149 @@
+"""This is test_solution.py"""
+
+import unittest
+
+import gurobipy as gp
+import numpy as np
+import pandas as pd
+
+from pownet.data_utils import (
+    parse_flow_variables,
+    parse_node_variables,
+    parse_syswide_variables,
+)
+from pownet.optim_model import PowerSystemModel, SolutionLayout
+
+
+class TestSolutionLayout(unittest.TestCase):
+    def setUp(self):
+        """Create a model with node, flow, and system-wide variables. The variables
+        are interleaved to check that the column order of the model is preserved.
+        """
+        self.model = gp.Model()
+        self.model.Params.LogToConsole = 0
+        units = ["pGas", "pCoal"]
+        nodes = ["Node1", "Node2"]
+        lines = [("Node1", "Node2"), ("pGas", "Node1")]
+        timesteps = range(1, 4)
+
+        self.variables = {
+            "status": self.model.addVars(
+                units, timesteps, vtype=gp.GRB.BINARY, name="status"
+            ),
+            "flow_fwd": self.model.addVars(lines, timesteps, name="flow_fwd"),
+            "spin_shortfall": self.model.addVars(timesteps, name="spin_shortfall"),
+            "theta": self.model.addVars(nodes, timesteps, lb=-10, name="theta"),
+            "flow_bwd": self.model.addVars(lines, timesteps, name="flow_bwd"),
+            "empty": gp.tupledict(),
+        }
+        self.model.update()
+
+        rng = np.random.default_rng(seed=0)
+        self.values = rng.uniform(0, 5, self.model.NumVars)
+        # Values that should be rounded to binary
+        self.values[0] = 1 - 1e-6
+        self.values[1] = 1e-6
+
+        self.solution = pd.DataFrame(
+            {"varname": self.model.getAttr("VarName"), "value": self.values}
+        )
+        self.solution[["vartype"]] = self.solution["varname"].str.extract(
+            r"(\w+)\[", expand=True
+        )
+
+    def test_get_tables(self):
+        tables = SolutionLayout(self.variables).get_tables(self.values)
+
+        expected_node = parse_node_variables(self.solution, sim_horizon=3, step_k=1)
+        expected_node = expected_node.drop(["varname", "hour"], axis=1)
+        pd.testing.assert_frame_equal(
+            tables["node"],
+            expected_node.reset_index(drop=True),
+            check_dtype=False,
+        )
+        self.assertEqual(tables["node"].loc[0, "value"], 1)
+        self.assertEqual(tables["node"].loc[1, "value"], 0)
+
+        expected_flow = parse_flow_variables(self.solution, sim_horizon=3, step_k=1)
+        pd.testing.assert_frame_equal(
+            tables["flow"],
+            expected_flow.drop("hour", axis=1).reset_index(drop=True),
+            check_dtype=False,
+        )
+
+        expected_syswide = parse_syswide_variables(
+            self.solution, sim_horizon=3, step_k=1
+        )
+        pd.testing.assert_frame_equal(
+            tables["syswide"],
+            expected_syswide.drop("hour", axis=1).reset_index(drop=True),
+            check_dtype=False,
+        )
+
+    def test_empty_layout(self):
+        tables = SolutionLayout({}).get_tables(np.array([]))
+        self.assertTrue(tables["node"].empty)
+        self.assertTrue(tables["flow"].empty)
+        self.assertTrue(tables["syswide"].empty)
+
+    def test_invalid_index(self):
+        model = gp.Model()
+        var = model.addVars(["a"], ["b"], ["c"], [1], name="var")
+        model.update()
+        with self.assertRaises(ValueError):
+            SolutionLayout({"var": var})
+
+    def test_get_structured_solution(self):
+        self.model.setObjective(self.variables["status"].sum(), gp.GRB.MAXIMIZE)
+        self.model.addConstr(self.variables["theta"].sum() >= 0)
+        psm = PowerSystemModel(self.model)
+
+        with self.assertRaises(ValueError):
+            psm.get_structured_solution()
+
+        psm.solution_layout = SolutionLayout(self.variables)
+        for solver in ["gurobi", "highs"]:
+            psm.model = self.model
+            psm.optimize(solver=solver, log_to_console=False)
+            tables = psm.get_structured_solution()
+            status = tables["node"][tables["node"]["vartype"] == "status"]
+            self.assertTrue((status["value"] == 1).all())
+
+    def test_get_shifted_start(self):
+        layout = SolutionLayout(self.variables)
+        col_idx, start_values = layout.get_shifted_start(
+            self.values, shift=1, vartypes=("status",)
+        )
+        status = self.variables["status"]
+        expected = {
+            status[unit, t].index: self.values[status[unit, t + 1].index]
+            for unit in ["pGas", "pCoal"]
+            for t in [1, 2]
+        }
+        self.assertEqual(dict(zip(col_idx.tolist(), start_values)), expected)
+
+        # No overlap when the shift covers the whole horizon
+        col_idx, start_values = layout.get_shifted_start(self.values, shift=3)
+        self.assertEqual(len(col_idx), 0)
+
+    def test_mip_start(self):
+        self.model.setObjective(self.variables["status"].sum(), gp.GRB.MAXIMIZE)
+        psm = PowerSystemModel(self.model)
+        status_idx = [v.index for v in self.variables["status"].values()]
+        psm.set_mip_start(status_idx, np.ones(len(status_idx)))
+
+        for solver in ["gurobi", "highs"]:
+            psm.model = self.model
+            psm.optimize(solver=solver, log_to_console=False)
+            self.assertAlmostEqual(psm.get_objval(), len(status_idx))
+
+        # The start is cleared from the Gurobi model once it is no longer set
+        self.assertTrue(self.model._has_mip_start)
+        psm = PowerSystemModel(self.model)
+        psm.optimize(solver="gurobi", log_to_console=False)
+        self.assertFalse(self.model._has_mip_start)
+        self.assertEqual(self.variables["status"]["pGas", 1].Start, gp.GRB.UNDEFINED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,11 @@
 """test_variable_func.py: Unit tests for variable_func.py."""
 
 import unittest
-from unittest.mock import MagicMock, patch, call
+from unittest.mock import MagicMock, patch
 import pandas as pd
 
+from pownet.data_model import TimeseriesArray
+
 # Assuming variable_func is in pownet.optim_model directory
 # Adjust the import path if your directory structure is different.
 # For example, if pownet is in your PYTHONPATH:
@@ -46,8 +48,7 @@ class TestVariableFunctions(unittest.TestCase):
         self.flow_capacity_df = pd.DataFrame(data_for_flow_df, index=idx)
 
     @patch("pownet.optim_model.variable_func.GRB")
-    @patch("pownet.optim_model.variable_func.get_capacity_value")
-    def test_add_var_with_variable_ub(self, mock_get_capacity_value, mock_grb_module):
+    def test_add_var_with_variable_ub(self, mock_grb_module):
         """Test the add_var_with_variable_ub function."""
         var_name = "test_var"
         step_k_test = 2
@@ -55,24 +56,21 @@ class TestVariableFunctions(unittest.TestCase):
         # Mock the GRB constant
         mock_grb_module.CONTINUOUS = "MOCK_GRB_CONTINUOUS_TYPE"
 
-        # Define a side effect for mock_get_capacity_value
-        def capacity_side_effect(t, unit, sk, df):
-            self.assertIs(df, self.dummy_capacity_df)  # Ensure correct df is passed
-            if unit == self.units[0]:
-                return 100 + t + sk
-            elif unit == self.units[1]:
-                return 200 + t + sk
-            return 0
-
-        mock_get_capacity_value.side_effect = capacity_side_effect
+        # Capacity of each unit indexed by hour
+        capacity_df = pd.DataFrame(
+            {
+                self.units[0]: [100 + i for i in range(50)],
+                self.units[1]: [200 + i for i in range(50)],
+            },
+            index=pd.RangeIndex(start=0, stop=50, step=1),
+        )
 
-        # Expected upper bounds dictionary based on the side effect
+        # Expected upper bounds dictionary: hour t + (step_k - 1) * 24
         expected_ub_dict = {}
         for t_val in self.timesteps:
+            hour = t_val + (step_k_test - 1) * 24
             for unit_val in self.units:
-                expected_ub_dict[(unit_val, t_val)] = capacity_side_effect(
-                    t_val, unit_val, step_k_test, self.dummy_capacity_df
-                )
+                expected_ub_dict[(unit_val, t_val)] = capacity_df.loc[hour, unit_val]
 
         # Call the function
         created_vars = variable_func.add_var_with_variable_ub(
@@ -81,7 +79,7 @@ class TestVariableFunctions(unittest.TestCase):
             timesteps=self.timesteps,
             step_k=step_k_test,
             units=self.units,
-            capacity_df=self.dummy_capacity_df,
+            capacity_df=capacity_df,
         )
 
         # Assert model.addVars was called correctly
@@ -97,22 +95,7 @@ class TestVariableFunctions(unittest.TestCase):
         # Assert that the function returns what model.addVars returned
         self.assertEqual(created_vars, self.mock_vars_tupledict)
 
-        # Verify calls to get_capacity_value
-        expected_calls_to_get_capacity = []
-        for t_val in self.timesteps:
-            for unit_val in self.units:
-                expected_calls_to_get_capacity.append(
-                    call(t_val, unit_val, step_k_test, self.dummy_capacity_df)
-                )
-        mock_get_capacity_value.assert_has_calls(
-            expected_calls_to_get_capacity, any_order=True
-        )
-        self.assertEqual(
-            mock_get_capacity_value.call_count, len(self.units) * len(self.timesteps)
-        )
-
-    @patch("pownet.optim_model.variable_func.get_capacity_value")
-    def test_update_var_with_variable_ub(self, mock_get_capacity_value):
+    def test_update_var_with_variable_ub(self):
         """Test the update_var_with_variable_ub function."""
         step_k_test = 1
 
@@ -134,46 +117,31 @@ class TestVariableFunctions(unittest.TestCase):
             (self.units[0], 2): mock_gvar3,
         }
 
-        # Configure side effect for get_capacity_value
-        expected_capacity_gvar1 = 150
-        expected_capacity_gvar2 = 250
-        expected_capacity_gvar3 = 175
-
-        def capacity_side_effect(t_arg, unit_arg, sk_arg, df_arg):
-            self.assertEqual(sk_arg, step_k_test)
-            self.assertIs(df_arg, self.dummy_capacity_df)
-            if unit_arg == self.units[0] and t_arg == 0:
-                return expected_capacity_gvar1
-            elif unit_arg == self.units[1] and t_arg == 1:
-                return expected_capacity_gvar2
-            elif unit_arg == self.units[0] and t_arg == 2:
-                return expected_capacity_gvar3
-            return 0  # Default, should not be hit
-
-        mock_get_capacity_value.side_effect = capacity_side_effect
+        capacity_df = pd.DataFrame(
+            {self.units[0]: [150, 160, 175], self.units[1]: [240, 250, 260]},
+            index=self.timesteps,
+        )
 
         # Call the function
         variable_func.update_var_with_variable_ub(
             variables=mock_variables_dict,
             step_k=step_k_test,
-            capacity_df=self.dummy_capacity_df,
+            capacity_df=capacity_df,
         )
 
-        # Assertions
-        # Check get_capacity_value calls
-        # The calls are made based on the keys of mock_variables_dict
-        expected_calls = [
-            call(0, self.units[0], step_k_test, self.dummy_capacity_df),
-            call(1, self.units[1], step_k_test, self.dummy_capacity_df),
-            call(2, self.units[0], step_k_test, self.dummy_capacity_df),
-        ]
-        mock_get_capacity_value.assert_has_calls(expected_calls, any_order=True)
-        self.assertEqual(mock_get_capacity_value.call_count, len(mock_variables_dict))
-
         # Check if variable upper bounds were updated
-        self.assertEqual(mock_gvar1.ub, expected_capacity_gvar1)
-        self.assertEqual(mock_gvar2.ub, expected_capacity_gvar2)
-        self.assertEqual(mock_gvar3.ub, expected_capacity_gvar3)
+        self.assertEqual(mock_gvar1.ub, 150)
+        self.assertEqual(mock_gvar2.ub, 250)
+        self.assertEqual(mock_gvar3.ub, 175)
+
+        # The same values are read from a TimeseriesArray
+        mock_gvar1.ub = 0
+        variable_func.update_var_with_variable_ub(
+            variables=mock_variables_dict,
+            step_k=step_k_test,
+            capacity_df=TimeseriesArray(capacity_df),
+        )
+        self.assertEqual(mock_gvar1.ub, 150)
 
     def test_update_flow_vars(
         self,